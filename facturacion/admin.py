@@ -71,6 +71,14 @@ class ECFSequenceAdmin(admin.ModelAdmin):
     readonly_fields = ['created_at', 'updated_at']
 
 
+@admin.register(ECFSequenceReservation)
+class ECFSequenceReservationAdmin(admin.ModelAdmin):
+    list_display = ['sequence', 'first_number', 'last_number', 'owner', 'status', 'expires_at', 'used_count']
+    list_filter = ['status', 'ecf_type']
+    search_fields = ['owner', 'sequence__issuer__rnc']
+    readonly_fields = ['reserved_at', 'reconciled_at', 'unused_encfs']
+
+
 class ECFEventLogInline(admin.TabularInline):
     model = ECFEventLog
     extra = 0
@@ -85,7 +93,7 @@ class ElectronicFiscalDocumentAdmin(admin.ModelAdmin):
     search_fields = ['encf', 'track_id', 'invoice__invoice_number', 'credit_note__credit_note_number', 'issuer__business_name']
     readonly_fields = [
         'created_at', 'updated_at', 'last_submitted_at', 'accepted_at',
-        'last_status_checked_at', 'xml_content', 'signed_xml_content',
+        'last_status_checked_at', 'next_status_check_at', 'xml_content', 'signed_xml_content',
         'dgii_request_xml', 'dgii_response_xml', 'dgii_response',
         'async_task_id', 'idempotency_key', 'submission_attempts',
         'status_check_attempts', 'next_retry_at', 'last_error',
@@ -113,6 +121,28 @@ class ECFStatusEventAdmin(admin.ModelAdmin):
     ]
 
 
+@admin.register(ECFArtifact)
+class ECFArtifactAdmin(admin.ModelAdmin):
+    list_display = ['sha256', 'size', 'created_at']
+    search_fields = ['sha256']
+    readonly_fields = ['sha256', 'size', 'created_at']
+    exclude = ['content']
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(ECFOutbox)
+class ECFOutboxAdmin(admin.ModelAdmin):
+    list_display = ['document', 'task', 'status', 'attempts', 'available_at', 'dispatched_at', 'task_id']
+    list_filter = ['status', 'task']
+    search_fields = ['document__encf', 'task_id', 'last_error']
+    readonly_fields = ['created_at', 'dispatched_at', 'task_id', 'last_error', 'payload']
+
+
 @admin.register(DGIIPublicRequestLog)
 class DGIIPublicRequestLogAdmin(admin.ModelAdmin):
     list_display = ['endpoint', 'method', 'rnc', 'response_status', 'created_at']
@@ -130,6 +160,48 @@ class DGIIPublicRequestLogAdmin(admin.ModelAdmin):
         return False
 
 
+class ArchivedLogAdmin(admin.ModelAdmin):
+    """Archive tables are written only by ``archive_audit_logs``."""
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(ECFEventLogArchive)
+class ECFEventLogArchiveAdmin(ArchivedLogAdmin):
+    list_display = ['electronic_document', 'event_type', 'created_by', 'created_at', 'period']
+    list_filter = ['event_type', 'period']
+    search_fields = ['electronic_document__encf']
+    readonly_fields = ['electronic_document', 'event_type', 'message', 'payload', 'created_by', 'created_at', 'period', 'archived_at']
+
+
+@admin.register(ECFStatusEventArchive)
+class ECFStatusEventArchiveAdmin(ArchivedLogAdmin):
+    list_display = ['document', 'previous_fiscal_status', 'new_fiscal_status', 'new_job_status', 'source', 'created_at', 'period']
+    list_filter = ['source', 'new_fiscal_status', 'period']
+    search_fields = ['document__encf', 'task_id']
+    readonly_fields = [
+        'document', 'previous_fiscal_status', 'new_fiscal_status',
+        'previous_job_status', 'new_job_status', 'source', 'reason',
+        'task_id', 'created_at', 'period', 'archived_at',
+    ]
+
+
+@admin.register(DGIIPublicRequestLogArchive)
+class DGIIPublicRequestLogArchiveAdmin(ArchivedLogAdmin):
+    list_display = ['endpoint', 'method', 'rnc', 'response_status', 'created_at', 'period']
+    list_filter = ['endpoint', 'method', 'response_status', 'period']
+    search_fields = ['rnc', 'body_sha256']
+    readonly_fields = [
+        'endpoint', 'method', 'content_type', 'safe_headers', 'body_sha256',
+        'body_preview', 'rnc', 'remote_addr', 'response_status', 'error',
+        'created_at', 'period', 'archived_at',
+    ]
+
+
 class DGIICertificationItemInline(admin.TabularInline):
     model = DGIICertificationItem
     extra = 0
@@ -0,0 +1,85 @@
+"""Read endpoints that span a hot log table and its archive table."""
+
+from django.http import Http404
+from django.shortcuts import get_object_or_404
+from rest_framework.response import Response
+
+
+class ArchiveSpanningRows:
+    """Read-only, sliceable sequence of a hot queryset followed by its archive.
+
+    Archived rows are always older than hot ones, so for created_at ordering
+    the two querysets can simply be concatenated (newest first: hot, then
+    archive). Only the slice a page needs is fetched from each table.
+    """
+
+    ordered = True
+
+    def __init__(self, hot, archived):
+        ascending = not str((hot.query.order_by or hot.model._meta.ordering or ['-created_at'])[0]).startswith('-')
+        self.parts = (archived, hot) if ascending else (hot, archived)
+        self._counts = None
+
+    def counts(self):
+        if self._counts is None:
+            self._counts = tuple(part.count() for part in self.parts)
+        return self._counts
+
+    def count(self):
+        return sum(self.counts())
+
+    def __len__(self):
+        return self.count()
+
+    def __iter__(self):
+        for part in self.parts:
+            yield from part
+
+    def __getitem__(self, key):
+        if not isinstance(key, slice):
+            rows = self[key:key + 1]
+            if not rows:
+                raise IndexError(key)
+            return rows[0]
+        start, stop, _step = key.indices(self.count())
+        rows, offset = [], 0
+        for part, size in zip(self.parts, self.counts()):
+            if start < offset + size and stop > offset:
+                rows.extend(part[max(start - offset, 0):min(stop - offset, size)])
+            offset += size
+        return rows
+
+
+class ArchiveSpanningListMixin:
+    """List/retrieve hot rows and their archived counterparts as one collection.
+
+    Views set ``archive_queryset``; filters, company scoping and created_at
+    ordering are applied to both tables.
+    """
+
+    archive_queryset = None
+
+    def get_archive_queryset(self):
+        return self.get_company_scoped_queryset(self.archive_queryset.all())
+
+    def list(self, request, *args, **kwargs):
+        rows = ArchiveSpanningRows(
+            self.filter_queryset(self.get_queryset()),
+            self.filter_queryset(self.get_archive_queryset()),
+        )
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(self.get_serializer(page, many=True).data)
+        return Response(self.get_serializer(rows, many=True).data)
+
+    def get_object(self):
+        try:
+            return super().get_object()
+        except Http404:
+            lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+            obj = get_object_or_404(
+                self.filter_queryset(self.get_archive_queryset()),
+                **{self.lookup_field: self.kwargs[lookup_url_kwarg]},
+            )
+            self.check_object_permissions(self.request, obj)
+            return obj
@@ -0,0 +1,19 @@
+"""DRF authentication backed by the cached tenant context."""
+
+from django.utils.translation import gettext_lazy as _
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.exceptions import AuthenticationFailed
+
+from facturacion.services.tenant_context import cached_token
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """TokenAuthentication that reuses the cached token lookup instead of querying per request."""
+
+    def authenticate_credentials(self, key):
+        token = cached_token(key)
+        if token is None:
+            raise AuthenticationFailed(_("Invalid token."))
+        if not token.user.is_active:
+            raise AuthenticationFailed(_("User inactive or deleted."))
+        return (token.user, token)
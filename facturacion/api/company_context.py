@@ -4,7 +4,8 @@ from __future__ import annotations
 
 from django.core.exceptions import PermissionDenied
 
-from facturacion.models import Company, CompanyMembership
+from facturacion.models import Company
+from facturacion.services.tenant_context import cached_memberships
 
 
 ACTIVE_COMPANY_SESSION_KEY = "active_company_id"
@@ -42,12 +43,7 @@ def get_user_companies(user):
 def user_has_company_access(user, company):
     if not user or not user.is_authenticated or company is None:
         return False
-    return CompanyMembership.objects.filter(
-        user=user,
-        company=company,
-        is_active=True,
-        company__is_active=True,
-    ).exists()
+    return _membership_for(cached_memberships(user), company.pk) is not None
 
 
 def resolve_company_context(request):
@@ -56,37 +52,30 @@ def resolve_company_context(request):
     if not user or not user.is_authenticated:
         return None, None
 
-    memberships = (
-        CompanyMembership.objects
-        .select_related("company")
-        .filter(user=user, is_active=True, company__is_active=True)
-        .order_by("company__name")
-    )
-
-    count = memberships.count()
-    if count == 0:
+    memberships = cached_memberships(user)
+    if not memberships:
         _clear_active_company(request)
         return None, None
-    if count == 1:
-        membership = memberships.first()
+    if len(memberships) == 1:
+        membership = memberships[0]
         _set_active_company(request, membership.company_id)
         return membership.company, membership
 
     session_company_id = _session_company_id(request)
     if session_company_id:
-        membership = memberships.filter(company_id=session_company_id).first()
+        membership = _membership_for(memberships, session_company_id)
         if membership:
             return membership.company, membership
         _clear_active_company(request)
 
     header_company_id = _header_company_id(request)
     if header_company_id:
-        membership = memberships.filter(company_id=header_company_id).first()
+        membership = _membership_for(memberships, header_company_id)
         if membership:
             _set_active_company(request, membership.company_id)
             return membership.company, membership
 
-    membership = memberships.first()
+    membership = memberships[0]
     _set_active_company(request, membership.company_id)
     return membership.company, membership
 
@@ -97,6 +86,10 @@ def user_company_queryset(user):
     return Company.objects.filter(memberships__user=user, memberships__is_active=True, is_active=True).distinct()
 
 
+def _membership_for(memberships, company_id):
+    return next((membership for membership in memberships if membership.company_id == company_id), None)
+
+
 def _assign_company_context(request, company, membership):
     request.company = company
     request.company_membership = membership
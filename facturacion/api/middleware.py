@@ -1,8 +1,7 @@
 """Request middleware for SaaS company context."""
 
-from rest_framework.authtoken.models import Token
-
 from facturacion.api.company_context import resolve_company_context
+from facturacion.services.tenant_context import cached_token
 
 
 class CompanyContextMiddleware:
@@ -35,8 +34,5 @@ class CompanyContextMiddleware:
         if len(parts) != 2 or parts[0].lower() != "token":
             return None
 
-        try:
-            token = Token.objects.select_related("user").get(key=parts[1])
-        except Token.DoesNotExist:
-            return None
-        return token.user
+        token = cached_token(parts[1])
+        return token.user if token is not None else None
@@ -14,9 +14,9 @@ def _effective_fiscal_status(document):
         return 'submitted'
     if legacy_status in {'draft', 'xml_generated', 'signed'}:
         return legacy_status
-    if document.signed_xml_content:
+    if document.artifact_sha256('signed_xml_content'):
         return 'signed'
-    if document.xml_content:
+    if document.artifact_sha256('xml_content'):
         return 'xml_generated'
     return document.fiscal_status or 'draft'
 
@@ -61,7 +61,7 @@ class ElectronicFiscalDocumentSerializer(serializers.ModelSerializer):
             'track_id',
             'xml_available', 'signed_xml_available', 'dgii_request_available',
             'dgii_response_available', 'dgii_response', 'last_submitted_at',
-            'last_status_checked_at', 'accepted_at', 'rejection_reason',
+            'last_status_checked_at', 'next_status_check_at', 'accepted_at', 'rejection_reason',
             'async_task_id', 'idempotency_key', 'submission_attempts',
             'status_check_attempts', 'next_retry_at', 'last_error',
             'created_at', 'updated_at', 'events', 'status_events'
@@ -72,7 +72,7 @@ class ElectronicFiscalDocumentSerializer(serializers.ModelSerializer):
             'is_terminal_fiscal', 'track_id',
             'xml_available', 'signed_xml_available', 'dgii_request_available',
             'dgii_response_available', 'dgii_response', 'last_submitted_at',
-            'last_status_checked_at', 'accepted_at', 'rejection_reason',
+            'last_status_checked_at', 'next_status_check_at', 'accepted_at', 'rejection_reason',
             'async_task_id', 'idempotency_key', 'submission_attempts',
             'status_check_attempts', 'next_retry_at', 'last_error',
             'created_at', 'updated_at', 'events', 'status_events'
@@ -121,13 +121,13 @@ class ElectronicFiscalDocumentSerializer(serializers.ModelSerializer):
         return _effective_fiscal_status(obj) in {'accepted', 'rejected'}
 
     def get_xml_available(self, obj):
-        return bool(obj.xml_content)
+        return bool(obj.artifact_sha256('xml_content'))
 
     def get_signed_xml_available(self, obj):
-        return bool(obj.signed_xml_content)
+        return bool(obj.artifact_sha256('signed_xml_content'))
 
     def get_dgii_request_available(self, obj):
-        return bool(obj.dgii_request_xml)
+        return bool(obj.artifact_sha256('dgii_request_xml'))
 
     def get_dgii_response_available(self, obj):
-        return bool(obj.dgii_response_xml)
+        return bool(obj.artifact_sha256('dgii_response_xml'))
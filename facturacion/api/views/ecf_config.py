@@ -13,6 +13,7 @@ from rest_framework.parsers import FormParser, MultiPartParser
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 
+from facturacion.api.archive import ArchiveSpanningListMixin
 from facturacion.api.company_context import get_current_company, get_current_membership
 from facturacion.api.permissions import model_permissions
 from facturacion.api.scoping import CompanyScopedQuerysetMixin
@@ -28,7 +29,14 @@ from facturacion.ecf.certificates.resolver import resolve_certificate_credential
 from facturacion.ecf.exceptions import ECFError
 from facturacion.ecf.services.certificate_policy import ECFCertificateSigningPolicy
 from facturacion.ecf.signer.xml_signer import ECFXMLSigner
-from facturacion.models import CompanyMembership, ECFCertificate, ECFEventLog, ECFIssuerConfig, ECFSequence
+from facturacion.models import (
+    CompanyMembership,
+    ECFCertificate,
+    ECFEventLog,
+    ECFEventLogArchive,
+    ECFIssuerConfig,
+    ECFSequence,
+)
 from facturacion.permissions import HasRequiredPermissions
 
 
@@ -268,12 +276,14 @@ class ECFSequenceViewSet(CompanyScopedQuerysetMixin, viewsets.ModelViewSet):
     ordering = ['ecf_type', 'next_number']
 
 
-class ECFEventLogViewSet(CompanyScopedQuerysetMixin, viewsets.ReadOnlyModelViewSet):
+class ECFEventLogViewSet(ArchiveSpanningListMixin, CompanyScopedQuerysetMixin, viewsets.ReadOnlyModelViewSet):
     queryset = ECFEventLog.objects.select_related('electronic_document', 'created_by').all()
+    archive_queryset = ECFEventLogArchive.objects.select_related('electronic_document', 'created_by').all()
     serializer_class = ECFEventLogSerializer
     permission_classes = [IsAuthenticated, HasRequiredPermissions]
     required_permissions = {'GET': ['facturacion.view_ecfeventlog']}
     company_field = 'electronic_document__company'
     filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
     filterset_fields = ['electronic_document', 'event_type']
+    ordering_fields = ['created_at']
     ordering = ['-created_at']
@@ -1,7 +1,8 @@
 from django.core.exceptions import ValidationError as DjangoValidationError
-from django.db.models import Count, Sum
+from django.db.models import Count, Q, Sum
 from django.db.models.functions import Coalesce
-from django.http import HttpResponse
+from django.http import HttpResponse, StreamingHttpResponse
+from django.utils.cache import patch_vary_headers
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import filters, status, viewsets
 from rest_framework.decorators import action
@@ -18,6 +19,7 @@ from facturacion.ecf.queues import (
     enqueue_check_status,
     enqueue_generate_xml,
     enqueue_retry_submission,
+    enqueue_sign_batch,
     enqueue_sign_xml,
     enqueue_submit_dgii,
     enqueue_submission_pipeline,
@@ -28,15 +30,16 @@ from facturacion.ecf.services.document_factory import ECFDocumentFactoryService
 from facturacion.ecf.services.certificate_policy import ECFCertificateSigningPolicy
 from facturacion.ecf.services.signing import ECFSigningService
 from facturacion.ecf.services.xml_generation import ECFXMLGenerationService
-from facturacion.models import ECFIssuerConfig, ElectronicFiscalDocument, Invoice
+from facturacion.models import ECFArtifact, ECFIssuerConfig, ElectronicFiscalDocument, Invoice
 from facturacion.permissions import HasRequiredPermissions
+from facturacion.services.response_cache import ECF_MONITOR_NAMESPACE, TenantResponseCache
 
 
 class ElectronicFiscalDocumentViewSet(CompanyScopedQuerysetMixin, viewsets.ModelViewSet):
     queryset = (
         ElectronicFiscalDocument.objects
         .select_related('invoice', 'credit_note', 'issuer', 'sequence')
-        .prefetch_related('events')
+        .prefetch_related('events', 'status_events')
         .all()
     )
     serializer_class = ElectronicFiscalDocumentSerializer
@@ -47,6 +50,7 @@ class ElectronicFiscalDocumentViewSet(CompanyScopedQuerysetMixin, viewsets.Model
     search_fields = ['encf', 'track_id', 'invoice__invoice_number', 'credit_note__credit_note_number']
     ordering_fields = ['created_at', 'updated_at', 'encf']
     ordering = ['-created_at']
+    sign_batch_max_documents = 500
 
     def _enqueue_or_503(self, enqueue_callable):
         try:
@@ -202,6 +206,28 @@ class ElectronicFiscalDocumentViewSet(CompanyScopedQuerysetMixin, viewsets.Model
         result = response
         return Response(result, status=status.HTTP_202_ACCEPTED)
 
+    @action(detail=False, methods=['post'], url_path='sign-xml-batch-async')
+    def sign_xml_batch_async(self, request):
+        document_ids = request.data.get('document_ids')
+        if not isinstance(document_ids, list) or not document_ids or not all(isinstance(pk, int) for pk in document_ids):
+            return Response({'detail': 'document_ids debe ser una lista no vacía de IDs.'}, status=status.HTTP_400_BAD_REQUEST)
+        if len(document_ids) > self.sign_batch_max_documents:
+            return Response(
+                {'detail': f'Máximo {self.sign_batch_max_documents} documentos por lote.'},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        validate_xsd = request.data.get('validate_xsd', True)
+        if isinstance(validate_xsd, str):
+            validate_xsd = validate_xsd.lower() not in ('false', '0', 'no')
+        scoped_ids = list(self.get_queryset().filter(pk__in=document_ids).values_list('pk', flat=True))
+        response = self._enqueue_or_503(
+            lambda: enqueue_sign_batch(scoped_ids, user_id=request.user.id, validate_xsd=bool(validate_xsd))
+        )
+        if isinstance(response, Response):
+            return response
+        result = response
+        return Response(result, status=status.HTTP_202_ACCEPTED)
+
     @action(detail=True, methods=['post'], url_path='submit-dgii')
     def submit_dgii(self, request, pk=None):
         document = self.get_object()
@@ -319,46 +345,73 @@ class ElectronicFiscalDocumentViewSet(CompanyScopedQuerysetMixin, viewsets.Model
             'dgii-request': 'dgii_request_xml',
             'dgii-response': 'dgii_response_xml',
         }
-        field = field_by_artifact[artifact]
-        content = getattr(document, field, None)
-        if not content:
+        sha256 = document.artifact_sha256(field_by_artifact[artifact])
+        stored = ECFArtifact.objects.filter(sha256=sha256).first() if sha256 else None
+        if stored is None:
             return Response({'detail': 'Artefacto no disponible.', 'code': 'artifact_not_available'}, status=status.HTTP_404_NOT_FOUND)
 
-        response = HttpResponse(content, content_type='application/xml; charset=utf-8')
+        content_type = 'application/xml; charset=utf-8'
+        if _accepts_gzip(request.META.get('HTTP_ACCEPT_ENCODING', '')):
+            # The blob is already gzip: hand it over as-is instead of inflating it.
+            response = HttpResponse(bytes(stored.content), content_type=content_type)
+            response['Content-Encoding'] = 'gzip'
+            # Each representation gets its own strong validator.
+            response['ETag'] = f'"{sha256}-gzip"'
+        else:
+            response = StreamingHttpResponse(stored.chunks(), content_type=content_type)
+            response['Content-Length'] = str(stored.size)
+            response['ETag'] = f'"{sha256}"'
+        patch_vary_headers(response, ['Accept-Encoding'])
         response['Content-Disposition'] = f'attachment; filename="{document.encf}-{artifact}.xml"'
         return response
 
     @action(detail=False, methods=['get'], url_path='async-monitor')
     def async_monitor(self, request):
         queryset = self.get_queryset()
-        by_fiscal_status = (
-            queryset
-            .values('fiscal_status')
-            .annotate(count=Count('id'))
-            .order_by('fiscal_status')
+        company = require_current_company(request)
+        payload = TenantResponseCache(ECF_MONITOR_NAMESPACE).get_or_compute(
+            company.pk,
+            'monitor',
+            {},
+            lambda: self._async_monitor_payload(queryset),
         )
-        by_job_status = (
-            queryset
-            .values('job_status')
-            .annotate(count=Count('id'))
-            .order_by('job_status')
+        return Response(payload)
+
+    def _async_monitor_payload(self, queryset):
+        fiscal_statuses = sorted(value for value, _label in ElectronicFiscalDocument.FISCAL_STATUS_CHOICES)
+        job_statuses = sorted(value for value, _label in ElectronicFiscalDocument.JOB_STATUS_CHOICES)
+        counters = queryset.order_by().aggregate(
+            retry_pending=Count('id', filter=Q(next_retry_at__isnull=False)),
+            submission_attempts=Coalesce(Sum('submission_attempts'), 0),
+            status_check_attempts=Coalesce(Sum('status_check_attempts'), 0),
+            **{f'fiscal__{value}': Count('id', filter=Q(fiscal_status=value)) for value in fiscal_statuses},
+            **{f'job__{value}': Count('id', filter=Q(job_status=value)) for value in job_statuses},
+            # Legacy or hand-edited rows outside CHOICES still count, under "other".
+            fiscal__other=Count('id', filter=~Q(fiscal_status__in=fiscal_statuses)),
+            job__other=Count('id', filter=~Q(job_status__in=job_statuses)),
         )
-        retry_pending = queryset.filter(next_retry_at__isnull=False).count()
-        technical_failed = queryset.filter(job_status='failed').count()
-        pending_dgii = queryset.filter(fiscal_status='submitted').count()
-        currently_running = queryset.filter(job_status='running').count()
-        currently_queued = queryset.filter(job_status='queued').count()
-        fiscal_rejected = queryset.filter(fiscal_status='rejected').count()
-        accepted = queryset.filter(fiscal_status='accepted').count()
+        by_fiscal_status = [
+            {'fiscal_status': value, 'count': counters[f'fiscal__{value}']}
+            for value in [*fiscal_statuses, 'other']
+            if counters[f'fiscal__{value}']
+        ]
+        by_job_status = [
+            {'job_status': value, 'count': counters[f'job__{value}']}
+            for value in [*job_statuses, 'other']
+            if counters[f'job__{value}']
+        ]
+        retry_pending = counters['retry_pending']
+        technical_failed = counters['job__failed']
+        pending_dgii = counters['fiscal__submitted']
+        currently_running = counters['job__running']
+        currently_queued = counters['job__queued']
+        fiscal_rejected = counters['fiscal__rejected']
+        accepted = counters['fiscal__accepted']
         rejected = fiscal_rejected
         submitted = pending_dgii
         queued = currently_queued
         running = currently_running
-        retrying = queryset.filter(job_status='retrying').count()
-        totals = queryset.aggregate(
-            submission_attempts=Coalesce(Sum('submission_attempts'), 0),
-            status_check_attempts=Coalesce(Sum('status_check_attempts'), 0),
-        )
+        retrying = counters['job__retrying']
         recent_errors = list(
             queryset
             .exclude(last_error__isnull=True)
@@ -369,25 +422,45 @@ class ElectronicFiscalDocumentViewSet(CompanyScopedQuerysetMixin, viewsets.Model
         for item in recent_errors:
             item['status'] = item['fiscal_status']
         by_status = [{'status': item['fiscal_status'], 'count': item['count']} for item in by_fiscal_status]
-        return Response(
-            {
-                'by_status': by_status,
-                'by_fiscal_status': list(by_fiscal_status),
-                'by_job_status': list(by_job_status),
-                'accepted': accepted,
-                'rejected': rejected,
-                'submitted': submitted,
-                'fiscal_rejected': fiscal_rejected,
-                'technical_failed': technical_failed,
-                'queued': queued,
-                'running': running,
-                'retrying': retrying,
-                'pending_dgii': pending_dgii,
-                'currently_running': currently_running,
-                'currently_queued': currently_queued,
-                'retry_pending': retry_pending,
-                'submission_attempts': totals['submission_attempts'],
-                'status_check_attempts': totals['status_check_attempts'],
-                'recent_errors': recent_errors,
-            }
-        )
+        return {
+            'by_status': by_status,
+            'by_fiscal_status': by_fiscal_status,
+            'by_job_status': by_job_status,
+            'accepted': accepted,
+            'rejected': rejected,
+            'submitted': submitted,
+            'fiscal_rejected': fiscal_rejected,
+            'technical_failed': technical_failed,
+            'queued': queued,
+            'running': running,
+            'retrying': retrying,
+            'pending_dgii': pending_dgii,
+            'currently_running': currently_running,
+            'currently_queued': currently_queued,
+            'retry_pending': retry_pending,
+            'submission_attempts': counters['submission_attempts'],
+            'status_check_attempts': counters['status_check_attempts'],
+            'recent_errors': recent_errors,
+        }
+
+
+def _accepts_gzip(accept_encoding: str) -> bool:
+    """Whether an Accept-Encoding header allows gzip, honouring q-values (``gzip;q=0`` refuses it)."""
+    weights = {}
+    for item in accept_encoding.split(','):
+        coding, _sep, params = item.strip().partition(';')
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        weight = 1.0
+        for param in params.split(';'):
+            name, _eq, value = param.strip().partition('=')
+            if name.strip().lower() == 'q':
+                try:
+                    weight = float(value)
+                except ValueError:
+                    weight = 0.0
+        weights[coding] = weight
+    if 'gzip' in weights:
+        return weights['gzip'] > 0
+    return weights.get('*', 0) > 0
@@ -1,9 +1,13 @@
-from django.db.models import F, Q
-from rest_framework import generics
+from pathlib import Path
+
+from rest_framework import generics, status
+from rest_framework.exceptions import PermissionDenied
+from rest_framework.parsers import FormParser, MultiPartParser
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from facturacion.api.company_context import get_current_company
 from facturacion.api.scoping import CompanyScopedQuerysetMixin
 from facturacion.api.serializers.inventory import (
     CategorySerializer,
@@ -12,6 +16,9 @@ from facturacion.api.serializers.inventory import (
 )
 from facturacion.models import Category, Product, ProductHistory
 from facturacion.permissions import HasRequiredPermissions
+from facturacion.services.inventory_health import InventoryHealthService
+from facturacion.services.product_import import SUPPORTED_SUFFIXES, ProductImportService
+from facturacion.services.product_search import ProductSearchService
 
 
 class CategoryListCreateView(CompanyScopedQuerysetMixin, generics.ListCreateAPIView):
@@ -61,9 +68,7 @@ class ProductListCreateView(CompanyScopedQuerysetMixin, generics.ListCreateAPIVi
 
         low_stock = self.request.query_params.get('low_stock')
         if low_stock and low_stock.lower() == 'true':
-            queryset = queryset.filter(
-                Q(stock__lt=3) | Q(stock__lt=F('min_stock'))
-            )
+            queryset = InventoryHealthService().low_stock_products(queryset)
 
         category = self.request.query_params.get('category')
         min_price = self.request.query_params.get('min_price')
@@ -76,14 +81,11 @@ class ProductListCreateView(CompanyScopedQuerysetMixin, generics.ListCreateAPIVi
             queryset = queryset.filter(price__gte=min_price)
         if max_price:
             queryset = queryset.filter(price__lte=max_price)
+        ordering = self.request.query_params.get('ordering')
         if search:
-            queryset = queryset.filter(
-                Q(name__icontains=search) |
-                Q(description__icontains=search) |
-                Q(barcode__icontains=search)
-            )
+            scan = self.request.query_params.get('scan', '').lower() in ('1', 'true', 'yes', 'si')
+            queryset = ProductSearchService().search(queryset, search, rank=not ordering, scan=scan)
 
-        ordering = self.request.query_params.get('ordering')
         if ordering:
             queryset = queryset.order_by(ordering)
 
@@ -103,6 +105,41 @@ class ProductRetrieveUpdateDeleteView(CompanyScopedQuerysetMixin, generics.Retri
     }
 
 
+class ProductImportView(APIView):
+    """Create or update the active company's catalogue from a CSV/XLSX upload."""
+
+    permission_classes = [IsAuthenticated, HasRequiredPermissions]
+    required_permissions = {'POST': ['facturacion.add_product', 'facturacion.change_product']}
+    parser_classes = [MultiPartParser, FormParser]
+
+    def post(self, request):
+        company = get_current_company(request)
+        if company is None:
+            raise PermissionDenied("Debes seleccionar una empresa activa para continuar.")
+
+        uploaded_file = request.FILES.get('file')
+        if not uploaded_file:
+            return Response({'file': ['Debe cargar el catálogo de productos.']}, status=status.HTTP_400_BAD_REQUEST)
+        if Path(uploaded_file.name).suffix.lower() not in SUPPORTED_SUFFIXES:
+            return Response({'file': ['El catálogo debe ser un archivo .csv o .xlsx.']}, status=status.HTTP_400_BAD_REQUEST)
+
+        dry_run = str(request.data.get('dry_run', '')).lower() in {'1', 'true'}
+        try:
+            result = ProductImportService(company, dry_run=dry_run).import_file(uploaded_file, uploaded_file.name)
+        except ValueError as exc:
+            return Response(
+                {'detail': 'No se pudo importar el catálogo.', 'error': str(exc)},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        return Response({
+            'created': result.created,
+            'updated': result.updated,
+            'dry_run': result.dry_run,
+            'errors': [{'row': error.row, 'message': error.message} for error in result.errors],
+        })
+
+
 class ProductHistoryListView(CompanyScopedQuerysetMixin, generics.ListAPIView):
     serializer_class = ProductHistorySerializer
     permission_classes = [IsAuthenticated, HasRequiredPermissions]
@@ -120,9 +157,9 @@ class LowStockProductsView(CompanyScopedQuerysetMixin, APIView):
 
     def get(self, request):
         try:
-            low_stock_products = self.get_company_scoped_queryset(Product.objects.filter(
-                Q(stock__lt=3) | Q(stock__lt=F('min_stock'))
-            )).select_related('category')
+            low_stock_products = InventoryHealthService().low_stock_products(
+                self.get_company_scoped_queryset(Product.objects.select_related('category'))
+            )
 
             products_data = [
                 {
@@ -21,9 +21,9 @@ from rest_framework.response import Response
 from rest_framework.views import APIView
 
 from facturacion.api.company_context import get_current_company
-from facturacion.api.serializers.inventory import ProductSerializer
 from facturacion.models import Product
 from facturacion.permissions import HasRequiredPermissions
+from facturacion.services.barcode_map import BarcodeMapService
 
 
 def _require_company(request):
@@ -438,12 +438,38 @@ class SearchByBarcodeView(APIView):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        try:
-            product = _tenant_product_queryset(request).get(barcode=barcode_value)
-            serializer = ProductSerializer(product, context={'request': request})
-            return Response(serializer.data)
-        except Product.DoesNotExist:
+        record = BarcodeMapService().lookup(_require_company(request).id, barcode_value)
+        if record is None:
             return Response(
                 {"error": f"Producto con código '{barcode_value}' no encontrado"},
                 status=status.HTTP_404_NOT_FOUND
             )
+        return Response(record.as_dict(request))
+
+
+class SearchByBarcodeBatchView(APIView):
+    """Resolve several scanned barcodes in one call (queued scans, offline registers)."""
+
+    permission_classes = [IsAuthenticated, HasRequiredPermissions]
+    required_permissions = {'POST': ['facturacion.view_product']}
+    max_barcodes = 500
+
+    def post(self, request):
+        barcodes = request.data.get('barcodes')
+        if not isinstance(barcodes, list) or not barcodes:
+            return Response(
+                {"error": "Se requiere la lista 'barcodes'"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if len(barcodes) > self.max_barcodes:
+            return Response(
+                {"error": f"Máximo {self.max_barcodes} códigos por solicitud"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        barcodes = [str(value).strip() for value in barcodes]
+        records = BarcodeMapService().lookup_many(_require_company(request).id, barcodes)
+        return Response({
+            "products": {barcode: record.as_dict(request) for barcode, record in records.items()},
+            "missing": [barcode for barcode in dict.fromkeys(barcodes) if barcode not in records],
+        })
@@ -18,6 +18,7 @@ from facturacion.ecf.state_machine import ECFStateMachine
 from facturacion.models import Client, Invoice
 from facturacion.permissions import HasRequiredPermissions
 from facturacion.services.invoicing import InvoiceCreationService
+from facturacion.services.sales_rollup import DailySalesRollupService
 
 
 class InvoiceViewSet(CompanyScopedQuerysetMixin, viewsets.ModelViewSet):
@@ -228,6 +229,18 @@ class InvoiceViewSet(CompanyScopedQuerysetMixin, viewsets.ModelViewSet):
             )
         return super().destroy(request, *args, **kwargs)
 
+    @transaction.atomic
+    def perform_update(self, serializer):
+        rollup = DailySalesRollupService()
+        rollup.retract_invoice(serializer.instance)
+        invoice = serializer.save()
+        rollup.record_invoice(invoice)
+
+    @transaction.atomic
+    def perform_destroy(self, instance):
+        DailySalesRollupService().retract_invoice(instance)
+        instance.delete()
+
     def _normalized_request_data(self, request):
         data = request.data.copy()
         self._normalize_money_payload(data)
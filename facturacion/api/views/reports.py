@@ -1,4 +1,3 @@
-from collections import defaultdict
 from datetime import datetime, timedelta
 
 from django.db.models import Count, Q, Sum
@@ -10,16 +9,30 @@ from rest_framework.views import APIView
 
 from facturacion.api.company_context import get_current_company
 from facturacion.api.permissions import can_view_financial_totals
-from facturacion.models import Category, Invoice, InvoiceDetail, Product
+from facturacion.models import DailySalesRollup, Invoice, Product
 from facturacion.permissions import HasRequiredPermissions
+from facturacion.services.inventory_health import InventoryHealthService
+from facturacion.services.response_cache import DASHBOARD_NAMESPACE, TenantResponseCache
 
 
 class DashboardView(APIView):
     permission_classes = [IsAuthenticated, HasRequiredPermissions]
     required_permissions = {'GET': ['facturacion.view_invoice', 'facturacion.view_product']}
 
+    cache_params = ('start_date', 'end_date', 'time_frame')
+
     def get(self, request):
         can_view_totals = can_view_financial_totals(request.user)
+        company = get_current_company(request)
+        data = TenantResponseCache(DASHBOARD_NAMESPACE).get_or_compute(
+            company.pk if company else None,
+            'totals' if can_view_totals else 'counts',
+            {name: request.query_params.get(name) for name in self.cache_params},
+            lambda: self.build_dashboard(request, company, can_view_totals),
+        )
+        return Response(data)
+
+    def build_dashboard(self, request, company, can_view_totals):
         start_date = request.query_params.get('start_date')
         end_date = request.query_params.get('end_date')
         time_frame = request.query_params.get('time_frame', 'month')
@@ -38,22 +51,36 @@ class DashboardView(APIView):
 
         end_date = end_date.replace(hour=23, minute=59, second=59)
 
-        company = get_current_company(request)
         invoices = Invoice.objects.none()
+        rollups = DailySalesRollup.objects.none()
         if company:
             invoices = Invoice.objects.filter(company=company, created_at__range=[start_date, end_date])
+            rollups = DailySalesRollup.objects.filter(
+                company=company,
+                day__range=[timezone.localdate(start_date), timezone.localdate(end_date)],
+            )
 
         paid_invoices = invoices.filter(status='paid')
-        pending_invoices = invoices.filter(status='pending')
-        accepted_fiscal_invoices = invoices.filter(electronic_document__fiscal_status='accepted')
+        invoice_rows = rollups.filter(category__isnull=True)
+        paid_q = Q(status='paid')
+        pending_q = Q(status='pending')
+        accepted_q = Q(fiscal_status='accepted')
+        summary = invoice_rows.aggregate(
+            total_sales=Sum('total_amount', filter=paid_q),
+            sales_count=Sum('invoice_count', filter=paid_q),
+            accounts_receivable_total=Sum('total_amount', filter=pending_q),
+            accounts_receivable_count=Sum('invoice_count', filter=pending_q),
+            accepted_fiscal_total=Sum('total_amount', filter=accepted_q),
+            accepted_fiscal_count=Sum('invoice_count', filter=accepted_q),
+            total_invoices_count=Sum('invoice_count'),
+        )
+        total_sales = summary['total_sales'] or 0
+        sales_count = summary['sales_count'] or 0
+        accounts_receivable_total = summary['accounts_receivable_total'] or 0
+        accepted_fiscal_total = summary['accepted_fiscal_total'] or 0
 
-        total_sales = paid_invoices.aggregate(total=Sum('total'))['total'] or 0
-        sales_count = paid_invoices.count()
-        accounts_receivable_total = pending_invoices.aggregate(total=Sum('total'))['total'] or 0
-        accepted_fiscal_total = accepted_fiscal_invoices.aggregate(total=Sum('total'))['total'] or 0
-        products_sold = InvoiceDetail.objects.filter(invoice__in=paid_invoices).aggregate(
-            total=Sum('quantity')
-        )['total'] or 0
+        paid_category_rows = rollups.filter(category__isnull=False, status='paid')
+        products_sold = paid_category_rows.aggregate(total=Sum('quantity'))['total'] or 0
 
         top_products = (
             Product.objects
@@ -66,22 +93,15 @@ class DashboardView(APIView):
             .values('name', 'total_sold')
         )
 
-        invoice_details = InvoiceDetail.objects.filter(
-            invoice__in=paid_invoices
-        ).select_related('product__category')
-
-        category_totals = defaultdict(float)
-        for detail in invoice_details:
-            category = getattr(detail.product, 'category', None)
-            category_name = category.name if category else 'Sin categoría'
-            subtotal = float(detail.subtotal) if hasattr(detail, 'subtotal') and detail.subtotal \
-                else float(detail.price * detail.quantity)
-            category_totals[category_name] += subtotal
-
         sales_by_category = [
-            {'name': name, 'value': value}
-            for name, value in category_totals.items()
-            if value > 0
+            {'name': row['category__name'], 'value': float(row['value'])}
+            for row in (
+                paid_category_rows
+                .values('category__name')
+                .annotate(value=Sum('line_amount'))
+                .order_by('category__name')
+            )
+            if row['value'] and row['value'] > 0
         ]
 
         data = {
@@ -92,17 +112,17 @@ class DashboardView(APIView):
                 'paid_total': float(total_sales) if can_view_totals else None,
                 'paid_count': sales_count,
                 'accounts_receivable_total': float(accounts_receivable_total) if can_view_totals else None,
-                'accounts_receivable_count': pending_invoices.count(),
+                'accounts_receivable_count': summary['accounts_receivable_count'] or 0,
                 'accepted_fiscal_total': float(accepted_fiscal_total) if can_view_totals else None,
-                'accepted_fiscal_count': accepted_fiscal_invoices.count(),
-                'total_invoices_count': invoices.count(),
+                'accepted_fiscal_count': summary['accepted_fiscal_count'] or 0,
+                'total_invoices_count': summary['total_invoices_count'] or 0,
             },
             'topProducts': [
                 {'name': p['name'], 'quantity': p['total_sold'] or 0}
                 for p in top_products
             ],
             'salesByCategory': sales_by_category if can_view_totals else [],
-            'salesTrend': self.get_sales_trend(paid_invoices, time_frame) if can_view_totals else [],
+            'salesTrend': self.get_sales_trend(invoice_rows.filter(status='paid'), time_frame) if can_view_totals else [],
             'inventoryStatus': self.get_inventory_status(request),
             'recentSales': [
                 {
@@ -118,23 +138,23 @@ class DashboardView(APIView):
             ],
         }
 
-        return Response(data)
+        return data
 
-    def get_sales_trend(self, invoices, time_frame):
+    def get_sales_trend(self, rollups, time_frame):
         from django.db.models.functions import TruncDay, TruncWeek, TruncMonth, TruncYear
 
         trunc_map = {
-            'day': (TruncDay('created_at'), '%d/%m/%Y'),
-            'week': (TruncWeek('created_at'), '%Y-%U'),
-            'year': (TruncYear('created_at'), '%Y'),
+            'day': (TruncDay('day'), '%d/%m/%Y'),
+            'week': (TruncWeek('day'), '%Y-%U'),
+            'year': (TruncYear('day'), '%Y'),
         }
-        trunc_function, _ = trunc_map.get(time_frame, (TruncMonth('created_at'), '%Y-%m'))
+        trunc_function, _ = trunc_map.get(time_frame, (TruncMonth('day'), '%Y-%m'))
 
         sales_by_period = (
-            invoices
+            rollups
             .annotate(period=trunc_function)
             .values('period')
-            .annotate(sales=Sum('total'))
+            .annotate(sales=Sum('total_amount'))
             .order_by('period')
         )
 
@@ -161,37 +181,20 @@ class DashboardView(APIView):
 
     def get_inventory_status(self, request):
         try:
-            company = get_current_company(request)
-            if company is None:
-                return {'low_stock_count': 0, 'categories': []}
-
-            categories_inventory = (
-                Category.objects
-                .filter(company=company)
-                .annotate(total_stock=Sum('products__stock'))
-                .values('name', 'total_stock')
-            )
-
-            categories = []
-            low_stock_count = 0
-
-            for category in categories_inventory:
-                name = category['name']
-                product_queryset = Product.objects.filter(company=company, category__name=name)
-                low_stock_products = product_queryset.filter(stock__lt=5).count()
-                out_of_stock = product_queryset.filter(stock=0).count()
-                in_stock = product_queryset.filter(stock__gt=5).count()
-
-                low_stock_count += low_stock_products
-                categories.append({
-                    'name': name,
-                    'in_stock': in_stock,
-                    'low_stock': low_stock_products,
-                    'out_of_stock': out_of_stock,
-                    'total': category['total_stock'] or 0,
-                })
-
-            return {'low_stock_count': low_stock_count, 'categories': categories}
+            health = InventoryHealthService().category_health(get_current_company(request))
+            return {
+                'low_stock_count': health.low_stock_count,
+                'categories': [
+                    {
+                        'name': category.name,
+                        'in_stock': category.in_stock,
+                        'low_stock': category.low_stock,
+                        'out_of_stock': category.out_of_stock,
+                        'total': category.total_stock,
+                    }
+                    for category in health.categories
+                ],
+            }
 
         except Exception as e:
             print(f"Error getting inventory status: {e}")
@@ -3,6 +3,9 @@
 from __future__ import annotations
 
 import hashlib
+import threading
+import time
+from collections import OrderedDict
 from dataclasses import dataclass
 from datetime import timezone as datetime_timezone
 from pathlib import Path
@@ -10,6 +13,7 @@ from pathlib import Path
 from cryptography import x509
 from cryptography.hazmat.primitives import hashes, serialization
 from cryptography.hazmat.primitives.serialization import pkcs12
+from django.conf import settings
 from django.utils import timezone
 
 from facturacion.ecf.exceptions import ECFValidationError
@@ -29,9 +33,74 @@ class LoadedCertificate:
     sha256_fingerprint: str
 
 
+class LoadedCertificateCache:
+    """Per-process LRU of decrypted certificates with TTL and explicit eviction.
+
+    Entries are keyed by resolved path, file mtime/size and a password digest,
+    so replacing a .p12 in place or changing its password never serves stale
+    key material. Eviction by path or fingerprint covers rotations signalled
+    from ECFCertificate changes inside the same process.
+    """
+
+    def __init__(self) -> None:
+        self._entries: OrderedDict[tuple, tuple[float, LoadedCertificate]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: tuple) -> LoadedCertificate | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, certificate = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return certificate
+
+    def set(self, key: tuple, certificate: LoadedCertificate, ttl: int, max_entries: int) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, certificate)
+            self._entries.move_to_end(key)
+            while len(self._entries) > max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, certificate_path: str | Path | None = None, fingerprint: str | None = None) -> int:
+        """Evict entries matching a path or SHA-256 fingerprint; evict all when both are empty."""
+        resolved_path = str(Path(certificate_path).resolve()) if certificate_path else None
+        normalized_fingerprint = fingerprint.replace(":", "").lower() if fingerprint else None
+        with self._lock:
+            if not resolved_path and not normalized_fingerprint:
+                evicted = len(self._entries)
+                self._entries.clear()
+                return evicted
+            stale_keys = [
+                key
+                for key, (_, certificate) in self._entries.items()
+                if key[0] == resolved_path or certificate.sha256_fingerprint == normalized_fingerprint
+            ]
+            for key in stale_keys:
+                del self._entries[key]
+            return len(stale_keys)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+certificate_cache = LoadedCertificateCache()
+
+
+def invalidate_certificate_cache(certificate_path: str | Path | None = None, fingerprint: str | None = None) -> int:
+    """Evict decrypted certificates held by this process."""
+    return certificate_cache.invalidate(certificate_path=certificate_path, fingerprint=fingerprint)
+
+
 class PKCS12CertificateLoader:
     """Load a .p12/.pfx file without leaking password material."""
 
+    def __init__(self, cache: LoadedCertificateCache | None = None) -> None:
+        self.cache = cache if cache is not None else certificate_cache
+
     def load(self, certificate_path: str | Path, password: str | bytes | None) -> LoadedCertificate:
         """Load a PKCS#12 certificate and validate its usability."""
         path = Path(certificate_path)
@@ -39,6 +108,21 @@ class PKCS12CertificateLoader:
             raise ECFValidationError(f"No existe el certificado configurado: {path}")
 
         password_bytes = self._password_bytes(password)
+        ttl = int(getattr(settings, "ECF_CERTIFICATE_CACHE_TTL_SECONDS", 300))
+        cache_key = self._cache_key(path, password_bytes) if ttl > 0 else None
+        if cache_key:
+            cached = self.cache.get(cache_key)
+            if cached:
+                self._validate_expiration(cached.certificate)
+                return cached
+
+        loaded = self._load_uncached(path, password_bytes)
+        if cache_key:
+            max_entries = max(1, int(getattr(settings, "ECF_CERTIFICATE_CACHE_MAX_ENTRIES", 32)))
+            self.cache.set(cache_key, loaded, ttl=ttl, max_entries=max_entries)
+        return loaded
+
+    def _load_uncached(self, path: Path, password_bytes: bytes | None) -> LoadedCertificate:
         try:
             private_key, certificate, _ = pkcs12.load_key_and_certificates(
                 path.read_bytes(),
@@ -71,6 +155,11 @@ class PKCS12CertificateLoader:
             sha256_fingerprint=fingerprint or hashlib.sha256(certificate_pem).hexdigest(),
         )
 
+    def _cache_key(self, path: Path, password_bytes: bytes | None) -> tuple:
+        stat = path.stat()
+        password_digest = hashlib.sha256(password_bytes or b"").hexdigest()
+        return (str(path.resolve()), stat.st_mtime_ns, stat.st_size, password_digest)
+
     def _password_bytes(self, password: str | bytes | None) -> bytes | None:
         if password is None or password == "":
             return None
@@ -4,16 +4,21 @@ from facturacion.ecf.queues.ecf import (
     enqueue_check_status,
     enqueue_generate_xml,
     enqueue_retry_submission,
+    enqueue_sign_batch,
     enqueue_sign_xml,
     enqueue_submit_dgii,
     enqueue_submission_pipeline,
 )
+from facturacion.ecf.queues.outbox import ECFOutboxRelay, record_submission_pipeline
 
 __all__ = (
+    "ECFOutboxRelay",
     "enqueue_check_status",
     "enqueue_generate_xml",
     "enqueue_retry_submission",
+    "enqueue_sign_batch",
     "enqueue_sign_xml",
     "enqueue_submit_dgii",
     "enqueue_submission_pipeline",
+    "record_submission_pipeline",
 )
@@ -3,18 +3,20 @@
 from __future__ import annotations
 
 from celery import chain
-from django.db import transaction
+from django.conf import settings
 from django.utils import timezone
 from kombu.exceptions import OperationalError
 
 from facturacion.ecf.exceptions import ECFCeleryUnavailable
+from facturacion.ecf.services.audit import audited_atomic, record_event_log, record_status_event
 from facturacion.ecf.services.certificate_policy import ECFCertificateSigningPolicy
 from facturacion.ecf.services.status_transitions import ECFStatusTransitionService
 from facturacion.ecf.tasks.dgii import check_status, retry_submission, submit_dgii
-from facturacion.ecf.tasks.signing import sign_xml
+from facturacion.ecf.tasks.pipeline import process_document
+from facturacion.ecf.tasks.signing import sign_xml, sign_xml_batch
 from facturacion.ecf.tasks.xml import generate_xml
 from facturacion.ecf.workers.base import ECFCompanyScopeError, validate_document_company_scope
-from facturacion.models import ECFEventLog, ECFStatusEvent, ElectronicFiscalDocument
+from facturacion.models import ElectronicFiscalDocument
 
 
 status_transitions = ECFStatusTransitionService()
@@ -28,9 +30,57 @@ def enqueue_sign_xml(document_id: int, user_id: int | None = None, validate_xsd:
     return _enqueue_single(sign_xml, document_id, user_id, "sign_xml", validate_xsd=validate_xsd)
 
 
+def enqueue_sign_batch(document_ids: list[int], user_id: int | None = None, validate_xsd: bool = True):
+    """Enqueue one batch signing task for documents with generated, unsigned XML."""
+    with audited_atomic():
+        documents = list(
+            ElectronicFiscalDocument.objects
+            .select_for_update()
+            .select_related("company", "invoice", "credit_note", "issuer", "sequence")
+            .filter(pk__in=document_ids)
+            .order_by("pk")
+        )
+        eligible = []
+        results = {}
+        for document in documents:
+            preflight_error = _company_scope_preflight(document, "sign_xml_batch")
+            if preflight_error:
+                results[document.pk] = preflight_error
+                continue
+            if document.fiscal_status != "xml_generated" or not document.artifact_sha256("xml_content"):
+                _log_skip(document, "sign_xml_batch", "El documento no tiene XML pendiente de firma.")
+                results[document.pk] = _queue_result(document, enqueued=False)
+                continue
+            eligible.append(document)
+
+        if not eligible:
+            return {"enqueued": False, "task_id": None, "documents": results}
+
+        result = _apply_async_or_raise(
+            sign_xml_batch,
+            args=[[document.pk for document in eligible]],
+            kwargs={"user_id": user_id, "validate_xsd": validate_xsd},
+        )
+        for document in eligible:
+            document = status_transitions.transition(
+                document,
+                job_status="queued",
+                source="queue_sign_xml_batch",
+                reason="Firma por lote e-CF encolada.",
+                task_id=result.id,
+                extra_update_fields={
+                    "async_task_id": result.id,
+                    "idempotency_key": f"ecf:{document.pk}:sign_xml_batch",
+                },
+            ).document
+            _log_queue(document, "sign_xml_batch", result.id)
+            results[document.pk] = _queue_result(document, enqueued=True)
+        return {"enqueued": True, "task_id": result.id, "documents": results}
+
+
 def enqueue_submit_dgii(document_id: int, user_id: int | None = None, environment: str | None = None, force: bool = False):
     if not force:
-        with transaction.atomic():
+        with audited_atomic():
             document = ElectronicFiscalDocument.objects.select_for_update().get(pk=document_id)
             preflight_error = _company_scope_preflight(document, "submit_dgii")
             if preflight_error:
@@ -46,7 +96,7 @@ def enqueue_check_status(document_id: int, user_id: int | None = None, environme
 
 
 def enqueue_retry_submission(document_id: int, user_id: int | None = None, environment: str | None = None):
-    with transaction.atomic():
+    with audited_atomic():
         document = ElectronicFiscalDocument.objects.select_for_update().get(pk=document_id)
         preflight_error = _company_scope_preflight(document, "retry_submission")
         if preflight_error:
@@ -58,7 +108,7 @@ def enqueue_retry_submission(document_id: int, user_id: int | None = None, envir
             _log_skip(document, "retry_submission", "Documento ya tiene TrackID; no se duplica envío DGII.")
             return _queue_result(document, enqueued=False, track_id=document.track_id)
 
-        if document.xml_content and not document.signed_xml_content:
+        if document.artifact_sha256("xml_content") and not document.artifact_sha256("signed_xml_content"):
             certificate_policy_error = _certificate_policy_preflight(document, "retry_submission")
             if certificate_policy_error:
                 return certificate_policy_error
@@ -91,7 +141,7 @@ def enqueue_submission_pipeline(
     environment: str | None = None,
 ):
     """Enqueue generate -> sign -> submit as an idempotent pipeline."""
-    with transaction.atomic():
+    with audited_atomic():
         document = ElectronicFiscalDocument.objects.select_for_update().get(pk=document_id)
         preflight_error = _company_scope_preflight(document, "pipeline")
         if preflight_error:
@@ -100,17 +150,22 @@ def enqueue_submission_pipeline(
             _log_skip(document, "pipeline", "El documento ya está enviado, terminal o en proceso DGII.")
             return _queue_result(document, enqueued=False)
 
-        steps = []
-        if not document.xml_content:
-            steps.append(generate_xml.si(document_id, user_id=user_id, validate_xsd=validate_xsd))
-        if not document.signed_xml_content:
+        needs_signature = not document.artifact_sha256("signed_xml_content")
+        if needs_signature:
             certificate_policy_error = _certificate_policy_preflight(document, "pipeline")
             if certificate_policy_error:
                 return certificate_policy_error
-            steps.append(sign_xml.si(document_id, user_id=user_id, validate_xsd=validate_xsd))
-        steps.append(submit_dgii.si(document_id, user_id=user_id, environment=environment))
 
-        signature = chain(*steps)
+        if getattr(settings, "ECF_PIPELINE_MODE", "fused") == "fused":
+            signature = process_document.si(document_id, user_id=user_id, validate_xsd=validate_xsd, environment=environment)
+        else:
+            steps = []
+            if not document.artifact_sha256("xml_content"):
+                steps.append(generate_xml.si(document_id, user_id=user_id, validate_xsd=validate_xsd))
+            if needs_signature:
+                steps.append(sign_xml.si(document_id, user_id=user_id, validate_xsd=validate_xsd))
+            steps.append(submit_dgii.si(document_id, user_id=user_id, environment=environment))
+            signature = chain(*steps)
         result = _apply_async_or_raise(signature)
         document = status_transitions.transition(
             document,
@@ -128,7 +183,7 @@ def enqueue_submission_pipeline(
 
 
 def _enqueue_single(task, document_id: int, user_id: int | None, stage: str, **kwargs):
-    with transaction.atomic():
+    with audited_atomic():
         document = ElectronicFiscalDocument.objects.select_for_update().get(pk=document_id)
         preflight_error = _company_scope_preflight(document, stage)
         if preflight_error:
@@ -188,7 +243,7 @@ def _record_company_scope_failure(document: ElectronicFiscalDocument, stage: str
         updated_at=timezone.now(),
     )
     document.refresh_from_db()
-    ECFStatusEvent.objects.create(
+    record_status_event(
         document=document,
         previous_fiscal_status=previous_fiscal_status,
         new_fiscal_status=previous_fiscal_status,
@@ -197,7 +252,7 @@ def _record_company_scope_failure(document: ElectronicFiscalDocument, stage: str
         source=f"queue_{stage}_failed",
         reason=str(exc),
     )
-    ECFEventLog.objects.create(
+    record_event_log(
         electronic_document=document,
         event_type="error",
         message=f"Preflight e-CF fallido antes de encolar: {stage}.",
@@ -214,7 +269,7 @@ def _record_company_scope_failure(document: ElectronicFiscalDocument, stage: str
 
 
 def _log_queue(document: ElectronicFiscalDocument, stage: str, task_id: str) -> None:
-    ECFEventLog.objects.create(
+    record_event_log(
         electronic_document=document,
         event_type="queued",
         message=f"Task e-CF encolada: {stage}.",
@@ -229,7 +284,7 @@ def _log_queue(document: ElectronicFiscalDocument, stage: str, task_id: str) ->
 
 
 def _log_skip(document: ElectronicFiscalDocument, stage: str, message: str) -> None:
-    ECFEventLog.objects.create(
+    record_event_log(
         electronic_document=document,
         event_type="skipped",
         message=message,
@@ -0,0 +1,117 @@
+"""Transactional outbox between request transactions and the Celery broker."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from facturacion.ecf.exceptions import ECFCeleryUnavailable
+from facturacion.ecf.queues.ecf import enqueue_submission_pipeline
+from facturacion.models import ECFOutbox, ElectronicFiscalDocument
+
+
+@dataclass(frozen=True)
+class ECFOutboxRelayResult:
+    """Outcome of one relay batch."""
+
+    claimed: int
+    dispatched: int
+    deferred: int
+    failed: int
+    broker_unavailable: bool = False
+
+
+def record_submission_pipeline(
+    document: ElectronicFiscalDocument,
+    user_id: int | None = None,
+    validate_xsd: bool = True,
+) -> ECFOutbox:
+    """Record the generate -> sign -> submit enqueue inside the caller's transaction."""
+    entry, _created = ECFOutbox.objects.get_or_create(
+        document=document,
+        task=ECFOutbox.TASK_SUBMISSION_PIPELINE,
+        status=ECFOutbox.STATUS_PENDING,
+        defaults={
+            "company_id": document.company_id,
+            "payload": {"user_id": user_id, "validate_xsd": validate_xsd},
+        },
+    )
+    return entry
+
+
+class ECFOutboxRelay:
+    """Publish pending outbox entries to the broker in batches.
+
+    Entries are claimed with SKIP LOCKED so several relays can run side by
+    side. When the broker is unreachable the rest of the batch is deferred
+    with backoff instead of failing; any other error is retried up to
+    ECF_OUTBOX_MAX_ATTEMPTS and then left as failed for an operator.
+    """
+
+    def relay(self, limit: int | None = None) -> ECFOutboxRelayResult:
+        limit = limit or int(getattr(settings, "ECF_OUTBOX_RELAY_BATCH_SIZE", 100))
+        with transaction.atomic():
+            entries = list(
+                ECFOutbox.objects
+                .select_for_update(skip_locked=True)
+                .filter(status=ECFOutbox.STATUS_PENDING, available_at__lte=timezone.now())
+                .order_by("available_at", "id")[:limit]
+            )
+            dispatched = deferred = failed = 0
+            broker_unavailable, broker_error = False, ""
+            for entry in entries:
+                if broker_unavailable:
+                    self._defer(entry, broker_error)
+                    deferred += 1
+                    continue
+                try:
+                    result = self._dispatch(entry)
+                except ECFCeleryUnavailable as exc:
+                    broker_unavailable, broker_error = True, str(exc)
+                    self._defer(entry, broker_error)
+                    deferred += 1
+                except Exception as exc:
+                    if self._defer(entry, str(exc), count_attempt=True):
+                        deferred += 1
+                    else:
+                        failed += 1
+                else:
+                    entry.status = ECFOutbox.STATUS_DISPATCHED
+                    entry.dispatched_at = timezone.now()
+                    entry.task_id = result.get("task_id")
+                    entry.last_error = result.get("error")
+                    dispatched += 1
+            ECFOutbox.objects.bulk_update(
+                entries,
+                ["status", "attempts", "available_at", "dispatched_at", "task_id", "last_error"],
+            )
+        return ECFOutboxRelayResult(
+            claimed=len(entries),
+            dispatched=dispatched,
+            deferred=deferred,
+            failed=failed,
+            broker_unavailable=broker_unavailable,
+        )
+
+    def _dispatch(self, entry: ECFOutbox) -> dict:
+        payload = entry.payload or {}
+        # The enqueue helpers open their own savepoint, so a failed entry never poisons the batch.
+        return enqueue_submission_pipeline(
+            entry.document_id,
+            user_id=payload.get("user_id"),
+            validate_xsd=payload.get("validate_xsd", True),
+        )
+
+    def _defer(self, entry: ECFOutbox, error: str, count_attempt: bool = False) -> bool:
+        entry.last_error = error
+        if count_attempt:
+            entry.attempts += 1
+            if entry.attempts >= int(getattr(settings, "ECF_OUTBOX_MAX_ATTEMPTS", 10)):
+                entry.status = ECFOutbox.STATUS_FAILED
+                return False
+        backoff = int(getattr(settings, "ECF_OUTBOX_RETRY_BACKOFF_SECONDS", 5))
+        entry.available_at = timezone.now() + timezone.timedelta(seconds=backoff * (2 ** min(entry.attempts, 6)))
+        return True
@@ -0,0 +1,190 @@
+"""Asyncio DGII e-CF REST client for high-concurrency I/O workers."""
+
+from __future__ import annotations
+
+import asyncio
+from typing import Awaitable, Iterable, TypeVar
+
+import httpx
+from asgiref.sync import sync_to_async
+from django.conf import settings
+
+from facturacion.ecf.exceptions import ECFError, ECFValidationError
+from facturacion.ecf.rest.auth import DGIIRESTAuthClient
+from facturacion.ecf.rest.clients import BaseDGIIRESTClient
+from facturacion.ecf.rest.environments import DGIIRESTEnvironment, DGIIRESTEnvironmentResolver
+from facturacion.ecf.rest.responses import DGIIRESTCallResult, DGIIRESTToken
+
+
+T = TypeVar("T")
+
+
+class AsyncDGIIRESTClient(BaseDGIIRESTClient):
+    """Async counterpart of DGIIRESTClient over one keep-alive httpx connection pool.
+
+    Tokens still come from DGIIRESTAuthClient (and therefore the shared Django
+    cache); the blocking lookup runs in a worker thread and concurrent
+    coroutines needing the same token wait on one lookup. Use it as an async
+    context manager so pooled connections are closed with the event loop.
+    """
+
+    def __init__(
+        self,
+        environment: DGIIRESTEnvironment | None = None,
+        environment_resolver: DGIIRESTEnvironmentResolver | None = None,
+        auth_client: DGIIRESTAuthClient | None = None,
+        client: httpx.AsyncClient | None = None,
+        max_connections: int | None = None,
+    ) -> None:
+        self.environment = environment or (environment_resolver or DGIIRESTEnvironmentResolver()).resolve()
+        self.max_connections = max_connections or int(getattr(settings, "ECF_DGII_REST_ASYNC_MAX_CONNECTIONS", 100))
+        self.client = client or self._build_client()
+        self.auth_client = auth_client or DGIIRESTAuthClient(environment=self.environment)
+        self._token_locks: dict[tuple[str, str | None], asyncio.Lock] = {}
+
+    async def __aenter__(self) -> "AsyncDGIIRESTClient":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        await self.client.aclose()
+
+    async def submit_ecf(
+        self,
+        *,
+        signed_xml_content: str,
+        encf: str,
+        issuer_rnc: str,
+        certificate_path: str,
+        certificate_password: str | bytes | None,
+    ) -> DGIIRESTCallResult:
+        token = await self._token(certificate_path, certificate_password, issuer_rnc)
+        response = await self._request(
+            "POST",
+            self._url(self.environment.reception_base_url, self.submit_path),
+            headers={"Authorization": token.authorization_header},
+            files={"xml": (f"{encf}.xml", signed_xml_content.encode("utf-8"), "text/xml")},
+            data={"rncEmisor": issuer_rnc, "eNCF": encf},
+        )
+        return self._result(response, request_xml=signed_xml_content)
+
+    async def query_status(
+        self,
+        *,
+        track_id: str,
+        certificate_path: str,
+        certificate_password: str | bytes | None,
+        issuer_rnc: str | None = None,
+    ) -> DGIIRESTCallResult:
+        token = await self._token(certificate_path, certificate_password, issuer_rnc)
+        response = await self._request(
+            "GET",
+            self._url(self.environment.status_base_url, self.status_path),
+            headers={"Authorization": token.authorization_header},
+            params={"trackId": track_id},
+        )
+        return self._result(response, request_xml=None)
+
+    async def query_trackids(
+        self,
+        *,
+        issuer_rnc: str,
+        encf: str,
+        certificate_path: str,
+        certificate_password: str | bytes | None,
+    ) -> DGIIRESTCallResult:
+        if not self.environment.trackids_base_url:
+            raise ECFValidationError("No hay URL REST de consulta TrackIDs DGII configurada.")
+        token = await self._token(certificate_path, certificate_password, issuer_rnc)
+        response = await self._request(
+            "GET",
+            self._url(self.environment.trackids_base_url, self.trackids_path),
+            headers={"Authorization": token.authorization_header},
+            params={"rncEmisor": issuer_rnc, "eNCF": encf},
+        )
+        return self._result(response, request_xml=None)
+
+    async def gather(self, calls: Iterable[Awaitable[T]], concurrency: int | None = None) -> list[T | ECFError]:
+        """Await many calls with at most `concurrency` in flight, keeping DGII errors per call."""
+        semaphore = asyncio.Semaphore(concurrency or self.max_connections)
+
+        async def bounded(call: Awaitable[T]) -> T | ECFError:
+            async with semaphore:
+                try:
+                    return await call
+                except ECFError as exc:
+                    return exc
+
+        return await asyncio.gather(*(bounded(call) for call in calls))
+
+    async def _token(
+        self,
+        certificate_path: str,
+        certificate_password: str | bytes | None,
+        issuer_rnc: str | None,
+    ) -> DGIIRESTToken:
+        lock = self._token_locks.setdefault((certificate_path, issuer_rnc), asyncio.Lock())
+        async with lock:
+            return await sync_to_async(self.auth_client.get_token, thread_sensitive=False)(
+                certificate_path,
+                certificate_password,
+                issuer_rnc=issuer_rnc,
+            )
+
+    async def _request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        # Mirrors the urllib3 Retry policy of the sync client: retry listed statuses with exponential backoff.
+        retries = max(0, self.environment.retries)
+        for attempt in range(retries + 1):
+            last_attempt = attempt == retries
+            try:
+                response = await self.client.request(method, url, **kwargs)
+            except httpx.HTTPError as exc:
+                if last_attempt:
+                    raise ECFValidationError(f"Error de conexion REST DGII: {exc.__class__.__name__}.") from exc
+            else:
+                if last_attempt or response.status_code not in self.retry_statuses:
+                    return response
+            await asyncio.sleep(self.environment.retry_backoff * (2 ** attempt))
+
+    def _build_client(self) -> httpx.AsyncClient:
+        limits = httpx.Limits(
+            max_connections=self.max_connections,
+            max_keepalive_connections=self.max_connections,
+        )
+        return httpx.AsyncClient(
+            timeout=self.environment.timeout,
+            transport=httpx.AsyncHTTPTransport(verify=self.environment.verify_tls, limits=limits),
+        )
+
+
+def query_status_many(
+    track_ids: Iterable[str],
+    *,
+    certificate_path: str,
+    certificate_password: str | bytes | None,
+    issuer_rnc: str | None = None,
+    environment: DGIIRESTEnvironment | None = None,
+    auth_client: DGIIRESTAuthClient | None = None,
+    concurrency: int | None = None,
+) -> dict[str, DGIIRESTCallResult | ECFError]:
+    """Query many TrackIDs from synchronous code (commands, Celery I/O workers) on one event loop."""
+    track_ids = list(dict.fromkeys(track_ids))
+
+    async def run() -> list[DGIIRESTCallResult | ECFError]:
+        async with AsyncDGIIRESTClient(environment=environment, auth_client=auth_client, max_connections=concurrency) as client:
+            return await client.gather(
+                (
+                    client.query_status(
+                        track_id=track_id,
+                        certificate_path=certificate_path,
+                        certificate_password=certificate_password,
+                        issuer_rnc=issuer_rnc,
+                    )
+                    for track_id in track_ids
+                ),
+                concurrency,
+            )
+
+    return dict(zip(track_ids, asyncio.run(run())))
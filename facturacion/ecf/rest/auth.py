@@ -3,18 +3,23 @@
 from __future__ import annotations
 
 import hashlib
+import logging
+import time
+import uuid
 from dataclasses import dataclass
 from typing import Any
 
 import requests
+from django.conf import settings
 from django.core.cache import cache
 
 from facturacion.ecf.certificates.loader import PKCS12CertificateLoader
-from facturacion.ecf.exceptions import ECFValidationError
+from facturacion.ecf.exceptions import ECFError, ECFTemporaryError, ECFValidationError
 from facturacion.ecf.rest.environments import DGIIRESTEnvironment, DGIIRESTEnvironmentResolver
 from facturacion.ecf.rest.responses import DGIIRESTToken
 from facturacion.ecf.signer.xml_signer import ECFXMLSigner
 
+logger = logging.getLogger("facturacion.ecf.rest")
 
 @dataclass(frozen=True)
 class DGIISeedPayload:
@@ -46,18 +51,50 @@ class DGIIRESTAuthClient:
         self.session.verify = self.environment.verify_tls
 
     def get_token(self, certificate_path: str, certificate_password: str | bytes | None, issuer_rnc: str | None = None) -> DGIIRESTToken:
+        """Return a cached token, refreshing it at most once per (certificate, RNC) across workers.
+
+        A missing token is fetched by whoever takes the refresh lock while the
+        other callers wait for it in the cache. A token inside its refresh
+        window is renewed by one caller ahead of expiry; the rest keep using
+        the current token meanwhile. A failed early renewal (DGII 429,
+        timeout) is logged and the still-valid token is returned.
+        """
         cache_key = self._cache_key(certificate_path, issuer_rnc)
-        cached = cache.get(cache_key)
+        cached, needs_refresh = self._cached_token(cache_key)
+        if cached and not needs_refresh:
+            return cached
         if cached:
-            return DGIIRESTToken(value=cached, expires_in=self.default_expires_in)
-
-        seed = self.request_seed()
-        certificate = self.certificate_loader.load(certificate_path, certificate_password)
-        signed_seed = self.signer.sign(seed.xml, certificate)
-        token = self.validate_seed(signed_seed)
-        cache_timeout = max(60, min(token.expires_in, self.default_expires_in))
-        cache.set(cache_key, token.value, timeout=cache_timeout)
-        return token
+            lock_owner = self._acquire_refresh_lock(cache_key)
+            if lock_owner is None:
+                return cached
+            try:
+                return self._refresh_token(cache_key, lock_owner, certificate_path, certificate_password)
+            except (ECFError, requests.RequestException) as exc:
+                logger.warning(
+                    "Renovacion anticipada del token DGII REST fallida; se usa el token vigente (%ss restantes): %s",
+                    cached.expires_in,
+                    exc,
+                )
+                return cached
+
+        wait_seconds = int(getattr(settings, "ECF_DGII_REST_TOKEN_WAIT_SECONDS", 60))
+        deadline = time.monotonic() + wait_seconds
+        delay = 0.05
+        while True:
+            lock_owner = self._acquire_refresh_lock(cache_key)
+            if lock_owner is not None:
+                cached, _needs_refresh = self._cached_token(cache_key)
+                if cached:
+                    self._release_refresh_lock(cache_key, lock_owner)
+                    return cached
+                return self._refresh_token(cache_key, lock_owner, certificate_path, certificate_password)
+            if time.monotonic() >= deadline:
+                raise ECFTemporaryError("Tiempo de espera agotado esperando token DGII REST solicitado por otro proceso.")
+            time.sleep(delay)
+            delay = min(delay * 2, 0.5)
+            cached, _needs_refresh = self._cached_token(cache_key)
+            if cached:
+                return cached
 
     def request_seed(self) -> DGIISeedPayload:
         response = self.session.get(
@@ -92,6 +129,55 @@ class DGIIRESTAuthClient:
         raw = f"{self.environment.name}:{issuer_rnc or ''}:{certificate_path}"
         return "dgii-rest-token:" + hashlib.sha256(raw.encode("utf-8")).hexdigest()
 
+    def _cached_token(self, cache_key: str) -> tuple[DGIIRESTToken | None, bool]:
+        cached = cache.get(cache_key)
+        if not cached:
+            return None, False
+        if isinstance(cached, str):
+            # Entries cached before refresh windows existed expire with their cache timeout.
+            return DGIIRESTToken(value=cached, expires_in=self.default_expires_in), False
+        now = time.time()
+        expires_in = int(cached["expires_at"] - now)
+        if expires_in <= 0:
+            return None, False
+        return DGIIRESTToken(value=cached["value"], expires_in=expires_in), now >= cached["refresh_at"]
+
+    def _refresh_token(
+        self,
+        cache_key: str,
+        lock_owner: str,
+        certificate_path: str,
+        certificate_password: str | bytes | None,
+    ) -> DGIIRESTToken:
+        try:
+            seed = self.request_seed()
+            certificate = self.certificate_loader.load(certificate_path, certificate_password)
+            signed_seed = self.signer.sign(seed.xml, certificate)
+            token = self.validate_seed(signed_seed)
+            lifetime = max(60, min(token.expires_in, self.default_expires_in))
+            refresh_margin = min(int(getattr(settings, "ECF_DGII_REST_TOKEN_REFRESH_MARGIN_SECONDS", 300)), lifetime // 2)
+            now = time.time()
+            cache.set(
+                cache_key,
+                {"value": token.value, "expires_at": now + lifetime, "refresh_at": now + lifetime - refresh_margin},
+                timeout=lifetime,
+            )
+            return token
+        finally:
+            self._release_refresh_lock(cache_key, lock_owner)
+
+    def _acquire_refresh_lock(self, cache_key: str) -> str | None:
+        lock_owner = uuid.uuid4().hex
+        lock_seconds = int(getattr(settings, "ECF_DGII_REST_TOKEN_LOCK_SECONDS", 60))
+        if cache.add(f"{cache_key}:lock", lock_owner, timeout=lock_seconds):
+            return lock_owner
+        return None
+
+    def _release_refresh_lock(self, cache_key: str, lock_owner: str) -> None:
+        # Only drop our own lock; an expired one may already belong to another worker.
+        if cache.get(f"{cache_key}:lock") == lock_owner:
+            cache.delete(f"{cache_key}:lock")
+
     def _response_data(self, response: requests.Response) -> Any:
         text = response.text.strip()
         if not text:
@@ -14,12 +14,41 @@ from facturacion.ecf.rest.environments import DGIIRESTEnvironment, DGIIRESTEnvir
 from facturacion.ecf.rest.responses import DGIIRESTCallResult
 
 
-class DGIIRESTClient:
-    """Facade over DGII REST endpoints used by real pre-certification flows."""
+class BaseDGIIRESTClient:
+    """Endpoints and response handling shared by the sync and async DGII REST clients."""
 
     submit_path = "/api/Recepcion/ECF"
     status_path = "/api/ConsultaResultado"
     trackids_path = "/api/ConsultaTrackIds"
+    retry_statuses = (408, 429, 500, 502, 503, 504)
+
+    def _result(self, response, *, request_xml: str | None) -> DGIIRESTCallResult:
+        if response.status_code >= 400:
+            raise ECFValidationError(f"Error invocando REST DGII: HTTP {response.status_code}.")
+        return DGIIRESTCallResult(
+            result=self._response_data(response),
+            request_xml=request_xml,
+            response_xml=response.text,
+            status_code=response.status_code,
+        )
+
+    def _response_data(self, response) -> Any:
+        text = response.text.strip()
+        if not text:
+            return {}
+        try:
+            return response.json()
+        except ValueError:
+            if text.startswith("<"):
+                return text
+            return {"valor": text}
+
+    def _url(self, base_url: str, path: str) -> str:
+        return f"{base_url.rstrip('/')}{path}"
+
+
+class DGIIRESTClient(BaseDGIIRESTClient):
+    """Facade over DGII REST endpoints used by real pre-certification flows."""
 
     def __init__(
         self,
@@ -96,7 +125,7 @@ class DGIIRESTClient:
             read=self.environment.retries,
             status=self.environment.retries,
             backoff_factor=self.environment.retry_backoff,
-            status_forcelist=(408, 429, 500, 502, 503, 504),
+            status_forcelist=self.retry_statuses,
             allowed_methods=frozenset(["GET", "POST"]),
             raise_on_status=False,
         )
@@ -104,27 +133,3 @@ class DGIIRESTClient:
         session.mount("http://", adapter)
         session.mount("https://", adapter)
         return session
-
-    def _result(self, response: requests.Response, *, request_xml: str | None) -> DGIIRESTCallResult:
-        if response.status_code >= 400:
-            raise ECFValidationError(f"Error invocando REST DGII: HTTP {response.status_code}.")
-        return DGIIRESTCallResult(
-            result=self._response_data(response),
-            request_xml=request_xml,
-            response_xml=response.text,
-            status_code=response.status_code,
-        )
-
-    def _response_data(self, response: requests.Response) -> Any:
-        text = response.text.strip()
-        if not text:
-            return {}
-        try:
-            return response.json()
-        except ValueError:
-            if text.startswith("<"):
-                return text
-            return {"valor": text}
-
-    def _url(self, base_url: str, path: str) -> str:
-        return f"{base_url.rstrip('/')}{path}"
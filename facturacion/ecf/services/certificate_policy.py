@@ -9,6 +9,7 @@ from django.utils import timezone
 
 from facturacion.ecf.certificates.resolver import active_certificate_for_issuer
 from facturacion.ecf.certificates.metadata import ECFCertificateMetadataService
+from facturacion.ecf.services.audit import record_event_log
 from facturacion.models import ECFEventLog, ECFIssuerConfig, ElectronicFiscalDocument
 from facturacion.ecf.services.status_transitions import ECFStatusTransitionService
 
@@ -99,7 +100,7 @@ class ECFCertificateSigningPolicy:
         user=None,
     ) -> None:
         for warning in result.warnings:
-            ECFEventLog.objects.create(
+            record_event_log(
                 electronic_document=document,
                 event_type="warning",
                 message=warning,
@@ -111,6 +112,35 @@ class ECFCertificateSigningPolicy:
                 created_by=user,
             )
 
+    def log_batch_warnings(
+        self,
+        documents: list[ElectronicFiscalDocument],
+        result: ECFCertificateSigningPolicyResult,
+        *,
+        user=None,
+    ) -> None:
+        """Record policy warnings for documents of one issuer with a single insert."""
+        if not documents or not result.warnings:
+            return
+        certificate_payload = self._certificate_payload(documents[0].issuer)
+        ECFEventLog.objects.bulk_create(
+            [
+                ECFEventLog(
+                    electronic_document=document,
+                    event_type="warning",
+                    message=warning,
+                    payload={
+                        "stage": "certificate_policy",
+                        "code": result.code,
+                        **certificate_payload,
+                    },
+                    created_by=user,
+                )
+                for document in documents
+                for warning in result.warnings
+            ]
+        )
+
     def record_blocked(
         self,
         document: ElectronicFiscalDocument,
@@ -130,7 +160,7 @@ class ECFCertificateSigningPolicy:
             extra_update_fields={"last_error": result.reason, "next_retry_at": None},
         )
         document = transition.document
-        ECFEventLog.objects.create(
+        record_event_log(
             electronic_document=document,
             event_type="error",
             message=result.reason,
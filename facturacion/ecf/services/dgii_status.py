@@ -5,10 +5,10 @@ from __future__ import annotations
 from dataclasses import dataclass
 
 from django.conf import settings
-from django.db import transaction
 from django.utils import timezone
 
-from facturacion.models import ECFEventLog, ElectronicFiscalDocument
+from facturacion.ecf.services.audit import audited_atomic, record_event_log
+from facturacion.models import ElectronicFiscalDocument
 from facturacion.ecf.exceptions import ECFError, ECFValidationError
 from facturacion.ecf.soap.auth import SettingsTokenProvider
 from facturacion.ecf.soap.clients.dgii import DGIISOAPClient
@@ -16,6 +16,7 @@ from facturacion.ecf.soap.environments import DGIISOAPEnvironmentResolver
 from facturacion.ecf.soap.parsers.dgii import DGIISOAPResponseParser
 from facturacion.ecf.state_machine import ECFStateMachine
 from facturacion.ecf.services.job_reconciliation import ECFJobStatusReconciliationService
+from facturacion.ecf.services.status_schedule import ECFStatusCheckSchedule
 from facturacion.ecf.services.status_transitions import ECFStatusTransitionService
 from facturacion.services.credit_note_reconciliation import CreditNoteReconciliationService
 
@@ -45,6 +46,7 @@ class DGIIStatusService:
         self.soap_client_class = soap_client_class
         self.state_machine = ECFStateMachine()
         self.status_transitions = ECFStatusTransitionService()
+        self.status_check_schedule = ECFStatusCheckSchedule()
         self.credit_note_reconciliation = CreditNoteReconciliationService()
         self.job_status_reconciliation = ECFJobStatusReconciliationService(self.status_transitions)
 
@@ -56,7 +58,7 @@ class DGIIStatusService:
             self._log_error(document, str(exc), user)
             raise
 
-    @transaction.atomic
+    @audited_atomic()
     def _check_atomic(self, document: ElectronicFiscalDocument, user=None, environment: str | None = None) -> DGIIStatusCheckResult:
         locked_document = (
             ElectronicFiscalDocument.objects
@@ -84,6 +86,7 @@ class DGIIStatusService:
             "dgii_response_xml": result.response_xml,
             "dgii_response": parsed.raw,
             "last_status_checked_at": now,
+            "next_status_check_at": self._next_status_check_at(locked_document, target_fiscal_status, now),
         }
         if target_fiscal_status == "accepted":
             extra_fields["accepted_at"] = now
@@ -107,7 +110,7 @@ class DGIIStatusService:
             reason="Consulta DGII dejo el documento en estado fiscal terminal.",
         ).document
 
-        ECFEventLog.objects.create(
+        record_event_log(
             electronic_document=locked_document,
             event_type="status_checked",
             message="Estado e-CF consultado en DGII.",
@@ -149,7 +152,7 @@ class DGIIStatusService:
         locked_document.last_error = transition.document.last_error
         locked_document.next_retry_at = transition.document.next_retry_at
 
-        ECFEventLog.objects.create(
+        record_event_log(
             electronic_document=locked_document,
             event_type="status_checked",
             message="Estado local e-CF reconciliado antes de consultar DGII.",
@@ -185,6 +188,7 @@ class DGIIStatusService:
                     "messages": ["Estado DGII simulado para desarrollo."],
                 },
                 "last_status_checked_at": now,
+                "next_status_check_at": None,
                 "accepted_at": now,
                 "rejection_reason": None,
             },
@@ -197,7 +201,7 @@ class DGIIStatusService:
             source="dgii_status_mock_terminal_job_reconciliation",
             reason="Consulta DGII simulada dejo el documento en estado fiscal terminal.",
         ).document
-        ECFEventLog.objects.create(
+        record_event_log(
             electronic_document=locked_document,
             event_type="status_checked",
             message="Estado e-CF consultado en DGII en modo simulado.",
@@ -206,13 +210,18 @@ class DGIIStatusService:
         )
         return DGIIStatusCheckResult(document=locked_document, status="accepted", dgii_status="ACEPTADO")
 
+    def _next_status_check_at(self, document: ElectronicFiscalDocument, target_fiscal_status: str, now):
+        if target_fiscal_status != "submitted":
+            return None
+        return self.status_check_schedule.next_check_at(document.ecf_type, document.status_check_attempts, now)
+
     def _target_fiscal_status(self, normalized_status: str) -> str:
         if normalized_status in {"accepted", "rejected"}:
             return normalized_status
         return "submitted"
 
     def _log_error(self, document: ElectronicFiscalDocument, message: str, user=None) -> None:
-        ECFEventLog.objects.create(
+        record_event_log(
             electronic_document=document,
             event_type="error",
             message=f"Error consultando estado e-CF en DGII: {message}",
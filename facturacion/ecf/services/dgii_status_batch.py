@@ -0,0 +1,362 @@
+"""Periodic batch polling of DGII status for submitted e-CF documents."""
+
+from __future__ import annotations
+
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from facturacion.ecf.exceptions import ECFError, ECFValidationError
+from facturacion.ecf.services.dgii_status import DGIIStatusService
+from facturacion.ecf.soap.clients.base import SOAPCallResult
+from facturacion.ecf.soap.responses.dgii import DGIIStatusResponse
+from facturacion.models import ECFArtifact, ECFEventLog, ECFStatusEvent, ElectronicFiscalDocument
+from facturacion.services.response_cache import (
+    DASHBOARD_NAMESPACE,
+    ECF_MONITOR_NAMESPACE,
+    invalidate_tenant_responses,
+)
+from facturacion.services.sales_rollup import DailySalesRollupService
+
+
+BATCH_STAGE = "poll_submitted_batch"
+
+# Only these columns are written while persisting a batch ...
+_UPDATED_FIELDS = (
+    "status",
+    "fiscal_status",
+    "job_status",
+    "dgii_request_xml",
+    "dgii_response_xml",
+    "dgii_response",
+    "last_status_checked_at",
+    "next_status_check_at",
+    "accepted_at",
+    "rejection_reason",
+    "last_error",
+    "next_retry_at",
+    "updated_at",
+)
+# ... and these are the only ones loaded.
+_LOADED_FIELDS = (
+    "id",
+    "company_id",
+    "issuer_id",
+    "invoice_id",
+    "credit_note_id",
+    "ecf_type",
+    "track_id",
+    "async_task_id",
+    "status_check_attempts",
+    *_UPDATED_FIELDS,
+)
+
+
+@dataclass(frozen=True)
+class DGIIStatusBatchResult:
+    """Outcome of one polling cycle, by document id."""
+
+    claimed: int
+    accepted: list[int] = field(default_factory=list)
+    rejected: list[int] = field(default_factory=list)
+    processing: list[int] = field(default_factory=list)
+    failed: dict[int, str] = field(default_factory=dict)
+
+
+class DGIIStatusBatchService(DGIIStatusService):
+    """Check many submitted documents per cycle instead of one task per TrackID.
+
+    Documents whose next_status_check_at is due are claimed with SKIP LOCKED
+    (job_status running plus a claim token), DGII is queried from a bounded
+    thread pool sharing one pooled SOAP client, and every result is written
+    back in one transaction with bulk writes, rescheduling pending documents
+    along ECFStatusCheckSchedule. Threads never touch the database.
+    """
+
+    def poll_submitted(
+        self,
+        *,
+        limit: int | None = None,
+        max_workers: int | None = None,
+        environment: str | None = None,
+        task_id: str | None = None,
+        user=None,
+    ) -> DGIIStatusBatchResult:
+        limit = limit or int(getattr(settings, "ECF_DGII_STATUS_POLL_BATCH_SIZE", 200))
+        claim_token = task_id or uuid.uuid4().hex
+        claimed = self._claim_due(limit, claim_token)
+        if not claimed:
+            return DGIIStatusBatchResult(claimed=0)
+
+        try:
+            outcomes = self._query_many(claimed, environment, max_workers)
+            return self._persist(outcomes, claim_token, environment, user)
+        except Exception as exc:
+            # Hand the claimed rows back now instead of waiting out the lease.
+            self._release_claim(claimed, claim_token, exc)
+            raise
+
+    @transaction.atomic
+    def _release_claim(self, claimed: dict[int, str], claim_token: str, exc: Exception) -> None:
+        rows = list(
+            ElectronicFiscalDocument.objects
+            .select_for_update()
+            .filter(pk__in=claimed.keys(), job_status="running", async_task_id=claim_token)
+            .values_list("id", "fiscal_status")
+        )
+        if not rows:
+            return
+        ElectronicFiscalDocument.objects.filter(pk__in=[document_id for document_id, _status in rows]).update(
+            job_status="idle",
+            async_task_id=None,
+            last_error=str(exc),
+            updated_at=timezone.now(),
+        )
+        ECFStatusEvent.objects.bulk_create(
+            ECFStatusEvent(
+                document_id=document_id,
+                previous_fiscal_status=fiscal_status,
+                new_fiscal_status=fiscal_status,
+                previous_job_status="running",
+                new_job_status="idle",
+                source=f"task_{BATCH_STAGE}_released",
+                reason=str(exc),
+                task_id=claim_token,
+            )
+            for document_id, fiscal_status in rows
+        )
+
+    @transaction.atomic
+    def _claim_due(self, limit: int, claim_token: str) -> dict[int, str]:
+        now = timezone.now()
+        # Documents submitted before next_status_check_at existed fall back to the fixed delay.
+        legacy_cutoff = now - timezone.timedelta(seconds=int(getattr(settings, "ECF_TASK_STATUS_CHECK_DELAY_SECONDS", 120)))
+        # A claim whose worker died is taken over once its lease runs out.
+        lease_cutoff = now - timezone.timedelta(seconds=int(getattr(settings, "ECF_DGII_STATUS_POLL_LEASE_SECONDS", 600)))
+        rows = list(
+            ElectronicFiscalDocument.objects
+            .select_for_update(skip_locked=True)
+            .filter(fiscal_status="submitted", track_id__isnull=False)
+            .exclude(track_id="")
+            .filter(Q(job_status="idle") | Q(job_status="running", updated_at__lte=lease_cutoff))
+            .filter(
+                Q(next_status_check_at__lte=now)
+                | Q(next_status_check_at__isnull=True, last_status_checked_at__lte=legacy_cutoff)
+                | Q(next_status_check_at__isnull=True, last_status_checked_at__isnull=True, last_submitted_at__lte=legacy_cutoff)
+                | Q(next_status_check_at__isnull=True, last_status_checked_at__isnull=True, last_submitted_at__isnull=True)
+            )
+            .order_by(F("next_status_check_at").asc(nulls_first=True), "issuer_id", "id")
+            .values_list("id", "track_id", "fiscal_status", "job_status")[:limit]
+        )
+        if not rows:
+            return {}
+
+        ids = [row[0] for row in rows]
+        ElectronicFiscalDocument.objects.filter(pk__in=ids).update(
+            job_status="running",
+            async_task_id=claim_token,
+            status_check_attempts=F("status_check_attempts") + 1,
+            updated_at=now,
+        )
+        ECFStatusEvent.objects.bulk_create(
+            ECFStatusEvent(
+                document_id=document_id,
+                previous_fiscal_status=fiscal_status,
+                new_fiscal_status=fiscal_status,
+                previous_job_status=job_status,
+                new_job_status="running",
+                source=f"task_{BATCH_STAGE}_started",
+                reason=f"Task e-CF iniciada: {BATCH_STAGE}.",
+                task_id=claim_token,
+            )
+            for document_id, _track_id, fiscal_status, job_status in rows
+        )
+        return {document_id: track_id for document_id, track_id, _fiscal_status, _job_status in rows}
+
+    def _query_many(
+        self,
+        claimed: dict[int, str],
+        environment: str | None,
+        max_workers: int | None,
+    ) -> dict[int, tuple[SOAPCallResult | None, DGIIStatusResponse] | ECFError]:
+        if getattr(settings, "ECF_DGII_MOCK_ENABLED", False):
+            return {document_id: (None, self._mock_response(track_id, environment)) for document_id, track_id in claimed.items()}
+
+        try:
+            environment_config = self.environment_resolver.resolve(environment)
+            client = self.soap_client_class(environment_config, self.token_provider.get_token())
+        except ECFError as exc:
+            return {document_id: exc for document_id in claimed}
+
+        def query(track_id: str):
+            try:
+                result = client.query_status(track_id)
+                return result, self.parser.parse_status(result.result)
+            except ECFError as exc:
+                return exc
+            except Exception as exc:
+                # Keep one malformed response from stranding the whole claimed batch.
+                return ECFValidationError(f"Respuesta DGII no procesable para TrackID {track_id}: {exc}")
+
+        max_workers = max_workers or int(getattr(settings, "ECF_DGII_STATUS_POLL_WORKERS", 8))
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(claimed)))) as executor:
+            return dict(zip(claimed, executor.map(query, claimed.values())))
+
+    @transaction.atomic
+    def _persist(self, outcomes, claim_token: str, environment: str | None, user=None) -> DGIIStatusBatchResult:
+        documents = list(
+            ElectronicFiscalDocument.objects
+            .select_for_update()
+            .filter(pk__in=outcomes.keys(), job_status="running", async_task_id=claim_token)
+            .only(*_LOADED_FIELDS)
+            .order_by("pk")
+        )
+        environment_name = environment or getattr(settings, "ECF_DGII_ENVIRONMENT", "testing")
+        now = timezone.now()
+        result = DGIIStatusBatchResult(claimed=len(outcomes))
+        status_events: list[ECFStatusEvent] = []
+        event_logs: list[ECFEventLog] = []
+        rollup_changes: list[tuple[int, str, str]] = []
+        resolved: list[ElectronicFiscalDocument] = []
+
+        for document in documents:
+            previous_fiscal_status = document.fiscal_status
+            outcome = outcomes[document.pk]
+            document.job_status = "idle"
+            document.next_retry_at = None
+            document.last_status_checked_at = now
+            document.next_status_check_at = self.status_check_schedule.next_check_at(
+                document.ecf_type,
+                document.status_check_attempts,
+                now,
+            )
+            document.updated_at = now
+
+            if isinstance(outcome, ECFError):
+                result.failed[document.pk] = str(outcome)
+                document.last_error = str(outcome)
+                status_events.append(self._status_event(document, previous_fiscal_status, f"task_{BATCH_STAGE}_failed", str(outcome), claim_token))
+                event_logs.append(
+                    ECFEventLog(
+                        electronic_document=document,
+                        event_type="error",
+                        message=f"Error consultando estado e-CF en DGII: {outcome}",
+                        payload={"stage": "dgii_status", "batch": True, "task_id": claim_token},
+                        created_by=user,
+                    )
+                )
+                continue
+
+            call_result, parsed = outcome
+            target_fiscal_status = self._target_fiscal_status(parsed.normalized_status)
+            document.last_error = None
+            document.dgii_response = parsed.raw
+            if call_result is not None:
+                if call_result.request_xml:
+                    document.dgii_request_xml = call_result.request_xml
+                document.dgii_response_xml = call_result.response_xml
+            else:
+                document.dgii_response_xml = self._mock_response_xml(document.track_id)
+            if target_fiscal_status == "accepted":
+                document.accepted_at = now
+                document.rejection_reason = None
+                result.accepted.append(document.pk)
+            elif target_fiscal_status == "rejected":
+                document.rejection_reason = self._rejection_reason(parsed.messages)
+                result.rejected.append(document.pk)
+            else:
+                result.processing.append(document.pk)
+
+            if target_fiscal_status != previous_fiscal_status:
+                self.status_transitions.fiscal_state_machine.assert_transition(previous_fiscal_status, target_fiscal_status)
+                document.fiscal_status = target_fiscal_status
+                document.status = target_fiscal_status
+                document.next_status_check_at = None
+                resolved.append(document)
+                if document.invoice_id:
+                    rollup_changes.append((document.invoice_id, previous_fiscal_status, target_fiscal_status))
+
+            status_events.append(
+                self._status_event(
+                    document,
+                    previous_fiscal_status,
+                    "dgii_status_batch",
+                    f"Estado DGII consultado: {parsed.status} ({parsed.normalized_status}).",
+                    claim_token,
+                )
+            )
+            event_logs.append(
+                ECFEventLog(
+                    electronic_document=document,
+                    event_type="status_checked",
+                    message="Estado e-CF consultado en DGII.",
+                    payload={
+                        "environment": environment_name,
+                        "dgii_status": parsed.status,
+                        "normalized_status": parsed.normalized_status,
+                        "fiscal_status": document.fiscal_status,
+                        "code": parsed.code,
+                        "messages": parsed.messages,
+                        "batch": True,
+                        "task_id": claim_token,
+                    },
+                    created_by=user,
+                )
+            )
+
+        if documents:
+            ECFArtifact.sync(documents, ("dgii_request_xml", "dgii_response_xml"))
+            ElectronicFiscalDocument.objects.bulk_update(documents, _UPDATED_FIELDS)
+            ECFStatusEvent.objects.bulk_create(status_events)
+            ECFEventLog.objects.bulk_create(event_logs)
+            DailySalesRollupService().move_fiscal_status_many(rollup_changes)
+            for document in resolved:
+                if document.credit_note_id:
+                    self.credit_note_reconciliation.reconcile_after_dgii_status(document, user=user)
+            for company_id in {document.company_id for document in documents}:
+                invalidate_tenant_responses(company_id, [DASHBOARD_NAMESPACE, ECF_MONITOR_NAMESPACE])
+        return result
+
+    def _status_event(
+        self,
+        document: ElectronicFiscalDocument,
+        previous_fiscal_status: str,
+        source: str,
+        reason: str,
+        task_id: str,
+    ) -> ECFStatusEvent:
+        return ECFStatusEvent(
+            document=document,
+            previous_fiscal_status=previous_fiscal_status,
+            new_fiscal_status=document.fiscal_status,
+            previous_job_status="running",
+            new_job_status=document.job_status,
+            source=source,
+            reason=reason,
+            task_id=task_id,
+        )
+
+    def _mock_response(self, track_id: str, environment: str | None) -> DGIIStatusResponse:
+        return DGIIStatusResponse(
+            track_id=track_id,
+            status="ACEPTADO",
+            normalized_status="accepted",
+            raw={
+                "mock": True,
+                "environment": environment or getattr(settings, "ECF_DGII_ENVIRONMENT", "testing"),
+                "track_id": track_id,
+                "status": "ACEPTADO",
+                "messages": ["Estado DGII simulado para desarrollo."],
+            },
+        )
+
+    def _mock_response_xml(self, track_id: str) -> str:
+        return (
+            "<?xml version='1.0' encoding='UTF-8'?>"
+            f"<MockDGIIStatus><TrackID>{track_id}</TrackID><Estado>ACEPTADO</Estado></MockDGIIStatus>"
+        )
@@ -5,10 +5,10 @@ from __future__ import annotations
 from dataclasses import dataclass
 
 from django.conf import settings
-from django.db import transaction
 from django.utils import timezone
 
-from facturacion.models import ECFEventLog, ElectronicFiscalDocument
+from facturacion.ecf.services.audit import audited_atomic, record_event_log
+from facturacion.models import ElectronicFiscalDocument
 from facturacion.ecf.exceptions import ECFError, ECFValidationError
 from facturacion.ecf.soap.auth import SettingsTokenProvider
 from facturacion.ecf.soap.clients.dgii import DGIISOAPClient
@@ -16,6 +16,7 @@ from facturacion.ecf.soap.environments import DGIISOAPEnvironmentResolver
 from facturacion.ecf.soap.parsers.dgii import DGIISOAPResponseParser
 from facturacion.ecf.utils.text import digits_only
 from facturacion.ecf.state_machine import ECFStateMachine
+from facturacion.ecf.services.status_schedule import ECFStatusCheckSchedule
 from facturacion.ecf.services.status_transitions import ECFStatusTransitionService
 
 
@@ -44,6 +45,7 @@ class DGIISubmissionService:
         self.soap_client_class = soap_client_class
         self.state_machine = ECFStateMachine()
         self.status_transitions = ECFStatusTransitionService()
+        self.status_check_schedule = ECFStatusCheckSchedule()
 
     def submit(self, document: ElectronicFiscalDocument, user=None, environment: str | None = None, force: bool = False) -> DGIISubmissionResult:
         """Submit a signed e-CF and update local tracking state."""
@@ -53,7 +55,7 @@ class DGIISubmissionService:
             self._log_error(document, str(exc), user)
             raise
 
-    @transaction.atomic
+    @audited_atomic()
     def _submit_atomic(self, document: ElectronicFiscalDocument, user=None, environment: str | None = None, force: bool = False) -> DGIISubmissionResult:
         locked_document = (
             ElectronicFiscalDocument.objects
@@ -92,13 +94,17 @@ class DGIISubmissionService:
                 "dgii_response_xml": result.response_xml,
                 "dgii_response": parsed.raw,
                 "last_submitted_at": timezone.now(),
+                "next_status_check_at": self.status_check_schedule.next_check_at(
+                    locked_document.ecf_type,
+                    locked_document.status_check_attempts,
+                ),
                 "last_error": None,
                 "next_retry_at": None,
             },
         )
         locked_document = transition.document
 
-        ECFEventLog.objects.create(
+        record_event_log(
             electronic_document=locked_document,
             event_type="submitted",
             message="XML firmado enviado a DGII.",
@@ -148,13 +154,18 @@ class DGIISubmissionService:
                     "messages": ["Respuesta DGII simulada para desarrollo."],
                 },
                 "last_submitted_at": now,
+                "next_status_check_at": self.status_check_schedule.next_check_at(
+                    locked_document.ecf_type,
+                    locked_document.status_check_attempts,
+                    now,
+                ),
                 "last_error": None,
                 "next_retry_at": None,
             },
         )
         locked_document = transition.document
 
-        ECFEventLog.objects.create(
+        record_event_log(
             electronic_document=locked_document,
             event_type="submitted",
             message="XML firmado enviado a DGII en modo simulado.",
@@ -177,7 +188,7 @@ class DGIISubmissionService:
         )
 
     def _log_error(self, document: ElectronicFiscalDocument, message: str, user=None) -> None:
-        ECFEventLog.objects.create(
+        record_event_log(
             electronic_document=document,
             event_type="error",
             message=f"Error enviando XML e-CF a DGII: {message}",
@@ -6,10 +6,12 @@ from dataclasses import dataclass
 
 from django.conf import settings
 from django.core.exceptions import ValidationError
-from django.db import transaction
 
+from facturacion.ecf.services.audit import audited_atomic, record_event_log
+from facturacion.ecf.services.sequence_reservations import sequence_allocator
 from facturacion.ecf.utils.text import digits_only
-from facturacion.models import Company, CreditNote, ECFEventLog, ECFIssuerConfig, ECFSequence, ElectronicFiscalDocument, Invoice
+from facturacion.models import Company, CreditNote, ECFIssuerConfig, ElectronicFiscalDocument, Invoice
+from facturacion.services.sales_rollup import NO_FISCAL_STATUS, DailySalesRollupService
 
 
 @dataclass(frozen=True)
@@ -45,7 +47,7 @@ class ECFDocumentFactoryService:
         except ValidationError as exc:
             return ECFDocumentFactoryResult(document=None, created=False, error=self._format_validation_error(exc))
 
-    @transaction.atomic
+    @audited_atomic()
     def _create_for_invoice_atomic(
         self,
         invoice: Invoice,
@@ -61,7 +63,7 @@ class ECFDocumentFactoryService:
 
         issuer = self._resolve_issuer(issuer_id, company=locked_invoice.company)
         document_type = ecf_type or self._resolve_ecf_type(locked_invoice, issuer)
-        encf, sequence = ECFSequence.allocate_next(issuer=issuer, ecf_type=document_type)
+        encf, sequence = sequence_allocator.allocate(issuer, document_type)
 
         document = ElectronicFiscalDocument.objects.create(
             invoice=locked_invoice,
@@ -72,7 +74,7 @@ class ECFDocumentFactoryService:
             encf=encf,
             status="draft",
         )
-        ECFEventLog.objects.create(
+        record_event_log(
             electronic_document=document,
             event_type="created",
             message="Documento e-CF creado automaticamente desde factura.",
@@ -83,9 +85,10 @@ class ECFDocumentFactoryService:
                 "auto_created": True,
             },
         )
+        DailySalesRollupService().move_invoice(locked_invoice, previous_fiscal_status=NO_FISCAL_STATUS)
         return ECFDocumentFactoryResult(document=document, created=True)
 
-    @transaction.atomic
+    @audited_atomic()
     def _create_for_credit_note_atomic(
         self,
         credit_note: CreditNote,
@@ -99,7 +102,7 @@ class ECFDocumentFactoryService:
             return ECFDocumentFactoryResult(document=existing, created=False)
 
         issuer = self._resolve_issuer(issuer_id, company=locked_note.company)
-        encf, sequence = ECFSequence.allocate_next(issuer=issuer, ecf_type="34")
+        encf, sequence = sequence_allocator.allocate(issuer, "34")
         document = ElectronicFiscalDocument.objects.create(
             credit_note=locked_note,
             company=locked_note.company,
@@ -109,7 +112,7 @@ class ECFDocumentFactoryService:
             encf=encf,
             status="draft",
         )
-        ECFEventLog.objects.create(
+        record_event_log(
             electronic_document=document,
             event_type="created",
             message="Documento e-CF E34 creado desde nota de credito.",
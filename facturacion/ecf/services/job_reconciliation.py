@@ -4,10 +4,9 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 
-from django.db import transaction
-
+from facturacion.ecf.services.audit import audited_atomic, record_event_log
 from facturacion.ecf.services.status_transitions import ECFStatusTransitionService
-from facturacion.models import ECFEventLog, ElectronicFiscalDocument
+from facturacion.models import ElectronicFiscalDocument
 
 
 TERMINAL_FISCAL_STATUSES = {"accepted", "rejected"}
@@ -27,7 +26,7 @@ class ECFJobStatusReconciliationService:
     def __init__(self, status_transitions: ECFStatusTransitionService | None = None) -> None:
         self.status_transitions = status_transitions or ECFStatusTransitionService()
 
-    @transaction.atomic
+    @audited_atomic()
     def reconcile_terminal_document(
         self,
         document: ElectronicFiscalDocument,
@@ -56,7 +55,7 @@ class ECFJobStatusReconciliationService:
         )
         locked_document = transition.document
 
-        ECFEventLog.objects.create(
+        record_event_log(
             electronic_document=locked_document,
             event_type="job_reconciled",
             message="Estado tecnico reconciliado para documento fiscal terminal.",
@@ -0,0 +1,176 @@
+"""Block reservation of e-NCF numbers and reconciliation of unused ranges."""
+
+from __future__ import annotations
+
+import os
+import socket
+import threading
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from facturacion.models import ECFSequence, ECFSequenceReservation, ElectronicFiscalDocument
+
+
+@dataclass
+class _ReservedBlock:
+    reservation_id: int
+    sequence: ECFSequence
+    next_number: int
+    last_number: int
+    usable_until: timezone.datetime
+
+    def is_usable(self) -> bool:
+        return self.next_number <= self.last_number and timezone.now() < self.usable_until
+
+
+class ECFSequenceBlockAllocator:
+    """Hand out e-NCF numbers from per-process reserved blocks.
+
+    With ECF_SEQUENCE_BLOCK_SIZE <= 1 every call falls back to
+    ECFSequence.allocate_next. Otherwise the sequence row is locked once per
+    block; the reserving transaction uses the first number and the rest of
+    the block becomes available to other callers only after that transaction
+    commits, so a rollback never leaves numbers that were not reserved.
+    Each number served from a block re-reads the sequence row (no lock), so
+    a sequence deactivated or cut short in any process stops serving at once.
+    """
+
+    def __init__(self) -> None:
+        self._blocks: dict[tuple[int, str], _ReservedBlock] = {}
+        self._lock = threading.Lock()
+
+    def allocate(self, issuer, ecf_type: str) -> tuple[str, ECFSequence]:
+        block_size = int(getattr(settings, "ECF_SEQUENCE_BLOCK_SIZE", 1))
+        if block_size <= 1:
+            return ECFSequence.allocate_next(issuer=issuer, ecf_type=ecf_type)
+
+        key = (issuer.pk, ecf_type)
+        with self._lock:
+            block = self._blocks.get(key)
+            number = None
+            if block and block.is_usable():
+                number = block.next_number
+                block.next_number += 1
+            else:
+                self._blocks.pop(key, None)
+        if number is not None:
+            if self._still_serves(block, number):
+                return block.sequence.format_encf(number), block.sequence
+            # Deactivated or edited since the block was reserved: the rest of the
+            # block is left to reconciliation and the next call reserves afresh.
+            self._discard(key, block)
+
+        ttl_seconds = int(getattr(settings, "ECF_SEQUENCE_BLOCK_TTL_SECONDS", 900))
+        reservation = ECFSequence.allocate_block(
+            issuer,
+            ecf_type,
+            block_size,
+            owner=_process_owner(),
+            ttl_seconds=ttl_seconds,
+        )
+        sequence = reservation.sequence
+        if reservation.last_number > reservation.first_number:
+            block = _ReservedBlock(
+                reservation_id=reservation.pk,
+                sequence=sequence,
+                next_number=reservation.first_number + 1,
+                last_number=reservation.last_number,
+                # Stop handing out numbers shortly before expiry so reconciliation
+                # never races a caller that is still inside its transaction.
+                usable_until=reservation.expires_at - timezone.timedelta(seconds=min(60, ttl_seconds // 10)),
+            )
+            transaction.on_commit(lambda: self._activate(key, block))
+        return sequence.format_encf(reservation.first_number), sequence
+
+    def clear(self) -> None:
+        with self._lock:
+            self._blocks.clear()
+
+    def _still_serves(self, block: _ReservedBlock, number: int) -> bool:
+        """Lockless re-read of the sequence row, so admin edits in any process apply at once."""
+        sequence = block.sequence
+        return ECFSequence.objects.filter(
+            pk=sequence.pk,
+            issuer_id=sequence.issuer_id,
+            ecf_type=sequence.ecf_type,
+            is_active=True,
+            start_number__lte=number,
+            end_number__gte=number,
+        ).exists()
+
+    def _discard(self, key: tuple[int, str], block: _ReservedBlock) -> None:
+        with self._lock:
+            if self._blocks.get(key) is block:
+                del self._blocks[key]
+
+    def _activate(self, key: tuple[int, str], block: _ReservedBlock) -> None:
+        with self._lock:
+            current = self._blocks.get(key)
+            if current is None or not current.is_usable():
+                self._blocks[key] = block
+
+
+sequence_allocator = ECFSequenceBlockAllocator()
+
+
+def _process_owner() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+@dataclass(frozen=True)
+class SequenceReservationReconciliationResult:
+    reservations: int
+    unused_numbers: int
+
+
+class ECFSequenceReservationReconciliationService:
+    """Record e-NCF numbers from expired reservations that were never issued."""
+
+    def reconcile_expired(self, *, grace_seconds: int = 300, limit: int | None = None) -> SequenceReservationReconciliationResult:
+        cutoff = timezone.now() - timezone.timedelta(seconds=grace_seconds)
+        queryset = (
+            ECFSequenceReservation.objects
+            .filter(status=ECFSequenceReservation.STATUS_ACTIVE, expires_at__lte=cutoff)
+            .order_by("id")
+            .values_list("id", flat=True)
+        )
+        if limit:
+            queryset = queryset[:limit]
+
+        reservations = 0
+        unused_numbers = 0
+        for reservation_id in list(queryset):
+            unused = self._reconcile(reservation_id)
+            if unused is None:
+                continue
+            reservations += 1
+            unused_numbers += len(unused)
+        return SequenceReservationReconciliationResult(reservations=reservations, unused_numbers=unused_numbers)
+
+    @transaction.atomic
+    def _reconcile(self, reservation_id: int) -> list[str] | None:
+        reservation = (
+            ECFSequenceReservation.objects
+            .select_for_update()
+            .select_related("sequence")
+            .get(pk=reservation_id)
+        )
+        if reservation.status != ECFSequenceReservation.STATUS_ACTIVE:
+            return None
+
+        encfs = reservation.encfs()
+        used = set(
+            ElectronicFiscalDocument.objects
+            .filter(issuer_id=reservation.sequence.issuer_id, encf__in=encfs)
+            .values_list("encf", flat=True)
+        )
+        unused = [encf for encf in encfs if encf not in used]
+        reservation.status = ECFSequenceReservation.STATUS_RECONCILED
+        reservation.reconciled_at = timezone.now()
+        reservation.used_count = len(used)
+        reservation.unused_encfs = unused
+        reservation.save(update_fields=["status", "reconciled_at", "used_count", "unused_encfs"])
+        return unused
@@ -4,13 +4,21 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 
-from django.db import transaction
+from django.utils import timezone
 
-from facturacion.models import ECFEventLog, ElectronicFiscalDocument
+from facturacion.ecf.services.audit import audited_atomic, record_event_log
+from facturacion.models import ECFArtifact, ECFEventLog, ECFStatusEvent, ElectronicFiscalDocument
+from facturacion.services.response_cache import (
+    DASHBOARD_NAMESPACE,
+    ECF_MONITOR_NAMESPACE,
+    invalidate_tenant_responses,
+)
+from facturacion.services.sales_rollup import DailySalesRollupService
 from facturacion.ecf.state_machine import ECFStateMachine
 from facturacion.ecf.services.status_transitions import ECFStatusTransitionService
 from facturacion.ecf.certificates.loader import PKCS12CertificateLoader
-from facturacion.ecf.exceptions import ECFError, ECFValidationError
+from facturacion.ecf.exceptions import ECFError, ECFPermanentError, ECFTemporaryError, ECFValidationError
+from facturacion.ecf.signer.engines import ECFSigningEngine, get_signing_engine
 from facturacion.ecf.signer.xml_signer import ECFXMLSigner
 from facturacion.ecf.validators.signature import ECFSignatureValidator
 from facturacion.ecf.validators.xsd import ECFXSDValidator
@@ -26,6 +34,19 @@ class ECFSigningResult:
     xsd_validated: bool
 
 
+@dataclass(frozen=True)
+class ECFBatchSigningResult:
+    """Result returned after signing a batch of e-CF XML documents of one issuer."""
+
+    signed: list[int]
+    skipped: list[int]
+    failed: dict[int, str]
+    xsd_validated: bool
+
+
+SIGNED_OR_LATER_STATUSES = {"signed", "submitted", "accepted", "rejected"}
+
+
 class ECFSigningService:
     """Sign generated e-CF XML, validate it and persist the signed XML."""
 
@@ -35,10 +56,15 @@ class ECFSigningService:
         signer: ECFXMLSigner | None = None,
         signature_validator: ECFSignatureValidator | None = None,
         xsd_validator: ECFXSDValidator | None = None,
+        signing_engine: ECFSigningEngine | None = None,
     ) -> None:
         self.certificate_loader = certificate_loader or PKCS12CertificateLoader()
         self.signer = signer or ECFXMLSigner()
         self.signature_validator = signature_validator or ECFSignatureValidator()
+        self.signing_engine = signing_engine or get_signing_engine(
+            signer=signer,
+            signature_validator=signature_validator,
+        )
         self.xsd_validator = xsd_validator or ECFXSDValidator()
         self.state_machine = ECFStateMachine()
         self.status_transitions = ECFStatusTransitionService()
@@ -58,7 +84,7 @@ class ECFSigningService:
             self._log_error(document, str(exc), user)
             raise
 
-    @transaction.atomic
+    @audited_atomic()
     def _sign_atomic(
         self,
         document: ElectronicFiscalDocument,
@@ -78,8 +104,7 @@ class ECFSigningService:
         self.status_transitions.fiscal_state_machine.assert_transition(locked_document.fiscal_status, "signed")
 
         certificate = self.certificate_loader.load(certificate_path, certificate_password)
-        signed_xml = self.signer.sign(locked_document.xml_content, certificate)
-        self.signature_validator.validate(signed_xml, certificate)
+        signed_xml = self.signing_engine.sign_and_verify(locked_document.xml_content, certificate)
 
         if validate_xsd:
             self.xsd_validator.validate(locked_document.ecf_type, signed_xml)
@@ -93,7 +118,7 @@ class ECFSigningService:
         )
         locked_document = transition.document
 
-        ECFEventLog.objects.create(
+        record_event_log(
             electronic_document=locked_document,
             event_type="signed",
             message="XML e-CF firmado y validado criptográficamente.",
@@ -116,8 +141,204 @@ class ECFSigningService:
             xsd_validated=validate_xsd,
         )
 
+    @audited_atomic()
+    def sign_batch(
+        self,
+        document_ids: list[int],
+        certificate_path: str | None,
+        certificate_password: str | bytes | None,
+        user=None,
+        validate_xsd: bool = True,
+        task_id: str | None = None,
+    ) -> ECFBatchSigningResult:
+        """Sign many documents of one issuer with one certificate load and bulk audited writes.
+
+        Per-document failures are recorded as failed jobs without aborting the
+        rest of the batch; every document leaves the batch with job_status
+        idle or failed. ECFTemporaryError (certificate store or signing pool
+        unavailable) aborts the whole batch unchanged so the caller can retry.
+        """
+        documents = list(
+            ElectronicFiscalDocument.objects
+            .select_for_update()
+            .filter(pk__in=document_ids)
+            .order_by("pk")
+        )
+        if len({document.issuer_id for document in documents}) > 1:
+            raise ECFValidationError("La firma por lote requiere documentos de un solo emisor.")
+
+        certificate = None
+        batch_error = None
+        try:
+            if not certificate_path:
+                raise ECFPermanentError("El emisor no tiene certificado e-CF configurado.")
+            certificate = self.certificate_loader.load(certificate_path, certificate_password)
+        except ECFTemporaryError:
+            raise
+        except ECFError as exc:
+            batch_error = str(exc)
+
+        # Load every XML artifact the batch reads or rewrites in one query.
+        ECFArtifact.sync(documents, ("xml_content", "signed_xml_content"))
+        outcomes: dict[int, str | ECFError] = {}
+        pending: list[ElectronicFiscalDocument] = []
+        for document in documents:
+            if self._already_signed(document):
+                continue
+            try:
+                if batch_error:
+                    raise ECFValidationError(batch_error)
+                if not document.xml_content:
+                    raise ECFValidationError("El documento no tiene XML generado para firmar.")
+                self.status_transitions.fiscal_state_machine.assert_transition(document.fiscal_status, "signed")
+            except ECFError as exc:
+                outcomes[document.pk] = exc
+                continue
+            pending.append(document)
+        if pending:
+            signatures = self.signing_engine.sign_many([document.xml_content for document in pending], certificate)
+            for signature in signatures:
+                if isinstance(signature, ECFTemporaryError):
+                    raise signature
+            outcomes.update(zip([document.pk for document in pending], signatures))
+
+        now = timezone.now()
+        signed: list[int] = []
+        skipped: list[int] = []
+        failed: dict[int, str] = {}
+        status_events: list[ECFStatusEvent] = []
+        event_logs: list[ECFEventLog] = []
+        rollup_changes: list[tuple[int, str, str]] = []
+
+        for document in documents:
+            previous_fiscal_status = document.fiscal_status
+            previous_job_status = document.job_status
+
+            if self._already_signed(document):
+                skipped.append(document.pk)
+                document.job_status = "idle"
+                document.updated_at = now
+                event_logs.append(
+                    ECFEventLog(
+                        electronic_document=document,
+                        event_type="skipped",
+                        message="XML ya firmado; documento omitido del lote por idempotencia.",
+                        payload={"stage": "sign_xml_batch", "task_id": task_id, "status": previous_fiscal_status},
+                        created_by=user,
+                    )
+                )
+                continue
+
+            try:
+                signed_xml = outcomes[document.pk]
+                if isinstance(signed_xml, ECFError):
+                    raise signed_xml
+                if validate_xsd:
+                    self.xsd_validator.validate(document.ecf_type, signed_xml)
+            except ECFError as exc:
+                failed[document.pk] = str(exc)
+                document.job_status = "failed"
+                document.last_error = str(exc)
+                document.next_retry_at = None
+                document.updated_at = now
+                status_events.append(
+                    ECFStatusEvent(
+                        document=document,
+                        previous_fiscal_status=previous_fiscal_status,
+                        new_fiscal_status=previous_fiscal_status,
+                        previous_job_status=previous_job_status,
+                        new_job_status="failed",
+                        source="xml_signing_batch_failed",
+                        reason=str(exc),
+                        task_id=task_id,
+                    )
+                )
+                event_logs.append(
+                    ECFEventLog(
+                        electronic_document=document,
+                        event_type="error",
+                        message=f"Error firmando XML e-CF: {exc}",
+                        payload={"stage": "xml_signature", "batch": True, "task_id": task_id},
+                        created_by=user,
+                    )
+                )
+                continue
+
+            signed.append(document.pk)
+            if document.invoice_id:
+                rollup_changes.append((document.invoice_id, previous_fiscal_status, "signed"))
+            document.signed_xml_content = signed_xml
+            document.fiscal_status = "signed"
+            document.status = "signed"
+            document.job_status = "idle"
+            document.last_error = None
+            document.next_retry_at = None
+            document.updated_at = now
+            status_events.append(
+                ECFStatusEvent(
+                    document=document,
+                    previous_fiscal_status=previous_fiscal_status,
+                    new_fiscal_status="signed",
+                    previous_job_status=previous_job_status,
+                    new_job_status="idle",
+                    source="xml_signing_batch",
+                    reason="XML e-CF firmado y validado en lote.",
+                    task_id=task_id,
+                )
+            )
+            event_logs.append(
+                ECFEventLog(
+                    electronic_document=document,
+                    event_type="signed",
+                    message="XML e-CF firmado y validado criptográficamente.",
+                    payload={
+                        "signature_validated": True,
+                        "xsd_validated": validate_xsd,
+                        "batch": True,
+                        "task_id": task_id,
+                        "certificate_subject": certificate.subject,
+                        "certificate_issuer": certificate.issuer,
+                        "certificate_serial_number": certificate.serial_number,
+                        "certificate_not_valid_after": str(certificate.not_valid_after),
+                        "certificate_sha256_fingerprint": certificate.sha256_fingerprint,
+                    },
+                    created_by=user,
+                )
+            )
+
+        if documents:
+            ECFArtifact.sync(documents, ("signed_xml_content",))
+            ElectronicFiscalDocument.objects.bulk_update(
+                documents,
+                [
+                    "signed_xml_content",
+                    "fiscal_status",
+                    "status",
+                    "job_status",
+                    "last_error",
+                    "next_retry_at",
+                    "updated_at",
+                ],
+            )
+            ECFStatusEvent.objects.bulk_create(status_events)
+            ECFEventLog.objects.bulk_create(event_logs)
+            DailySalesRollupService().move_fiscal_status_many(rollup_changes)
+            # bulk_update sends no post_save, so drop the cached monitor/dashboard here.
+            for company_id in {document.company_id for document in documents}:
+                invalidate_tenant_responses(company_id, [DASHBOARD_NAMESPACE, ECF_MONITOR_NAMESPACE])
+
+        return ECFBatchSigningResult(
+            signed=signed,
+            skipped=skipped,
+            failed=failed,
+            xsd_validated=validate_xsd,
+        )
+
+    def _already_signed(self, document: ElectronicFiscalDocument) -> bool:
+        return bool(document.artifact_sha256("signed_xml_content")) and document.fiscal_status in SIGNED_OR_LATER_STATUSES
+
     def _log_error(self, document: ElectronicFiscalDocument, message: str, user=None) -> None:
-        ECFEventLog.objects.create(
+        record_event_log(
             electronic_document=document,
             event_type="error",
             message=f"Error firmando XML e-CF: {message}",
@@ -0,0 +1,36 @@
+"""Backoff schedule for DGII status checks of submitted e-CF documents."""
+
+from __future__ import annotations
+
+from datetime import datetime
+
+from django.conf import settings
+from django.utils import timezone
+
+
+DEFAULT_STATUS_CHECK_BACKOFF_SECONDS = (60, 120, 300, 600, 1800, 3600)
+
+
+class ECFStatusCheckSchedule:
+    """Delay before the next DGII status check, by e-CF type and checks done so far.
+
+    ECF_DGII_STATUS_CHECK_BACKOFF_SECONDS is the default curve and
+    ECF_DGII_STATUS_CHECK_BACKOFF_BY_TYPE overrides it per e-CF type. Entry N
+    is the wait after N checks; past the end the last delay repeats.
+    """
+
+    def curve(self, ecf_type: str) -> tuple[int, ...]:
+        by_type = getattr(settings, "ECF_DGII_STATUS_CHECK_BACKOFF_BY_TYPE", {}) or {}
+        curve = by_type.get(ecf_type) or getattr(
+            settings,
+            "ECF_DGII_STATUS_CHECK_BACKOFF_SECONDS",
+            DEFAULT_STATUS_CHECK_BACKOFF_SECONDS,
+        )
+        return tuple(int(seconds) for seconds in curve) or DEFAULT_STATUS_CHECK_BACKOFF_SECONDS
+
+    def delay_seconds(self, ecf_type: str, attempts: int) -> int:
+        curve = self.curve(ecf_type)
+        return curve[min(max(attempts, 0), len(curve) - 1)]
+
+    def next_check_at(self, ecf_type: str, attempts: int, now: datetime | None = None) -> datetime:
+        return (now or timezone.now()) + timezone.timedelta(seconds=self.delay_seconds(ecf_type, attempts))
@@ -4,10 +4,10 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 
-from django.db import transaction
-
+from facturacion.ecf.services.audit import audited_atomic, record_status_event
 from facturacion.ecf.state_machine import ECFFiscalStateMachine, ECFJobStateMachine
-from facturacion.models import ECFStatusEvent, ElectronicFiscalDocument
+from facturacion.models import ElectronicFiscalDocument
+from facturacion.services.sales_rollup import DailySalesRollupService
 
 
 @dataclass(frozen=True)
@@ -27,7 +27,7 @@ class ECFStatusTransitionService:
         self.fiscal_state_machine = fiscal_state_machine or ECFFiscalStateMachine()
         self.job_state_machine = job_state_machine or ECFJobStateMachine()
 
-    @transaction.atomic
+    @audited_atomic()
     def transition(
         self,
         document: ElectronicFiscalDocument,
@@ -70,7 +70,7 @@ class ECFStatusTransitionService:
         if updates:
             updates.append("updated_at")
             locked_document.save(update_fields=sorted(set(updates)))
-            ECFStatusEvent.objects.create(
+            record_status_event(
                 document=locked_document,
                 previous_fiscal_status=previous_fiscal_status,
                 new_fiscal_status=new_fiscal_status,
@@ -80,5 +80,9 @@ class ECFStatusTransitionService:
                 reason=reason,
                 task_id=task_id,
             )
+        if fiscal_changed and locked_document.invoice_id:
+            DailySalesRollupService().move_fiscal_status_many(
+                [(locked_document.invoice_id, previous_fiscal_status, new_fiscal_status)]
+            )
 
         return StatusTransitionResult(document=locked_document, changed=bool(updates))
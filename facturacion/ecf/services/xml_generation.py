@@ -2,9 +2,8 @@
 
 from dataclasses import dataclass
 
-from django.db import transaction
-
-from facturacion.models import ECFEventLog, ElectronicFiscalDocument
+from facturacion.ecf.services.audit import audited_atomic, record_event_log
+from facturacion.models import ElectronicFiscalDocument
 from facturacion.ecf.state_machine import ECFStateMachine
 from facturacion.ecf.services.status_transitions import ECFStatusTransitionService
 from facturacion.ecf.mappers.invoice_mapper import InvoiceECFMapper
@@ -40,7 +39,7 @@ class ECFXMLGenerationService:
         self.state_machine = ECFStateMachine()
         self.status_transitions = ECFStatusTransitionService()
 
-    @transaction.atomic
+    @audited_atomic()
     def generate(self, document: ElectronicFiscalDocument, user=None, validate_xsd: bool = True) -> ECFXMLGenerationResult:
         """Generate XML, optionally validate XSD, store it and register an event."""
         locked_document = (
@@ -69,7 +68,7 @@ class ECFXMLGenerationService:
         )
         locked_document = transition.document
 
-        ECFEventLog.objects.create(
+        record_event_log(
             electronic_document=locked_document,
             event_type="xml_generated",
             message="XML e-CF generado y almacenado.",
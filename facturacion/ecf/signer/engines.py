@@ -0,0 +1,219 @@
+"""Signing engines that run XMLDSig sign+verify inline or in a process pool."""
+
+from __future__ import annotations
+
+import atexit
+import logging
+import multiprocessing
+import threading
+from collections import OrderedDict
+from concurrent.futures import Executor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from typing import Protocol
+
+from cryptography import x509
+from django.conf import settings
+
+from facturacion.ecf.certificates.loader import LoadedCertificate
+from facturacion.ecf.exceptions import ECFError, ECFTemporaryError
+from facturacion.ecf.signer.xml_signer import ECFXMLSigner
+from facturacion.ecf.validators.signature import ECFSignatureValidator
+
+
+logger = logging.getLogger("facturacion.ecf.signer")
+
+ENGINE_INLINE = "inline"
+ENGINE_PROCESS_POOL = "process_pool"
+
+
+class ECFSigningEngine(Protocol):
+    """Contract shared by the inline and process-pool signing engines."""
+
+    name: str
+
+    def sign_and_verify(self, xml_content: str, certificate: LoadedCertificate) -> str: ...
+
+    def sign_many(self, xml_contents: list[str], certificate: LoadedCertificate) -> list[str | ECFError]: ...
+
+
+class ECFInlineSigningEngine:
+    """Sign and verify in the calling process."""
+
+    name = ENGINE_INLINE
+
+    def __init__(
+        self,
+        signer: ECFXMLSigner | None = None,
+        signature_validator: ECFSignatureValidator | None = None,
+    ) -> None:
+        self.signer = signer or ECFXMLSigner()
+        self.signature_validator = signature_validator or ECFSignatureValidator()
+
+    def sign_and_verify(self, xml_content: str, certificate: LoadedCertificate) -> str:
+        signed_xml = self.signer.sign(xml_content, certificate)
+        self.signature_validator.validate(signed_xml, certificate)
+        return signed_xml
+
+    def sign_many(self, xml_contents: list[str], certificate: LoadedCertificate) -> list[str | ECFError]:
+        """Return one signed XML or ECFError per input, preserving order."""
+        results: list[str | ECFError] = []
+        for xml_content in xml_contents:
+            try:
+                results.append(self.sign_and_verify(xml_content, certificate))
+            except ECFError as exc:
+                results.append(exc)
+        return results
+
+
+@dataclass(frozen=True)
+class _PoolCertificate:
+    """Picklable key material shipped to pool workers."""
+
+    fingerprint: str
+    private_key_pem: bytes
+    certificate_pem: bytes
+    not_valid_after: str
+
+    @classmethod
+    def from_loaded(cls, certificate: LoadedCertificate) -> "_PoolCertificate":
+        return cls(
+            fingerprint=certificate.sha256_fingerprint,
+            private_key_pem=certificate.private_key_pem,
+            certificate_pem=certificate.certificate_pem,
+            not_valid_after=certificate.not_valid_after,
+        )
+
+
+# Issuer certificates each pool worker keeps materialized; least recently used
+# ones are dropped so rotated or rarely used certificates do not pile up.
+WORKER_CERTIFICATES_MAX_ENTRIES = 16
+
+# Per pool-worker state: certificates and signers already materialized for an
+# issuer fingerprint, so repeated jobs skip PEM parsing and signer setup.
+_worker_certificates: OrderedDict[str, LoadedCertificate] = OrderedDict()
+_worker_signer: ECFXMLSigner | None = None
+_worker_validator: ECFSignatureValidator | None = None
+
+
+def _worker_certificate(pool_certificate: _PoolCertificate) -> LoadedCertificate:
+    loaded = _worker_certificates.get(pool_certificate.fingerprint)
+    if loaded is not None:
+        _worker_certificates.move_to_end(pool_certificate.fingerprint)
+    else:
+        certificate = x509.load_pem_x509_certificate(pool_certificate.certificate_pem)
+        loaded = LoadedCertificate(
+            private_key_pem=pool_certificate.private_key_pem,
+            certificate_pem=pool_certificate.certificate_pem,
+            certificate=certificate,
+            subject=certificate.subject.rfc4514_string(),
+            issuer=certificate.issuer.rfc4514_string(),
+            serial_number=str(certificate.serial_number),
+            not_valid_after=pool_certificate.not_valid_after,
+            sha256_fingerprint=pool_certificate.fingerprint,
+        )
+        _worker_certificates[pool_certificate.fingerprint] = loaded
+        while len(_worker_certificates) > WORKER_CERTIFICATES_MAX_ENTRIES:
+            _worker_certificates.popitem(last=False)
+    return loaded
+
+
+def _pool_sign_and_verify(xml_content: str, pool_certificate: _PoolCertificate) -> str:
+    global _worker_signer, _worker_validator
+    if _worker_signer is None:
+        _worker_signer = ECFXMLSigner()
+        _worker_validator = ECFSignatureValidator()
+    certificate = _worker_certificate(pool_certificate)
+    signed_xml = _worker_signer.sign(xml_content, certificate)
+    _worker_validator.validate(signed_xml, certificate)
+    return signed_xml
+
+
+_executor: ProcessPoolExecutor | None = None
+_executor_lock = threading.Lock()
+
+
+def _shared_executor() -> ProcessPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            max_workers = getattr(settings, "ECF_SIGNING_POOL_WORKERS", None) or None
+            _executor = ProcessPoolExecutor(max_workers=max_workers)
+        return _executor
+
+
+def shutdown_signing_pool() -> None:
+    """Stop the shared signing pool; the next pooled job starts a new one."""
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=True, cancel_futures=True)
+            _executor = None
+
+
+atexit.register(shutdown_signing_pool)
+
+
+class ECFProcessPoolSigningEngine:
+    """Dispatch CPU-bound sign+verify jobs to a shared ProcessPoolExecutor.
+
+    The calling worker keeps the DB-bound stages; only XML, key material and
+    the resulting signed XML cross the process boundary.
+    """
+
+    name = ENGINE_PROCESS_POOL
+
+    def __init__(self, executor: Executor | None = None) -> None:
+        self._executor = executor
+
+    @property
+    def executor(self) -> Executor:
+        return self._executor or _shared_executor()
+
+    def sign_and_verify(self, xml_content: str, certificate: LoadedCertificate) -> str:
+        result = self.sign_many([xml_content], certificate)[0]
+        if isinstance(result, ECFError):
+            raise result
+        return result
+
+    def sign_many(self, xml_contents: list[str], certificate: LoadedCertificate) -> list[str | ECFError]:
+        """Return one signed XML or ECFError per input, preserving order."""
+        pool_certificate = _PoolCertificate.from_loaded(certificate)
+        try:
+            futures = [
+                self.executor.submit(_pool_sign_and_verify, xml_content, pool_certificate)
+                for xml_content in xml_contents
+            ]
+            results: list[str | ECFError] = []
+            for future in futures:
+                try:
+                    results.append(future.result())
+                except ECFError as exc:
+                    results.append(exc)
+            return results
+        except BrokenProcessPool as exc:
+            if self._executor is None:
+                shutdown_signing_pool()
+            raise ECFTemporaryError("El pool de firma e-CF no está disponible; reintente la firma.") from exc
+
+
+def get_signing_engine(
+    signer: ECFXMLSigner | None = None,
+    signature_validator: ECFSignatureValidator | None = None,
+) -> ECFSigningEngine:
+    """Return the engine selected by ECF_SIGNING_ENGINE.
+
+    Explicit signer/validator instances always run inline so injected
+    collaborators keep working regardless of the configured engine. Daemonic
+    processes (Celery prefork children) cannot start a process pool, so they
+    also sign inline.
+    """
+    engine_name = getattr(settings, "ECF_SIGNING_ENGINE", ENGINE_INLINE)
+    if engine_name == ENGINE_PROCESS_POOL and signer is None and signature_validator is None:
+        if not multiprocessing.current_process().daemon:
+            return ECFProcessPoolSigningEngine()
+        logger.warning(
+            "ECF_SIGNING_ENGINE=process_pool ignored in a daemonic worker process; signing inline. "
+            "Run the ecf.signing worker with -P solo or -P threads to use the pool."
+        )
+    return ECFInlineSigningEngine(signer=signer, signature_validator=signature_validator)
@@ -15,6 +15,9 @@ from facturacion.ecf.xml.render import render_xml
 class ECFXMLSigner:
     """Sign e-CF XML with an enveloped XMLDSig SHA256 signature."""
 
+    def __init__(self) -> None:
+        self._xml_signer: XMLSigner | None = None
+
     def sign(self, xml_content: str, certificate: LoadedCertificate) -> str:
         """Return signed XML, replacing any existing placeholder signature."""
         parser = etree.XMLParser(remove_blank_text=True, resolve_entities=False)
@@ -25,15 +28,8 @@ class ECFXMLSigner:
 
         self._remove_existing_signature(root)
 
-        signer = XMLSigner(
-            method=methods.enveloped,
-            signature_algorithm=SignatureMethod.RSA_SHA256,
-            digest_algorithm=DigestAlgorithm.SHA256,
-            c14n_algorithm=CanonicalizationMethod.CANONICAL_XML_1_0,
-        )
-
         try:
-            signed_root = signer.sign(
+            signed_root = self._configured_signer().sign(
                 root,
                 key=certificate.private_key_pem,
                 cert=certificate.certificate_pem,
@@ -43,6 +39,17 @@ class ECFXMLSigner:
 
         return render_xml(signed_root)
 
+    def _configured_signer(self) -> XMLSigner:
+        """Build the signxml signer once so batch signing reuses its configuration."""
+        if self._xml_signer is None:
+            self._xml_signer = XMLSigner(
+                method=methods.enveloped,
+                signature_algorithm=SignatureMethod.RSA_SHA256,
+                digest_algorithm=DigestAlgorithm.SHA256,
+                c14n_algorithm=CanonicalizationMethod.CANONICAL_XML_1_0,
+            )
+        return self._xml_signer
+
     def _remove_existing_signature(self, root: etree._Element) -> None:
         signature_xpath = f".//{{{XMLDSIG_NAMESPACE}}}Signature"
         for signature in root.findall(signature_xpath):
@@ -2,6 +2,8 @@
 
 from __future__ import annotations
 
+import threading
+from contextlib import contextmanager
 from dataclasses import dataclass
 from typing import Any
 
@@ -9,9 +11,11 @@ import requests
 from lxml import etree
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
+from django.conf import settings
 from zeep import Client, Settings
+from zeep.cache import SqliteCache
 from zeep.exceptions import Error as ZeepError
-from zeep.plugins import HistoryPlugin
+from zeep.plugins import Plugin
 from zeep.transports import Transport
 
 from facturacion.ecf.exceptions import ECFValidationError
@@ -26,8 +30,39 @@ class SOAPCallResult:
     response_xml: str | None
 
 
+class ThreadLocalHistoryPlugin(Plugin):
+    """Keep the last sent/received envelopes per thread so pooled clients never mix calls."""
+
+    def __init__(self) -> None:
+        self._local = threading.local()
+
+    def reset(self) -> None:
+        self._local.sent = None
+        self._local.received = None
+
+    @property
+    def last_sent(self) -> dict[str, Any] | None:
+        return getattr(self._local, "sent", None)
+
+    @property
+    def last_received(self) -> dict[str, Any] | None:
+        return getattr(self._local, "received", None)
+
+    def egress(self, envelope, http_headers, operation, binding_options):
+        self._local.sent = {"envelope": envelope, "http_headers": http_headers}
+        return envelope, http_headers
+
+    def ingress(self, envelope, http_headers, operation):
+        self._local.received = {"envelope": envelope, "http_headers": http_headers}
+        return envelope, http_headers
+
+
 class BaseZeepSOAPClient:
-    """Small wrapper around Zeep with auditable envelopes and resilient transport."""
+    """Small wrapper around Zeep with auditable envelopes and resilient transport.
+
+    Instances are safe to share between threads: envelope history is kept per
+    thread and per-call HTTP headers go through Zeep's thread-local settings.
+    """
 
     def __init__(
         self,
@@ -37,26 +72,38 @@ class BaseZeepSOAPClient:
         retry_backoff: float = 0.5,
         verify_tls: bool = True,
         headers: dict[str, str] | None = None,
+        wsdl_cache: SqliteCache | None = None,
+        wsdl_headers: dict[str, str] | None = None,
     ) -> None:
-        self.history = HistoryPlugin()
+        self.history = ThreadLocalHistoryPlugin()
         self.session = self._build_session(retries, retry_backoff, verify_tls, headers)
-        self.transport = Transport(session=self.session, timeout=timeout, operation_timeout=timeout)
-        self.client = Client(
-            wsdl=wsdl_url,
-            transport=self.transport,
-            settings=Settings(strict=True, xml_huge_tree=False),
-            plugins=[self.history],
+        self.transport = Transport(
+            session=self.session,
+            timeout=timeout,
+            operation_timeout=timeout,
+            cache=wsdl_cache,
         )
-
-    def call(self, operation_name: str, **payload) -> SOAPCallResult:
+        # wsdl_headers (e.g. the bearer token) only travel with the WSDL/XSD
+        # downloads Zeep performs while parsing; they never stay on the session.
+        with self._session_headers(wsdl_headers):
+            self.client = Client(
+                wsdl=wsdl_url,
+                transport=self.transport,
+                settings=Settings(strict=True, xml_huge_tree=False),
+                plugins=[self.history],
+            )
+
+    def call(self, operation_name: str, http_headers: dict[str, str] | None = None, **payload) -> SOAPCallResult:
         """Call a SOAP operation and capture envelopes for persistence."""
         try:
             operation = getattr(self.client.service, operation_name)
         except AttributeError as exc:
             raise ECFValidationError(f"Operación SOAP no disponible en WSDL: {operation_name}") from exc
 
+        self.history.reset()
         try:
-            result = operation(**payload)
+            with self.client.settings(extra_http_headers=http_headers):
+                result = operation(**payload)
         except (requests.RequestException, ZeepError, Exception) as exc:
             raise ECFValidationError(f"Error invocando SOAP DGII operación {operation_name}.") from exc
 
@@ -93,6 +140,19 @@ class BaseZeepSOAPClient:
         session.mount("https://", adapter)
         return session
 
+    @contextmanager
+    def _session_headers(self, headers: dict[str, str] | None):
+        previous = {name: self.session.headers.get(name) for name in headers or {}}
+        self.session.headers.update(headers or {})
+        try:
+            yield
+        finally:
+            for name, value in previous.items():
+                if value is None:
+                    self.session.headers.pop(name, None)
+                else:
+                    self.session.headers[name] = value
+
     def _envelope_to_string(self, envelope_entry: dict[str, Any] | None) -> str | None:
         if not envelope_entry:
             return None
@@ -106,3 +166,73 @@ class BaseZeepSOAPClient:
             pretty_print=True,
         ).decode("utf-8")
 
+
+
+class ZeepClientPool:
+    """Per-process pool of parsed Zeep clients keyed by WSDL and transport settings.
+
+    Each entry keeps its requests.Session (and so its keep-alive connections)
+    for the life of the process; WSDL and imported XSD documents are also
+    cached on disk so a fresh process skips the download.
+    """
+
+    def __init__(self) -> None:
+        self._clients: dict[tuple, BaseZeepSOAPClient] = {}
+        self._build_locks: dict[tuple, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def get(
+        self,
+        wsdl_url: str,
+        timeout: int = 30,
+        retries: int = 3,
+        retry_backoff: float = 0.5,
+        verify_tls: bool = True,
+        wsdl_headers: dict[str, str] | None = None,
+    ) -> BaseZeepSOAPClient:
+        """Return the pooled client, building it on first use.
+
+        The build (WSDL download and parse) runs under a per-key lock, so a
+        slow DGII endpoint only blocks callers waiting for that same client.
+        ``wsdl_headers`` are used for the download only and are not part of
+        the key: a rotated token still reuses the parsed client.
+        """
+        key = (wsdl_url, verify_tls, timeout, retries, retry_backoff)
+        with self._lock:
+            client = self._clients.get(key)
+            if client is not None:
+                return client
+            build_lock = self._build_locks.setdefault(key, threading.Lock())
+
+        with build_lock:
+            with self._lock:
+                client = self._clients.get(key)
+            if client is None:
+                client = BaseZeepSOAPClient(
+                    wsdl_url=wsdl_url,
+                    timeout=timeout,
+                    retries=retries,
+                    retry_backoff=retry_backoff,
+                    verify_tls=verify_tls,
+                    wsdl_cache=_wsdl_cache(),
+                    wsdl_headers=wsdl_headers,
+                )
+                with self._lock:
+                    self._clients[key] = client
+            return client
+
+    def clear(self) -> None:
+        with self._lock:
+            for client in self._clients.values():
+                client.session.close()
+            self._clients.clear()
+
+
+soap_client_pool = ZeepClientPool()
+
+
+def _wsdl_cache() -> SqliteCache | None:
+    timeout = int(getattr(settings, "ECF_DGII_WSDL_CACHE_SECONDS", 86400))
+    if timeout <= 0:
+        return None
+    return SqliteCache(path=getattr(settings, "ECF_DGII_WSDL_CACHE_PATH", None), timeout=timeout)
@@ -3,7 +3,7 @@
 from __future__ import annotations
 
 from facturacion.ecf.soap.auth import DGIIBearerToken
-from facturacion.ecf.soap.clients.base import BaseZeepSOAPClient, SOAPCallResult
+from facturacion.ecf.soap.clients.base import BaseZeepSOAPClient, SOAPCallResult, soap_client_pool
 from facturacion.ecf.soap.environments import DGIISOAPEnvironment
 
 
@@ -22,6 +22,7 @@ class DGIISOAPClient:
         client = self._client(self.environment.reception_wsdl)
         return client.call(
             self.environment.submit_operation,
+            http_headers=self.headers,
             xml=signed_xml_content,
             encf=encf,
             rncEmisor=issuer_rnc,
@@ -32,6 +33,7 @@ class DGIISOAPClient:
         client = self._client(self.environment.status_wsdl)
         return client.call(
             self.environment.status_operation,
+            http_headers=self.headers,
             trackId=track_id,
         )
 
@@ -41,17 +43,20 @@ class DGIISOAPClient:
         client = self._client(wsdl)
         return client.call(
             self.environment.trackids_operation,
+            http_headers=self.headers,
             rncEmisor=issuer_rnc,
             encf=encf,
         )
 
     def _client(self, wsdl_url: str) -> BaseZeepSOAPClient:
-        return BaseZeepSOAPClient(
+        # Pooled per process; the bearer token travels per call (and with the
+        # first WSDL download), never on the shared session.
+        return soap_client_pool.get(
             wsdl_url=wsdl_url,
             timeout=self.environment.timeout,
             retries=self.environment.retries,
             retry_backoff=self.environment.retry_backoff,
             verify_tls=self.environment.verify_tls,
-            headers=self.headers,
+            wsdl_headers={"Authorization": self.headers["Authorization"]},
         )
 
@@ -7,14 +7,16 @@ import logging
 from celery import shared_task
 from django.conf import settings
 from django.contrib.auth import get_user_model
-from django.db import transaction
 from django.db.models import F
 
 from facturacion.ecf.exceptions import ECFPermanentError
+from facturacion.ecf.services.audit import audited_atomic, record_event_log
 from facturacion.ecf.services.dgii_status import DGIIStatusService
+from facturacion.ecf.services.dgii_status_batch import DGIIStatusBatchService
 from facturacion.ecf.services.dgii_submission import DGIISubmissionService
+from facturacion.ecf.services.status_schedule import ECFStatusCheckSchedule
 from facturacion.ecf.workers.base import ECFTask
-from facturacion.models import ECFEventLog, ElectronicFiscalDocument
+from facturacion.models import ElectronicFiscalDocument
 
 
 @shared_task(bind=True, base=ECFTask, name="facturacion.ecf.tasks.dgii.submit_dgii")
@@ -35,11 +37,9 @@ def submit_dgii(self, document_id: int, user_id: int | None = None, environment:
         result = DGIISubmissionService().submit(document=document, user=user, environment=environment)
         self.log(logging.INFO, "e-CF submitted to DGII", document_id=document_id, track_id=result.track_id, status=result.status)
 
-        if result.track_id:
-            countdown = getattr(settings, "ECF_TASK_STATUS_CHECK_DELAY_SECONDS", 120)
-            check_status.apply_async(args=[document_id], kwargs={"user_id": user_id, "environment": environment}, countdown=countdown)
-
         document = self.mark_succeeded(document_id, "submit_dgii")
+        if result.track_id:
+            schedule_status_check(document, user_id=user_id, environment=environment)
         return {"document_id": document_id, "track_id": result.track_id, "status": document.fiscal_status, "fiscal_status": document.fiscal_status, "job_status": document.job_status}
     except Exception as exc:
         self.fail_or_retry(exc, document_id, "submit_dgii")
@@ -51,10 +51,10 @@ def check_status(self, document_id: int, user_id: int | None = None, environment
     user = _user(user_id)
     self.mark_started(document_id, "check_status")
     try:
-        with transaction.atomic():
+        with audited_atomic():
             document = ElectronicFiscalDocument.objects.select_for_update().get(pk=document_id)
             if document.fiscal_status in {"accepted", "rejected"}:
-                ECFEventLog.objects.create(
+                record_event_log(
                     electronic_document=document,
                     event_type="skipped",
                     message="Consulta omitida: documento en estado terminal.",
@@ -71,11 +71,92 @@ def check_status(self, document_id: int, user_id: int | None = None, environment
         result = DGIIStatusService().check(document=document, user=user, environment=environment)
         document = self.mark_succeeded(document_id, "check_status")
         self.log(logging.INFO, "e-CF status checked", document_id=document_id, status=result.status, dgii_status=result.dgii_status)
+        if document.fiscal_status == "submitted":
+            # Still pending at DGII: check again further along the backoff curve.
+            schedule_status_check(document, user_id=user_id, environment=environment)
         return {"document_id": document_id, "status": document.fiscal_status, "fiscal_status": document.fiscal_status, "job_status": document.job_status, "dgii_status": result.dgii_status}
     except Exception as exc:
         self.fail_or_retry(exc, document_id, "check_status")
 
 
+def schedule_status_check(document: ElectronicFiscalDocument, *, user_id: int | None, environment: str | None) -> None:
+    """In per_document mode, enqueue the next check_status along ECFStatusCheckSchedule.
+
+    Batch mode leaves the follow-up to poll_submitted_batch, which reads
+    next_status_check_at instead. After ECF_DGII_STATUS_MAX_CHECKS checks the
+    document stops being rescheduled and is left to reconciliation/operators.
+    """
+    if getattr(settings, "ECF_DGII_STATUS_POLLING", "per_document") != "per_document":
+        return
+    max_checks = int(getattr(settings, "ECF_DGII_STATUS_MAX_CHECKS", 48))
+    if max_checks > 0 and document.status_check_attempts >= max_checks:
+        record_event_log(
+            electronic_document=document,
+            event_type="manual_review",
+            message=f"DGII sigue procesando el documento tras {document.status_check_attempts} consultas; no se agendan mas consultas automaticas.",
+            payload={"stage": "check_status", "status_check_attempts": document.status_check_attempts, "max_checks": max_checks},
+            created_by=_user(user_id),
+        )
+        return
+    countdown = ECFStatusCheckSchedule().delay_seconds(document.ecf_type, document.status_check_attempts)
+    check_status.apply_async(
+        args=[document.pk],
+        kwargs={"user_id": user_id, "environment": environment},
+        countdown=countdown,
+    )
+
+
+@shared_task(bind=True, base=ECFTask, name="facturacion.ecf.tasks.dgii.poll_submitted_batch")
+def poll_submitted_batch(self, limit: int | None = None, environment: str | None = None):
+    """Beat-driven dispatcher: drain submitted documents whose status check is due, batch by batch."""
+    batch_size = limit or getattr(settings, "ECF_DGII_STATUS_POLL_BATCH_SIZE", 200)
+    max_batches = max(1, getattr(settings, "ECF_DGII_STATUS_POLL_MAX_BATCHES", 10))
+    service = DGIIStatusBatchService()
+    summary = {"claimed": 0, "accepted": [], "rejected": [], "processing": [], "failed": {}, "batches": 0}
+
+    for _batch in range(max_batches):
+        try:
+            result = service.poll_submitted(limit=batch_size, environment=environment, task_id=self.request.id)
+        except Exception as exc:
+            # The service already released the claimed rows; retry the cycle later.
+            delay = self.retry_delay()
+            self.log(
+                logging.ERROR,
+                "e-CF submitted batch poll failed",
+                batches=summary["batches"],
+                claimed=summary["claimed"],
+                retries=self.request.retries,
+                retry_in_seconds=delay,
+                error=str(exc),
+            )
+            if self.request.retries < self.max_retries:
+                raise self.retry(exc=exc, countdown=delay)
+            raise
+        if not result.claimed:
+            break
+        summary["batches"] += 1
+        summary["claimed"] += result.claimed
+        summary["accepted"].extend(result.accepted)
+        summary["rejected"].extend(result.rejected)
+        summary["processing"].extend(result.processing)
+        summary["failed"].update(result.failed)
+        if result.claimed < batch_size:
+            break
+
+    if summary["claimed"]:
+        self.log(
+            logging.INFO,
+            "e-CF submitted batch polled",
+            batches=summary["batches"],
+            claimed=summary["claimed"],
+            accepted=len(summary["accepted"]),
+            rejected=len(summary["rejected"]),
+            processing=len(summary["processing"]),
+            failed=len(summary["failed"]),
+        )
+    return summary
+
+
 @shared_task(bind=True, base=ECFTask, name="facturacion.ecf.tasks.dgii.retry_submission")
 def retry_submission(self, document_id: int, user_id: int | None = None, environment: str | None = None):
     """Explicit operator-triggered retry for documents that never got a TrackID."""
@@ -99,14 +180,14 @@ def retry_submission(self, document_id: int, user_id: int | None = None, environ
         self.fail_or_retry(exc, document_id, "retry_submission")
 
 
-@transaction.atomic
+@audited_atomic()
 def _submission_preflight(document_id: int, user, task_id: str, force: bool = False):
     document = ElectronicFiscalDocument.objects.select_for_update().get(pk=document_id)
     if document.fiscal_status in {"accepted", "rejected"}:
         return _skip(document, user, task_id, "submit_dgii", "Documento terminal; no se reenvía a DGII.")
     if document.track_id:
         return _skip(document, user, task_id, "submit_dgii", "Documento ya tiene TrackID; no se duplica envío DGII.")
-    if not document.signed_xml_content:
+    if not document.artifact_sha256("signed_xml_content"):
         raise ECFPermanentError("El documento no tiene XML firmado para enviar a DGII.")
 
     ElectronicFiscalDocument.objects.filter(pk=document_id).update(
@@ -118,7 +199,7 @@ def _submission_preflight(document_id: int, user, task_id: str, force: bool = Fa
 
 
 def _skip(document, user, task_id: str, stage: str, message: str):
-    ECFEventLog.objects.create(
+    record_event_log(
         electronic_document=document,
         event_type="skipped",
         message=message,
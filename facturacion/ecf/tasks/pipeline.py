@@ -0,0 +1,109 @@
+"""Fused e-CF pipeline task: generate, sign and submit in one worker invocation."""
+
+from __future__ import annotations
+
+import logging
+
+from celery import shared_task
+from django.contrib.auth import get_user_model
+
+from facturacion.ecf.certificates.resolver import resolve_certificate_credentials
+from facturacion.ecf.exceptions import ECFPermanentError
+from facturacion.ecf.services.audit import audited_atomic
+from facturacion.ecf.services.certificate_policy import ECFCertificateSigningPolicy
+from facturacion.ecf.services.dgii_submission import DGIISubmissionService
+from facturacion.ecf.services.signing import ECFSigningService
+from facturacion.ecf.services.xml_generation import ECFXMLGenerationService
+from facturacion.ecf.tasks.dgii import _submission_preflight, schedule_status_check
+from facturacion.ecf.workers.base import ECFTask
+
+XML_GENERATED_OR_LATER = {"xml_generated", "signed", "submitted", "accepted", "rejected"}
+SIGNED_OR_LATER = {"signed", "submitted", "accepted", "rejected"}
+
+
+@shared_task(bind=True, base=ECFTask, name="facturacion.ecf.tasks.pipeline.process_document")
+def process_document(
+    self,
+    document_id: int,
+    user_id: int | None = None,
+    validate_xsd: bool = True,
+    environment: str | None = None,
+):
+    """Run generate -> sign -> submit in-process, carrying the document between stages.
+
+    Each stage is skipped when its output already exists, so a retry resumes at
+    the stage that failed; failures are recorded and retried under that
+    stage's name exactly as the chained tasks do. The job is marked
+    running/idle once for the whole pipeline instead of once per stage.
+    """
+    user = _user(user_id)
+    document = self.mark_started(document_id, "process_document")
+    stage = "generate_xml"
+    stages: list[str] = []
+    try:
+        if not (document.artifact_sha256("xml_content") and document.fiscal_status in XML_GENERATED_OR_LATER):
+            document = ECFXMLGenerationService().generate(document=document, user=user, validate_xsd=validate_xsd).document
+            stages.append(stage)
+
+        stage = "sign_xml"
+        if not (document.artifact_sha256("signed_xml_content") and document.fiscal_status in SIGNED_OR_LATER):
+            certificate_policy = ECFCertificateSigningPolicy()
+            policy_result = certificate_policy.evaluate(document.issuer)
+            if policy_result.blocked:
+                document = certificate_policy.record_blocked(
+                    document,
+                    policy_result,
+                    user=user,
+                    source="task_sign_xml_certificate_policy_failed",
+                    task_id=self.request.id,
+                )
+                return _result(document, stages=stages, error=policy_result.reason)
+            certificate_policy.log_warnings(document, policy_result, user=user)
+            certificate_path, certificate_password = resolve_certificate_credentials(document.issuer)
+            if not certificate_path:
+                raise ECFPermanentError("El emisor no tiene certificado e-CF configurado.")
+            document = ECFSigningService().sign(
+                document=document,
+                certificate_path=certificate_path,
+                certificate_password=certificate_password,
+                user=user,
+                validate_xsd=validate_xsd,
+            ).document
+            stages.append(stage)
+
+        stage = "submit_dgii"
+        with audited_atomic():
+            skip = _submission_preflight(document_id, user, self.request.id)
+        if not skip:
+            result = DGIISubmissionService().submit(document=document, user=user, environment=environment)
+            document = result.document
+            stages.append(stage)
+            self.log(logging.INFO, "e-CF submitted to DGII", document_id=document_id, track_id=result.track_id, status=result.status)
+
+        document = self.mark_succeeded(document_id, "process_document")
+        if "submit_dgii" in stages and document.track_id:
+            schedule_status_check(document, user_id=user_id, environment=environment)
+        self.log(logging.INFO, "e-CF pipeline processed", document_id=document_id, stages=stages, status=document.fiscal_status)
+        return _result(document, stages=stages)
+    except Exception as exc:
+        self.fail_or_retry(exc, document_id, stage)
+
+
+def _result(document, *, stages: list[str], error: str | None = None) -> dict:
+    result = {
+        "document_id": document.pk,
+        "track_id": document.track_id,
+        "status": document.fiscal_status,
+        "fiscal_status": document.fiscal_status,
+        "job_status": document.job_status,
+        "stages": stages,
+    }
+    if error is not None:
+        result["error"] = error
+    return result
+
+
+def _user(user_id: int | None):
+    if not user_id:
+        return None
+    return get_user_model().objects.filter(pk=user_id).first()
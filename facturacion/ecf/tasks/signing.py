@@ -3,17 +3,18 @@
 from __future__ import annotations
 
 import logging
+from collections import defaultdict
 
 from celery import shared_task
 from django.contrib.auth import get_user_model
-from django.db import transaction
 
 from facturacion.ecf.exceptions import ECFPermanentError
 from facturacion.ecf.certificates.resolver import resolve_certificate_credentials
+from facturacion.ecf.services.audit import audited_atomic, record_event_log
 from facturacion.ecf.services.certificate_policy import ECFCertificateSigningPolicy
 from facturacion.ecf.services.signing import ECFSigningService
-from facturacion.ecf.workers.base import ECFTask
-from facturacion.models import ECFEventLog, ElectronicFiscalDocument
+from facturacion.ecf.workers.base import ECFCompanyScopeError, ECFTask
+from facturacion.models import ElectronicFiscalDocument
 
 
 @shared_task(bind=True, base=ECFTask, name="facturacion.ecf.tasks.signing.sign_xml")
@@ -23,10 +24,10 @@ def sign_xml(self, document_id: int, user_id: int | None = None, validate_xsd: b
     self.mark_started(document_id, "sign_xml")
     try:
         certificate_policy = ECFCertificateSigningPolicy()
-        with transaction.atomic():
+        with audited_atomic():
             document = ElectronicFiscalDocument.objects.select_for_update().select_related("issuer").get(pk=document_id)
-            if document.signed_xml_content and document.fiscal_status in {"signed", "submitted", "accepted", "rejected"}:
-                ECFEventLog.objects.create(
+            if document.artifact_sha256("signed_xml_content") and document.fiscal_status in {"signed", "submitted", "accepted", "rejected"}:
+                record_event_log(
                     electronic_document=document,
                     event_type="skipped",
                     message="XML ya firmado; task omitida por idempotencia.",
@@ -77,6 +78,109 @@ def sign_xml(self, document_id: int, user_id: int | None = None, validate_xsd: b
         self.fail_or_retry(exc, document_id, "sign_xml")
 
 
+@shared_task(bind=True, base=ECFTask, name="facturacion.ecf.tasks.signing.sign_xml_batch")
+def sign_xml_batch(self, document_ids: list[int], user_id: int | None = None, validate_xsd: bool = True):
+    """Sign queued documents grouped by issuer, loading each certificate once.
+
+    A failure while signing one issuer's group goes through the same
+    temporary/permanent split as fail_or_retry for every document of that
+    group; temporary failures re-enqueue only the affected documents.
+    """
+    user = _user(user_id)
+    documents_by_issuer: dict[int, list[ElectronicFiscalDocument]] = defaultdict(list)
+    summary = {"signed": [], "skipped": [], "failed": {}}
+
+    for document_id in document_ids:
+        try:
+            document = self.mark_started(document_id, "sign_xml_batch")
+        except ElectronicFiscalDocument.DoesNotExist:
+            continue
+        except ECFCompanyScopeError as exc:
+            summary["failed"][document_id] = str(exc)
+            continue
+        documents_by_issuer[document.issuer_id].append(document)
+
+    certificate_policy = ECFCertificateSigningPolicy()
+    signing_service = ECFSigningService()
+    delay = self.retry_delay()
+    can_retry = self.request.retries < self.max_retries
+    retry_ids: list[int] = []
+    retry_exc: Exception | None = None
+    for issuer_documents in documents_by_issuer.values():
+        try:
+            issuer = issuer_documents[0].issuer
+            policy_result = certificate_policy.evaluate(issuer)
+            if policy_result.blocked:
+                for document in issuer_documents:
+                    certificate_policy.record_blocked(
+                        document,
+                        policy_result,
+                        user=user,
+                        source="task_sign_xml_batch_certificate_policy_failed",
+                        task_id=self.request.id,
+                    )
+                    summary["failed"][document.pk] = policy_result.reason
+                continue
+
+            certificate_policy.log_batch_warnings(issuer_documents, policy_result, user=user)
+            certificate_path, certificate_password = resolve_certificate_credentials(issuer)
+            result = signing_service.sign_batch(
+                [document.pk for document in issuer_documents],
+                certificate_path=certificate_path,
+                certificate_password=certificate_password,
+                user=user,
+                validate_xsd=validate_xsd,
+                task_id=self.request.id,
+            )
+        except Exception as exc:
+            is_temporary = self.is_temporary(exc) and can_retry
+            for document in issuer_documents:
+                self._record_failure(document.pk, "sign_xml_batch", exc, is_temporary, delay)
+                if is_temporary:
+                    retry_ids.append(document.pk)
+                else:
+                    summary["failed"][document.pk] = str(exc)
+            if is_temporary:
+                retry_exc = exc
+            self.log(
+                logging.WARNING if is_temporary else logging.ERROR,
+                "e-CF batch signing failed for issuer",
+                issuer_id=issuer_documents[0].issuer_id,
+                documents=len(issuer_documents),
+                retrying=is_temporary,
+                retries=self.request.retries,
+                error=str(exc),
+            )
+            continue
+        summary["signed"].extend(result.signed)
+        summary["skipped"].extend(result.skipped)
+        summary["failed"].update(result.failed)
+
+    self.log(
+        logging.INFO,
+        "e-CF XML batch signed",
+        issuers=len(documents_by_issuer),
+        signed=len(summary["signed"]),
+        skipped=len(summary["skipped"]),
+        failed=len(summary["failed"]),
+        retrying=len(retry_ids),
+    )
+    if retry_ids:
+        raise self.retry(
+            args=[retry_ids],
+            kwargs={"user_id": user_id, "validate_xsd": validate_xsd},
+            exc=retry_exc,
+            countdown=delay,
+        )
+    return {
+        "document_ids": list(document_ids),
+        "signed": summary["signed"],
+        "skipped": summary["skipped"],
+        "failed": {str(document_id): error for document_id, error in summary["failed"].items()},
+        "xsd_validated": validate_xsd,
+    }
+
+
 def _user(user_id: int | None):
     if not user_id:
         return None
@@ -6,11 +6,11 @@ import logging
 
 from celery import shared_task
 from django.contrib.auth import get_user_model
-from django.db import transaction
 
+from facturacion.ecf.services.audit import audited_atomic, record_event_log
 from facturacion.ecf.services.xml_generation import ECFXMLGenerationService
 from facturacion.ecf.workers.base import ECFTask
-from facturacion.models import ECFEventLog, ElectronicFiscalDocument
+from facturacion.models import ElectronicFiscalDocument
 
 
 @shared_task(bind=True, base=ECFTask, name="facturacion.ecf.tasks.xml.generate_xml")
@@ -19,10 +19,10 @@ def generate_xml(self, document_id: int, user_id: int | None = None, validate_xs
     user = _user(user_id)
     self.mark_started(document_id, "generate_xml")
 
-    with transaction.atomic():
+    with audited_atomic():
         document = ElectronicFiscalDocument.objects.select_for_update().get(pk=document_id)
-        if document.xml_content and document.fiscal_status in {"xml_generated", "signed", "submitted", "accepted", "rejected"}:
-            ECFEventLog.objects.create(
+        if document.artifact_sha256("xml_content") and document.fiscal_status in {"xml_generated", "signed", "submitted", "accepted", "rejected"}:
+            record_event_log(
                 electronic_document=document,
                 event_type="skipped",
                 message="XML ya generado; task omitida por idempotencia.",
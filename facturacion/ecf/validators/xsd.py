@@ -1,5 +1,9 @@
 """XSD validation for generated e-CF XML."""
 
+from __future__ import annotations
+
+import threading
+from dataclasses import dataclass, field
 from pathlib import Path
 
 from django.conf import settings
@@ -8,6 +12,26 @@ from lxml import etree
 from facturacion.ecf.exceptions import ECFValidationError
 
 
+@dataclass(frozen=True)
+class CompiledECFSchema:
+    """Compiled DGII XSD tied to the file version it was built from."""
+
+    schema_path: Path
+    mtime_ns: int
+    schema: etree.XMLSchema
+    lock: threading.Lock = field(default_factory=threading.Lock, compare=False, repr=False)
+
+
+_compiled_schemas: dict[tuple[str, str], CompiledECFSchema] = {}
+_compiled_schemas_lock = threading.Lock()
+
+
+def clear_compiled_schemas() -> None:
+    """Drop every compiled XSD held by this process."""
+    with _compiled_schemas_lock:
+        _compiled_schemas.clear()
+
+
 class ECFXSDValidator:
     """Validate e-CF XML against official DGII XSD files."""
 
@@ -22,18 +46,52 @@ class ECFXSDValidator:
 
     def validate(self, ecf_type: str, xml_content: str) -> None:
         """Raise ECFValidationError when XML does not match the DGII XSD."""
-        schema_path = self._schema_path(ecf_type)
-        if not schema_path.exists():
-            raise ECFValidationError(f"No existe XSD local para e-CF tipo {ecf_type}: {schema_path}")
-
+        compiled = self.compiled_schema(ecf_type)
         parser = etree.XMLParser(remove_blank_text=True)
-        schema_doc = self._load_schema(schema_path, parser)
-        schema = etree.XMLSchema(schema_doc)
         xml_doc = etree.fromstring(xml_content.encode("utf-8"), parser)
 
-        if not schema.validate(xml_doc):
-            messages = [str(error) for error in schema.error_log]
-            raise ECFValidationError("XML no válido contra XSD DGII: " + " | ".join(messages))
+        # XMLSchema keeps its error_log on the instance, so concurrent threads
+        # sharing one compiled schema must not interleave validate/error_log.
+        with compiled.lock:
+            if compiled.schema.validate(xml_doc):
+                return
+            messages = [str(error) for error in compiled.schema.error_log]
+        raise ECFValidationError("XML no válido contra XSD DGII: " + " | ".join(messages))
+
+    def compiled_schema(self, ecf_type: str) -> CompiledECFSchema:
+        """Return the process-wide compiled XSD, recompiling when the file changed."""
+        schema_path = self._schema_path(ecf_type)
+        try:
+            mtime_ns = schema_path.stat().st_mtime_ns
+        except FileNotFoundError:
+            raise ECFValidationError(f"No existe XSD local para e-CF tipo {ecf_type}: {schema_path}") from None
+
+        cache_key = (ecf_type, str(schema_path))
+        compiled = _compiled_schemas.get(cache_key)
+        if compiled and compiled.mtime_ns == mtime_ns:
+            return compiled
+
+        with _compiled_schemas_lock:
+            compiled = _compiled_schemas.get(cache_key)
+            if compiled and compiled.mtime_ns == mtime_ns:
+                return compiled
+            parser = etree.XMLParser(remove_blank_text=True)
+            compiled = CompiledECFSchema(
+                schema_path=schema_path,
+                mtime_ns=mtime_ns,
+                schema=etree.XMLSchema(self._load_schema(schema_path, parser)),
+            )
+            _compiled_schemas[cache_key] = compiled
+            return compiled
+
+    def warm(self) -> list[str]:
+        """Compile every configured XSD ahead of the first validation."""
+        warmed = []
+        for ecf_type in self.schema_files:
+            if self._schema_path(ecf_type).exists():
+                self.compiled_schema(ecf_type)
+                warmed.append(ecf_type)
+        return warmed
 
     def _schema_path(self, ecf_type: str) -> Path:
         filename = self.schema_files.get(ecf_type)
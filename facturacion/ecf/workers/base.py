@@ -5,13 +5,15 @@ from __future__ import annotations
 import logging
 
 from celery import Task
+from celery.signals import worker_process_init
 from django.conf import settings
-from django.db import transaction
 from django.utils import timezone
 
 from facturacion.ecf.exceptions import ECFError, ECFPermanentError, ECFTemporaryError
+from facturacion.ecf.services.audit import audited_atomic, record_event_log, record_status_event
 from facturacion.ecf.services.status_transitions import ECFStatusTransitionService
-from facturacion.models import ECFEventLog, ECFStatusEvent, ElectronicFiscalDocument
+from facturacion.ecf.validators.xsd import ECFXSDValidator
+from facturacion.models import ElectronicFiscalDocument
 
 logger = logging.getLogger("facturacion.ecf.tasks")
 
@@ -19,6 +21,17 @@ TERMINAL_STATUSES = {"accepted", "rejected", "cancelled"}
 status_transitions = ECFStatusTransitionService()
 
 
+@worker_process_init.connect
+def warm_worker_caches(**kwargs) -> None:
+    """Compile DGII XSD schemas once per worker process before tasks arrive."""
+    try:
+        warmed = ECFXSDValidator().warm()
+    except Exception as exc:
+        logger.warning("unable to warm e-CF XSD schemas", extra={"ecf": {"error": str(exc)}})
+        return
+    logger.info("e-CF XSD schemas warmed", extra={"ecf": {"ecf_types": warmed}})
+
+
 class ECFCompanyScopeError(ECFPermanentError):
     """Raised when an async e-CF task detects a cross-company document graph."""
 
@@ -91,9 +104,12 @@ class ECFTask(Task):
             extra_update_fields={"last_error": None, "next_retry_at": None},
         ).document
 
+    def is_temporary(self, exc: Exception) -> bool:
+        return isinstance(exc, ECFTemporaryError) or _looks_temporary(exc)
+
     def fail_or_retry(self, exc: Exception, document_id: int, stage: str):
         delay = self.retry_delay()
-        is_temporary = isinstance(exc, ECFTemporaryError) or _looks_temporary(exc)
+        is_temporary = self.is_temporary(exc)
         self._record_failure(document_id, stage, exc, is_temporary, delay)
 
         if is_temporary and self.request.retries < self.max_retries:
@@ -118,7 +134,7 @@ class ECFTask(Task):
         )
         raise exc
 
-    @transaction.atomic
+    @audited_atomic()
     def _record_failure(self, document_id: int, stage: str, exc: Exception, is_temporary: bool, delay: int) -> None:
         document = self._load_task_document(document_id, for_update=True)
         previous_fiscal_status = document.fiscal_status
@@ -133,7 +149,7 @@ class ECFTask(Task):
             updated_at=timezone.now(),
         )
         document.refresh_from_db()
-        ECFStatusEvent.objects.create(
+        record_status_event(
             document=document,
             previous_fiscal_status=previous_fiscal_status,
             new_fiscal_status=previous_fiscal_status,
@@ -144,7 +160,7 @@ class ECFTask(Task):
             task_id=self.request.id,
         )
 
-        ECFEventLog.objects.create(
+        record_event_log(
             electronic_document=document,
             event_type="retry_scheduled" if is_temporary else "error",
             message=f"{stage}: {'reintento programado' if is_temporary else 'error permanente'}.",
@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+
+from facturacion.services.log_archive import LOG_ARCHIVE_SPECS, LogArchiveService
+
+
+class Command(BaseCommand):
+    help = "Move audit-log months older than the hot window into the compressed archive tables."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--table",
+            action="append",
+            choices=[spec.label for spec in LOG_ARCHIVE_SPECS],
+            help="Archive only this log table (repeatable).",
+        )
+        parser.add_argument("--months", type=int, default=None, help="Full months kept in the hot tables.")
+        parser.add_argument("--batch-size", type=int, default=None, help="Rows moved per transaction.")
+        parser.add_argument("--dry-run", action="store_true", help="Only count the rows that would be archived.")
+
+    def handle(self, *args, **options):
+        service = LogArchiveService(hot_months=options.get("months"), batch_size=options.get("batch_size"))
+        if options.get("dry_run"):
+            results = service.pending(options.get("table"))
+            verb = "por archivar"
+        else:
+            results = service.archive(options.get("table"))
+            verb = "archivadas"
+        for result in results:
+            self.stdout.write(f"{result.label}: {result.moved} filas {verb} (anteriores a {result.cutoff:%Y-%m-%d})")
+        self.stdout.write(self.style.SUCCESS(f"Total filas {verb}: {sum(result.moved for result in results)}"))
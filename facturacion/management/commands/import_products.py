@@ -0,0 +1,41 @@
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from facturacion.models import Company
+from facturacion.services.product_import import ProductImportService
+
+
+class Command(BaseCommand):
+    help = "Create or update a company's products from a CSV/XLSX catalogue, matching by barcode."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Catalogue file (.csv or .xlsx).")
+        parser.add_argument("--company-id", type=int, required=True, help="Company that owns the products.")
+        parser.add_argument("--chunk-size", type=int, default=None, help="Rows validated and written per transaction.")
+        parser.add_argument("--dry-run", action="store_true", help="Only validate the file and count the rows.")
+
+    def handle(self, *args, **options):
+        company = Company.objects.filter(pk=options["company_id"]).first()
+        if company is None:
+            raise CommandError("No existe la empresa indicada.")
+        path = Path(options["path"])
+        if not path.is_file():
+            raise CommandError(f"No existe el archivo {path}.")
+
+        service = ProductImportService(company, chunk_size=options.get("chunk_size"), dry_run=options.get("dry_run"))
+        try:
+            with path.open("rb") as file:
+                result = service.import_file(file, path.name)
+        except ValueError as exc:
+            raise CommandError(str(exc)) from exc
+
+        for error in result.errors:
+            self.stderr.write(f"Fila {error.row}: {error.message}")
+        prefix = "Simulacion: " if result.dry_run else ""
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{prefix}{result.created} productos creados, {result.updated} actualizados, "
+                f"{len(result.errors)} filas con errores."
+            )
+        )
@@ -0,0 +1,35 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from facturacion.models import Company
+from facturacion.services.sales_rollup import DailySalesRollupService
+
+
+class Command(BaseCommand):
+    help = "Rebuild the daily sales rollup used by the dashboard from invoices."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--company-id", type=int, default=None, help="Rebuild a single company.")
+        parser.add_argument("--since", default=None, help="Rebuild days on or after YYYY-MM-DD.")
+
+    def handle(self, *args, **options):
+        company = None
+        if options.get("company_id"):
+            company = Company.objects.filter(pk=options["company_id"]).first()
+            if company is None:
+                raise CommandError("No existe la empresa indicada.")
+
+        since = None
+        if options.get("since"):
+            try:
+                since = date.fromisoformat(options["since"])
+            except ValueError as exc:
+                raise CommandError("--since debe tener formato YYYY-MM-DD.") from exc
+
+        result = DailySalesRollupService().rebuild(company=company, since=since)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Resumen diario de ventas reconstruido: {result.created} filas creadas, {result.deleted} eliminadas."
+            )
+        )
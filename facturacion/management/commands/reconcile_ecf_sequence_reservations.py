@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from facturacion.ecf.services.sequence_reservations import ECFSequenceReservationReconciliationService
+
+
+class Command(BaseCommand):
+    help = "Report e-NCF numbers from expired block reservations that were never issued."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--grace-seconds", type=int, default=300, help="Seconds after expiry before a block is reconciled.")
+        parser.add_argument("--limit", type=int, default=None, help="Maximum number of reservations to reconcile.")
+
+    def handle(self, *args, **options):
+        result = ECFSequenceReservationReconciliationService().reconcile_expired(
+            grace_seconds=options["grace_seconds"],
+            limit=options.get("limit"),
+        )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Reservas e-NCF reconciliadas: {result.reservations}; "
+                f"e-NCF sin usar pendientes de anulación: {result.unused_numbers}"
+            )
+        )
@@ -0,0 +1,33 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from facturacion.ecf.queues.outbox import ECFOutboxRelay
+
+
+class Command(BaseCommand):
+    help = "Publish pending e-CF outbox entries to the Celery broker."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--limit", type=int, default=None, help="Entries claimed per batch.")
+        parser.add_argument("--loop", action="store_true", help="Keep relaying until interrupted.")
+        parser.add_argument("--interval", type=float, default=None, help="Seconds to sleep when the outbox is drained.")
+
+    def handle(self, *args, **options):
+        relay = ECFOutboxRelay()
+        limit = options.get("limit") or getattr(settings, "ECF_OUTBOX_RELAY_BATCH_SIZE", 100)
+        interval = options.get("interval") or getattr(settings, "ECF_OUTBOX_RELAY_INTERVAL_SECONDS", 1)
+        dispatched = 0
+        while True:
+            result = relay.relay(limit=limit)
+            dispatched += result.dispatched
+            if result.broker_unavailable:
+                self.stderr.write(self.style.WARNING("Broker Celery no disponible; entradas diferidas."))
+            # A full batch means more is probably waiting; otherwise idle until the next tick.
+            if result.claimed >= limit and not result.broker_unavailable:
+                continue
+            if not options.get("loop"):
+                break
+            time.sleep(interval)
+        self.stdout.write(self.style.SUCCESS(f"Entradas outbox e-CF publicadas: {dispatched}"))
@@ -7,6 +7,7 @@ import time
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from decimal import Decimal
 
+from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.core.management.base import BaseCommand, CommandError
 from django.db import close_old_connections
@@ -38,19 +39,32 @@ class Command(BaseCommand):
         parser.add_argument("--items", type=int, default=3, help="Items per generated invoice.")
         parser.add_argument("--reversals", type=int, default=10, help="Concurrent one-unit E34 reversals against one invoice.")
         parser.add_argument("--issuer-rnc", default="101010555", help="Issuer RNC used or created for the stress run.")
+        parser.add_argument(
+            "--sequence-block-size",
+            type=int,
+            default=None,
+            help="e-NCF numbers reserved per sequence lock. Defaults to ECF_SEQUENCE_BLOCK_SIZE.",
+        )
         parser.add_argument("--enqueue", action="store_true", help="Allow automatic Celery enqueue. Default keeps stress DB-local.")
 
     def handle(self, *args, **options):
         if options["workers"] <= 0 or options["invoices"] <= 0:
             raise CommandError("--workers and --invoices must be greater than zero.")
 
+        block_size = options["sequence_block_size"]
+        if block_size is None:
+            block_size = getattr(settings, "ECF_SEQUENCE_BLOCK_SIZE", 1)
+
         start = time.perf_counter()
-        context = override_settings(ECF_AUTO_ENQUEUE_ENABLED=bool(options["enqueue"]))
+        context = override_settings(
+            ECF_AUTO_ENQUEUE_ENABLED=bool(options["enqueue"]),
+            ECF_SEQUENCE_BLOCK_SIZE=block_size,
+        )
         with context:
             company = self._company()
             issuer = self._issuer(options["issuer_rnc"], company)
-            self._sequence(issuer, "32", options["invoices"] + 100)
-            self._sequence(issuer, "34", options["reversals"] + 100)
+            self._sequence(issuer, "32", options["invoices"] + block_size + 100)
+            self._sequence(issuer, "34", options["reversals"] + block_size + 100)
             products = self._products(company, options["items"], stock=options["invoices"] * options["items"] + 100)
             client = Client.objects.create(
                 company=company,
@@ -86,6 +100,7 @@ class Command(BaseCommand):
                 "items_per_invoice": options["items"],
                 "reversals": options["reversals"],
                 "celery_enqueue_enabled": bool(options["enqueue"]),
+                "sequence_block_size": block_size,
             },
             "invoice_stress": invoice_results,
             "idempotency_probe": idempotency_result,
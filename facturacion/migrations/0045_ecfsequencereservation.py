@@ -0,0 +1,39 @@
+# Generated by Django 5.2.1 on 2026-10-18 15:59
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('facturacion', '0044_dgiicertificationitem_generated_at_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ECFSequenceReservation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('ecf_type', models.CharField(choices=[('31', 'Factura de Crédito Fiscal Electrónica'), ('32', 'Factura de Consumo Electrónica'), ('33', 'Nota de Débito Electrónica'), ('34', 'Nota de Crédito Electrónica'), ('41', 'Compras Electrónico'), ('43', 'Gastos Menores Electrónico'), ('44', 'Regímenes Especiales Electrónico'), ('45', 'Gubernamental Electrónico'), ('46', 'Exportaciones Electrónico'), ('47', 'Pagos al Exterior Electrónico')], max_length=2)),
+                ('first_number', models.PositiveBigIntegerField()),
+                ('last_number', models.PositiveBigIntegerField()),
+                ('owner', models.CharField(blank=True, default='', max_length=120)),
+                ('status', models.CharField(choices=[('active', 'Activa'), ('reconciled', 'Reconciliada')], default='active', max_length=20)),
+                ('reserved_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('expires_at', models.DateTimeField()),
+                ('reconciled_at', models.DateTimeField(blank=True, null=True)),
+                ('used_count', models.PositiveIntegerField(blank=True, null=True)),
+                ('unused_encfs', models.JSONField(blank=True, null=True)),
+                ('company', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='ecf_sequence_reservations', to='facturacion.company')),
+                ('sequence', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='reservations', to='facturacion.ecfsequence')),
+            ],
+            options={
+                'verbose_name': 'Reserva de e-NCF',
+                'verbose_name_plural': 'Reservas de e-NCF',
+                'ordering': ['-reserved_at'],
+                'indexes': [models.Index(fields=['status', 'expires_at'], name='ecf_seq_resv_status_exp_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,50 @@
+# Generated by Django 5.2.1 on 2026-10-18 16:02
+
+import re
+
+from django.db import migrations, models
+
+
+SEQUENCE_TARGETS = {
+    'invoice': ('Invoice', 'invoice_number'),
+    'quotation': ('Quotation', 'quotation_number'),
+    'credit_note': ('CreditNote', 'credit_note_number'),
+    'product_internal_code': ('Product', 'barcode'),
+}
+
+
+def flag_existing_numbers_ahead(apps, schema_editor):
+    """Flag sequences whose table already holds numbers the sequence has not reached."""
+    NumberSequence = apps.get_model('facturacion', 'NumberSequence')
+
+    for sequence in NumberSequence.objects.filter(code__in=SEQUENCE_TARGETS.keys(), issuer__isnull=True):
+        model_name, field_name = SEQUENCE_TARGETS[sequence.code]
+        Model = apps.get_model('facturacion', model_name)
+        pattern = re.compile(rf"^{re.escape(sequence.prefix)}(\d+){re.escape(sequence.suffix)}$")
+        max_number = None
+        values = Model.objects.filter(
+            company_id=sequence.company_id,
+            **{f'{field_name}__startswith': sequence.prefix},
+        ).values_list(field_name, flat=True)
+        for value in values:
+            match = pattern.match(value or '')
+            if match:
+                max_number = max(max_number or 0, int(match.group(1)))
+        if max_number is not None and max_number >= sequence.next_number:
+            NumberSequence.objects.filter(pk=sequence.pk).update(legacy_max_number=max_number)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('facturacion', '0045_ecfsequencereservation'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='numbersequence',
+            name='legacy_max_number',
+            field=models.PositiveBigIntegerField(blank=True, help_text='Mayor numero importado fuera de la secuencia; hasta alli se verifica colision.', null=True),
+        ),
+        migrations.RunPython(flag_existing_numbers_ahead, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,91 @@
+# Generated by Django 5.2.1 on 2026-10-18 16:06
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, F, Sum, Value
+from django.db.models.functions import Coalesce, TruncDate
+
+
+def populate_daily_sales_rollup(apps, schema_editor):
+    Invoice = apps.get_model('facturacion', 'Invoice')
+    InvoiceDetail = apps.get_model('facturacion', 'InvoiceDetail')
+    DailySalesRollup = apps.get_model('facturacion', 'DailySalesRollup')
+
+    invoice_rows = (
+        Invoice.objects
+        .annotate(day=TruncDate('created_at'), fiscal=Coalesce('electronic_document__fiscal_status', Value('')))
+        .values('company_id', 'day', 'status', 'fiscal')
+        .annotate(invoice_count=Count('id'), total_amount=Sum('total'))
+        .order_by()
+    )
+    line_rows = (
+        InvoiceDetail.objects
+        .annotate(
+            company_id=F('invoice__company_id'),
+            day=TruncDate('invoice__created_at'),
+            status=F('invoice__status'),
+            fiscal=Coalesce('invoice__electronic_document__fiscal_status', Value('')),
+            category_id=F('product__category_id'),
+        )
+        .values('company_id', 'day', 'category_id', 'status', 'fiscal')
+        .annotate(line_amount=Sum('subtotal'), quantity=Sum('quantity'))
+        .order_by()
+    )
+    rows = [
+        DailySalesRollup(
+            company_id=row['company_id'],
+            day=row['day'],
+            status=row['status'],
+            fiscal_status=row['fiscal'],
+            invoice_count=row['invoice_count'],
+            total_amount=row['total_amount'] or 0,
+        )
+        for row in invoice_rows.iterator()
+    ]
+    rows.extend(
+        DailySalesRollup(
+            company_id=row['company_id'],
+            day=row['day'],
+            category_id=row['category_id'],
+            status=row['status'],
+            fiscal_status=row['fiscal'],
+            line_amount=row['line_amount'] or 0,
+            quantity=row['quantity'] or 0,
+        )
+        for row in line_rows.iterator()
+    )
+    DailySalesRollup.objects.bulk_create(rows, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('facturacion', '0046_numbersequence_legacy_max_number'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailySalesRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('status', models.CharField(max_length=20)),
+                ('fiscal_status', models.CharField(blank=True, default='', max_length=20)),
+                ('invoice_count', models.IntegerField(default=0)),
+                ('total_amount', models.DecimalField(decimal_places=2, default=0, max_digits=16)),
+                ('line_amount', models.DecimalField(decimal_places=2, default=0, max_digits=16)),
+                ('quantity', models.BigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('category', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='daily_sales_rollups', to='facturacion.category')),
+                ('company', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_sales_rollups', to='facturacion.company')),
+            ],
+            options={
+                'verbose_name': 'Resumen diario de ventas',
+                'verbose_name_plural': 'Resumenes diarios de ventas',
+                'ordering': ['company', 'day'],
+                'indexes': [models.Index(fields=['company', 'day'], name='daily_sales_company_day_idx')],
+                'constraints': [models.UniqueConstraint(condition=models.Q(('category__isnull', True)), fields=('company', 'day', 'status', 'fiscal_status'), name='unique_daily_sales_rollup_invoice_row'), models.UniqueConstraint(condition=models.Q(('category__isnull', False)), fields=('company', 'day', 'category', 'status', 'fiscal_status'), name='unique_daily_sales_rollup_category_row')],
+            },
+        ),
+        migrations.RunPython(populate_daily_sales_rollup, migrations.RunPython.noop),
+    ]
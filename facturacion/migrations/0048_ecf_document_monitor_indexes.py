@@ -0,0 +1,17 @@
+# Generated by Django 5.2.1 on 2026-10-18 16:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('facturacion', '0047_dailysalesrollup'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='electronicfiscaldocument',
+            index=models.Index(condition=models.Q(('last_error__isnull', False)), fields=['company', '-updated_at'], name='ecf_doc_company_error_idx'),
+        ),
+    ]
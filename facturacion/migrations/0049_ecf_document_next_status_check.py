@@ -0,0 +1,22 @@
+# Generated by Django 5.2.1 on 2026-10-18 16:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('facturacion', '0048_ecf_document_monitor_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='electronicfiscaldocument',
+            name='next_status_check_at',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Próxima Consulta Estado'),
+        ),
+        migrations.AddIndex(
+            model_name='electronicfiscaldocument',
+            index=models.Index(condition=models.Q(('fiscal_status', 'submitted')), fields=['next_status_check_at'], name='ecf_doc_status_check_due_idx'),
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.1 on 2026-10-18 16:43
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('facturacion', '0049_ecf_document_next_status_check'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ECFOutbox',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('task', models.CharField(choices=[('submission_pipeline', 'Pipeline de envio e-CF')], max_length=40)),
+                ('payload', models.JSONField(blank=True, default=dict)),
+                ('status', models.CharField(choices=[('pending', 'Pendiente'), ('dispatched', 'Publicado'), ('failed', 'Fallido')], default='pending', max_length=20)),
+                ('attempts', models.PositiveIntegerField(default=0)),
+                ('available_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('dispatched_at', models.DateTimeField(blank=True, null=True)),
+                ('task_id', models.CharField(blank=True, max_length=255, null=True)),
+                ('last_error', models.TextField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('company', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='ecf_outbox_entries', to='facturacion.company')),
+                ('document', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='outbox_entries', to='facturacion.electronicfiscaldocument')),
+            ],
+            options={
+                'verbose_name': 'Outbox e-CF',
+                'verbose_name_plural': 'Outbox e-CF',
+                'ordering': ['available_at', 'id'],
+                'indexes': [models.Index(condition=models.Q(('status', 'pending')), fields=['available_at', 'id'], name='ecf_outbox_pending_idx')],
+            },
+        ),
+    ]
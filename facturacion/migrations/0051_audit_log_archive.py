@@ -0,0 +1,130 @@
+# Generated by Django 5.2.1 on 2026-10-18 16:55
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('facturacion', '0050_ecf_outbox'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DGIIPublicRequestLogArchive',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('period', models.DateField(db_index=True)),
+                ('data', models.BinaryField(blank=True, null=True)),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+                ('endpoint', models.CharField(db_index=True, max_length=120)),
+                ('method', models.CharField(max_length=10)),
+                ('content_type', models.CharField(blank=True, default='', max_length=120)),
+                ('body_sha256', models.CharField(blank=True, default='', max_length=64)),
+                ('rnc', models.CharField(blank=True, db_index=True, default='', max_length=20)),
+                ('remote_addr', models.GenericIPAddressField(blank=True, null=True)),
+                ('response_status', models.PositiveSmallIntegerField()),
+                ('created_at', models.DateTimeField()),
+            ],
+            options={
+                'verbose_name': 'Request publico DGII archivado',
+                'verbose_name_plural': 'Requests publicos DGII archivados',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ECFEventLogArchive',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('period', models.DateField(db_index=True)),
+                ('data', models.BinaryField(blank=True, null=True)),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+                ('event_type', models.CharField(choices=[('created', 'Creado'), ('queued', 'Encolado'), ('xml_generated', 'XML Generado'), ('signed', 'Firmado'), ('submitted', 'Enviado'), ('status_checked', 'Estado Consultado'), ('retry_scheduled', 'Reintento Programado'), ('skipped', 'Omitido'), ('inventory_restored', 'Inventario Restaurado'), ('inventory_compensated', 'Inventario Compensado'), ('manual_review', 'Revision Manual'), ('accepted', 'Aceptado'), ('rejected', 'Rechazado'), ('cancelled', 'Anulado'), ('error', 'Error')], max_length=30)),
+                ('created_at', models.DateTimeField()),
+            ],
+            options={
+                'verbose_name': 'Evento e-CF archivado',
+                'verbose_name_plural': 'Eventos e-CF archivados',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ECFStatusEventArchive',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('period', models.DateField(db_index=True)),
+                ('data', models.BinaryField(blank=True, null=True)),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+                ('previous_fiscal_status', models.CharField(blank=True, max_length=20, null=True)),
+                ('new_fiscal_status', models.CharField(blank=True, max_length=20, null=True)),
+                ('previous_job_status', models.CharField(blank=True, max_length=20, null=True)),
+                ('new_job_status', models.CharField(blank=True, max_length=20, null=True)),
+                ('source', models.CharField(max_length=80)),
+                ('task_id', models.CharField(blank=True, db_index=True, max_length=255, null=True)),
+                ('created_at', models.DateTimeField()),
+            ],
+            options={
+                'verbose_name': 'Evento de Estado e-CF archivado',
+                'verbose_name_plural': 'Eventos de Estado e-CF archivados',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='dgiipublicrequestlog',
+            index=models.Index(fields=['created_at'], name='dgii_public_log_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='ecfeventlog',
+            index=models.Index(fields=['electronic_document', 'created_at'], name='ecf_event_doc_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='ecfeventlog',
+            index=models.Index(fields=['created_at'], name='ecf_event_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='ecfstatusevent',
+            index=models.Index(fields=['document', 'created_at'], name='ecf_status_evt_doc_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='ecfstatusevent',
+            index=models.Index(fields=['created_at'], name='ecf_status_evt_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='dgiipublicrequestlogarchive',
+            index=models.Index(fields=['created_at'], name='dgii_public_arch_created_idx'),
+        ),
+        migrations.AddField(
+            model_name='ecfeventlogarchive',
+            name='created_by',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='ecfeventlogarchive',
+            name='electronic_document',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_events', to='facturacion.electronicfiscaldocument'),
+        ),
+        migrations.AddField(
+            model_name='ecfstatuseventarchive',
+            name='document',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_status_events', to='facturacion.electronicfiscaldocument'),
+        ),
+        migrations.AddIndex(
+            model_name='ecfeventlogarchive',
+            index=models.Index(fields=['electronic_document', 'created_at'], name='ecf_event_arch_doc_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='ecfeventlogarchive',
+            index=models.Index(fields=['created_at'], name='ecf_event_arch_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='ecfstatuseventarchive',
+            index=models.Index(fields=['document', 'created_at'], name='ecf_status_arch_doc_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='ecfstatuseventarchive',
+            index=models.Index(fields=['created_at'], name='ecf_status_arch_created_idx'),
+        ),
+    ]
@@ -0,0 +1,78 @@
+# Generated by Django 5.2.1 on 2026-10-18 17:01
+
+import gzip
+import hashlib
+
+from django.db import migrations, models
+
+
+ARTIFACT_FIELDS = ('xml_content', 'signed_xml_content', 'dgii_request_xml', 'dgii_response_xml')
+
+
+# The columns switch to ECFArtifactField in 0052b, in its own transaction: altering
+# them here, after the RunPython writes, fails on PostgreSQL with pending trigger events.
+def move_xml_to_artifacts(apps, schema_editor):
+    ElectronicFiscalDocument = apps.get_model('facturacion', 'ElectronicFiscalDocument')
+    ECFArtifact = apps.get_model('facturacion', 'ECFArtifact')
+
+    documents = ElectronicFiscalDocument.objects.only('id', *ARTIFACT_FIELDS).order_by('id')
+    batch = []
+    for document in documents.iterator(chunk_size=500):
+        artifacts = {}
+        for field in ARTIFACT_FIELDS:
+            text = getattr(document, field)
+            if not text:
+                continue
+            data = text.encode('utf-8')
+            sha256 = hashlib.sha256(data).hexdigest()
+            artifacts[sha256] = ECFArtifact(sha256=sha256, content=gzip.compress(data, mtime=0), size=len(data))
+            setattr(document, field, sha256)
+        if artifacts:
+            ECFArtifact.objects.bulk_create(artifacts.values(), ignore_conflicts=True)
+            batch.append(document)
+        if len(batch) >= 500:
+            ElectronicFiscalDocument.objects.bulk_update(batch, ARTIFACT_FIELDS)
+            batch = []
+    if batch:
+        ElectronicFiscalDocument.objects.bulk_update(batch, ARTIFACT_FIELDS)
+
+
+def restore_xml_from_artifacts(apps, schema_editor):
+    ElectronicFiscalDocument = apps.get_model('facturacion', 'ElectronicFiscalDocument')
+    ECFArtifact = apps.get_model('facturacion', 'ECFArtifact')
+
+    for document in ElectronicFiscalDocument.objects.only('id', *ARTIFACT_FIELDS).iterator(chunk_size=500):
+        digests = {getattr(document, field) for field in ARTIFACT_FIELDS if getattr(document, field)}
+        if not digests:
+            continue
+        texts = {
+            artifact.sha256: gzip.decompress(bytes(artifact.content)).decode('utf-8')
+            for artifact in ECFArtifact.objects.filter(sha256__in=digests)
+        }
+        ElectronicFiscalDocument.objects.filter(pk=document.pk).update(
+            **{field: texts.get(getattr(document, field), '') for field in ARTIFACT_FIELDS if getattr(document, field)}
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('facturacion', '0051_audit_log_archive'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ECFArtifact',
+            fields=[
+                ('sha256', models.CharField(max_length=64, primary_key=True, serialize=False)),
+                ('content', models.BinaryField()),
+                ('size', models.PositiveIntegerField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Artefacto XML e-CF',
+                'verbose_name_plural': 'Artefactos XML e-CF',
+            },
+        ),
+        migrations.RunPython(move_xml_to_artifacts, restore_xml_from_artifacts),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.1 on 2026-10-18 17:01
+
+import facturacion.models
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('facturacion', '0052a_ecf_artifact_store'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='electronicfiscaldocument',
+            name='dgii_request_xml',
+            field=facturacion.models.ECFArtifactField(blank=True, null=True, verbose_name='Request DGII'),
+        ),
+        migrations.AlterField(
+            model_name='electronicfiscaldocument',
+            name='dgii_response_xml',
+            field=facturacion.models.ECFArtifactField(blank=True, null=True, verbose_name='Response DGII'),
+        ),
+        migrations.AlterField(
+            model_name='electronicfiscaldocument',
+            name='signed_xml_content',
+            field=facturacion.models.ECFArtifactField(blank=True, null=True, verbose_name='XML Firmado'),
+        ),
+        migrations.AlterField(
+            model_name='electronicfiscaldocument',
+            name='xml_content',
+            field=facturacion.models.ECFArtifactField(blank=True, null=True, verbose_name='XML'),
+        ),
+    ]
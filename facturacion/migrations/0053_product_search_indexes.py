@@ -0,0 +1,49 @@
+from django.db import migrations
+
+
+# PostgreSQL-only: pg_trgm GIN indexes matching the UPPER(col::text) LIKE
+# expressions Django emits for icontains, and a Spanish tsvector index matching
+# SearchVector('description', config='spanish') in ProductSearchService.
+SEARCH_INDEXES = (
+    (
+        'product_name_trgm_idx',
+        'CREATE INDEX IF NOT EXISTS product_name_trgm_idx ON facturacion_product '
+        'USING gin (UPPER((name)::text) gin_trgm_ops)',
+    ),
+    (
+        'product_barcode_trgm_idx',
+        'CREATE INDEX IF NOT EXISTS product_barcode_trgm_idx ON facturacion_product '
+        'USING gin (UPPER((barcode)::text) gin_trgm_ops)',
+    ),
+    (
+        'product_description_fts_idx',
+        'CREATE INDEX IF NOT EXISTS product_description_fts_idx ON facturacion_product '
+        "USING gin (to_tsvector('spanish'::regconfig, COALESCE(description, '')))",
+    ),
+)
+
+
+def create_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for _name, sql in SEARCH_INDEXES:
+        schema_editor.execute(sql)
+
+
+def drop_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for name, _sql in SEARCH_INDEXES:
+        schema_editor.execute(f'DROP INDEX IF EXISTS {name}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('facturacion', '0052b_ecf_artifact_fields'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_indexes, drop_search_indexes),
+    ]
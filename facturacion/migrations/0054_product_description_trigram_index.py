@@ -0,0 +1,32 @@
+from django.db import migrations
+
+
+# PostgreSQL-only: ProductSearchService keeps substring (icontains) matching on
+# description next to the full-text match, so it gets a pg_trgm index too.
+INDEX_NAME = 'product_description_trgm_idx'
+
+
+def create_description_trigram_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(
+        f'CREATE INDEX IF NOT EXISTS {INDEX_NAME} ON facturacion_product '
+        'USING gin (UPPER((description)::text) gin_trgm_ops)'
+    )
+
+
+def drop_description_trigram_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(f'DROP INDEX IF EXISTS {INDEX_NAME}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('facturacion', '0053_product_search_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_description_trigram_index, drop_description_trigram_index),
+    ]
@@ -1,5 +1,12 @@
-from django.db import models, transaction
-from django.db.models.signals import pre_save, post_save
+import gzip
+import hashlib
+import json
+import zlib
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models, router, transaction
+from django.db.models.query_utils import DeferredAttribute
+from django.db.models.signals import pre_save, post_save, post_delete
 from django.dispatch import receiver
 from django.core.validators import MinValueValidator
 from django.core.exceptions import ValidationError
@@ -65,6 +72,11 @@ class NumberSequence(models.Model):
         blank=True,
     )
     branch_code = models.CharField(max_length=40, blank=True, default='')
+    legacy_max_number = models.PositiveBigIntegerField(
+        null=True,
+        blank=True,
+        help_text='Mayor numero importado fuera de la secuencia; hasta alli se verifica colision.',
+    )
     is_active = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -95,6 +107,13 @@ class NumberSequence(models.Model):
     def format_number(self, number):
         return f"{self.prefix}{number:0{self.padding}d}{self.suffix}"
 
+    def parse_number(self, value):
+        """Return the numeric part of a value formatted by this sequence, or None."""
+        if not value or not value.startswith(self.prefix) or not value.endswith(self.suffix):
+            return None
+        digits = value[len(self.prefix):len(value) - len(self.suffix)]
+        return int(digits) if digits.isdigit() else None
+
     def __str__(self):
         return f"{self.code} -> {self.format_number(self.next_number)}"
 
@@ -199,17 +218,103 @@ class Product(models.Model):
             ),
         ]
 
+    # Campos auditados en ProductHistory (attname).
+    HISTORY_FIELDS = ('name', 'description', 'price', 'stock', 'category_id', 'min_stock')
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance.take_history_snapshot()
+        return instance
+
+    def refresh_from_db(self, *args, **kwargs):
+        super().refresh_from_db(*args, **kwargs)
+        self.take_history_snapshot()
+
+    def take_history_snapshot(self, fields=None):
+        """Remember the persisted value of the loaded tracked fields (no query).
+
+        ``fields`` may name fields or attnames (``category`` or ``category_id``),
+        as ``save(update_fields=...)`` accepts either.
+        """
+        if fields is not None:
+            fields = {self._meta.get_field(name).attname for name in fields}
+        snapshot = self.__dict__.setdefault('_history_snapshot', {})
+        for attname in self.HISTORY_FIELDS:
+            if attname in self.__dict__ and (fields is None or attname in fields):
+                snapshot[attname] = self.__dict__[attname]
+
+    def history_changes(self, fields=None, category_names=None):
+        """Tracked fields changed since load/save, formatted for ProductHistory.changed_fields.
+
+        Compares against the snapshot taken in from_db/save; only instances
+        built by hand (never loaded) fall back to reading the stored row.
+        ``category_names`` maps category ids to names so bulk callers resolve
+        every category in one query.
+        """
+        if fields is not None:
+            fields = {self._meta.get_field(name).attname for name in fields}
+        snapshot = self.__dict__.get('_history_snapshot')
+        if snapshot is None:
+            snapshot = (
+                Product.objects.filter(pk=self.pk).values(*self.HISTORY_FIELDS).first() or {}
+            )
+
+        changed = {}
+        for attname in self.HISTORY_FIELDS:
+            if (fields is not None and attname not in fields) or attname not in snapshot:
+                continue
+            old_value = snapshot[attname]
+            new_value = getattr(self, attname)
+            if old_value == new_value:
+                continue
+            if attname == 'category_id':
+                if category_names is None:
+                    category_names = dict(
+                        Category.objects.filter(pk__in=[old_value, new_value]).values_list('id', 'name')
+                    )
+                changed['category'] = {
+                    'old': category_names.get(old_value),
+                    'new': category_names.get(new_value),
+                }
+            else:
+                changed[attname] = {
+                    'old': str(old_value) if old_value is not None else None,
+                    'new': str(new_value) if new_value is not None else None,
+                }
+        return changed
+
+    def creation_history(self, category_name=None):
+        """changed_fields recorded in the 'created' ProductHistory row."""
+        return {
+            'name': {'old': None, 'new': self.name},
+            'description': {'old': None, 'new': self.description},
+            'price': {'old': None, 'new': str(self.price)},
+            'stock': {'old': None, 'new': str(self.stock)},
+            'category': {'old': None, 'new': category_name},
+            'min_stock': {'old': None, 'new': str(self.min_stock)},
+            'barcode': {'old': None, 'new': self.barcode},
+        }
+
     def save(self, *args, **kwargs):
-        if not self.barcode:
-            from facturacion.services.numbering import NumberingService
+        from facturacion.services.numbering import NumberingService
 
+        if not self.barcode:
             self.barcode = NumberingService().allocate_unique(
                 code='product_internal_code',
                 model_class=Product,
                 field_name='barcode',
                 company=self.company,
             )
+        elif self._state.adding and self.company_id:
+            # A typed barcode in the internal format must be skipped by allocation.
+            NumberingService().note_external_number(
+                code='product_internal_code',
+                company=self.company,
+                value=self.barcode,
+            )
         super().save(*args, **kwargs)
+        self.take_history_snapshot(kwargs.get('update_fields'))
 
     def generate_barcode(self):
         """Backward-compatible barcode generator using transactional sequences."""
@@ -245,33 +350,11 @@ class ProductHistory(models.Model):
 
 
 @receiver(pre_save, sender=Product)
-def create_product_history_record(sender, instance, **kwargs):
+def create_product_history_record(sender, instance, update_fields=None, **kwargs):
     if not instance.pk:
         return
 
-    try:
-        previous = Product.objects.get(pk=instance.pk)
-    except Product.DoesNotExist:
-        return
-
-    changed = {}
-    fields_to_check = ['name', 'description', 'price', 'stock', 'category_id', 'min_stock']
-
-    for field in fields_to_check:
-        old_value = getattr(previous, field)
-        new_value = getattr(instance, field)
-        if old_value != new_value:
-            if field == 'category_id':
-                changed['category'] = {
-                    'old': previous.category.name if previous.category else None,
-                    'new': instance.category.name if instance.category else None,
-                }
-            else:
-                changed[field] = {
-                    'old': str(old_value) if old_value is not None else None,
-                    'new': str(new_value) if new_value is not None else None,
-                }
-
+    changed = instance.history_changes(fields=update_fields)
     if changed:
         ProductHistory.objects.create(product=instance, action='updated', changed_fields=changed)
 
@@ -284,15 +367,7 @@ def create_product_history_on_create(sender, instance, created, **kwargs):
     ProductHistory.objects.create(
         product=instance,
         action='created',
-        changed_fields={
-            'name': {'old': None, 'new': instance.name},
-            'description': {'old': None, 'new': instance.description},
-            'price': {'old': None, 'new': str(instance.price)},
-            'stock': {'old': None, 'new': str(instance.stock)},
-            'category': {'old': None, 'new': instance.category.name if instance.category else None},
-            'min_stock': {'old': None, 'new': str(instance.min_stock)},
-            'barcode': {'old': None, 'new': instance.barcode},
-        }
+        changed_fields=instance.creation_history(instance.category.name if instance.category else None),
     )
 
 
@@ -589,6 +664,58 @@ class InvoiceDetail(models.Model):
         return f"{self.product.name} x {self.quantity} (Factura #{self.invoice.id})"
 
 
+class DailySalesRollup(models.Model):
+    """Per-company daily invoice totals read by the dashboard.
+
+    Rows without category hold invoice-level measures (count and total);
+    rows with a category hold line-level measures (line amount and quantity).
+    """
+
+    company = models.ForeignKey(
+        'Company',
+        on_delete=models.CASCADE,
+        related_name='daily_sales_rollups',
+    )
+    day = models.DateField()
+    category = models.ForeignKey(
+        Category,
+        on_delete=models.CASCADE,
+        related_name='daily_sales_rollups',
+        null=True,
+        blank=True,
+    )
+    status = models.CharField(max_length=20)
+    fiscal_status = models.CharField(max_length=20, blank=True, default='')
+    invoice_count = models.IntegerField(default=0)
+    total_amount = models.DecimalField(max_digits=16, decimal_places=2, default=0)
+    line_amount = models.DecimalField(max_digits=16, decimal_places=2, default=0)
+    quantity = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = 'Resumen diario de ventas'
+        verbose_name_plural = 'Resumenes diarios de ventas'
+        ordering = ['company', 'day']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['company', 'day', 'status', 'fiscal_status'],
+                condition=models.Q(category__isnull=True),
+                name='unique_daily_sales_rollup_invoice_row',
+            ),
+            models.UniqueConstraint(
+                fields=['company', 'day', 'category', 'status', 'fiscal_status'],
+                condition=models.Q(category__isnull=False),
+                name='unique_daily_sales_rollup_category_row',
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['company', 'day'], name='daily_sales_company_day_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.company_id} {self.day} {self.status}/{self.fiscal_status or '-'}"
+
+
 class QuotationDetail(models.Model):
     quotation = models.ForeignKey(Quotation, on_delete=models.CASCADE, related_name='details')
     product = models.ForeignKey('Product', on_delete=models.PROTECT)
@@ -1185,6 +1312,16 @@ class ECFCertificate(models.Model):
         return f"{self.issuer} - {label}"
 
 
+@receiver(post_save, sender=ECFCertificate)
+def invalidate_loaded_certificate_on_rotation(sender, instance, **kwargs):
+    from facturacion.ecf.certificates.loader import invalidate_certificate_cache
+
+    invalidate_certificate_cache(instance.certificate_reference, instance.fingerprint)
+    previous = instance.previous_certificate if instance.previous_certificate_id else None
+    if previous is not None:
+        invalidate_certificate_cache(previous.certificate_reference, previous.fingerprint)
+
+
 class ECFSequence(models.Model):
     """Rango autorizado de e-NCF otorgado por DGII."""
 
@@ -1286,6 +1423,40 @@ class ECFSequence(models.Model):
             sequence.save(update_fields=['next_number', 'updated_at'])
             return sequence.format_encf(assigned_number), sequence
 
+    @classmethod
+    def allocate_block(cls, issuer, ecf_type, count, *, owner='', ttl_seconds=900):
+        """Reserva hasta ``count`` e-NCF contiguos con un solo bloqueo de la secuencia."""
+        if count < 1:
+            raise ValidationError("El bloque e-NCF debe reservar al menos un número.")
+        with transaction.atomic():
+            sequence = (
+                cls.objects
+                .select_for_update()
+                .filter(issuer=issuer, company=issuer.company, ecf_type=ecf_type, is_active=True)
+                .order_by('next_number')
+                .first()
+            )
+            if not sequence:
+                raise ValidationError(f"No hay secuencia activa para e-CF tipo {ecf_type}.")
+            if sequence.next_number > sequence.end_number:
+                raise ValidationError(f"La secuencia e-CF tipo {ecf_type} está agotada.")
+
+            first_number = sequence.next_number
+            last_number = min(first_number + count - 1, sequence.end_number)
+            now = timezone.now()
+            cls.objects.filter(pk=sequence.pk).update(next_number=last_number + 1, updated_at=now)
+            sequence.next_number = last_number + 1
+            return ECFSequenceReservation.objects.create(
+                company_id=sequence.company_id,
+                sequence=sequence,
+                ecf_type=ecf_type,
+                first_number=first_number,
+                last_number=last_number,
+                owner=owner[:120],
+                reserved_at=now,
+                expires_at=now + timezone.timedelta(seconds=ttl_seconds),
+            )
+
     def save(self, *args, **kwargs):
         self.full_clean()
         super().save(*args, **kwargs)
@@ -1294,9 +1465,236 @@ class ECFSequence(models.Model):
         return f"E{self.ecf_type} {self.start_number:010d}-{self.end_number:010d}"
 
 
+class ECFSequenceReservation(models.Model):
+    """Bloque contiguo de e-NCF reservado por un proceso para asignación local.
+
+    Los números que el proceso no llegue a usar antes de ``expires_at`` se
+    reportan en la reconciliación como huecos pendientes de anulación DGII.
+    """
+
+    STATUS_ACTIVE = 'active'
+    STATUS_RECONCILED = 'reconciled'
+    STATUS_CHOICES = [
+        (STATUS_ACTIVE, 'Activa'),
+        (STATUS_RECONCILED, 'Reconciliada'),
+    ]
+
+    company = models.ForeignKey(
+        'Company',
+        on_delete=models.PROTECT,
+        related_name='ecf_sequence_reservations',
+    )
+    sequence = models.ForeignKey(
+        ECFSequence,
+        on_delete=models.PROTECT,
+        related_name='reservations',
+    )
+    ecf_type = models.CharField(max_length=2, choices=ECFSequence.ECF_TYPE_CHOICES)
+    first_number = models.PositiveBigIntegerField()
+    last_number = models.PositiveBigIntegerField()
+    owner = models.CharField(max_length=120, blank=True, default='')
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_ACTIVE)
+    reserved_at = models.DateTimeField(default=timezone.now)
+    expires_at = models.DateTimeField()
+    reconciled_at = models.DateTimeField(blank=True, null=True)
+    used_count = models.PositiveIntegerField(blank=True, null=True)
+    unused_encfs = models.JSONField(blank=True, null=True)
+
+    class Meta:
+        verbose_name = "Reserva de e-NCF"
+        verbose_name_plural = "Reservas de e-NCF"
+        ordering = ['-reserved_at']
+        indexes = [
+            models.Index(fields=['status', 'expires_at'], name='ecf_seq_resv_status_exp_idx'),
+        ]
+
+    @property
+    def size(self):
+        return self.last_number - self.first_number + 1
+
+    def encfs(self):
+        return [self.sequence.format_encf(number) for number in range(self.first_number, self.last_number + 1)]
+
+    def __str__(self):
+        return f"{self.sequence} [{self.first_number}-{self.last_number}]"
+
+
+class ECFArtifactRef:
+    """Digest of a stored artifact whose text has not been loaded yet."""
+
+    __slots__ = ('sha256',)
+
+    def __init__(self, sha256: str) -> None:
+        self.sha256 = sha256
+
+    def __repr__(self):
+        return f"<ECFArtifactRef {self.sha256}>"
+
+
+class ECFArtifactText(str):
+    """Artifact text that remembers the digest it is stored under."""
+
+    sha256: str
+
+    @classmethod
+    def stored(cls, text: str, sha256: str) -> 'ECFArtifactText':
+        value = cls(text)
+        value.sha256 = sha256
+        return value
+
+
+class ECFArtifact(models.Model):
+    """XML e-CF comprimido con gzip y direccionado por su SHA-256.
+
+    Un mismo contenido se guarda una sola vez (p. ej. el XML firmado y el
+    request enviado a DGII), y los documentos solo guardan el digest.
+    """
+
+    CHUNK_SIZE = 64 * 1024
+
+    sha256 = models.CharField(max_length=64, primary_key=True)
+    content = models.BinaryField()
+    size = models.PositiveIntegerField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = "Artefacto XML e-CF"
+        verbose_name_plural = "Artefactos XML e-CF"
+
+    def __str__(self):
+        return f"{self.sha256} ({self.size} bytes)"
+
+    @staticmethod
+    def digest(text: str) -> str:
+        return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+    @classmethod
+    def put_many(cls, texts, using: str | None = None) -> list[ECFArtifactText]:
+        """Store texts (deduplicated, one INSERT) and return them tagged with their digest."""
+        stored, artifacts = [], {}
+        for text in texts:
+            data = text.encode('utf-8')
+            sha256 = hashlib.sha256(data).hexdigest()
+            if sha256 not in artifacts:
+                artifacts[sha256] = cls(sha256=sha256, content=gzip.compress(data, mtime=0), size=len(data))
+            stored.append(ECFArtifactText.stored(text, sha256))
+        if artifacts:
+            cls.objects.using(using).bulk_create(artifacts.values(), ignore_conflicts=True)
+        return stored
+
+    @classmethod
+    def load_many(cls, digests, using: str | None = None) -> dict[str, ECFArtifactText]:
+        artifacts = cls.objects.using(using).filter(sha256__in=set(digests))
+        return {artifact.sha256: ECFArtifactText.stored(artifact.text(), artifact.sha256) for artifact in artifacts}
+
+    @classmethod
+    def sync(cls, instances, field_names, using: str | None = None) -> None:
+        """Resolve pending refs and store new texts on many rows with one query each.
+
+        bulk_update() reads every listed field, which would otherwise load or
+        store artifacts one row at a time.
+        """
+        refs, texts = [], []
+        for instance in instances:
+            for name in field_names:
+                value = instance.__dict__.get(name)
+                if isinstance(value, ECFArtifactRef):
+                    refs.append((instance, name, value.sha256))
+                elif isinstance(value, str) and value and not isinstance(value, ECFArtifactText):
+                    texts.append((instance, name, value))
+        if refs:
+            loaded = cls.load_many([sha256 for _instance, _name, sha256 in refs], using=using)
+            for instance, name, sha256 in refs:
+                instance.__dict__[name] = loaded.get(sha256, '')
+        if texts:
+            stored = cls.put_many([text for _instance, _name, text in texts], using=using)
+            for (instance, name, _text), value in zip(texts, stored):
+                instance.__dict__[name] = value
+
+    def text(self) -> str:
+        return gzip.decompress(bytes(self.content)).decode('utf-8')
+
+    def chunks(self):
+        """Yield the uncompressed bytes in CHUNK_SIZE pieces without inflating it all at once."""
+        decompressor = zlib.decompressobj(wbits=31)
+        content = memoryview(self.content)
+        for start in range(0, len(content), self.CHUNK_SIZE):
+            data = decompressor.decompress(content[start:start + self.CHUNK_SIZE])
+            if data:
+                yield data
+        tail = decompressor.flush()
+        if tail:
+            yield tail
+
+
+class ECFArtifactDescriptor(DeferredAttribute):
+    """Load an artifact's text from ECFArtifact on first access."""
+
+    def __get__(self, instance, cls=None):
+        if instance is None:
+            return self
+        value = super().__get__(instance, cls)
+        if isinstance(value, ECFArtifactRef):
+            db = instance._state.db or router.db_for_read(type(instance), instance=instance)
+            value = ECFArtifact.load_many([value.sha256], using=db).get(value.sha256, '')
+            instance.__dict__[self.field.attname] = value
+        return value
+
+    def __set__(self, instance, value):
+        instance.__dict__[self.field.attname] = value
+
+
+class ECFArtifactField(models.Field):
+    """Texto XML guardado en ECFArtifact; la columna solo contiene su SHA-256.
+
+    Se lee y asigna como un TextField. El contenido se carga de forma perezosa
+    al primer acceso y se guarda (deduplicado) al grabar la fila.
+    """
+
+    descriptor_class = ECFArtifactDescriptor
+
+    def __init__(self, *args, **kwargs):
+        kwargs['max_length'] = 64
+        super().__init__(*args, **kwargs)
+
+    def deconstruct(self):
+        name, path, args, kwargs = super().deconstruct()
+        del kwargs['max_length']
+        return name, path, args, kwargs
+
+    def get_internal_type(self):
+        return 'CharField'
+
+    def from_db_value(self, value, expression, connection):
+        return ECFArtifactRef(value) if value else value
+
+    def pre_save(self, model_instance, add):
+        # Read the raw value so saving never loads an untouched artifact.
+        value = model_instance.__dict__.get(self.attname)
+        if isinstance(value, str) and value and not isinstance(value, ECFArtifactText):
+            db = router.db_for_write(type(model_instance), instance=model_instance)
+            value = ECFArtifact.put_many([value], using=db)[0]
+            model_instance.__dict__[self.attname] = value
+        return value
+
+    def get_prep_value(self, value):
+        if isinstance(value, (ECFArtifactRef, ECFArtifactText)):
+            return value.sha256
+        if isinstance(value, str) and value:
+            return ECFArtifact.digest(value)
+        return value
+
+    def get_db_prep_save(self, value, connection):
+        if isinstance(value, str) and value and not isinstance(value, ECFArtifactText):
+            value = ECFArtifact.put_many([value], using=connection.alias)[0]
+        return super().get_db_prep_save(value, connection)
+
+
 class ElectronicFiscalDocument(models.Model):
     """Estado y trazabilidad DGII de una factura emitida como e-CF."""
 
+    ARTIFACT_FIELDS = ['xml_content', 'signed_xml_content', 'dgii_request_xml', 'dgii_response_xml']
+
     STATUS_CHOICES = [
         ('draft', 'Borrador'),
         ('queued', 'En Cola'),
@@ -1379,13 +1777,14 @@ class ElectronicFiscalDocument(models.Model):
         verbose_name="Estado Técnico",
     )
     track_id = models.CharField(max_length=80, blank=True, null=True, verbose_name="TrackID DGII")
-    xml_content = models.TextField(blank=True, null=True, verbose_name="XML")
-    signed_xml_content = models.TextField(blank=True, null=True, verbose_name="XML Firmado")
-    dgii_request_xml = models.TextField(blank=True, null=True, verbose_name="Request DGII")
-    dgii_response_xml = models.TextField(blank=True, null=True, verbose_name="Response DGII")
+    xml_content = ECFArtifactField(blank=True, null=True, verbose_name="XML")
+    signed_xml_content = ECFArtifactField(blank=True, null=True, verbose_name="XML Firmado")
+    dgii_request_xml = ECFArtifactField(blank=True, null=True, verbose_name="Request DGII")
+    dgii_response_xml = ECFArtifactField(blank=True, null=True, verbose_name="Response DGII")
     dgii_response = models.JSONField(blank=True, null=True, verbose_name="Respuesta DGII")
     last_submitted_at = models.DateTimeField(blank=True, null=True, verbose_name="Último Envío")
     last_status_checked_at = models.DateTimeField(blank=True, null=True, verbose_name="Última Consulta Estado")
+    next_status_check_at = models.DateTimeField(blank=True, null=True, verbose_name="Próxima Consulta Estado")
     accepted_at = models.DateTimeField(blank=True, null=True, verbose_name="Fecha Aceptación")
     rejection_reason = models.TextField(blank=True, null=True, verbose_name="Motivo Rechazo")
     async_task_id = models.CharField(max_length=255, blank=True, null=True, db_index=True, verbose_name="Task Celery Actual")
@@ -1407,6 +1806,19 @@ class ElectronicFiscalDocument(models.Model):
                 name='unique_ecf_document_encf_per_issuer',
             ),
         ]
+        indexes = [
+            # Parcial: la lista de errores recientes del monitor solo lee documentos con error.
+            models.Index(
+                fields=['company', '-updated_at'],
+                name='ecf_doc_company_error_idx',
+                condition=models.Q(last_error__isnull=False),
+            ),
+            models.Index(
+                fields=['next_status_check_at'],
+                name='ecf_doc_status_check_due_idx',
+                condition=models.Q(fiscal_status='submitted'),
+            ),
+        ]
 
     def clean(self):
         if self.encf and (len(self.encf) != 13 or not self.encf.startswith(f"E{self.ecf_type}")):
@@ -1435,14 +1847,82 @@ class ElectronicFiscalDocument(models.Model):
         fiscal_values = {choice[0] for choice in self.FISCAL_STATUS_CHOICES}
         if self.status in fiscal_values and (not self.fiscal_status or self.fiscal_status == 'draft'):
             self.fiscal_status = self.status
-        self.full_clean()
+        self.full_clean(exclude=self.ARTIFACT_FIELDS)
         super().save(*args, **kwargs)
 
+    def artifact_sha256(self, field_name: str) -> str | None:
+        """Digest of an XML artifact without loading its text (None when empty)."""
+        value = self.__dict__.get(field_name)
+        if isinstance(value, (ECFArtifactRef, ECFArtifactText)):
+            return value.sha256
+        return ECFArtifact.digest(value) if value else None
+
     def __str__(self):
         source = self.invoice.invoice_number if self.invoice_id else self.credit_note.credit_note_number
         return f"{self.encf} - {source}"
 
 
+@receiver(post_save, sender=Invoice)
+@receiver(post_delete, sender=Invoice)
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+def invalidate_dashboard_responses(sender, instance, **kwargs):
+    from facturacion.services.response_cache import DASHBOARD_NAMESPACE, invalidate_tenant_responses
+
+    invalidate_tenant_responses(instance.company_id, [DASHBOARD_NAMESPACE])
+
+
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+def invalidate_product_barcode_map(sender, instance, **kwargs):
+    from facturacion.services.barcode_map import invalidate_company_barcodes, invalidate_product_records
+
+    invalidate_company_barcodes(instance.company_id)
+    invalidate_product_records([instance.pk])
+
+
+@receiver(post_save, sender=ElectronicFiscalDocument)
+@receiver(post_delete, sender=ElectronicFiscalDocument)
+def invalidate_fiscal_monitor_responses(sender, instance, **kwargs):
+    from facturacion.services.response_cache import (
+        DASHBOARD_NAMESPACE,
+        ECF_MONITOR_NAMESPACE,
+        invalidate_tenant_responses,
+    )
+
+    invalidate_tenant_responses(instance.company_id, [DASHBOARD_NAMESPACE, ECF_MONITOR_NAMESPACE])
+
+
+@receiver(post_save, sender=Company)
+def invalidate_company_members_context(sender, instance, **kwargs):
+    from facturacion.services.tenant_context import invalidate_company_context
+
+    invalidate_company_context(instance.pk)
+
+
+@receiver(post_save, sender=CompanyMembership)
+@receiver(post_delete, sender=CompanyMembership)
+def invalidate_member_context(sender, instance, **kwargs):
+    from facturacion.services.tenant_context import invalidate_user_context
+
+    invalidate_user_context([instance.user_id])
+
+
+@receiver(post_save, sender='auth.User')
+def invalidate_user_token_context(sender, instance, **kwargs):
+    from facturacion.services.tenant_context import invalidate_user_context, invalidate_user_tokens
+
+    invalidate_user_context([instance.pk])
+    invalidate_user_tokens(instance.pk)
+
+
+@receiver(post_delete, sender='authtoken.Token')
+def invalidate_deleted_token_context(sender, instance, **kwargs):
+    from facturacion.services.tenant_context import invalidate_tokens
+
+    invalidate_tokens([instance.key])
+
+
 class ECFStatusEvent(models.Model):
     """Auditable fiscal/job status transition history for e-CF documents."""
 
@@ -1464,11 +1944,74 @@ class ECFStatusEvent(models.Model):
         verbose_name = "Evento de Estado e-CF"
         verbose_name_plural = "Eventos de Estado e-CF"
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['document', 'created_at'], name='ecf_status_evt_doc_created_idx'),
+            models.Index(fields=['created_at'], name='ecf_status_evt_created_idx'),
+        ]
 
     def __str__(self):
         return f"{self.document.encf} {self.previous_fiscal_status}->{self.new_fiscal_status}"
 
 
+class ECFOutbox(models.Model):
+    """Encolado e-CF pendiente, escrito en la misma transaccion que el documento.
+
+    Un relay (``relay_ecf_outbox``) lo publica luego en el broker, de modo que
+    una caida de Redis no falla la venta ni pierde el trabajo tras el commit.
+    """
+
+    STATUS_PENDING = 'pending'
+    STATUS_DISPATCHED = 'dispatched'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'Pendiente'),
+        (STATUS_DISPATCHED, 'Publicado'),
+        (STATUS_FAILED, 'Fallido'),
+    ]
+
+    TASK_SUBMISSION_PIPELINE = 'submission_pipeline'
+    TASK_CHOICES = [
+        (TASK_SUBMISSION_PIPELINE, 'Pipeline de envio e-CF'),
+    ]
+
+    company = models.ForeignKey(
+        'Company',
+        on_delete=models.CASCADE,
+        related_name='ecf_outbox_entries',
+        null=True,
+        blank=True,
+    )
+    document = models.ForeignKey(
+        ElectronicFiscalDocument,
+        on_delete=models.CASCADE,
+        related_name='outbox_entries',
+    )
+    task = models.CharField(max_length=40, choices=TASK_CHOICES)
+    payload = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    attempts = models.PositiveIntegerField(default=0)
+    available_at = models.DateTimeField(default=timezone.now)
+    dispatched_at = models.DateTimeField(blank=True, null=True)
+    task_id = models.CharField(max_length=255, blank=True, null=True)
+    last_error = models.TextField(blank=True, null=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = "Outbox e-CF"
+        verbose_name_plural = "Outbox e-CF"
+        ordering = ['available_at', 'id']
+        indexes = [
+            models.Index(
+                fields=['available_at', 'id'],
+                name='ecf_outbox_pending_idx',
+                condition=models.Q(status='pending'),
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.task} #{self.document_id} ({self.status})"
+
+
 class ECFEventLog(models.Model):
     """Bitácora de eventos de generación, firma, envío y consulta e-CF."""
 
@@ -1510,6 +2053,10 @@ class ECFEventLog(models.Model):
         verbose_name = "Evento e-CF"
         verbose_name_plural = "Eventos e-CF"
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['electronic_document', 'created_at'], name='ecf_event_doc_created_idx'),
+            models.Index(fields=['created_at'], name='ecf_event_created_idx'),
+        ]
 
     def __str__(self):
         return f"{self.electronic_document.encf} - {self.event_type}"
@@ -1702,6 +2249,161 @@ class DGIIPublicRequestLog(models.Model):
         verbose_name = "Request publico DGII"
         verbose_name_plural = "Requests publicos DGII"
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['created_at'], name='dgii_public_log_created_idx'),
+        ]
 
     def __str__(self):
         return f"{self.method} {self.endpoint} -> {self.response_status}"
+
+
+class ArchivedValue:
+    """Read one column back out of an archive row's compressed ``data`` blob."""
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        return instance.unpacked().get(self.name)
+
+
+class ArchivedLogRow(models.Model):
+    """Fila fria de una bitacora, movida desde su tabla caliente por ``archive_audit_logs``.
+
+    La llave primaria es el id original, las columnas de busqueda se conservan
+    como columnas reales y las voluminosas (``COMPRESSED_FIELDS``) se guardan
+    juntas en ``data`` como JSON comprimido con zlib.
+    """
+
+    COMPRESSED_FIELDS: tuple[str, ...] = ()
+
+    id = models.BigIntegerField(primary_key=True)
+    period = models.DateField(db_index=True)
+    data = models.BinaryField(blank=True, null=True)
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        abstract = True
+
+    @classmethod
+    def from_row(cls, row):
+        """Build the archive row for a hot row (not saved)."""
+        skip = {'period', 'data', 'archived_at'}
+        values = {
+            field.attname: getattr(row, field.attname)
+            for field in cls._meta.concrete_fields
+            if field.name not in skip
+        }
+        values['period'] = timezone.localtime(row.created_at).date().replace(day=1)
+        values['data'] = cls.pack({name: getattr(row, name) for name in cls.COMPRESSED_FIELDS})
+        return cls(**values)
+
+    @staticmethod
+    def pack(values: dict) -> bytes:
+        return zlib.compress(json.dumps(values, cls=DjangoJSONEncoder, separators=(',', ':')).encode('utf-8'))
+
+    def unpacked(self) -> dict:
+        if not hasattr(self, '_unpacked'):
+            self._unpacked = json.loads(zlib.decompress(bytes(self.data)).decode('utf-8')) if self.data else {}
+        return self._unpacked
+
+
+class ECFEventLogArchive(ArchivedLogRow):
+    """Eventos e-CF archivados; mismo id y forma de lectura que ECFEventLog."""
+
+    COMPRESSED_FIELDS = ('message', 'payload')
+
+    electronic_document = models.ForeignKey(
+        ElectronicFiscalDocument,
+        on_delete=models.CASCADE,
+        related_name='archived_events',
+    )
+    event_type = models.CharField(max_length=30, choices=ECFEventLog.EVENT_CHOICES)
+    created_by = models.ForeignKey(
+        'auth.User',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+',
+    )
+    created_at = models.DateTimeField()
+
+    message = ArchivedValue()
+    payload = ArchivedValue()
+
+    class Meta:
+        verbose_name = "Evento e-CF archivado"
+        verbose_name_plural = "Eventos e-CF archivados"
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['electronic_document', 'created_at'], name='ecf_event_arch_doc_idx'),
+            models.Index(fields=['created_at'], name='ecf_event_arch_created_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.electronic_document.encf} - {self.event_type} (archivado)"
+
+
+class ECFStatusEventArchive(ArchivedLogRow):
+    """Transiciones de estado e-CF archivadas; mismo id que ECFStatusEvent."""
+
+    COMPRESSED_FIELDS = ('reason',)
+
+    document = models.ForeignKey(
+        ElectronicFiscalDocument,
+        on_delete=models.CASCADE,
+        related_name='archived_status_events',
+    )
+    previous_fiscal_status = models.CharField(max_length=20, blank=True, null=True)
+    new_fiscal_status = models.CharField(max_length=20, blank=True, null=True)
+    previous_job_status = models.CharField(max_length=20, blank=True, null=True)
+    new_job_status = models.CharField(max_length=20, blank=True, null=True)
+    source = models.CharField(max_length=80)
+    task_id = models.CharField(max_length=255, blank=True, null=True, db_index=True)
+    created_at = models.DateTimeField()
+
+    reason = ArchivedValue()
+
+    class Meta:
+        verbose_name = "Evento de Estado e-CF archivado"
+        verbose_name_plural = "Eventos de Estado e-CF archivados"
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['document', 'created_at'], name='ecf_status_arch_doc_idx'),
+            models.Index(fields=['created_at'], name='ecf_status_arch_created_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.document.encf} {self.previous_fiscal_status}->{self.new_fiscal_status} (archivado)"
+
+
+class DGIIPublicRequestLogArchive(ArchivedLogRow):
+    """Requests publicos DGII archivados; cabeceras y cuerpo quedan comprimidos."""
+
+    COMPRESSED_FIELDS = ('safe_headers', 'body_preview', 'error')
+
+    endpoint = models.CharField(max_length=120, db_index=True)
+    method = models.CharField(max_length=10)
+    content_type = models.CharField(max_length=120, blank=True, default='')
+    body_sha256 = models.CharField(max_length=64, blank=True, default='')
+    rnc = models.CharField(max_length=20, blank=True, default='', db_index=True)
+    remote_addr = models.GenericIPAddressField(blank=True, null=True)
+    response_status = models.PositiveSmallIntegerField()
+    created_at = models.DateTimeField()
+
+    safe_headers = ArchivedValue()
+    body_preview = ArchivedValue()
+    error = ArchivedValue()
+
+    class Meta:
+        verbose_name = "Request publico DGII archivado"
+        verbose_name_plural = "Requests publicos DGII archivados"
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['created_at'], name='dgii_public_arch_created_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.method} {self.endpoint} -> {self.response_status} (archivado)"
@@ -0,0 +1,233 @@
+"""Per-company barcode -> compact product record map for the checkout scan path."""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from typing import Iterable
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.storage import default_storage
+from django.db import transaction
+
+from facturacion.models import Product
+
+
+_KEY_PREFIX = "barcode-map"
+# Cached product id for a barcode that matches no product of the company.
+_MISSING = 0
+
+
+@dataclass(frozen=True)
+class ProductScanRecord:
+    """Cached product row rendered with the same fields as ProductSerializer."""
+
+    id: int
+    company: int
+    name: str
+    description: str | None
+    barcode: str
+    price: str
+    stock: int
+    min_stock: int | None
+    category: int
+    category_name: str
+    image: str
+
+    def as_dict(self, request=None) -> dict:
+        """Match ProductSerializer(product, context={'request': request}).data."""
+        data = asdict(self)
+        image_url = default_storage.url(self.image) if self.image else None
+        if image_url and request is not None:
+            image_url = request.build_absolute_uri(image_url)
+        data["image"] = image_url
+        data["image_url"] = image_url if request is not None else None
+        return data
+
+
+class LocalBarcodeMap:
+    """Per-process LRU of (company, map version, barcode) -> product id.
+
+    Keys carry the company's map version read from the shared cache, so a
+    product create/delete/barcode change in any process makes every local
+    entry of that company unreachable; stale versions age out of the LRU.
+    """
+
+    def __init__(self) -> None:
+        self._entries: OrderedDict[tuple, int] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: tuple) -> int | None:
+        with self._lock:
+            product_id = self._entries.get(key)
+            if product_id is not None:
+                self._entries.move_to_end(key)
+            return product_id
+
+    def set_many(self, entries: dict[tuple, int], max_entries: int) -> None:
+        with self._lock:
+            for key, product_id in entries.items():
+                self._entries[key] = product_id
+                self._entries.move_to_end(key)
+            while len(self._entries) > max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+local_barcode_map = LocalBarcodeMap()
+
+
+class BarcodeMapService:
+    """Resolve scanned barcodes to compact product records without touching the DB when warm.
+
+    The barcode -> product id map lives in the local LRU and the shared cache
+    under a per-company version; records are cached per product id so a
+    stock change only drops that product's record. Warm scans cost two shared
+    cache reads (version and record) and no queries.
+    """
+
+    def __init__(self, local_map: LocalBarcodeMap | None = None) -> None:
+        self.local_map = local_map if local_map is not None else local_barcode_map
+
+    def lookup(self, company_id: int, barcode: str) -> ProductScanRecord | None:
+        return self.lookup_many(company_id, [barcode]).get(barcode)
+
+    def lookup_many(self, company_id: int, barcodes: Iterable[str]) -> dict[str, ProductScanRecord]:
+        max_length = Product._meta.get_field("barcode").max_length
+        barcodes = list(dict.fromkeys(code for code in barcodes if code and len(code) <= max_length))
+        if not barcodes:
+            return {}
+        if _ttl() <= 0:
+            records = _load_records(company_id=company_id, barcode__in=barcodes)
+            return {record.barcode: record for record in records.values()}
+
+        product_ids = self._product_ids(company_id, barcodes)
+        records = self._records({product_id for product_id in product_ids.values() if product_id != _MISSING})
+        return {
+            barcode: records[product_id]
+            for barcode, product_id in product_ids.items()
+            if product_id in records
+        }
+
+    def _product_ids(self, company_id: int, barcodes: list[str]) -> dict[str, int]:
+        version = _version(company_id)
+        product_ids = {}
+        for barcode in barcodes:
+            product_id = self.local_map.get((company_id, version, barcode))
+            if product_id is not None:
+                product_ids[barcode] = product_id
+
+        misses = [barcode for barcode in barcodes if barcode not in product_ids]
+        if misses:
+            shared_keys = {_map_key(company_id, version, barcode): barcode for barcode in misses}
+            shared = {shared_keys[key]: product_id for key, product_id in cache.get_many(list(shared_keys)).items()}
+            loaded = {}
+            unresolved = [barcode for barcode in misses if barcode not in shared]
+            if unresolved:
+                found = dict(
+                    Product.objects
+                    .filter(company_id=company_id, barcode__in=unresolved)
+                    .values_list("barcode", "id")
+                )
+                loaded = {barcode: found.get(barcode, _MISSING) for barcode in unresolved}
+                cache.set_many(
+                    {_map_key(company_id, version, barcode): product_id for barcode, product_id in loaded.items()},
+                    _ttl(),
+                )
+            resolved = {**shared, **loaded}
+            self.local_map.set_many(
+                {(company_id, version, barcode): product_id for barcode, product_id in resolved.items()},
+                int(getattr(settings, "BARCODE_MAP_LOCAL_MAX_ENTRIES", 20000)),
+            )
+            product_ids.update(resolved)
+        return product_ids
+
+    def _records(self, product_ids: set[int]) -> dict[int, ProductScanRecord]:
+        if not product_ids:
+            return {}
+        keys = {_record_key(product_id): product_id for product_id in product_ids}
+        records = {keys[key]: record for key, record in cache.get_many(list(keys)).items()}
+        missing = product_ids - set(records)
+        if missing:
+            loaded = _load_records(id__in=missing)
+            cache.set_many({_record_key(product_id): record for product_id, record in loaded.items()}, _ttl())
+            records.update(loaded)
+        return records
+
+
+def invalidate_company_barcodes(company_id: int | None) -> None:
+    """Retire a company's barcode map now and again once the transaction commits."""
+    if company_id is None:
+        return
+    _bump(company_id)
+    transaction.on_commit(lambda: _bump(company_id))
+
+
+def invalidate_product_records(product_ids: Iterable[int]) -> None:
+    """Drop cached scan records (e.g. after a stock update) now and on commit."""
+    keys = [_record_key(product_id) for product_id in set(product_ids)]
+    if not keys:
+        return
+    cache.delete_many(keys)
+    transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+def _load_records(**filters) -> dict[int, ProductScanRecord]:
+    rows = Product.objects.filter(**filters).values_list(
+        "id", "company_id", "name", "description", "barcode", "price", "stock", "min_stock",
+        "category_id", "category__name", "image",
+    )
+    return {
+        row[0]: ProductScanRecord(
+            id=row[0],
+            company=row[1],
+            name=row[2],
+            description=row[3],
+            barcode=row[4],
+            price=str(row[5]),
+            stock=row[6],
+            min_stock=row[7],
+            category=row[8],
+            category_name=row[9],
+            image=row[10] or "",
+        )
+        for row in rows
+    }
+
+
+def _map_key(company_id: int, version: int, barcode: str) -> str:
+    return f"{_KEY_PREFIX}:{company_id}:{version}:{barcode}"
+
+
+def _record_key(product_id: int) -> str:
+    return f"{_KEY_PREFIX}:record:{product_id}"
+
+
+def _version_key(company_id: int) -> str:
+    return f"{_KEY_PREFIX}:{company_id}:version"
+
+
+def _version(company_id: int) -> int:
+    key = _version_key(company_id)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, time.time_ns(), None)
+        version = cache.get(key)
+    return version
+
+
+def _bump(company_id: int) -> None:
+    cache.set(_version_key(company_id), time.time_ns(), None)
+
+
+def _ttl() -> int:
+    return int(getattr(settings, "BARCODE_MAP_CACHE_TTL_SECONDS", 0))
@@ -9,6 +9,8 @@ from django.db.models import F
 from django.utils import timezone
 
 from facturacion.models import CreditNote, ECFEventLog, ElectronicFiscalDocument, InvoiceDetail, Product, SaleDetail
+from facturacion.services.barcode_map import invalidate_product_records
+from facturacion.services.sales_rollup import DailySalesRollupService
 
 
 @dataclass(frozen=True)
@@ -132,8 +134,10 @@ class CreditNoteReconciliationService:
             )
             raise ValueError("No se puede compensar automaticamente: " + " ".join(issues))
 
-        for detail in note.details.select_related("product").all():
+        details = list(note.details.select_related("product").all())
+        for detail in details:
             Product.objects.filter(pk=detail.product_id).update(stock=F("stock") - detail.quantity)
+        invalidate_product_records(detail.product_id for detail in details)
 
         now = timezone.now()
         note.inventory_compensated_at = now
@@ -220,8 +224,10 @@ class CreditNoteReconciliationService:
             return
         invoice = note.origin_invoice
         if invoice.status != "refunded":
+            previous_status = invoice.status
             invoice.status = "refunded"
             invoice.save(update_fields=["status", "updated_at"])
+            DailySalesRollupService().move_invoice(invoice, previous_status=previous_status)
 
     def _log(self, document, event_type: str, message: str, payload: dict, *, user=None) -> None:
         if not document:
@@ -11,9 +11,10 @@ from django.db.models import F, Sum
 from django.utils import timezone
 
 from facturacion.ecf.exceptions import ECFCeleryUnavailable
-from facturacion.ecf.queues import enqueue_submission_pipeline
+from facturacion.ecf.queues import enqueue_submission_pipeline, record_submission_pipeline
 from facturacion.ecf.services.document_factory import ECFDocumentFactoryService
 from facturacion.models import Company, CreditNote, CreditNoteDetail, ECFEventLog, Invoice, InvoiceDetail, Product, ElectronicFiscalDocument
+from facturacion.services.barcode_map import invalidate_product_records
 
 
 @dataclass(frozen=True)
@@ -126,9 +127,7 @@ class CreditNoteService:
                 created_by=user,
             )
             if enqueue_enabled:
-                transaction.on_commit(
-                    lambda document_id=factory_result.document.id, user_id=getattr(user, "id", None): self._enqueue_after_commit(document_id, user_id)
-                )
+                self._schedule_enqueue(factory_result.document, getattr(user, "id", None))
             note.refresh_from_db()
         return CreditNoteCreationResult(
             credit_note=note,
@@ -204,6 +203,7 @@ class CreditNoteService:
 
         for item in normalized:
             Product.objects.filter(pk=item["product"].pk).update(stock=F("stock") + item["quantity"])
+        invalidate_product_records(item["product"].pk for item in normalized)
 
         locked_note.inventory_restored_at = timezone.now()
         locked_note.save(update_fields=["inventory_restored_at", "updated_at"])
@@ -241,6 +241,12 @@ class CreditNoteService:
                 return False
         return True
 
+    def _schedule_enqueue(self, document: ElectronicFiscalDocument, user_id: int | None) -> None:
+        if getattr(settings, "ECF_AUTO_ENQUEUE_MODE", "outbox") == "outbox":
+            record_submission_pipeline(document, user_id=user_id, validate_xsd=True)
+            return
+        transaction.on_commit(lambda document_id=document.id: self._enqueue_after_commit(document_id, user_id))
+
     def _enqueue_after_commit(self, document_id: int, user_id: int | None) -> None:
         try:
             enqueue_submission_pipeline(document_id, user_id=user_id, validate_xsd=True)
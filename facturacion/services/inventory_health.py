@@ -0,0 +1,72 @@
+"""Inventory health metrics shared by the dashboard and low-stock endpoints."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+from django.db.models import Count, F, Q, QuerySet, Sum
+
+from facturacion.models import Category, Company, Product
+
+
+@dataclass(frozen=True)
+class CategoryInventoryHealth:
+    name: str
+    in_stock: int
+    low_stock: int
+    out_of_stock: int
+    total_stock: int
+
+
+@dataclass(frozen=True)
+class InventoryHealth:
+    categories: list[CategoryInventoryHealth]
+
+    @property
+    def low_stock_count(self) -> int:
+        return sum(category.low_stock for category in self.categories)
+
+
+class InventoryHealthService:
+    """Compute stock health per category with a single conditional aggregate."""
+
+    # Dashboard buckets: below this is "low", above it is "in stock".
+    dashboard_low_stock_threshold = 5
+    # Low-stock listings: below this floor or below the product's own min_stock.
+    low_stock_floor = 3
+
+    def category_health(self, company: Company | None) -> InventoryHealth:
+        if company is None:
+            return InventoryHealth(categories=[])
+
+        threshold = self.dashboard_low_stock_threshold
+        rows = (
+            Category.objects
+            .filter(company=company)
+            .annotate(
+                total_stock=Sum('products__stock'),
+                in_stock=Count('products', filter=Q(products__stock__gt=threshold)),
+                low_stock=Count('products', filter=Q(products__stock__lt=threshold)),
+                out_of_stock=Count('products', filter=Q(products__stock=0)),
+            )
+            .values('name', 'total_stock', 'in_stock', 'low_stock', 'out_of_stock')
+        )
+        return InventoryHealth(
+            categories=[
+                CategoryInventoryHealth(
+                    name=row['name'],
+                    in_stock=row['in_stock'],
+                    low_stock=row['low_stock'],
+                    out_of_stock=row['out_of_stock'],
+                    total_stock=row['total_stock'] or 0,
+                )
+                for row in rows
+            ]
+        )
+
+    def low_stock_condition(self) -> Q:
+        return Q(stock__lt=self.low_stock_floor) | Q(stock__lt=F('min_stock'))
+
+    def low_stock_products(self, queryset: QuerySet[Product] | None = None) -> QuerySet[Product]:
+        queryset = Product.objects.all() if queryset is None else queryset
+        return queryset.filter(self.low_stock_condition())
@@ -11,10 +11,12 @@ from django.db.models import F
 from django.utils import timezone
 
 from facturacion.ecf.exceptions import ECFCeleryUnavailable
-from facturacion.ecf.queues import enqueue_submission_pipeline
+from facturacion.ecf.queues import enqueue_submission_pipeline, record_submission_pipeline
 from facturacion.ecf.services.document_factory import ECFDocumentFactoryService
 from facturacion.models import Client, Company, ECFEventLog, ElectronicFiscalDocument, Invoice, InvoiceDetail, Product, Sale, SaleDetail
+from facturacion.services.barcode_map import invalidate_product_records
 from facturacion.services.fiscal_rules import FiscalCalculationService
+from facturacion.services.sales_rollup import DailySalesRollupService, InvoiceLine
 
 
 @dataclass(frozen=True)
@@ -104,9 +106,7 @@ class InvoiceCreationService:
                 if ecf_error:
                     raise ValueError(ecf_error)
                 if electronic_document and enqueue_enabled:
-                    transaction.on_commit(
-                        lambda document_id=electronic_document.id, user_id=getattr(user, "id", None): self._enqueue_after_commit(document_id, user_id)
-                    )
+                    self._schedule_enqueue(electronic_document, getattr(user, "id", None))
 
         invoice.refresh_from_db()
         if electronic_document:
@@ -148,8 +148,10 @@ class InvoiceCreationService:
                 self._commit_invoice_inventory(invoice)
                 invoice.inventory_committed_at = timezone.now()
 
+            previous_status = invoice.status
             invoice.status = "paid"
             invoice.save(update_fields=["status", "inventory_committed_at", "updated_at"])
+            DailySalesRollupService().move_invoice(invoice, previous_status=previous_status)
 
             if self._should_create_ecf(invoice):
                 factory_result = self.document_factory.create_for_invoice(
@@ -163,9 +165,7 @@ class InvoiceCreationService:
                 if ecf_error:
                     raise ValueError(ecf_error)
                 if electronic_document and enqueue_enabled:
-                    transaction.on_commit(
-                        lambda document_id=electronic_document.id, user_id=getattr(user, "id", None): self._enqueue_after_commit(document_id, user_id)
-                    )
+                    self._schedule_enqueue(electronic_document, getattr(user, "id", None))
 
         invoice.refresh_from_db()
         if electronic_document:
@@ -242,9 +242,7 @@ class InvoiceCreationService:
                 if ecf_error:
                     raise ValueError(ecf_error)
                 if electronic_document and enqueue_enabled:
-                    transaction.on_commit(
-                        lambda document_id=electronic_document.id, user_id=getattr(user, "id", None): self._enqueue_after_commit(document_id, user_id)
-                    )
+                    self._schedule_enqueue(electronic_document, getattr(user, "id", None))
 
         sale.refresh_from_db()
         invoice.refresh_from_db()
@@ -319,6 +317,13 @@ class InvoiceCreationService:
                 for item in normalized_details
             ]
         )
+        DailySalesRollupService().record_invoice(
+            invoice,
+            lines=[
+                InvoiceLine(category_id=item["product"].category_id, amount=item["subtotal"], quantity=item["quantity"])
+                for item in normalized_details
+            ],
+        )
         return invoice
 
     def _lock_and_normalize_details(self, details: list[dict], decrement_stock: bool, company: Company | None) -> list[dict]:
@@ -354,6 +359,7 @@ class InvoiceCreationService:
         if decrement_stock:
             for item in normalized:
                 Product.objects.filter(pk=item["product"].pk).update(stock=F("stock") - item["quantity"])
+            invalidate_product_records(item["product"].pk for item in normalized)
         return normalized
 
     def _commit_invoice_inventory(self, invoice: Invoice) -> None:
@@ -387,6 +393,7 @@ class InvoiceCreationService:
             Product.objects.filter(pk=detail.product_id, company=invoice.company).update(
                 stock=F("stock") - detail.quantity
             )
+        invalidate_product_records(product_ids)
 
     def _resolve_company(self, *, client_id: int | None, details: list[dict], company: Company | None) -> Company:
         if company:
@@ -428,6 +435,12 @@ class InvoiceCreationService:
         eligible_statuses = set(getattr(settings, "ECF_AUTO_CREATE_INVOICE_STATUSES", ("paid", "pending")))
         return invoice.receipt_type == "invoice" and invoice.status in eligible_statuses
 
+    def _schedule_enqueue(self, document: ElectronicFiscalDocument, user_id: int | None) -> None:
+        if getattr(settings, "ECF_AUTO_ENQUEUE_MODE", "outbox") == "outbox":
+            record_submission_pipeline(document, user_id=user_id)
+            return
+        transaction.on_commit(lambda document_id=document.id: self._enqueue_after_commit(document_id, user_id))
+
     def _enqueue_after_commit(self, document_id: int, user_id: int | None) -> None:
         try:
             enqueue_submission_pipeline(document_id, user_id=user_id)
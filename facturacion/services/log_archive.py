@@ -0,0 +1,101 @@
+"""Move cold audit-log months out of the hot tables into compressed archive tables."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime
+
+from django.conf import settings
+from django.db import models, transaction
+from django.utils import timezone
+
+from facturacion.models import (
+    ArchivedLogRow,
+    DGIIPublicRequestLog,
+    DGIIPublicRequestLogArchive,
+    ECFEventLog,
+    ECFEventLogArchive,
+    ECFStatusEvent,
+    ECFStatusEventArchive,
+)
+
+
+@dataclass(frozen=True)
+class LogArchiveSpec:
+    label: str
+    model: type[models.Model]
+    archive_model: type[ArchivedLogRow]
+
+
+@dataclass(frozen=True)
+class LogArchiveResult:
+    label: str
+    cutoff: datetime
+    moved: int
+
+
+LOG_ARCHIVE_SPECS = (
+    LogArchiveSpec('ecf_events', ECFEventLog, ECFEventLogArchive),
+    LogArchiveSpec('ecf_status_events', ECFStatusEvent, ECFStatusEventArchive),
+    LogArchiveSpec('dgii_public_requests', DGIIPublicRequestLog, DGIIPublicRequestLogArchive),
+)
+
+
+class LogArchiveService:
+    """Archive whole months older than the hot window, one batch per transaction.
+
+    Each batch copies rows into the archive table (same id, bulky columns
+    compressed) and deletes them from the hot table in the same transaction,
+    so a crash never loses or duplicates a row and reruns pick up where the
+    last one stopped.
+    """
+
+    def __init__(self, hot_months: int | None = None, batch_size: int | None = None) -> None:
+        self.hot_months = getattr(settings, 'AUDIT_LOG_HOT_MONTHS', 6) if hot_months is None else hot_months
+        self.batch_size = batch_size or getattr(settings, 'AUDIT_LOG_ARCHIVE_BATCH_SIZE', 1000)
+
+    def cutoff(self, now: datetime | None = None) -> datetime:
+        """Start of the oldest month kept hot; rows created before it are archived."""
+        today = timezone.localtime(now or timezone.now()).date()
+        months = today.year * 12 + today.month - 1 - max(0, self.hot_months)
+        start = today.replace(year=months // 12, month=months % 12 + 1, day=1)
+        return timezone.make_aware(datetime.combine(start, datetime.min.time()))
+
+    def pending(self, labels: list[str] | None = None, now: datetime | None = None) -> list[LogArchiveResult]:
+        cutoff = self.cutoff(now)
+        return [
+            LogArchiveResult(spec.label, cutoff, spec.model.objects.filter(created_at__lt=cutoff).count())
+            for spec in self._specs(labels)
+        ]
+
+    def archive(self, labels: list[str] | None = None, now: datetime | None = None) -> list[LogArchiveResult]:
+        cutoff = self.cutoff(now)
+        results = []
+        for spec in self._specs(labels):
+            moved = 0
+            while batch := self._archive_batch(spec, cutoff):
+                moved += batch
+            results.append(LogArchiveResult(spec.label, cutoff, moved))
+        return results
+
+    def _archive_batch(self, spec: LogArchiveSpec, cutoff: datetime) -> int:
+        with transaction.atomic():
+            rows = list(
+                spec.model.objects
+                .select_for_update(skip_locked=True)
+                .filter(created_at__lt=cutoff)
+                .order_by('id')[:self.batch_size]
+            )
+            if not rows:
+                return 0
+            spec.archive_model.objects.bulk_create(
+                [spec.archive_model.from_row(row) for row in rows],
+                ignore_conflicts=True,
+            )
+            spec.model.objects.filter(pk__in=[row.pk for row in rows]).delete()
+        return len(rows)
+
+    def _specs(self, labels: list[str] | None) -> list[LogArchiveSpec]:
+        if not labels:
+            return list(LOG_ARCHIVE_SPECS)
+        return [spec for spec in LOG_ARCHIVE_SPECS if spec.label in labels]
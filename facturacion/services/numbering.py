@@ -4,8 +4,11 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 
+from django.apps import apps
 from django.core.exceptions import ValidationError
-from django.db import IntegrityError, transaction
+from django.db import IntegrityError, connection, transaction
+from django.db.models.functions import Greatest
+from django.utils import timezone
 
 from facturacion.models import Company, NumberSequence
 
@@ -17,13 +20,22 @@ class SequenceDefinition:
     prefix: str
     suffix: str
     padding: int
+    # Rows numbered by this sequence; scanned when the sequence is first created.
+    model_label: str
+    field_name: str
 
 
 DEFAULT_SEQUENCES = {
-    'invoice': SequenceDefinition('commercial', 'invoice', 'FAC-', '', 8),
-    'quotation': SequenceDefinition('commercial', 'quotation', 'COT-', '', 8),
-    'credit_note': SequenceDefinition('commercial', 'credit_note', 'NC-', '', 8),
-    'product_internal_code': SequenceDefinition('internal', 'product_internal_code', 'PRD-', '', 8),
+    'invoice': SequenceDefinition('commercial', 'invoice', 'FAC-', '', 8, 'facturacion.Invoice', 'invoice_number'),
+    'quotation': SequenceDefinition(
+        'commercial', 'quotation', 'COT-', '', 8, 'facturacion.Quotation', 'quotation_number',
+    ),
+    'credit_note': SequenceDefinition(
+        'commercial', 'credit_note', 'NC-', '', 8, 'facturacion.CreditNote', 'credit_note_number',
+    ),
+    'product_internal_code': SequenceDefinition(
+        'internal', 'product_internal_code', 'PRD-', '', 8, 'facturacion.Product', 'barcode',
+    ),
 }
 
 
@@ -32,6 +44,8 @@ class NumberingService:
 
     max_retries = 3
     max_collision_skips = 100
+    # Backends allocating with a single UPDATE ... RETURNING; others lock and save.
+    update_returning_vendors = frozenset({'postgresql'})
 
     def allocate_unique(self, *, code: str, model_class, field_name: str, company: Company) -> str:
         """Return the next unused formatted number for the given model field."""
@@ -50,8 +64,96 @@ class NumberingService:
                 last_error = exc
         raise ValidationError(f"No fue posible asignar una secuencia unica para {code}: {last_error}")
 
+    def allocate_block(self, *, code: str, model_class, field_name: str, company: Company, count: int) -> list[str]:
+        """Reserve ``count`` unused formatted numbers under a single sequence lock.
+
+        Bulk imports use this instead of one allocate_unique() per row; numbers
+        inside the legacy-import window are probed with one query per pass.
+        """
+        if count <= 0:
+            return []
+        if not company or not getattr(company, 'pk', None):
+            raise ValidationError(f"La secuencia {code} requiere una empresa activa.")
+
+        with transaction.atomic():
+            sequence = self._locked_sequence(code, company=company)
+            allocated: list[str] = []
+            assigned = sequence.next_number
+            while len(allocated) < count:
+                candidates = [sequence.format_number(number) for number in range(assigned, assigned + count - len(allocated))]
+                taken = set()
+                if sequence.legacy_max_number is not None and assigned <= sequence.legacy_max_number:
+                    taken = set(
+                        model_class.objects
+                        .filter(company=company, **{f'{field_name}__in': candidates})
+                        .values_list(field_name, flat=True)
+                    )
+                allocated.extend(value for value in candidates if value not in taken)
+                assigned += len(candidates)
+            sequence.next_number = assigned
+            sequence.save(update_fields=['next_number', 'updated_at'])
+        return allocated
+
+    def mark_legacy_import(self, *, code: str, model_class, field_name: str, company: Company) -> int | None:
+        """Flag numbers written outside the sequence so allocation probes past them.
+
+        Call after importing rows that already carry formatted numbers. Returns
+        the highest imported number that still lies ahead of the sequence.
+        """
+        with transaction.atomic():
+            sequence = self._locked_sequence(code, company=company)
+            values = (
+                model_class.objects
+                .filter(company=company, **{f'{field_name}__startswith': sequence.prefix})
+                .values_list(field_name, flat=True)
+            )
+            numbers = [number for number in map(sequence.parse_number, values) if number is not None]
+            return self._raise_legacy_mark(sequence, max(numbers, default=None))
+
+    def note_external_number(self, *, code: str, company: Company, value: str) -> int | None:
+        """Flag a single number entered outside the sequence, e.g. a typed barcode."""
+        definition = DEFAULT_SEQUENCES.get(code)
+        if not value or not definition or not value.startswith(definition.prefix):
+            return None
+        with transaction.atomic():
+            sequence = self._locked_sequence(code, company=company)
+            return self._raise_legacy_mark(sequence, sequence.parse_number(value))
+
+    def note_external_numbers(self, *, code: str, company: Company, values) -> int | None:
+        """Flag the highest of many numbers entered outside the sequence (bulk imports)."""
+        definition = DEFAULT_SEQUENCES.get(code)
+        if not definition:
+            return None
+        values = [value for value in values if value and value.startswith(definition.prefix)]
+        if not values:
+            return None
+        with transaction.atomic():
+            sequence = self._locked_sequence(code, company=company)
+            numbers = [number for number in map(sequence.parse_number, values) if number is not None]
+            return self._raise_legacy_mark(sequence, max(numbers, default=None))
+
+    def _raise_legacy_mark(self, sequence: NumberSequence, number: int | None) -> int | None:
+        if number is None or number < sequence.next_number:
+            return None
+        NumberSequence.objects.filter(pk=sequence.pk).update(
+            legacy_max_number=Greatest('legacy_max_number', number) if sequence.legacy_max_number else number,
+            updated_at=timezone.now(),
+        )
+        return number
+
     @transaction.atomic
     def _allocate_unique_atomic(self, *, code: str, model_class, field_name: str, company: Company) -> str:
+        if connection.vendor in self.update_returning_vendors:
+            allocated = self._allocate_returning(code, company=company)
+            if allocated is None:
+                self._create_default_sequence(code, company=company)
+                allocated = self._allocate_returning(code, company=company)
+            sequence, assigned = allocated
+            formatted = sequence.format_number(assigned)
+            if not self._collides(sequence, assigned, formatted, model_class, field_name, company):
+                return formatted
+            # The UPDATE already holds the row lock; keep skipping on the slow path.
+
         sequence = self._locked_sequence(code, company=company)
 
         for _ in range(self.max_collision_skips):
@@ -60,12 +162,45 @@ class NumberingService:
             sequence.next_number = assigned + 1
             sequence.save(update_fields=['next_number', 'updated_at'])
 
-            lookup = {field_name: formatted}
-            if not model_class.objects.filter(company=company, **lookup).exists():
+            if not self._collides(sequence, assigned, formatted, model_class, field_name, company):
                 return formatted
 
         raise ValidationError(f"La secuencia {code} encontro demasiadas colisiones consecutivas.")
 
+    def _allocate_returning(self, code: str, *, company: Company) -> tuple[NumberSequence, int] | None:
+        """Increment the default sequence in one UPDATE ... RETURNING round-trip."""
+        quote = connection.ops.quote_name
+        sql = (
+            f"UPDATE {quote(NumberSequence._meta.db_table)} "
+            "SET next_number = next_number + 1, updated_at = %s "
+            "WHERE company_id = %s AND code = %s AND scope_key = %s AND branch_code = %s "
+            "AND issuer_id IS NULL AND is_active = %s "
+            "RETURNING id, next_number, prefix, suffix, padding, legacy_max_number"
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [timezone.now(), company.pk, code, 'default', '', True])
+            row = cursor.fetchone()
+        if row is None:
+            return None
+        pk, next_number, prefix, suffix, padding, legacy_max_number = row
+        sequence = NumberSequence(
+            pk=pk,
+            company=company,
+            code=code,
+            prefix=prefix,
+            suffix=suffix,
+            padding=padding,
+            next_number=next_number,
+            legacy_max_number=legacy_max_number,
+        )
+        return sequence, next_number - 1
+
+    def _collides(self, sequence: NumberSequence, assigned: int, formatted: str, model_class, field_name: str, company: Company) -> bool:
+        # Numbers past the last flagged legacy import cannot already exist.
+        if sequence.legacy_max_number is None or assigned > sequence.legacy_max_number:
+            return False
+        return model_class.objects.filter(company=company, **{field_name: formatted}).exists()
+
     def _locked_sequence(self, code: str, *, company: Company) -> NumberSequence:
         sequence = (
             NumberSequence.objects
@@ -100,7 +235,7 @@ class NumberingService:
         definition = DEFAULT_SEQUENCES.get(code)
         if not definition:
             raise ValidationError(f"No existe definicion de secuencia para {code}.")
-        NumberSequence.objects.get_or_create(
+        sequence, created = NumberSequence.objects.get_or_create(
             company=company,
             code=code,
             scope_key='default',
@@ -116,3 +251,14 @@ class NumberingService:
                 'is_active': True,
             },
         )
+        if created:
+            # Rows may predate the sequence (bulk inserts, legacy data): flag them
+            # so allocation probes past them instead of reissuing number 1.
+            model_class = apps.get_model(definition.model_label)
+            values = (
+                model_class.objects
+                .filter(company=company, **{f'{definition.field_name}__startswith': definition.prefix})
+                .values_list(definition.field_name, flat=True)
+            )
+            numbers = [number for number in map(sequence.parse_number, values) if number is not None]
+            self._raise_legacy_mark(sequence, max(numbers, default=None))
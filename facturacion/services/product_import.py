@@ -0,0 +1,349 @@
+"""Streaming CSV/XLSX product catalogue import with set-based writes."""
+
+from __future__ import annotations
+
+import csv
+import io
+import itertools
+import re
+import unicodedata
+from dataclasses import dataclass, field
+from decimal import Decimal, InvalidOperation
+from pathlib import Path
+from typing import IO, Iterable, Iterator
+
+from django.conf import settings
+from django.db import DataError, IntegrityError, transaction
+
+from facturacion.models import Category, Company, Product, ProductHistory
+from facturacion.services.barcode_map import invalidate_company_barcodes
+from facturacion.services.numbering import NumberingService
+from facturacion.services.product_history import ProductBulkUpdateService
+from facturacion.services.response_cache import DASHBOARD_NAMESPACE, invalidate_tenant_responses
+
+
+IMPORT_NOTE = 'Importación masiva'
+BARCODE_SEQUENCE = 'product_internal_code'
+SUPPORTED_SUFFIXES = {'.csv', '.xlsx'}
+
+COLUMN_ALIASES = {
+    'name': {'name', 'nombre', 'producto'},
+    'description': {'description', 'descripcion'},
+    'price': {'price', 'precio'},
+    'stock': {'stock', 'existencia', 'cantidad'},
+    'category': {'category', 'categoria'},
+    'min_stock': {'min stock', 'stock minimo'},
+    'barcode': {'barcode', 'codigo de barras', 'codigo barras', 'codigo'},
+}
+_HEADER_LOOKUP = {alias: column for column, aliases in COLUMN_ALIASES.items() for alias in aliases}
+# Columns a row needs when its barcode does not match an existing product.
+REQUIRED_FOR_CREATE = (('name', 'nombre'), ('price', 'precio'), ('category', 'categoria'))
+MAX_PRICE = Decimal('99999999.99')
+
+
+@dataclass(frozen=True)
+class ProductImportRowError:
+    row: int
+    message: str
+
+
+@dataclass
+class ProductImportResult:
+    created: int = 0
+    updated: int = 0
+    errors: list[ProductImportRowError] = field(default_factory=list)
+    dry_run: bool = False
+
+
+@dataclass(frozen=True)
+class _ImportRow:
+    row: int
+    values: dict
+
+
+class ProductImportService:
+    """Create or update a company's products from a CSV/XLSX file.
+
+    Rows are read one at a time and written in chunks: existing products are
+    matched by barcode with one query, updated through ProductBulkUpdateService
+    and new ones inserted with bulk_create; rows without a barcode receive a
+    block of internal codes from a single sequence allocation. Invalid rows
+    are reported by row number and never stop the rest of the file.
+    """
+
+    def __init__(self, company: Company, chunk_size: int | None = None, dry_run: bool = False) -> None:
+        self.company = company
+        self.chunk_size = chunk_size or int(getattr(settings, 'PRODUCT_IMPORT_CHUNK_SIZE', 1000))
+        self.dry_run = dry_run
+
+    def import_file(self, file: IO[bytes], filename: str) -> ProductImportResult:
+        result = ProductImportResult(dry_run=self.dry_run)
+        seen_barcodes: dict[str, int] = {}
+        chunk: list[_ImportRow] = []
+        columns: list[str] = []
+        for row_number, raw in read_product_rows(file, filename):
+            columns = list(raw)
+            row = self._parse_row(row_number, raw, seen_barcodes, result)
+            if row is not None:
+                chunk.append(row)
+            if len(chunk) >= self.chunk_size:
+                self._write_chunk(chunk, columns, result)
+                chunk = []
+        if chunk:
+            self._write_chunk(chunk, columns, result)
+
+        if result.created and not self.dry_run:
+            # bulk_create sends no post_save, so drop the cached dashboard and scan map here.
+            invalidate_tenant_responses(self.company.pk, [DASHBOARD_NAMESPACE])
+            invalidate_company_barcodes(self.company.pk)
+        result.errors.sort(key=lambda error: error.row)
+        return result
+
+    def _parse_row(
+        self,
+        row_number: int,
+        raw: dict,
+        seen_barcodes: dict[str, int],
+        result: ProductImportResult,
+    ) -> _ImportRow | None:
+        values, problems = {}, []
+        for column, text in raw.items():
+            if text is None:
+                continue
+            try:
+                values[column] = _PARSERS[column](text)
+            except ValueError as exc:
+                problems.append(str(exc))
+
+        barcode = values.get('barcode')
+        if barcode:
+            if barcode in seen_barcodes:
+                problems.append(f"Código de barras '{barcode}' repetido en la fila {seen_barcodes[barcode]}.")
+            else:
+                seen_barcodes[barcode] = row_number
+
+        if problems:
+            result.errors.append(ProductImportRowError(row_number, ' '.join(problems)))
+            return None
+        return _ImportRow(row_number, values)
+
+    def _write_chunk(self, rows: list[_ImportRow], columns: list[str], result: ProductImportResult) -> None:
+        existing = {
+            product.barcode: product
+            for product in Product.objects.filter(
+                company=self.company,
+                barcode__in=[row.values['barcode'] for row in rows if row.values.get('barcode')],
+            )
+        }
+        updates, creates = [], []
+        for row in rows:
+            product = existing.get(row.values.get('barcode'))
+            if product is not None:
+                updates.append((row, product))
+                continue
+            missing = [label for column, label in REQUIRED_FOR_CREATE if row.values.get(column) is None]
+            if missing:
+                result.errors.append(
+                    ProductImportRowError(
+                        row.row,
+                        f"Producto nuevo sin {', '.join(missing)}.",
+                    )
+                )
+                continue
+            creates.append(row)
+
+        if self.dry_run:
+            result.created += len(creates)
+            result.updated += len(updates)
+            return
+
+        try:
+            with transaction.atomic():
+                categories = self._categories({row.values['category'] for row in rows if row.values.get('category')})
+                self._update(updates, [column for column in columns if column != 'barcode'], categories)
+                self._create(creates, categories)
+        except (IntegrityError, DataError) as exc:
+            result.errors.extend(
+                ProductImportRowError(row.row, f"Lote rechazado por la base de datos: {exc}")
+                for row in [row for row, _product in updates] + creates
+            )
+            return
+        result.created += len(creates)
+        result.updated += len(updates)
+
+    def _categories(self, names: set[str]) -> dict[str, Category]:
+        categories = {category.name: category for category in Category.objects.filter(company=self.company, name__in=names)}
+        missing = [Category(company=self.company, name=name) for name in sorted(names - set(categories))]
+        for category in Category.objects.bulk_create(missing):
+            categories[category.name] = category
+        return categories
+
+    def _update(self, updates: list[tuple[_ImportRow, Product]], fields: list[str], categories: dict[str, Category]) -> None:
+        if not updates or not fields:
+            return
+        for row, product in updates:
+            for column in fields:
+                if column not in row.values:
+                    continue
+                value = row.values[column]
+                setattr(product, column, categories[value] if column == 'category' else value)
+        ProductBulkUpdateService(batch_size=self.chunk_size).update(
+            [product for _row, product in updates],
+            fields,
+            note=IMPORT_NOTE,
+        )
+
+    def _create(self, rows: list[_ImportRow], categories: dict[str, Category]) -> None:
+        typed = [row for row in rows if row.values.get('barcode')]
+        untyped = [row for row in rows if not row.values.get('barcode')]
+        numbering = NumberingService()
+
+        # Typed codes go in first so the block allocation probes past them.
+        self._insert([self._product(row, categories) for row in typed])
+        numbering.note_external_numbers(
+            code=BARCODE_SEQUENCE,
+            company=self.company,
+            values=[row.values['barcode'] for row in typed],
+        )
+        barcodes = numbering.allocate_block(
+            code=BARCODE_SEQUENCE,
+            model_class=Product,
+            field_name='barcode',
+            company=self.company,
+            count=len(untyped),
+        )
+        self._insert([self._product(row, categories, barcode) for row, barcode in zip(untyped, barcodes)])
+
+    def _product(self, row: _ImportRow, categories: dict[str, Category], barcode: str | None = None) -> Product:
+        values = dict(row.values)
+        values['category'] = categories[values['category']]
+        if barcode:
+            values['barcode'] = barcode
+        values.setdefault('stock', 0)
+        return Product(company=self.company, **values)
+
+    def _insert(self, products: list[Product]) -> None:
+        if not products:
+            return
+        Product.objects.bulk_create(products, batch_size=self.chunk_size)
+        ProductHistory.objects.bulk_create(
+            [
+                ProductHistory(
+                    product=product,
+                    action='created',
+                    changed_fields=product.creation_history(product.category.name),
+                    note=IMPORT_NOTE,
+                )
+                for product in products
+            ],
+            batch_size=self.chunk_size,
+        )
+        for product in products:
+            product.take_history_snapshot()
+
+
+def read_product_rows(file: IO[bytes], filename: str) -> Iterator[tuple[int, dict]]:
+    """Yield (row number, {column: text or None}) for each non-empty data row."""
+    suffix = Path(filename).suffix.lower()
+    if suffix == '.csv':
+        yield from _csv_rows(file)
+    elif suffix == '.xlsx':
+        yield from _xlsx_rows(file)
+    else:
+        raise ValueError('El catálogo debe ser un archivo .csv o .xlsx.')
+
+
+def _csv_rows(file: IO[bytes]) -> Iterator[tuple[int, dict]]:
+    text = io.TextIOWrapper(file, encoding='utf-8-sig', newline='')
+    try:
+        first_line = text.readline()
+        delimiter = ';' if first_line.count(';') > first_line.count(',') else ','
+        yield from _mapped_rows(csv.reader(itertools.chain([first_line], text), delimiter=delimiter))
+    finally:
+        text.detach()
+
+
+def _xlsx_rows(file: IO[bytes]) -> Iterator[tuple[int, dict]]:
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(file, read_only=True, data_only=True)
+    try:
+        yield from _mapped_rows(workbook.worksheets[0].iter_rows(values_only=True))
+    finally:
+        workbook.close()
+
+
+def _mapped_rows(rows: Iterable[Iterable]) -> Iterator[tuple[int, dict]]:
+    columns = None
+    for row_number, row in enumerate(rows, start=1):
+        cells = [_cell(value) for value in row or ()]
+        if not any(cells):
+            continue
+        if columns is None:
+            columns = {index: _HEADER_LOOKUP.get(_normalize_header(cell)) for index, cell in enumerate(cells)}
+            if not {'name', 'barcode'} & set(columns.values()):
+                raise ValueError(
+                    'El archivo no tiene encabezados reconocibles: se requiere al menos nombre o código de barras.'
+                )
+            continue
+        yield row_number, {
+            column: cells[index] if index < len(cells) else None
+            for index, column in columns.items()
+            if column
+        }
+
+
+def _cell(value) -> str | None:
+    if value is None:
+        return None
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    text = str(value).strip()
+    return text or None
+
+
+def _normalize_header(value: str | None) -> str:
+    text = unicodedata.normalize('NFKD', (value or '').lower()).encode('ascii', 'ignore').decode('ascii')
+    return re.sub(r'[\s_]+', ' ', text).strip()
+
+
+def _text(max_length: int, label: str):
+    def parse(text: str) -> str:
+        if len(text) > max_length:
+            raise ValueError(f"{label} excede {max_length} caracteres.")
+        return text
+    return parse
+
+
+def _price(text: str) -> Decimal:
+    normalized = text.replace(',', '.') if ',' in text and '.' not in text else text.replace(',', '')
+    try:
+        value = Decimal(normalized).quantize(Decimal('0.01'))
+    except InvalidOperation as exc:
+        raise ValueError(f"Precio inválido: '{text}'.") from exc
+    if value < 0 or value > MAX_PRICE:
+        raise ValueError(f"Precio fuera de rango: '{text}'.")
+    return value
+
+
+def _quantity(label: str):
+    def parse(text: str) -> int:
+        try:
+            value = Decimal(text)
+        except InvalidOperation as exc:
+            raise ValueError(f"{label} inválido: '{text}'.") from exc
+        if not value.is_finite() or value < 0 or value != value.to_integral_value():
+            raise ValueError(f"{label} debe ser un entero no negativo: '{text}'.")
+        return int(value)
+    return parse
+
+
+_PARSERS = {
+    'name': _text(Product._meta.get_field('name').max_length, 'Nombre'),
+    'description': str,
+    'price': _price,
+    'stock': _quantity('Stock'),
+    'category': _text(Category._meta.get_field('name').max_length, 'Categoría'),
+    'min_stock': _quantity('Stock mínimo'),
+    'barcode': _text(Product._meta.get_field('barcode').max_length, 'Código de barras'),
+}
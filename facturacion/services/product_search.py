@@ -0,0 +1,79 @@
+"""Product catalogue search for the inventory list and POS typeahead."""
+
+from __future__ import annotations
+
+from django.db import connections
+from django.db.models import Case, IntegerField, Q, QuerySet, Value, When
+from django.db.models.functions import Greatest
+
+# Text search configuration baked into the description full-text index (migration 0053).
+SEARCH_CONFIG = 'spanish'
+
+
+class ProductSearchService:
+    """Search a product queryset by name, barcode and description.
+
+    Terms match name/barcode/description substrings (served on PostgreSQL by
+    pg_trgm GIN indexes) or, on PostgreSQL, description words through a
+    tsvector GIN index. Ranked results put an exact barcode hit first, then
+    order by trigram similarity (prefix match elsewhere). Scanner input
+    (``scan=True``) short-circuits to the exact barcode through the unique
+    (company, barcode) index and only searches when nothing matches.
+    """
+
+    barcode_max_length = 50
+
+    def search(self, queryset: QuerySet, term: str, rank: bool = True, scan: bool = False) -> QuerySet:
+        term = (term or '').strip()
+        if not term:
+            return queryset
+
+        if scan and self._looks_like_barcode(term):
+            exact = queryset.filter(barcode=term)
+            if exact.exists():
+                return exact
+
+        if connections[queryset.db].vendor == 'postgresql':
+            return self._postgres_search(queryset, term, rank)
+        return self._fallback_search(queryset, term, rank)
+
+    def _postgres_search(self, queryset: QuerySet, term: str, rank: bool) -> QuerySet:
+        from django.contrib.postgres.search import SearchQuery, SearchVector, TrigramSimilarity
+
+        queryset = queryset.annotate(
+            description_vector=SearchVector('description', config=SEARCH_CONFIG),
+        ).filter(
+            Q(name__icontains=term)
+            | Q(barcode__icontains=term)
+            | Q(description__icontains=term)
+            | Q(description_vector=SearchQuery(term, config=SEARCH_CONFIG, search_type='websearch'))
+        )
+        if not rank:
+            return queryset
+        return queryset.annotate(
+            exact_barcode=self._exact_barcode(term),
+            search_rank=Greatest(TrigramSimilarity('name', term), TrigramSimilarity('barcode', term)),
+        ).order_by('-exact_barcode', '-search_rank', 'name', 'id')
+
+    def _fallback_search(self, queryset: QuerySet, term: str, rank: bool) -> QuerySet:
+        queryset = queryset.filter(
+            Q(name__icontains=term)
+            | Q(description__icontains=term)
+            | Q(barcode__icontains=term)
+        )
+        if not rank:
+            return queryset
+        return queryset.annotate(
+            exact_barcode=self._exact_barcode(term),
+            search_rank=Case(
+                When(Q(name__istartswith=term) | Q(barcode__istartswith=term), then=Value(1)),
+                default=Value(0),
+                output_field=IntegerField(),
+            ),
+        ).order_by('-exact_barcode', '-search_rank', 'name', 'id')
+
+    def _exact_barcode(self, term: str) -> Case:
+        return Case(When(barcode=term, then=Value(1)), default=Value(0), output_field=IntegerField())
+
+    def _looks_like_barcode(self, term: str) -> bool:
+        return len(term) <= self.barcode_max_length and not any(char.isspace() for char in term)
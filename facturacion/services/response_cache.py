@@ -0,0 +1,87 @@
+"""Per-company cache for read-only endpoints that the frontend polls."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import time
+from typing import Any, Callable, Iterable, Mapping
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+
+DASHBOARD_NAMESPACE = "dashboard"
+ECF_MONITOR_NAMESPACE = "ecf-async-monitor"
+
+_KEY_PREFIX = "tenant-response"
+
+
+class TenantResponseCache:
+    """Cache response payloads per (company, permission tier, query params).
+
+    Each company and namespace carries a version token; invalidating bumps the
+    token so every cached variant of that company's responses is skipped at
+    once, while TENANT_RESPONSE_CACHE_TTL_SECONDS bounds staleness for writes
+    that bypass model signals (queryset.update, bulk_update).
+    """
+
+    def __init__(self, namespace: str) -> None:
+        self.namespace = namespace
+
+    def get_or_compute(
+        self,
+        company_id: int | None,
+        tier: str,
+        params: Mapping[str, Any],
+        compute: Callable[[], Any],
+    ) -> Any:
+        ttl = int(getattr(settings, "TENANT_RESPONSE_CACHE_TTL_SECONDS", 15))
+        if ttl <= 0 or company_id is None:
+            return compute()
+
+        key = self._key(company_id, tier, params)
+        payload = cache.get(key)
+        if payload is None:
+            payload = compute()
+            cache.set(key, payload, ttl)
+        return payload
+
+    def _key(self, company_id: int, tier: str, params: Mapping[str, Any]) -> str:
+        encoded = json.dumps(sorted((str(name), str(value)) for name, value in params.items()))
+        params_hash = hashlib.sha256(encoded.encode("utf-8")).hexdigest()[:32]
+        version = _version(self.namespace, company_id)
+        return f"{_KEY_PREFIX}:{self.namespace}:{company_id}:{version}:{tier}:{params_hash}"
+
+
+def invalidate_tenant_responses(company_id: int | None, namespaces: Iterable[str]) -> None:
+    """Drop cached responses for a company now and again once the transaction commits.
+
+    The second bump discards anything a concurrent request cached from data
+    read before this transaction became visible.
+    """
+    if company_id is None:
+        return
+    namespaces = tuple(namespaces)
+    _bump(company_id, namespaces)
+    transaction.on_commit(lambda: _bump(company_id, namespaces))
+
+
+def _version_key(namespace: str, company_id: int) -> str:
+    return f"{_KEY_PREFIX}:{namespace}:{company_id}:version"
+
+
+def _version(namespace: str, company_id: int) -> int:
+    key = _version_key(namespace, company_id)
+    version = cache.get(key)
+    if version is None:
+        # A fresh token (rather than 0) keeps an evicted version key from
+        # resurrecting entries cached under an earlier token.
+        cache.add(key, time.time_ns(), None)
+        version = cache.get(key)
+    return version
+
+
+def _bump(company_id: int, namespaces: tuple[str, ...]) -> None:
+    cache.set_many({_version_key(namespace, company_id): time.time_ns() for namespace in namespaces}, None)
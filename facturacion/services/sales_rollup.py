@@ -0,0 +1,338 @@
+"""Incremental per-company daily sales rollup backing the dashboard."""
+
+from __future__ import annotations
+
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import date
+from decimal import Decimal
+from typing import Iterable
+
+from django.db import IntegrityError, connection, transaction
+from django.db.models import Count, F, Sum, Value
+from django.db.models.functions import Coalesce, TruncDate
+from django.utils import timezone
+
+from facturacion.models import Company, DailySalesRollup, ElectronicFiscalDocument, Invoice, InvoiceDetail
+from facturacion.services.response_cache import DASHBOARD_NAMESPACE, invalidate_tenant_responses
+
+
+NO_FISCAL_STATUS = ''
+
+# (company_id, day, category_id, status, fiscal_status); category_id None marks invoice-level rows.
+RollupKey = tuple[int, date, int | None, str, str]
+
+# Backends whose ON CONFLICT accepts the partial unique indexes below as arbiters.
+UPSERT_VENDORS = {'postgresql', 'sqlite'}
+# Conflict targets matching DailySalesRollup's two partial unique constraints.
+INVOICE_ROW_CONFLICT = (('company_id', 'day', 'status', 'fiscal_status'), 'category_id IS NULL')
+CATEGORY_ROW_CONFLICT = (('company_id', 'day', 'category_id', 'status', 'fiscal_status'), 'category_id IS NOT NULL')
+
+
+@dataclass
+class RollupMeasures:
+    invoice_count: int = 0
+    total_amount: Decimal = Decimal('0.00')
+    line_amount: Decimal = Decimal('0.00')
+    quantity: int = 0
+
+    def add(self, other: 'RollupMeasures', sign: int = 1) -> None:
+        self.invoice_count += sign * other.invoice_count
+        self.total_amount += sign * other.total_amount
+        self.line_amount += sign * other.line_amount
+        self.quantity += sign * other.quantity
+
+    def is_zero(self) -> bool:
+        return not (self.invoice_count or self.total_amount or self.line_amount or self.quantity)
+
+
+@dataclass(frozen=True)
+class InvoiceLine:
+    category_id: int
+    amount: Decimal
+    quantity: int
+
+
+@dataclass(frozen=True)
+class DailySalesRebuildResult:
+    deleted: int
+    created: int
+
+
+class DailySalesRollupService:
+    """Keep DailySalesRollup in step with invoice writes using additive deltas.
+
+    Every change is expressed as "remove the old contribution, add the new
+    one" and applied as relative increments in an INSERT ... ON CONFLICT DO
+    UPDATE per row kind, so checkouts never read-lock the rollup rows and
+    concurrent writers touching the same day never overwrite each other.
+    """
+
+    def record_invoice(self, invoice: Invoice, lines: Iterable[InvoiceLine] | None = None) -> None:
+        """Add a newly created invoice to the rollup."""
+        lines = list(lines) if lines is not None else self._lines(invoice.pk)
+        contribution = self._contribution(invoice, invoice.status, self._fiscal_status(invoice), lines)
+        self._apply(contribution)
+
+    def retract_invoice(self, invoice: Invoice) -> None:
+        """Remove an invoice's current contribution, e.g. before deleting or editing it."""
+        contribution = self._contribution(invoice, invoice.status, self._fiscal_status(invoice), self._lines(invoice.pk))
+        self._apply(contribution, sign=-1)
+
+    def move_invoice(
+        self,
+        invoice: Invoice,
+        *,
+        previous_status: str | None = None,
+        previous_fiscal_status: str | None = None,
+    ) -> None:
+        """Move an invoice between status and/or fiscal_status rows."""
+        status = invoice.status
+        fiscal_status = self._fiscal_status(invoice)
+        old_status = previous_status if previous_status is not None else status
+        old_fiscal_status = previous_fiscal_status if previous_fiscal_status is not None else fiscal_status
+        if (old_status, old_fiscal_status) == (status, fiscal_status):
+            return
+        lines = self._lines(invoice.pk)
+        delta = self._contribution(invoice, status, fiscal_status, lines)
+        self._merge(delta, self._contribution(invoice, old_status, old_fiscal_status, lines), sign=-1)
+        self._apply(delta)
+
+    def move_fiscal_status_many(self, changes: Iterable[tuple[int, str, str]]) -> None:
+        """Move many invoices between fiscal_status rows: (invoice_id, previous, new)."""
+        changes = [change for change in changes if change[1] != change[2]]
+        if not changes:
+            return
+        invoices = Invoice.objects.in_bulk([invoice_id for invoice_id, _previous, _new in changes])
+        lines_by_invoice: dict[int, list[InvoiceLine]] = defaultdict(list)
+        for row in self._line_rows(InvoiceDetail.objects.filter(invoice_id__in=invoices.keys()), 'invoice_id'):
+            lines_by_invoice[row['invoice_id']].append(self._line(row))
+
+        delta: dict[RollupKey, RollupMeasures] = {}
+        for invoice_id, previous, new in changes:
+            invoice = invoices.get(invoice_id)
+            if invoice is None:
+                continue
+            lines = lines_by_invoice[invoice_id]
+            self._merge(delta, self._contribution(invoice, invoice.status, new, lines))
+            self._merge(delta, self._contribution(invoice, invoice.status, previous, lines), sign=-1)
+        self._apply(delta)
+
+    @transaction.atomic
+    def rebuild(self, *, company: Company | None = None, since: date | None = None) -> DailySalesRebuildResult:
+        """Recompute rollup rows from invoices, optionally for one company and/or from a day on."""
+        rollups = DailySalesRollup.objects.all()
+        invoices = Invoice.objects.all()
+        if company is not None:
+            rollups = rollups.filter(company=company)
+            invoices = invoices.filter(company=company)
+        if since is not None:
+            rollups = rollups.filter(day__gte=since)
+            invoices = invoices.annotate(rollup_day=TruncDate('created_at')).filter(rollup_day__gte=since)
+        company_ids = set(rollups.values_list('company_id', flat=True).distinct())
+        deleted, _details = rollups.delete()
+
+        invoice_rows = (
+            invoices
+            .annotate(
+                day=TruncDate('created_at'),
+                fiscal=Coalesce('electronic_document__fiscal_status', Value(NO_FISCAL_STATUS)),
+            )
+            .values('company_id', 'day', 'status', 'fiscal')
+            .annotate(invoice_count=Count('id'), total_amount=Sum('total'))
+            .order_by()
+        )
+        line_rows = (
+            InvoiceDetail.objects
+            .filter(invoice__in=invoices)
+            .annotate(
+                company_id=F('invoice__company_id'),
+                day=TruncDate('invoice__created_at'),
+                status=F('invoice__status'),
+                fiscal=Coalesce('invoice__electronic_document__fiscal_status', Value(NO_FISCAL_STATUS)),
+                category_id=F('product__category_id'),
+            )
+            .values('company_id', 'day', 'category_id', 'status', 'fiscal')
+            .annotate(line_amount=Sum('subtotal'), quantity=Sum('quantity'))
+            .order_by()
+        )
+
+        rows = [
+            DailySalesRollup(
+                company_id=row['company_id'],
+                day=row['day'],
+                status=row['status'],
+                fiscal_status=row['fiscal'],
+                invoice_count=row['invoice_count'],
+                total_amount=row['total_amount'] or Decimal('0.00'),
+            )
+            for row in invoice_rows.iterator()
+        ]
+        rows.extend(
+            DailySalesRollup(
+                company_id=row['company_id'],
+                day=row['day'],
+                category_id=row['category_id'],
+                status=row['status'],
+                fiscal_status=row['fiscal'],
+                line_amount=row['line_amount'] or Decimal('0.00'),
+                quantity=row['quantity'] or 0,
+            )
+            for row in line_rows.iterator()
+        )
+        DailySalesRollup.objects.bulk_create(rows, batch_size=1000)
+        company_ids.update(row.company_id for row in rows)
+        for company_id in company_ids:
+            invalidate_tenant_responses(company_id, [DASHBOARD_NAMESPACE])
+        return DailySalesRebuildResult(deleted=deleted, created=len(rows))
+
+    def _contribution(
+        self,
+        invoice: Invoice,
+        status: str,
+        fiscal_status: str,
+        lines: Iterable[InvoiceLine],
+    ) -> dict[RollupKey, RollupMeasures]:
+        if not invoice.company_id:
+            return {}
+        day = timezone.localdate(invoice.created_at)
+        contribution = {
+            (invoice.company_id, day, None, status, fiscal_status): RollupMeasures(
+                invoice_count=1,
+                total_amount=invoice.total or Decimal('0.00'),
+            )
+        }
+        for line in lines:
+            measures = contribution.setdefault(
+                (invoice.company_id, day, line.category_id, status, fiscal_status),
+                RollupMeasures(),
+            )
+            measures.line_amount += line.amount
+            measures.quantity += line.quantity
+        return contribution
+
+    def _merge(self, target: dict[RollupKey, RollupMeasures], source: dict[RollupKey, RollupMeasures], sign: int = 1) -> None:
+        for key, measures in source.items():
+            target.setdefault(key, RollupMeasures()).add(measures, sign)
+
+    @transaction.atomic
+    def _apply(self, delta: dict[RollupKey, RollupMeasures], sign: int = 1) -> None:
+        delta = {key: measures for key, measures in delta.items() if not measures.is_zero()}
+        if not delta:
+            return
+
+        rows = sorted(delta.items(), key=_key_order)
+        if connection.vendor not in UPSERT_VENDORS:
+            for key, measures in rows:
+                self._increment(key, measures, sign)
+            return
+
+        now = timezone.now()
+        self._upsert([row for row in rows if row[0][2] is None], sign, now, INVOICE_ROW_CONFLICT)
+        self._upsert([row for row in rows if row[0][2] is not None], sign, now, CATEGORY_ROW_CONFLICT)
+
+    def _upsert(
+        self,
+        rows: list[tuple[RollupKey, RollupMeasures]],
+        sign: int,
+        now,
+        conflict: tuple[tuple[str, ...], str],
+    ) -> None:
+        """Add deltas with one INSERT ... ON CONFLICT DO UPDATE, without reading the rows first."""
+        if not rows:
+            return
+        quote = connection.ops.quote_name
+        table = quote(DailySalesRollup._meta.db_table)
+        conflict_columns, conflict_condition = conflict
+        measures_columns = ('invoice_count', 'total_amount', 'line_amount', 'quantity')
+        columns = ('company_id', 'day', 'category_id', 'status', 'fiscal_status', *measures_columns, 'updated_at')
+        params = []
+        for key, measures in rows:
+            params.extend(key)
+            params.extend([
+                sign * measures.invoice_count,
+                sign * measures.total_amount,
+                sign * measures.line_amount,
+                sign * measures.quantity,
+                now,
+            ])
+        placeholders = ', '.join(['(' + ', '.join(['%s'] * len(columns)) + ')'] * len(rows))
+        increments = ', '.join(
+            f"{quote(column)} = {table}.{quote(column)} + EXCLUDED.{quote(column)}"
+            for column in measures_columns
+        )
+        sql = (
+            f"INSERT INTO {table} ({', '.join(quote(column) for column in columns)}) VALUES {placeholders} "
+            f"ON CONFLICT ({', '.join(quote(column) for column in conflict_columns)}) WHERE {conflict_condition} "
+            f"DO UPDATE SET {increments}, {quote('updated_at')} = EXCLUDED.{quote('updated_at')}"
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+
+    def _increment(self, key: RollupKey, measures: RollupMeasures, sign: int) -> None:
+        # Fallback for backends without partial-index ON CONFLICT upserts.
+        increments = {
+            'invoice_count': F('invoice_count') + sign * measures.invoice_count,
+            'total_amount': F('total_amount') + sign * measures.total_amount,
+            'line_amount': F('line_amount') + sign * measures.line_amount,
+            'quantity': F('quantity') + sign * measures.quantity,
+            'updated_at': timezone.now(),
+        }
+        if DailySalesRollup.objects.filter(**_lookup(key)).update(**increments):
+            return
+        try:
+            with transaction.atomic():
+                DailySalesRollup.objects.create(
+                    **_lookup(key),
+                    invoice_count=sign * measures.invoice_count,
+                    total_amount=sign * measures.total_amount,
+                    line_amount=sign * measures.line_amount,
+                    quantity=sign * measures.quantity,
+                )
+        except IntegrityError:
+            # A concurrent writer created the row first; add onto it instead.
+            DailySalesRollup.objects.filter(**_lookup(key)).update(**increments)
+
+    def _fiscal_status(self, invoice: Invoice) -> str:
+        fiscal_status = (
+            ElectronicFiscalDocument.objects
+            .filter(invoice_id=invoice.pk)
+            .values_list('fiscal_status', flat=True)
+            .first()
+        )
+        return fiscal_status or NO_FISCAL_STATUS
+
+    def _lines(self, invoice_id: int) -> list[InvoiceLine]:
+        return [self._line(row) for row in self._line_rows(InvoiceDetail.objects.filter(invoice_id=invoice_id))]
+
+    def _line_rows(self, queryset, *group_by: str):
+        return (
+            queryset
+            .values(*group_by, 'product__category_id')
+            .annotate(amount=Sum('subtotal'), total_quantity=Sum('quantity'))
+            .order_by()
+        )
+
+    def _line(self, row: dict) -> InvoiceLine:
+        return InvoiceLine(
+            category_id=row['product__category_id'],
+            amount=row['amount'] or Decimal('0.00'),
+            quantity=row['total_quantity'] or 0,
+        )
+
+
+def _lookup(key: RollupKey) -> dict:
+    company_id, day, category_id, status, fiscal_status = key
+    return {
+        'company_id': company_id,
+        'day': day,
+        'category_id': category_id,
+        'status': status,
+        'fiscal_status': fiscal_status,
+    }
+
+
+def _key_order(item):
+    # Lock rollup rows in a stable order so concurrent writers cannot deadlock.
+    company_id, day, category_id, status, fiscal_status = item[0]
+    return (company_id, day, category_id or 0, status, fiscal_status)
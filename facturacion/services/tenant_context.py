@@ -0,0 +1,106 @@
+"""Cached per-user tenant snapshot used to resolve the request company context."""
+
+from __future__ import annotations
+
+import hashlib
+from typing import Iterable
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from rest_framework.authtoken.models import Token
+
+from facturacion.models import CompanyMembership
+
+
+_KEY_PREFIX = "tenant-context"
+
+
+def cached_memberships(user) -> list[CompanyMembership]:
+    """Active memberships of active companies for a user, ordered by company name.
+
+    The list (memberships with their company) is cached per user so resolving
+    the active company costs no queries until a Company or CompanyMembership
+    write drops it; TENANT_CONTEXT_CACHE_TTL_SECONDS bounds staleness for
+    writes that bypass model signals. Signal invalidation only reaches other
+    processes through a shared cache, so the TTL defaults to 0 (no caching)
+    unless CACHE_REDIS_URL is configured.
+    """
+    ttl = _ttl()
+    if ttl <= 0:
+        return _load_memberships(user.pk)
+
+    key = _memberships_key(user.pk)
+    memberships = cache.get(key)
+    if memberships is None:
+        memberships = _load_memberships(user.pk)
+        cache.set(key, memberships, ttl)
+    return memberships
+
+
+def cached_token(key: str) -> Token | None:
+    """Return the DRF token (with its user) for a key, or None, caching the lookup."""
+    ttl = _ttl()
+    if ttl <= 0:
+        return _load_token(key)
+
+    cache_key = _token_key(key)
+    token = cache.get(cache_key)
+    if token is None:
+        token = _load_token(key)
+        if token is None:
+            return None
+        cache.set(cache_key, token, ttl)
+    return token
+
+
+def invalidate_user_context(user_ids: Iterable[int]) -> None:
+    """Drop membership snapshots now and again once the transaction commits."""
+    keys = [_memberships_key(user_id) for user_id in set(user_ids)]
+    _delete_now_and_on_commit(keys)
+
+
+def invalidate_company_context(company_id: int) -> None:
+    user_ids = CompanyMembership.objects.filter(company_id=company_id).values_list("user_id", flat=True)
+    invalidate_user_context(user_ids)
+
+
+def invalidate_tokens(keys: Iterable[str]) -> None:
+    _delete_now_and_on_commit([_token_key(key) for key in keys])
+
+
+def invalidate_user_tokens(user_id: int) -> None:
+    invalidate_tokens(Token.objects.filter(user_id=user_id).values_list("key", flat=True))
+
+
+def _load_memberships(user_id: int) -> list[CompanyMembership]:
+    return list(
+        CompanyMembership.objects
+        .select_related("company")
+        .filter(user_id=user_id, is_active=True, company__is_active=True)
+        .order_by("company__name")
+    )
+
+
+def _load_token(key: str) -> Token | None:
+    return Token.objects.select_related("user").filter(key=key).first()
+
+
+def _delete_now_and_on_commit(keys: list[str]) -> None:
+    if not keys:
+        return
+    cache.delete_many(keys)
+    transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+def _memberships_key(user_id: int) -> str:
+    return f"{_KEY_PREFIX}:memberships:{user_id}"
+
+
+def _token_key(key: str) -> str:
+    # Never put raw tokens in cache keys.
+    return f"{_KEY_PREFIX}:token:{hashlib.sha256(key.encode('utf-8')).hexdigest()}"
+
+
+def _ttl() -> int:
+    return int(getattr(settings, "TENANT_CONTEXT_CACHE_TTL_SECONDS", 0))
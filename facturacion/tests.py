@@ -2,57 +2,86 @@
 
 from __future__ import annotations
 
+import asyncio
+import dataclasses
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
 from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from decimal import Decimal
 from io import BytesIO, StringIO
 from pathlib import Path
 from types import SimpleNamespace
 from tempfile import TemporaryDirectory
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 from unittest.mock import Mock, patch
 
+import requests
 from cryptography import x509
 from cryptography.hazmat.primitives import hashes, serialization
 from cryptography.hazmat.primitives.asymmetric import rsa
 from cryptography.hazmat.primitives.serialization import pkcs12
 from cryptography.x509.oid import NameOID
+from django.conf import settings
 from django.contrib.auth.models import Group, Permission
 from django.contrib.contenttypes.models import ContentType
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.cache.backends.locmem import LocMemCache
 from django.core.exceptions import PermissionDenied, ValidationError
 from django.core.management import call_command
 from django.core.management.base import CommandError
 from django.core.files.storage import default_storage
 from django.db import IntegrityError, close_old_connections, connection, transaction
+from django.db.models import F
 from django.db.migrations.executor import MigrationExecutor
 from django.core.files.uploadedfile import SimpleUploadedFile
 from django.test import SimpleTestCase, TestCase, TransactionTestCase, override_settings, skipUnlessDBFeature
+from django.test.utils import CaptureQueriesContext
+from lxml import etree
 from rest_framework.authtoken.models import Token
 from rest_framework.test import APIRequestFactory, force_authenticate
 
-from facturacion.ecf.certificates.loader import PKCS12CertificateLoader
+from facturacion.ecf.certificates.loader import LoadedCertificateCache, PKCS12CertificateLoader
 from facturacion.ecf.certificates.metadata import ECFCertificateMetadataService, extract_rnc_candidates_from_certificate
 from facturacion.ecf.certificates.resolver import resolve_certificate_credentials
-from facturacion.ecf.exceptions import ECFValidationError
+from facturacion.ecf.exceptions import ECFCeleryUnavailable, ECFTemporaryError, ECFValidationError
+from facturacion.ecf.services.audit import audited_atomic, record_event_log
 from facturacion.ecf.services.dgii_status import DGIIStatusService
+from facturacion.ecf.services.dgii_status_batch import DGIIStatusBatchService
 from facturacion.ecf.services.dgii_submission import DGIISubmissionService
 from facturacion.ecf.services.document_factory import ECFDocumentFactoryService
 from facturacion.ecf.services.job_reconciliation import ECFJobStatusReconciliationService
+from facturacion.ecf.services.sequence_reservations import (
+    ECFSequenceReservationReconciliationService,
+    sequence_allocator,
+)
 from facturacion.ecf.services.certificate_policy import ECFCertificateSigningPolicy
 from facturacion.ecf.services.signing import ECFSigningService
+from facturacion.ecf.services.status_schedule import ECFStatusCheckSchedule
+from facturacion.ecf.services.status_transitions import ECFStatusTransitionService
 from facturacion.ecf.services.xml_generation import ECFXMLGenerationService
-from facturacion.ecf.queues.ecf import enqueue_generate_xml, enqueue_submission_pipeline
+from facturacion.ecf.queues.ecf import enqueue_generate_xml, enqueue_sign_batch, enqueue_submission_pipeline
+from facturacion.ecf.queues.outbox import ECFOutboxRelay, record_submission_pipeline
+from facturacion.ecf.rest.async_clients import AsyncDGIIRESTClient, query_status_many
 from facturacion.ecf.rest.auth import DGIIRESTAuthClient
 from facturacion.ecf.rest.clients import DGIIRESTClient
 from facturacion.ecf.rest.environments import DGIIRESTEnvironment, DGIIRESTEnvironmentResolver
 from facturacion.ecf.rest.responses import DGIIRESTToken
+from facturacion.ecf.signer import engines as signing_engines
+from facturacion.ecf.signer.engines import ECFInlineSigningEngine, ECFProcessPoolSigningEngine, get_signing_engine
 from facturacion.ecf.signer.xml_signer import ECFXMLSigner
 from facturacion.ecf.soap.auth import DGIIBearerToken
-from facturacion.ecf.soap.clients.base import SOAPCallResult
+from facturacion.ecf.soap.clients.base import SOAPCallResult, ZeepClientPool
 from facturacion.ecf.soap.environments import DGIISOAPEnvironment
 from facturacion.ecf.soap.parsers.dgii import DGIISOAPResponseParser
 from facturacion.ecf.validators.signature import ECFSignatureValidator
-from facturacion.ecf.validators.xsd import ECFXSDValidator
+from facturacion.ecf.validators.xsd import ECFXSDValidator, clear_compiled_schemas
 from facturacion.models import (
     AbonoServicio,
     Asset,
@@ -62,20 +91,26 @@ from facturacion.models import (
     Company,
     CompanyMembership,
     CreditNote,
+    DailySalesRollup,
     DGIICertificationEvent,
     DGIICertificationItem,
     DGIICertificationPlan,
     ECFCertificate,
     ECFIssuerConfig,
+    ECFArtifact,
     ECFEventLog,
+    ECFEventLogArchive,
+    ECFOutbox,
     ECFStatusEvent,
     ECFSequence,
+    ECFSequenceReservation,
     DGIIPublicRequestLog,
     ElectronicFiscalDocument,
     Invoice,
     InvoiceDetail,
     NumberSequence,
     Product,
+    ProductHistory,
     Quotation,
     Sale,
     SaleDetail,
@@ -83,6 +118,7 @@ from facturacion.models import (
 )
 from facturacion.api.serializers.ecf_runtime import ElectronicFiscalDocumentSerializer
 from facturacion.api.serializers.clients import ClientSerializer
+from facturacion.api.serializers.inventory import ProductSerializer
 from facturacion.api.serializers.sales_legacy import SaleListSerializer, SaleSerializer
 from facturacion.api.views.assets import AssetViewSet
 from facturacion.api.views.clients import ClientViewSet
@@ -91,11 +127,12 @@ from facturacion.api.views.companies import CompanyViewSet
 from facturacion.api.views.ecf_runtime import ElectronicFiscalDocumentViewSet
 from facturacion.api.views.ecf_config import ECFEventLogViewSet, ECFIssuerConfigViewSet, ECFSequenceViewSet
 from facturacion.api.views.dgii_certification import DGIICertificationPlanViewSet
-from facturacion.api.views.inventory import CategoryListCreateView, ProductListCreateView
+from facturacion.api.views.inventory import CategoryListCreateView, ProductImportView, ProductListCreateView
 from facturacion.api.views.inventory_utils import (
     GenerateBarcodeImageView,
     GenerateZPLLabelView,
     PrintLabelDirectView,
+    SearchByBarcodeBatchView,
     SearchByBarcodeView,
     generate_low_stock_pdf,
 )
@@ -105,8 +142,10 @@ from facturacion.api.views.quotations import QuotationViewSet
 from facturacion.api.views.reports import DashboardView
 from facturacion.api.views.sales_legacy import SaleCreateView, SaleListView, SalesUpdateDeleteView
 from facturacion.api.views.auth import GroupViewSet, PermissionListView, RegisterView, UserViewSet
-from facturacion.ecf.tasks.dgii import check_status, submit_dgii
+from facturacion.ecf.tasks.dgii import check_status, poll_submitted_batch, submit_dgii
+from facturacion.ecf.tasks.pipeline import process_document
 from facturacion.ecf.tasks.signing import sign_xml as sign_xml_task
+from facturacion.ecf.tasks.signing import sign_xml_batch as sign_xml_batch_task
 from facturacion.ecf.tasks.xml import generate_xml as generate_xml_task
 from facturacion.api.company_context import (
     get_current_company,
@@ -116,9 +155,16 @@ from facturacion.api.company_context import (
 )
 from facturacion.api.middleware import CompanyContextMiddleware
 from facturacion.api.scoping import CompanyScopedQuerysetMixin
+from facturacion.services.barcode_map import BarcodeMapService, LocalBarcodeMap, invalidate_product_records
 from facturacion.services.credit_note_reconciliation import CreditNoteReconciliationService
 from facturacion.services.credit_notes import CreditNoteService
+from facturacion.services.inventory_health import InventoryHealthService
 from facturacion.services.invoicing import InvoiceCreationService
+from facturacion.services.log_archive import LogArchiveService
+from facturacion.services.numbering import NumberingService
+from facturacion.services.product_history import ProductBulkUpdateService
+from facturacion.services.product_import import ProductImportService
+from facturacion.services.sales_rollup import DailySalesRollupService
 from facturacion.services.onboarding import DEFAULT_OWNER_GROUP_NAME, DEFAULT_OWNER_PERMISSION_CODENAMES
 from facturacion.services.quotations import QuotationService
 
@@ -686,6 +732,98 @@ class ECFSigningTests(SimpleTestCase):
             self.assertNotIn("Placeholder", signed_xml)
             ECFSignatureValidator().validate(signed_xml, loaded)
 
+    def test_loader_reuses_decrypted_certificate_until_file_changes(self):
+        with TemporaryDirectory() as temp_dir:
+            p12_path = self._write_pkcs12(Path(temp_dir) / "cert.p12")
+            loader = PKCS12CertificateLoader(cache=LoadedCertificateCache())
+
+            with patch(
+                "facturacion.ecf.certificates.loader.pkcs12.load_key_and_certificates",
+                wraps=pkcs12.load_key_and_certificates,
+            ) as decrypt:
+                first = loader.load(p12_path, self.password)
+                second = loader.load(p12_path, self.password)
+                self._write_pkcs12(p12_path)
+                stat = p12_path.stat()
+                os.utime(p12_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+                rotated = loader.load(p12_path, self.password)
+
+        self.assertIs(first, second)
+        self.assertNotEqual(first.sha256_fingerprint, rotated.sha256_fingerprint)
+        self.assertEqual(decrypt.call_count, 2)
+
+    def test_loader_cache_is_keyed_by_password(self):
+        with TemporaryDirectory() as temp_dir:
+            p12_path = self._write_pkcs12(Path(temp_dir) / "cert.p12")
+            loader = PKCS12CertificateLoader(cache=LoadedCertificateCache())
+            loader.load(p12_path, self.password)
+
+            with self.assertRaises(ECFValidationError):
+                loader.load(p12_path, "wrong-password")
+
+    def test_certificate_cache_evicts_by_fingerprint(self):
+        with TemporaryDirectory() as temp_dir:
+            p12_path = self._write_pkcs12(Path(temp_dir) / "cert.p12")
+            cache = LoadedCertificateCache()
+            loaded = PKCS12CertificateLoader(cache=cache).load(p12_path, self.password)
+
+            evicted = cache.invalidate(fingerprint=loaded.sha256_fingerprint.upper())
+
+        self.assertEqual(evicted, 1)
+        self.assertEqual(len(cache), 0)
+
+    @override_settings(ECF_CERTIFICATE_CACHE_TTL_SECONDS=0)
+    def test_loader_cache_can_be_disabled(self):
+        with TemporaryDirectory() as temp_dir:
+            p12_path = self._write_pkcs12(Path(temp_dir) / "cert.p12")
+            cache = LoadedCertificateCache()
+            loader = PKCS12CertificateLoader(cache=cache)
+
+            self.assertIsNot(loader.load(p12_path, self.password), loader.load(p12_path, self.password))
+            self.assertEqual(len(cache), 0)
+
+    def test_process_pool_engine_signs_and_verifies_in_worker_process(self):
+        with TemporaryDirectory() as temp_dir:
+            p12_path = self._write_pkcs12(Path(temp_dir) / "cert.p12")
+            loaded = PKCS12CertificateLoader().load(p12_path, self.password)
+            xml = '<?xml version="1.0" encoding="UTF-8"?><ECF><Encabezado>1</Encabezado></ECF>'
+
+            with ProcessPoolExecutor(max_workers=1) as executor:
+                results = ECFProcessPoolSigningEngine(executor=executor).sign_many([xml, "<ECF>"], loaded)
+
+        self.assertIn("<ds:Signature", results[0])
+        ECFSignatureValidator().validate(results[0], loaded)
+        self.assertIsInstance(results[1], ECFValidationError)
+
+    def test_pool_worker_certificates_keep_expiry_and_stay_bounded(self):
+        with TemporaryDirectory() as temp_dir:
+            p12_path = self._write_pkcs12(Path(temp_dir) / "cert.p12")
+            loaded = PKCS12CertificateLoader().load(p12_path, self.password)
+        pool_certificate = signing_engines._PoolCertificate.from_loaded(loaded)
+
+        with patch.object(signing_engines, "_worker_certificates", OrderedDict()) as worker_certificates, \
+                patch.object(signing_engines, "WORKER_CERTIFICATES_MAX_ENTRIES", 2):
+            materialized = signing_engines._worker_certificate(pool_certificate)
+            for fingerprint in ("rotated-1", "rotated-2"):
+                signing_engines._worker_certificate(dataclasses.replace(pool_certificate, fingerprint=fingerprint))
+
+            self.assertEqual(materialized.not_valid_after, loaded.not_valid_after)
+            self.assertEqual(list(worker_certificates), ["rotated-1", "rotated-2"])
+
+    @override_settings(ECF_SIGNING_ENGINE="process_pool")
+    def test_signing_engine_signs_inline_inside_daemonic_prefork_children(self):
+        with patch("facturacion.ecf.signer.engines.multiprocessing.current_process", return_value=SimpleNamespace(daemon=True)):
+            self.assertIsInstance(get_signing_engine(), ECFInlineSigningEngine)
+
+    @override_settings(ECF_SIGNING_ENGINE="process_pool")
+    def test_signing_engine_setting_selects_process_pool_unless_collaborators_injected(self):
+        self.assertIsInstance(get_signing_engine(), ECFProcessPoolSigningEngine)
+        self.assertIsInstance(get_signing_engine(signer=ECFXMLSigner()), ECFInlineSigningEngine)
+        self.assertIsInstance(ECFSigningService().signing_engine, ECFProcessPoolSigningEngine)
+
+    def test_signing_engine_defaults_to_inline(self):
+        self.assertIsInstance(get_signing_engine(), ECFInlineSigningEngine)
+
     def test_expired_certificate_is_rejected(self):
         with TemporaryDirectory() as temp_dir:
             p12_path = self._write_pkcs12(Path(temp_dir) / "expired.p12", expired=True)
@@ -729,6 +867,46 @@ class ECFSigningTests(SimpleTestCase):
         return path
 
 
+class ECFXSDSchemaCacheTests(SimpleTestCase):
+    """Validate the process-wide compiled XSD registry."""
+
+    def setUp(self):
+        clear_compiled_schemas()
+        self.addCleanup(clear_compiled_schemas)
+
+    def test_schema_is_compiled_once_across_validator_instances(self):
+        with patch("facturacion.ecf.validators.xsd.etree.XMLSchema", wraps=etree.XMLSchema) as compile_schema:
+            first = ECFXSDValidator().compiled_schema("32")
+            second = ECFXSDValidator().compiled_schema("32")
+
+        self.assertIs(first, second)
+        self.assertEqual(compile_schema.call_count, 1)
+
+    def test_schema_is_recompiled_when_file_changes(self):
+        source_dir = Path(ECFXSDValidator().schemas_dir)
+        with TemporaryDirectory() as temp_dir:
+            schema_path = Path(temp_dir) / ECFXSDValidator.schema_files["32"]
+            schema_path.write_bytes((source_dir / schema_path.name).read_bytes())
+            validator = ECFXSDValidator(schemas_dir=Path(temp_dir))
+
+            first = validator.compiled_schema("32")
+            stat = schema_path.stat()
+            os.utime(schema_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+            second = validator.compiled_schema("32")
+
+        self.assertIsNot(first, second)
+        self.assertGreater(second.mtime_ns, first.mtime_ns)
+
+    def test_warm_compiles_all_configured_types(self):
+        warmed = ECFXSDValidator().warm()
+
+        self.assertEqual(sorted(warmed), ["31", "32", "34"])
+
+    def test_invalid_xml_reports_schema_errors(self):
+        with self.assertRaisesMessage(ECFValidationError, "XML no válido contra XSD DGII"):
+            ECFXSDValidator().validate("32", "<ECF><Encabezado /></ECF>")
+
+
 class DGIISOAPParserTests(SimpleTestCase):
     """Validate DGII SOAP response normalization."""
 
@@ -763,6 +941,242 @@ class DGIISOAPParserTests(SimpleTestCase):
         self.assertEqual(parsed.messages[0]["valor"], "Firma invalida")
 
 
+DGII_TEST_STATUS_WSDL = """<?xml version="1.0" encoding="UTF-8"?>
+<definitions xmlns="http://schemas.xmlsoap.org/wsdl/" xmlns:soap="http://schemas.xmlsoap.org/wsdl/soap/"
+    xmlns:xsd="http://www.w3.org/2001/XMLSchema" xmlns:tns="urn:dgii-test" targetNamespace="urn:dgii-test">
+  <types>
+    <xsd:schema targetNamespace="urn:dgii-test" elementFormDefault="qualified">
+      <xsd:element name="ConsultaResultado"><xsd:complexType><xsd:sequence>
+        <xsd:element name="trackId" type="xsd:string"/></xsd:sequence></xsd:complexType></xsd:element>
+      <xsd:element name="ConsultaResultadoResponse"><xsd:complexType><xsd:sequence>
+        <xsd:element name="estado" type="xsd:string"/></xsd:sequence></xsd:complexType></xsd:element>
+    </xsd:schema>
+  </types>
+  <message name="ConsultaIn"><part name="parameters" element="tns:ConsultaResultado"/></message>
+  <message name="ConsultaOut"><part name="parameters" element="tns:ConsultaResultadoResponse"/></message>
+  <portType name="ConsultaPort"><operation name="ConsultaResultado">
+    <input message="tns:ConsultaIn"/><output message="tns:ConsultaOut"/></operation></portType>
+  <binding name="ConsultaBinding" type="tns:ConsultaPort">
+    <soap:binding style="document" transport="http://schemas.xmlsoap.org/soap/http"/>
+    <operation name="ConsultaResultado"><soap:operation soapAction="ConsultaResultado"/>
+      <input><soap:body use="literal"/></input><output><soap:body use="literal"/></output></operation>
+  </binding>
+  <service name="ConsultaService"><port name="ConsultaPort" binding="tns:ConsultaBinding">
+    <soap:address location="https://dgii.test/consulta"/></port></service>
+</definitions>"""
+
+
+@override_settings(ECF_DGII_WSDL_CACHE_SECONDS=0)
+class DGIISOAPClientPoolTests(SimpleTestCase):
+    """Validate pooled Zeep clients are reused without leaking per-call state."""
+
+    def test_pool_reuses_parsed_client_per_wsdl_and_transport_settings(self):
+        with TemporaryDirectory() as temp_dir:
+            wsdl_path = Path(temp_dir) / "consulta.wsdl"
+            wsdl_path.write_text(DGII_TEST_STATUS_WSDL, encoding="utf-8")
+            pool = ZeepClientPool()
+
+            client = pool.get(str(wsdl_path), timeout=30)
+
+            self.assertIs(pool.get(str(wsdl_path), timeout=30), client)
+            self.assertIsNot(pool.get(str(wsdl_path), timeout=10), client)
+            pool.clear()
+            self.assertIsNot(pool.get(str(wsdl_path), timeout=30), client)
+
+    def test_concurrent_calls_keep_their_own_headers_and_envelopes(self):
+        with TemporaryDirectory() as temp_dir:
+            wsdl_path = Path(temp_dir) / "consulta.wsdl"
+            wsdl_path.write_text(DGII_TEST_STATUS_WSDL, encoding="utf-8")
+            client = ZeepClientPool().get(str(wsdl_path))
+            barrier = threading.Barrier(2)
+            sent_headers = {}
+
+            def fake_post(address, data=None, headers=None, timeout=None, **kwargs):
+                track_id = etree.fromstring(data).findtext(".//{urn:dgii-test}trackId")
+                sent_headers[track_id] = headers["Authorization"]
+                barrier.wait(timeout=5)
+                response = requests.Response()
+                response.status_code = 200
+                response.headers["Content-Type"] = "text/xml"
+                response._content = (
+                    '<soap:Envelope xmlns:soap="http://schemas.xmlsoap.org/soap/envelope/"><soap:Body>'
+                    f'<ConsultaResultadoResponse xmlns="urn:dgii-test"><estado>{track_id}</estado>'
+                    "</ConsultaResultadoResponse></soap:Body></soap:Envelope>"
+                ).encode("utf-8")
+                return response
+
+            client.session.post = fake_post
+
+            def query(track_id):
+                return client.call(
+                    "ConsultaResultado",
+                    http_headers={"Authorization": f"Bearer {track_id}"},
+                    trackId=track_id,
+                )
+
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                results = dict(zip(["track-a", "track-b"], executor.map(query, ["track-a", "track-b"])))
+
+        self.assertEqual(sent_headers, {"track-a": "Bearer track-a", "track-b": "Bearer track-b"})
+        for track_id, result in results.items():
+            self.assertEqual(result.result, track_id)
+            self.assertIn(f"<ns0:trackId>{track_id}</ns0:trackId>", result.request_xml)
+            self.assertIn(f"<estado>{track_id}</estado>", result.response_xml)
+        self.assertNotIn("Authorization", client.session.headers)
+
+    def test_wsdl_download_carries_auth_without_leaving_it_on_the_session(self):
+        fetched = []
+
+        def fake_get(session, url, **kwargs):
+            fetched.append((url, session.headers.get("Authorization")))
+            response = requests.Response()
+            response.status_code = 200
+            response._content = DGII_TEST_STATUS_WSDL.encode("utf-8")
+            return response
+
+        with patch.object(requests.Session, "get", fake_get):
+            client = ZeepClientPool().get(
+                "https://dgii.test/consulta.svc?wsdl",
+                wsdl_headers={"Authorization": "Bearer wsdl-token"},
+            )
+
+        self.assertEqual(fetched, [("https://dgii.test/consulta.svc?wsdl", "Bearer wsdl-token")])
+        self.assertNotIn("Authorization", client.session.headers)
+
+    def test_slow_build_only_blocks_callers_of_the_same_client(self):
+        started, release = threading.Event(), threading.Event()
+        built, timed_out = [], []
+
+        class FakeClient:
+            def __init__(self, wsdl_url, **kwargs):
+                built.append(wsdl_url)
+                if wsdl_url == "slow.wsdl":
+                    started.set()
+                    timed_out.append(not release.wait(timeout=5))
+
+        pool = ZeepClientPool()
+        with patch("facturacion.ecf.soap.clients.base.BaseZeepSOAPClient", FakeClient):
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                slow = [executor.submit(pool.get, "slow.wsdl") for _ in range(2)]
+                self.assertTrue(started.wait(timeout=5))
+                fast = pool.get("fast.wsdl")
+                release.set()
+                slow_clients = [future.result(timeout=10) for future in slow]
+
+        self.assertIsInstance(fast, FakeClient)
+        self.assertEqual(timed_out, [False])
+        self.assertIs(slow_clients[0], slow_clients[1])
+        self.assertEqual(sorted(built), ["fast.wsdl", "slow.wsdl"])
+
+
+class DGIIRESTStubHandler(BaseHTTPRequestHandler):
+    """Local DGII REST stand-in that records requests and keep-alive connections."""
+
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        super().setup()
+        self.server.connections.add(self.client_address)
+
+    def do_GET(self):
+        self._record()
+        track_id = self.path.split("trackId=")[-1]
+        time.sleep(0.01)
+        self._reply(200, {"trackId": track_id, "estado": "Aceptado"})
+
+    def do_POST(self):
+        self._record()
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        if self.server.fail_next_post:
+            self.server.fail_next_post = False
+            self._reply(503, {"mensaje": "Servicio no disponible"})
+            return
+        self._reply(200, {"trackId": "track-async", "estado": "Recibido"})
+
+    def log_message(self, format, *args):
+        pass
+
+    def _record(self):
+        with self.server.lock:
+            self.server.requests.append((self.command, self.path, self.headers.get("Authorization")))
+
+    def _reply(self, status, payload):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class AsyncDGIIRESTClientTests(SimpleTestCase):
+    """Validate the asyncio DGII REST client against a local stub server."""
+
+    def setUp(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), DGIIRESTStubHandler)
+        self.server.daemon_threads = True
+        self.server.lock = threading.Lock()
+        self.server.requests = []
+        self.server.connections = set()
+        self.server.fail_next_post = False
+        thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        thread.start()
+        self.addCleanup(thread.join)
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+        base_url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self.environment = DGIIRESTEnvironment(
+            name="testing",
+            auth_base_url=base_url,
+            reception_base_url=base_url,
+            status_base_url=base_url,
+            trackids_base_url=base_url,
+            timeout=5,
+            retries=1,
+            retry_backoff=0,
+            verify_tls=False,
+        )
+
+    def test_query_status_many_shares_token_over_bounded_keepalive_pool(self):
+        auth_client = Mock(wraps=FakeRESTAuthClient())
+        track_ids = [f"track-{index:03d}" for index in range(40)]
+
+        results = query_status_many(
+            track_ids,
+            certificate_path="cert.p12",
+            certificate_password="secret",
+            issuer_rnc="101010101",
+            environment=self.environment,
+            auth_client=auth_client,
+            concurrency=5,
+        )
+
+        self.assertEqual([results[track_id].result["trackId"] for track_id in track_ids], track_ids)
+        self.assertEqual(len(self.server.requests), 40)
+        self.assertTrue(all(header == "Bearer token-rest" for _method, _path, header in self.server.requests))
+        self.assertEqual(auth_client.get_token.call_count, 40)
+        self.assertLessEqual(len(self.server.connections), 5)
+
+    def test_submit_retries_transient_status_like_sync_client(self):
+        self.server.fail_next_post = True
+
+        async def submit():
+            async with AsyncDGIIRESTClient(environment=self.environment, auth_client=FakeRESTAuthClient()) as client:
+                return await client.submit_ecf(
+                    signed_xml_content="<ECF>firmado</ECF>",
+                    encf="E310000000001",
+                    issuer_rnc="101010101",
+                    certificate_path="cert.p12",
+                    certificate_password="secret",
+                )
+
+        result = asyncio.run(submit())
+
+        self.assertEqual(result.result["trackId"], "track-async")
+        self.assertEqual(result.request_xml, "<ECF>firmado</ECF>")
+        self.assertEqual([request[:2] for request in self.server.requests], [("POST", "/api/Recepcion/ECF")] * 2)
+
+
 class DGIIRESTClientTests(TestCase):
     """Validate DGII REST client scaffolding without network calls."""
 
@@ -817,6 +1231,85 @@ class DGIIRESTClientTests(TestCase):
         self.assertEqual(session.calls[1]["method"], "POST")
         self.assertIn("semilla_firmada.xml", session.calls[1]["files"]["xml"])
 
+    def test_auth_client_fetches_one_token_for_concurrent_cache_misses(self):
+        cache.clear()
+        session = FakeRESTSession([
+            FakeRESTResponse({"semilla": "<Semilla><Valor>abc</Valor></Semilla>"}),
+            FakeRESTResponse({"token": "token-shared", "expiraEn": 600}),
+        ])
+        signer = Mock(wraps=FakeSeedSigner())
+        signer.sign.side_effect = lambda xml, certificate: time.sleep(0.2) or f"<Signed>{xml}</Signed>"
+        auth_client = DGIIRESTAuthClient(
+            environment=self._environment(),
+            certificate_loader=FakeCertificateLoader(),
+            signer=signer,
+            session=session,
+        )
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            tokens = list(executor.map(lambda _index: auth_client.get_token("cert.p12", "secret", issuer_rnc="101010101"), range(8)))
+
+        self.assertEqual({token.value for token in tokens}, {"token-shared"})
+        self.assertEqual(len(session.calls), 2)
+        self.assertEqual(signer.sign.call_count, 1)
+
+    def test_auth_client_refreshes_token_before_expiry_once(self):
+        cache.clear()
+        session = FakeRESTSession([
+            FakeRESTResponse({"semilla": "<Semilla><Valor>abc</Valor></Semilla>"}),
+            FakeRESTResponse({"token": "token-old", "expiraEn": 3300}),
+            FakeRESTResponse({"semilla": "<Semilla><Valor>def</Valor></Semilla>"}),
+            FakeRESTResponse({"token": "token-new", "expiraEn": 3300}),
+        ])
+        auth_client = DGIIRESTAuthClient(
+            environment=self._environment(),
+            certificate_loader=FakeCertificateLoader(),
+            signer=FakeSeedSigner(),
+            session=session,
+        )
+        self.assertEqual(auth_client.get_token("cert.p12", "secret", issuer_rnc="101010101").value, "token-old")
+        cache_key = auth_client._cache_key("cert.p12", "101010101")
+
+        cache.set(cache_key, {**cache.get(cache_key), "refresh_at": time.time() - 1})
+
+        cache.add(f"{cache_key}:lock", "other-worker")
+        during_refresh = auth_client.get_token("cert.p12", "secret", issuer_rnc="101010101")
+        cache.delete(f"{cache_key}:lock")
+        refreshed = auth_client.get_token("cert.p12", "secret", issuer_rnc="101010101")
+
+        self.assertEqual(during_refresh.value, "token-old")
+        self.assertEqual(refreshed.value, "token-new")
+        self.assertEqual(len(session.calls), 4)
+
+    def test_auth_client_keeps_valid_token_when_early_refresh_fails(self):
+        cache.clear()
+        session = FakeRESTSession([
+            FakeRESTResponse({"semilla": "<Semilla><Valor>abc</Valor></Semilla>"}),
+            FakeRESTResponse({"token": "token-old", "expiraEn": 3300}),
+            FakeRESTResponse({}, status_code=429),
+        ])
+        auth_client = DGIIRESTAuthClient(
+            environment=self._environment(),
+            certificate_loader=FakeCertificateLoader(),
+            signer=FakeSeedSigner(),
+            session=session,
+        )
+        auth_client.get_token("cert.p12", "secret", issuer_rnc="101010101")
+        cache_key = auth_client._cache_key("cert.p12", "101010101")
+        cache.set(cache_key, {**cache.get(cache_key), "refresh_at": time.time() - 1})
+
+        with self.assertLogs("facturacion.ecf.rest", level="WARNING"):
+            token = auth_client.get_token("cert.p12", "secret", issuer_rnc="101010101")
+
+        self.assertEqual(token.value, "token-old")
+        self.assertEqual(len(session.calls), 3)
+        self.assertIsNone(cache.get(f"{cache_key}:lock"))
+
+        cache.set(cache_key, {**cache.get(cache_key), "expires_at": time.time() - 1})
+        session.responses.append(FakeRESTResponse({}, status_code=429))
+        with self.assertRaises(ECFValidationError):
+            auth_client.get_token("cert.p12", "secret", issuer_rnc="101010101")
+
     def test_rest_client_submits_signed_xml_with_bearer_token(self):
         session = FakeRESTSession([FakeRESTResponse({"trackId": "track-rest", "estado": "Recibido"})])
         client = DGIIRESTClient(
@@ -2527,6 +3020,59 @@ class CompanyFoundationAPITests(TestCase):
         self.assertEqual(captured["company"], company)
         self.assertEqual(captured["membership"], membership)
 
+    @override_settings(TENANT_CONTEXT_CACHE_TTL_SECONDS=300)
+    def test_company_context_middleware_reuses_cached_tenant_snapshot(self):
+        user = get_user_model().objects.create_user(username="middleware-cached", password="pass")
+        first = Company.objects.create(name="Empresa Cache A", rnc="101010117")
+        second = Company.objects.create(name="Empresa Cache B", rnc="101010118")
+        CompanyMembership.objects.create(user=user, company=first, role="owner")
+        membership = CompanyMembership.objects.create(user=user, company=second, role="cashier")
+        token = Token.objects.create(user=user)
+        captured = {}
+
+        def get_response(request):
+            captured["company"] = request.company
+            captured["membership"] = request.company_membership
+            return None
+
+        def resolve():
+            request = APIRequestFactory().get("/dashboard/", HTTP_AUTHORIZATION=f"Token {token.key}")
+            request.session = {"active_company_id": second.id}
+            CompanyContextMiddleware(get_response)(request)
+
+        resolve()
+        with self.assertNumQueries(0):
+            resolve()
+        self.assertEqual(captured["company"], second)
+        self.assertEqual(captured["membership"].role, "cashier")
+
+        membership.role = "supervisor"
+        membership.save()
+        resolve()
+        self.assertEqual(captured["membership"].role, "supervisor")
+
+        second.is_active = False
+        second.save()
+        resolve()
+        self.assertEqual(captured["company"], first)
+
+    def test_membership_revoked_by_another_process_applies_without_shared_cache(self):
+        user = get_user_model().objects.create_user(username="revoked-elsewhere", password="pass")
+        company = Company.objects.create(name="Empresa Revocada", rnc="101010119")
+        membership = CompanyMembership.objects.create(user=user, company=company, role="cashier")
+        worker_cache = LocMemCache("tenant-context-worker", {})
+
+        def has_access_in_worker():
+            with patch("facturacion.services.tenant_context.cache", worker_cache):
+                return user_has_company_access(user, company)
+
+        self.assertTrue(has_access_in_worker())
+        # The revoking process only invalidates its own process-local cache.
+        membership.is_active = False
+        membership.save()
+
+        self.assertFalse(has_access_in_worker())
+
     def test_require_current_company_fails_when_user_has_no_active_company(self):
         user = get_user_model().objects.create_user(username="requires-company", password="pass")
 
@@ -2633,6 +3179,40 @@ class CompanyFoundationAPITests(TestCase):
 
         self.assertEqual([product["id"] for product in list_response.data], [product.id])
 
+    def test_product_search_ranks_exact_barcode_first_and_scans_short_circuit(self):
+        user = get_user_model().objects.create_superuser(username="inventory-search", password="pass")
+        first, second = self._member_companies(user)
+        category = Category.objects.create(company=first, name="Bebidas")
+        scanned = Product.objects.create(
+            company=first, category=category, name="Agua 500ml", barcode="7460001", price=Decimal("25.00"), stock=3
+        )
+        longer = Product.objects.create(
+            company=first, category=category, name="Agua 1L", barcode="74600012", price=Decimal("40.00"), stock=3
+        )
+        juice = Product.objects.create(
+            company=first, category=category, name="Jugo de naranja", description="Sin agua anadida",
+            price=Decimal("60.00"), stock=3,
+        )
+        Product.objects.create(
+            company=second,
+            category=Category.objects.create(company=second, name="Otra"),
+            name="Agua ajena",
+            price=Decimal("20.00"),
+            stock=1,
+        )
+
+        def search(term, **params):
+            request = APIRequestFactory().get("/products/", {"search": term, **params})
+            request.session = {"active_company_id": first.id}
+            force_authenticate(request, user=user)
+            return [product["id"] for product in ProductListCreateView.as_view()(request).data]
+
+        self.assertEqual(search("7460001"), [scanned.id, longer.id])
+        self.assertEqual(search("7460001", scan="1"), [scanned.id])
+        self.assertEqual(search("74600012", scan="1"), [longer.id])
+        self.assertEqual(search("746000"), [longer.id, scanned.id])
+        self.assertEqual(search("agua"), [longer.id, scanned.id, juice.id])
+
     def test_inventory_utils_are_scoped_by_product_id(self):
         user = get_user_model().objects.create_superuser(username="inventory-utils-id", password="pass")
         first, second = self._member_companies(user)
@@ -2709,6 +3289,195 @@ class CompanyFoundationAPITests(TestCase):
         response = SearchByBarcodeView.as_view()(request)
         self.assertEqual(response.status_code, 404)
 
+    def test_barcode_scan_keeps_the_product_serializer_contract(self):
+        user = get_user_model().objects.create_superuser(username="inventory-scan-contract", password="pass")
+        first, _second = self._member_companies(user)
+        category = Category.objects.create(company=first, name="Contrato")
+        product = Product.objects.create(
+            company=first, category=category, name="Cafe 2lb", description="Molido", price=Decimal("650.00"),
+            stock=4, min_stock=2, barcode="SCAN-CONTRACT",
+        )
+        Product.objects.filter(pk=product.pk).update(image="products/cafe.png")
+
+        request = APIRequestFactory().get("/products/search-barcode/", {"barcode": "SCAN-CONTRACT"})
+        request.session = {"active_company_id": first.id}
+        force_authenticate(request, user=user)
+        response = SearchByBarcodeView.as_view()(request)
+
+        expected = ProductSerializer(Product.objects.get(pk=product.pk), context={"request": response.renderer_context["request"]}).data
+        self.assertEqual(response.data, dict(expected))
+        self.assertTrue(response.data["image_url"].endswith("/products/cafe.png"))
+
+    @override_settings(TENANT_CONTEXT_CACHE_TTL_SECONDS=300, BARCODE_MAP_CACHE_TTL_SECONDS=300)
+    def test_barcode_scans_are_served_from_the_barcode_map_until_stock_changes(self):
+        user = get_user_model().objects.create_superuser(username="inventory-scan-map", password="pass")
+        first, _second = self._member_companies(user)
+        category = Category.objects.create(company=first, name="Scan Map")
+        product = Product.objects.create(
+            company=first, category=category, name="Cafe 1lb", price=Decimal("350.00"), stock=9, barcode="SCAN-001"
+        )
+
+        def scan(barcode):
+            request = APIRequestFactory().get("/products/search-barcode/", {"barcode": barcode})
+            request.session = {"active_company_id": first.id}
+            force_authenticate(request, user=user)
+            return SearchByBarcodeView.as_view()(request)
+
+        self.assertEqual(scan("SCAN-001").data["stock"], 9)
+        with self.assertNumQueries(0):
+            response = scan("SCAN-001")
+        self.assertEqual(response.data["id"], product.id)
+        self.assertEqual(response.data["price"], "350.00")
+        self.assertEqual(response.data["category_name"], "Scan Map")
+
+        Product.objects.filter(pk=product.pk).update(stock=F("stock") - 2)
+        invalidate_product_records([product.pk])
+        self.assertEqual(scan("SCAN-001").data["stock"], 7)
+
+        request = APIRequestFactory().post(
+            "/products/search-barcode/batch/", {"barcodes": ["SCAN-001", "NOPE-404", "SCAN-001"]}, format="json"
+        )
+        request.session = {"active_company_id": first.id}
+        force_authenticate(request, user=user)
+        response = SearchByBarcodeBatchView.as_view()(request)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(list(response.data["products"]), ["SCAN-001"])
+        self.assertEqual(response.data["missing"], ["NOPE-404"])
+
+        Product.objects.create(
+            company=first, category=category, name="Te verde", price=Decimal("120.00"), stock=4, barcode="NOPE-404"
+        )
+        self.assertEqual(scan("NOPE-404").status_code, 200)
+
+    def test_price_changed_by_another_process_applies_without_shared_cache(self):
+        company = Company.objects.create(name="Empresa Precio", rnc="101010129")
+        category = Category.objects.create(company=company, name="Precio")
+        product = Product.objects.create(
+            company=company, category=category, name="Arroz 5lb", price=Decimal("275.00"), stock=6, barcode="SCAN-PRICE"
+        )
+        worker_cache = LocMemCache("barcode-map-worker", {})
+        worker_map = LocalBarcodeMap()
+
+        def price_in_worker():
+            with patch("facturacion.services.barcode_map.cache", worker_cache):
+                return BarcodeMapService(local_map=worker_map).lookup(company.pk, "SCAN-PRICE").price
+
+        self.assertEqual(price_in_worker(), "275.00")
+        # The writing process only invalidates its own process-local cache.
+        product.price = Decimal("299.00")
+        product.save()
+
+        self.assertEqual(price_in_worker(), "299.00")
+
+    def test_product_history_diffs_loaded_snapshot_and_bulk_updates_write_history_in_one_insert(self):
+        user = get_user_model().objects.create_superuser(username="inventory-history", password="pass")
+        first, _second = self._member_companies(user)
+        category = Category.objects.create(company=first, name="Historial")
+        other_category = Category.objects.create(company=first, name="Historial Nuevo")
+        for index in range(3):
+            Product.objects.create(
+                company=first, category=category, name=f"Item {index}", price=Decimal("10.00"), stock=5,
+                barcode=f"HIST-{index}",
+            )
+
+        product = Product.objects.get(barcode="HIST-0")
+        product.price = Decimal("12.50")
+        with self.assertNumQueries(2):
+            product.save()
+        product.save()
+        self.assertEqual(
+            product.history.get(action="updated").changed_fields,
+            {"price": {"old": "10.00", "new": "12.50"}},
+        )
+
+        products = list(Product.objects.filter(company=first).order_by("barcode"))
+        for item in products:
+            item.price = item.price + Decimal("1.00")
+            item.category = other_category
+        with self.assertNumQueries(5):
+            result = ProductBulkUpdateService().update(products, ["price", "category"], note="Ajuste masivo")
+
+        self.assertEqual((result.updated, result.history_rows), (3, 3))
+        latest = ProductHistory.objects.filter(product=products[1], note="Ajuste masivo").get()
+        self.assertEqual(
+            latest.changed_fields,
+            {
+                "price": {"old": "10.00", "new": "11.00"},
+                "category": {"old": "Historial", "new": "Historial Nuevo"},
+            },
+        )
+        self.assertEqual(Product.objects.get(pk=products[0].pk).price, Decimal("13.50"))
+
+    def test_product_history_snapshot_follows_save_with_update_fields_by_field_name(self):
+        user = get_user_model().objects.create_superuser(username="inventory-history-fields", password="pass")
+        first, _second = self._member_companies(user)
+        category = Category.objects.create(company=first, name="Origen")
+        second_category = Category.objects.create(company=first, name="Destino")
+        product = Product.objects.create(
+            company=first, category=category, name="Item", price=Decimal("10.00"), stock=5, barcode="HIST-UF"
+        )
+
+        product.category = second_category
+        product.save(update_fields=["category"])
+        product.save(update_fields=["category"])
+
+        self.assertEqual(
+            list(product.history.filter(action="updated").values_list("changed_fields", flat=True)),
+            [{"category": {"old": "Origen", "new": "Destino"}}],
+        )
+
+    def test_product_import_upserts_by_barcode_allocates_codes_in_one_block_and_reports_rows(self):
+        from openpyxl import Workbook
+
+        user = get_user_model().objects.create_superuser(username="inventory-import", password="pass")
+        first, _second = self._member_companies(user)
+        category = Category.objects.create(company=first, name="Granos")
+        existing = Product.objects.create(
+            company=first, category=category, name="Arroz 5lb", price=Decimal("150.00"), stock=10, barcode="IMP-001"
+        )
+        csv_content = (
+            "Código de barras;Nombre;Precio;Existencia;Categoría\n"
+            "IMP-001;Arroz 5lb;165,00;;\n"
+            "IMP-002;Habichuelas;95.50;12;Granos\n"
+            ";Azucar 2lb;60;8;Endulzantes\n"
+            ";Sal;abc;1;Granos\n"
+            "IMP-404;Sin categoria;10;1;\n"
+            "IMP-002;Duplicado;1;1;Granos\n"
+        ).encode("utf-8")
+
+        request = APIRequestFactory().post(
+            "/products/import/",
+            {"file": SimpleUploadedFile("catalogo.csv", csv_content, content_type="text/csv")},
+            format="multipart",
+        )
+        request.session = {"active_company_id": first.id}
+        force_authenticate(request, user=user)
+        response = ProductImportView.as_view()(request)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((response.data["created"], response.data["updated"]), (2, 1))
+        self.assertEqual([error["row"] for error in response.data["errors"]], [5, 6, 7])
+        existing.refresh_from_db()
+        self.assertEqual((existing.price, existing.stock), (Decimal("165.00"), 10))
+        self.assertEqual(
+            existing.history.get(action="updated").changed_fields,
+            {"price": {"old": "150.00", "new": "165.00"}},
+        )
+        sugar = Product.objects.get(company=first, name="Azucar 2lb")
+        self.assertTrue(sugar.barcode.startswith("PRD-"))
+        self.assertEqual(sugar.category.name, "Endulzantes")
+        self.assertTrue(sugar.history.filter(action="created", note="Importación masiva").exists())
+
+        workbook = Workbook()
+        workbook.active.append(["barcode", "name", "price", "category"])
+        workbook.active.append([7460001000012, "Cafe", 300, "Granos"])
+        buffer = BytesIO()
+        workbook.save(buffer)
+        buffer.seek(0)
+        result = ProductImportService(first).import_file(buffer, "catalogo.xlsx")
+        self.assertEqual((result.created, result.errors), (1, []))
+        self.assertTrue(Product.objects.filter(company=first, barcode="7460001000012", stock=0).exists())
+
     def test_inventory_label_utilities_return_404_for_cross_company_product(self):
         user = get_user_model().objects.create_superuser(username="inventory-utils-labels", password="pass")
         first, second = self._member_companies(user)
@@ -3048,6 +3817,7 @@ class CompanyFoundationAPITests(TestCase):
             subtotal=Decimal("250.00"),
         )
 
+        DailySalesRollupService().rebuild()
         request = APIRequestFactory().get("/dashboard/")
         request.session = {"active_company_id": first.id}
         force_authenticate(request, user=user)
@@ -3308,6 +4078,50 @@ class CompanyFoundationAPITests(TestCase):
         payload = response.data.get("results", response.data) if isinstance(response.data, dict) else response.data
         self.assertEqual([item["id"] for item in payload], [visible_log.id])
 
+    def test_archived_event_logs_leave_hot_table_and_still_list_and_paginate(self):
+        user = get_user_model().objects.create_superuser(username="ecf-log-archive", password="pass")
+        first, _second = self._member_companies(user)
+        document = self._ecf_document(first, encf="E320000001008")
+        old_log = ECFEventLog.objects.create(
+            electronic_document=document,
+            event_type="submitted",
+            message="Antiguo",
+            payload={"trackId": "TRACK-OLD"},
+        )
+        ECFEventLog.objects.filter(pk=old_log.pk).update(created_at=datetime(2020, 1, 15, tzinfo=timezone.utc))
+        recent_log = ECFEventLog.objects.create(electronic_document=document, event_type="accepted", message="Reciente")
+
+        results = LogArchiveService(hot_months=1).archive(["ecf_events"])
+
+        self.assertEqual(results[0].moved, 1)
+        self.assertFalse(ECFEventLog.objects.filter(pk=old_log.pk).exists())
+        archived = ECFEventLogArchive.objects.get(pk=old_log.pk)
+        self.assertEqual(archived.period.isoformat(), "2020-01-01")
+        self.assertEqual(archived.payload, {"trackId": "TRACK-OLD"})
+        self.assertEqual(LogArchiveService(hot_months=1).archive(["ecf_events"])[0].moved, 0)
+
+        view = ECFEventLogViewSet.as_view({"get": "list"})
+        request = APIRequestFactory().get("/ecf/events/", {"page_size": 1, "page": 2})
+        request.session = {"active_company_id": first.id}
+        force_authenticate(request, user=user)
+        response = view(request)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["count"], 2)
+        self.assertEqual(response.data["results"][0]["id"], old_log.id)
+        self.assertEqual(response.data["results"][0]["message"], "Antiguo")
+
+        request = APIRequestFactory().get("/ecf/events/", {"ordering": "created_at"})
+        request.session = {"active_company_id": first.id}
+        force_authenticate(request, user=user)
+        self.assertEqual([item["id"] for item in view(request).data], [old_log.id, recent_log.id])
+
+        request = APIRequestFactory().get(f"/ecf/events/{old_log.id}/")
+        request.session = {"active_company_id": first.id}
+        force_authenticate(request, user=user)
+        response = ECFEventLogViewSet.as_view({"get": "retrieve"})(request, pk=old_log.id)
+        self.assertEqual(response.data["payload"], {"trackId": "TRACK-OLD"})
+
     def test_electronic_document_rejects_cross_company_relations(self):
         user = get_user_model().objects.create_superuser(username="ecf-cross-company", password="pass")
         first, second = self._member_companies(user)
@@ -3541,6 +4355,7 @@ class ECFAsyncTaskTests(TestCase):
         self.assertEqual(document.track_id, "track-existing")
         self.assertTrue(ECFEventLog.objects.filter(electronic_document=document, event_type="skipped").exists())
 
+    @override_settings(ECF_DGII_STATUS_POLLING="per_document", ECF_DGII_STATUS_CHECK_BACKOFF_SECONDS=(7, 30, 90))
     @patch("facturacion.ecf.tasks.dgii.check_status.apply_async")
     @patch("facturacion.ecf.tasks.dgii.DGIISubmissionService")
     def test_submit_task_records_attempt_and_schedules_status_check(self, service_class, status_task):
@@ -3562,37 +4377,104 @@ class ECFAsyncTaskTests(TestCase):
         self.assertEqual(result["track_id"], "track-async")
         self.assertEqual(document.submission_attempts, 1)
         status_task.assert_called_once()
+        self.assertEqual(status_task.call_args.kwargs["countdown"], 7)
 
-    @override_settings(ECF_DGII_MOCK_ENABLED=True)
-    def test_check_status_task_recovers_document_marked_error_after_track_id(self):
-        document = self._document(
-            signed_xml_content="<ECF />",
-            track_id="track-error",
-            status="error",
+    @override_settings(
+        ECF_DGII_STATUS_POLLING="per_document",
+        ECF_DGII_STATUS_CHECK_BACKOFF_SECONDS=(7, 30, 90),
+    )
+    @patch("facturacion.ecf.tasks.dgii.check_status.apply_async")
+    @patch("facturacion.ecf.tasks.dgii.DGIIStatusService")
+    def test_pending_status_check_reschedules_itself_along_backoff_curve(self, service_class, status_task):
+        document = self._document(signed_xml_content="<ECF />", track_id="track-pending", status="submitted")
+        ElectronicFiscalDocument.objects.filter(pk=document.pk).update(fiscal_status="submitted", status_check_attempts=1)
+        service_class.return_value.check.return_value = SimpleNamespace(status="submitted", dgii_status="En Proceso")
+
+        check_status.apply(args=[document.id], kwargs={"environment": "test"}).get()
+
+        status_task.assert_called_once_with(
+            args=[document.id],
+            kwargs={"user_id": None, "environment": "test"},
+            countdown=90,
         )
 
+    @override_settings(ECF_DGII_STATUS_POLLING="per_document", ECF_DGII_STATUS_MAX_CHECKS=3)
+    @patch("facturacion.ecf.tasks.dgii.check_status.apply_async")
+    @patch("facturacion.ecf.tasks.dgii.DGIIStatusService")
+    def test_pending_status_check_stops_rescheduling_after_max_checks(self, service_class, status_task):
+        document = self._document(signed_xml_content="<ECF />", track_id="track-stuck", status="submitted")
+        ElectronicFiscalDocument.objects.filter(pk=document.pk).update(fiscal_status="submitted", status_check_attempts=2)
+        service_class.return_value.check.return_value = SimpleNamespace(status="submitted", dgii_status="En Proceso")
+
         result = check_status.apply(args=[document.id]).get()
 
-        document.refresh_from_db()
-        self.assertEqual(result["status"], "accepted")
-        self.assertEqual(document.status, "accepted")
-        self.assertIsNone(document.last_error)
+        status_task.assert_not_called()
+        self.assertEqual(result["fiscal_status"], "submitted")
+        event = ECFEventLog.objects.get(electronic_document=document, event_type="manual_review")
+        self.assertEqual(event.payload["status_check_attempts"], 3)
 
-    def test_electronic_document_company_cannot_be_cleared_before_generate_task(self):
-        document = self._document(signed_xml_content="", status="draft")
+    @override_settings(ECF_DGII_STATUS_POLLING="per_document", ECF_DGII_MOCK_ENABLED=True)
+    @patch("facturacion.ecf.tasks.dgii.check_status.apply_async")
+    def test_final_status_check_does_not_reschedule(self, status_task):
+        document = self._document(signed_xml_content="<ECF />", track_id="track-final", status="submitted")
 
-        with self.assertRaises(IntegrityError):
-            with transaction.atomic():
-                ElectronicFiscalDocument.objects.filter(pk=document.pk).update(company=None)
+        check_status.apply(args=[document.id]).get()
 
         document.refresh_from_db()
-        self.assertEqual(document.fiscal_status, "draft")
-        self.assertEqual(document.status, "draft")
-        self.assertEqual(document.job_status, "idle")
-        self.assertIsNone(document.last_error)
+        self.assertEqual(document.fiscal_status, "accepted")
+        status_task.assert_not_called()
 
-    def test_submit_task_records_cross_company_issuer_as_technical_failure(self):
-        document = self._document(signed_xml_content="<ECF />", status="signed")
+    @override_settings(ECF_DGII_STATUS_POLLING="batch")
+    @patch("facturacion.ecf.tasks.dgii.check_status.apply_async")
+    @patch("facturacion.ecf.tasks.dgii.DGIISubmissionService")
+    def test_submit_task_leaves_status_check_to_batch_poller(self, service_class, status_task):
+        document = self._document(signed_xml_content="<ECF />")
+
+        class FakeSubmissionService:
+            def submit(self, document, user=None, environment=None):
+                document.track_id = "track-batch"
+                document.status = "submitted"
+                document.fiscal_status = "submitted"
+                document.save(update_fields=["track_id", "status", "fiscal_status", "updated_at"])
+                return SimpleNamespace(track_id="track-batch", status="submitted", document=document)
+
+        service_class.return_value = FakeSubmissionService()
+
+        result = submit_dgii.apply(args=[document.id]).get()
+
+        self.assertEqual(result["track_id"], "track-batch")
+        status_task.assert_not_called()
+
+    @override_settings(ECF_DGII_MOCK_ENABLED=True)
+    def test_check_status_task_recovers_document_marked_error_after_track_id(self):
+        document = self._document(
+            signed_xml_content="<ECF />",
+            track_id="track-error",
+            status="error",
+        )
+
+        result = check_status.apply(args=[document.id]).get()
+
+        document.refresh_from_db()
+        self.assertEqual(result["status"], "accepted")
+        self.assertEqual(document.status, "accepted")
+        self.assertIsNone(document.last_error)
+
+    def test_electronic_document_company_cannot_be_cleared_before_generate_task(self):
+        document = self._document(signed_xml_content="", status="draft")
+
+        with self.assertRaises(IntegrityError):
+            with transaction.atomic():
+                ElectronicFiscalDocument.objects.filter(pk=document.pk).update(company=None)
+
+        document.refresh_from_db()
+        self.assertEqual(document.fiscal_status, "draft")
+        self.assertEqual(document.status, "draft")
+        self.assertEqual(document.job_status, "idle")
+        self.assertIsNone(document.last_error)
+
+    def test_submit_task_records_cross_company_issuer_as_technical_failure(self):
+        document = self._document(signed_xml_content="<ECF />", status="signed")
         other_company = Company.objects.create(name="Empresa Async Externa", rnc="309999999")
         ECFIssuerConfig.objects.filter(pk=document.issuer_id).update(company=other_company)
 
@@ -3731,6 +4613,202 @@ class ECFStatusSplitCompatibilityTests(TestCase):
         self.assertIn("by_job_status", response.data)
         self.assertIn("by_status", response.data)
 
+    @override_settings(TENANT_RESPONSE_CACHE_TTL_SECONDS=0)
+    def test_async_monitor_counts_documents_in_one_aggregate(self):
+        user = get_user_model().objects.create_superuser(
+            username="monitor-aggregate-admin",
+            email="monitor-aggregate-admin@example.test",
+            password="test-pass",
+        )
+        accepted = self._document(status="accepted", encf="E310000000106")
+        retrying = self._document(status="submitted", encf="E310000000107", track_id="track-retry", company=accepted.company)
+        retrying.job_status = "retrying"
+        retrying.submission_attempts = 2
+        retrying.next_retry_at = retrying.updated_at
+        retrying.last_error = "DGII no disponible"
+        retrying.save(update_fields=["job_status", "submission_attempts", "next_retry_at", "last_error", "updated_at"])
+        legacy = self._document(status="accepted", encf="E310000000108", company=accepted.company)
+        ElectronicFiscalDocument.objects.filter(pk=legacy.pk).update(fiscal_status="processing", job_status="paused")
+        CompanyMembership.objects.create(user=user, company=accepted.company, role="admin")
+
+        request = APIRequestFactory().get("/ecf/documents/async-monitor/")
+        request.session = {"active_company_id": accepted.company_id}
+        force_authenticate(request, user=user)
+        with CaptureQueriesContext(connection) as queries:
+            response = ElectronicFiscalDocumentViewSet.as_view({"get": "async_monitor"})(request)
+
+        document_queries = [
+            query["sql"] for query in queries.captured_queries
+            if "facturacion_electronicfiscaldocument" in query["sql"]
+        ]
+        self.assertEqual(len(document_queries), 2)
+        self.assertEqual(response.data["accepted"], 1)
+        self.assertEqual(response.data["submitted"], 1)
+        self.assertEqual(response.data["retrying"], 1)
+        self.assertEqual(response.data["retry_pending"], 1)
+        self.assertEqual(response.data["submission_attempts"], 2)
+        self.assertEqual(
+            response.data["by_fiscal_status"],
+            [
+                {"fiscal_status": "accepted", "count": 1},
+                {"fiscal_status": "submitted", "count": 1},
+                {"fiscal_status": "other", "count": 1},
+            ],
+        )
+        self.assertEqual(
+            response.data["by_job_status"],
+            [
+                {"job_status": "idle", "count": 1},
+                {"job_status": "retrying", "count": 1},
+                {"job_status": "other", "count": 1},
+            ],
+        )
+        self.assertEqual([item["id"] for item in response.data["recent_errors"]], [retrying.id])
+
+    @override_settings(
+        ECF_DGII_MOCK_ENABLED=False,
+        ECF_DGII_AUTH_TOKEN="batch-token",
+        ECF_DGII_SOAP_WSDLS={"testing": {"reception": "https://dgii.test/recepcion?wsdl", "status": "https://dgii.test/consulta?wsdl"}},
+        ECF_TASK_STATUS_CHECK_DELAY_SECONDS=60,
+        ECF_DGII_STATUS_CHECK_BACKOFF_SECONDS=[60, 300, 900],
+    )
+    def test_poll_submitted_batch_checks_due_documents_with_bulk_writes(self):
+        class MixedStatusSOAPClient(FakeDGIISOAPClient):
+            def query_status(self, track_id):
+                answers = {
+                    "track-ok": {"trackId": track_id, "estado": "Aceptado", "codigo": 1},
+                    "track-no": {"trackId": track_id, "estado": "Rechazado", "codigo": 2, "mensajes": [{"valor": "Firma invalida"}]},
+                    "track-wait": {"trackId": track_id, "estado": "En Proceso", "codigo": 3},
+                }
+                if track_id not in answers:
+                    raise ECFValidationError("Error invocando SOAP DGII operación ConsultaResultado.")
+                return SOAPCallResult(result=answers[track_id], request_xml="<StatusRequest />", response_xml="<StatusResponse />")
+
+        accepted = self._document(status="submitted", encf="E310000000301", track_id="track-ok", signed_xml_content="<ECF />")
+        company = accepted.company
+        rejected = self._document(status="submitted", encf="E310000000302", track_id="track-no", signed_xml_content="<ECF />", company=company)
+        waiting = self._document(status="submitted", encf="E310000000303", track_id="track-wait", signed_xml_content="<ECF />", company=company)
+        broken = self._document(status="submitted", encf="E310000000304", track_id="track-boom", signed_xml_content="<ECF />", company=company)
+        not_due = self._document(status="submitted", encf="E310000000305", track_id="track-late", signed_xml_content="<ECF />", company=company)
+        running = self._document(status="submitted", encf="E310000000306", track_id="track-running", signed_xml_content="<ECF />", company=company)
+        past = datetime.now(timezone.utc) - timedelta(minutes=5)
+        ElectronicFiscalDocument.objects.filter(pk__in=[accepted.pk, rejected.pk, waiting.pk, broken.pk, running.pk]).update(last_submitted_at=past)
+        ElectronicFiscalDocument.objects.filter(pk=not_due.pk).update(last_submitted_at=datetime.now(timezone.utc))
+        ElectronicFiscalDocument.objects.filter(pk=running.pk).update(job_status="running")
+
+        with patch("facturacion.ecf.services.dgii_status_batch.DailySalesRollupService") as rollup_service:
+            result = DGIIStatusBatchService(soap_client_class=MixedStatusSOAPClient).poll_submitted(max_workers=3, task_id="poll-1")
+
+        self.assertEqual(result.claimed, 4)
+        self.assertEqual(result.accepted, [accepted.pk])
+        self.assertEqual(result.rejected, [rejected.pk])
+        self.assertEqual(result.processing, [waiting.pk])
+        self.assertEqual(list(result.failed), [broken.pk])
+        rollup_service.return_value.move_fiscal_status_many.assert_called_once_with(
+            [(accepted.invoice_id, "submitted", "accepted"), (rejected.invoice_id, "submitted", "rejected")]
+        )
+
+        documents = ElectronicFiscalDocument.objects.in_bulk([accepted.pk, rejected.pk, waiting.pk, broken.pk, not_due.pk, running.pk])
+        self.assertEqual(documents[accepted.pk].fiscal_status, "accepted")
+        self.assertIsNotNone(documents[accepted.pk].accepted_at)
+        self.assertEqual(documents[rejected.pk].fiscal_status, "rejected")
+        self.assertEqual(documents[rejected.pk].rejection_reason, "Firma invalida")
+        self.assertIsNone(documents[accepted.pk].next_status_check_at)
+        self.assertEqual(documents[waiting.pk].fiscal_status, "submitted")
+        self.assertEqual(
+            documents[waiting.pk].next_status_check_at - documents[waiting.pk].last_status_checked_at,
+            timedelta(seconds=300),
+        )
+        self.assertEqual(documents[broken.pk].fiscal_status, "submitted")
+        self.assertIn("SOAP DGII", documents[broken.pk].last_error)
+        for document_id in (accepted.pk, rejected.pk, waiting.pk, broken.pk):
+            self.assertEqual(documents[document_id].job_status, "idle")
+            self.assertEqual(documents[document_id].status_check_attempts, 1)
+        self.assertIsNone(documents[not_due.pk].last_status_checked_at)
+        self.assertEqual(documents[running.pk].job_status, "running")
+        self.assertEqual(
+            ECFStatusEvent.objects.filter(task_id="poll-1", source="dgii_status_batch").count(),
+            3,
+        )
+
+        second = DGIIStatusBatchService(soap_client_class=MixedStatusSOAPClient).poll_submitted(task_id="poll-2")
+        self.assertEqual(second.claimed, 0)
+
+    @override_settings(
+        ECF_DGII_MOCK_ENABLED=True,
+        ECF_DGII_STATUS_CHECK_BACKOFF_SECONDS=[60, 120],
+        ECF_DGII_STATUS_CHECK_BACKOFF_BY_TYPE={"32": [15]},
+    )
+    def test_status_check_dispatcher_drains_due_documents_in_batches(self):
+        schedule = ECFStatusCheckSchedule()
+        self.assertEqual([schedule.delay_seconds("31", attempts) for attempts in range(4)], [60, 120, 120, 120])
+        self.assertEqual(schedule.delay_seconds("32", 3), 15)
+
+        first = self._document(status="submitted", encf="E310000000311", track_id="track-d1", signed_xml_content="<ECF />")
+        company = first.company
+        second = self._document(status="submitted", encf="E310000000312", track_id="track-d2", signed_xml_content="<ECF />", company=company)
+        third = self._document(status="submitted", encf="E310000000313", track_id="track-d3", signed_xml_content="<ECF />", company=company)
+        later = self._document(status="submitted", encf="E310000000314", track_id="track-d4", signed_xml_content="<ECF />", company=company)
+        now = datetime.now(timezone.utc)
+        ElectronicFiscalDocument.objects.filter(pk__in=[first.pk, second.pk, third.pk]).update(next_status_check_at=now - timedelta(seconds=1))
+        ElectronicFiscalDocument.objects.filter(pk=later.pk).update(next_status_check_at=now + timedelta(minutes=10))
+
+        result = poll_submitted_batch.apply(kwargs={"limit": 2}).get()
+
+        self.assertEqual(result["batches"], 2)
+        self.assertEqual(sorted(result["accepted"]), [first.pk, second.pk, third.pk])
+        later.refresh_from_db()
+        self.assertEqual(later.fiscal_status, "submitted")
+        self.assertEqual(later.status_check_attempts, 0)
+
+    @override_settings(ECF_DGII_MOCK_ENABLED=True)
+    def test_poll_submitted_releases_claimed_documents_when_persisting_fails(self):
+        document = self._document(status="submitted", encf="E310000000321", track_id="track-crash", signed_xml_content="<ECF />")
+        ElectronicFiscalDocument.objects.filter(pk=document.pk).update(
+            next_status_check_at=datetime.now(timezone.utc) - timedelta(seconds=1)
+        )
+
+        with patch.object(DGIIStatusBatchService, "_persist", side_effect=RuntimeError("db down")):
+            with self.assertRaises(RuntimeError):
+                DGIIStatusBatchService().poll_submitted(task_id="poll-crash")
+
+        document.refresh_from_db()
+        self.assertEqual(document.job_status, "idle")
+        self.assertIsNone(document.async_task_id)
+        self.assertEqual(document.last_error, "db down")
+        self.assertTrue(
+            ECFStatusEvent.objects.filter(document=document, source="task_poll_submitted_batch_released").exists()
+        )
+
+    @patch("facturacion.ecf.queues.outbox.enqueue_submission_pipeline")
+    def test_outbox_relay_defers_entries_while_broker_is_down(self, enqueue):
+        first = self._document(status="draft", encf="E310000000411")
+        second = self._document(status="draft", encf="E310000000412", company=first.company)
+        record_submission_pipeline(first, user_id=None)
+        record_submission_pipeline(first, user_id=None)
+        record_submission_pipeline(second, user_id=None)
+        self.assertEqual(ECFOutbox.objects.filter(status="pending").count(), 2)
+
+        enqueue.side_effect = ECFCeleryUnavailable("Celery/Redis no está disponible.")
+        outage = ECFOutboxRelay().relay()
+
+        self.assertEqual((outage.claimed, outage.deferred, outage.dispatched), (2, 2, 0))
+        self.assertTrue(outage.broker_unavailable)
+        enqueue.assert_called_once()
+        self.assertEqual(ECFOutboxRelay().relay().claimed, 0)
+
+        ECFOutbox.objects.update(available_at=datetime.now(timezone.utc) - timedelta(seconds=1))
+        enqueue.side_effect = None
+        enqueue.return_value = {"enqueued": True, "task_id": "task-outbox"}
+        recovered = ECFOutboxRelay().relay()
+
+        self.assertEqual((recovered.claimed, recovered.dispatched), (2, 2))
+        self.assertEqual(
+            list(ECFOutbox.objects.order_by("id").values_list("status", "task_id", "last_error")),
+            [("dispatched", "task-outbox", None), ("dispatched", "task-outbox", None)],
+        )
+        enqueue.assert_called_with(second.pk, user_id=None, validate_xsd=True)
+
     def _document(
         self,
         *,
@@ -3980,6 +5058,251 @@ class ECFStatusRuntimeTransitionTests(TestCase):
         self.assertEqual(document.job_status, "idle")
         self.assertTrue(ECFStatusEvent.objects.filter(document=document, source="xml_signing").exists())
 
+    def test_sign_batch_loads_certificate_once_and_bulk_audits(self):
+        first = self._document(status="xml_generated", fiscal_status="xml_generated", xml_content="<ECF>1</ECF>")
+        second = self._sibling_document(first, xml_content="<ECF>2</ECF>")
+        ElectronicFiscalDocument.objects.filter(pk__in=[first.pk, second.pk]).update(job_status="queued")
+        loader = Mock(wraps=FakeCertificateLoader())
+
+        with self.assertNumQueries(13):
+            result = ECFSigningService(
+                certificate_loader=loader,
+                signer=FakeXMLSigner(),
+                signature_validator=FakeValidator(),
+                xsd_validator=FakeValidator(),
+            ).sign_batch([first.pk, second.pk], certificate_path="fake.p12", certificate_password="secret", task_id="batch-1")
+
+        loader.load.assert_called_once()
+        self.assertEqual(result.signed, [first.pk, second.pk])
+        self.assertEqual(result.failed, {})
+        for document in (first, second):
+            document.refresh_from_db()
+            self.assertEqual(document.fiscal_status, "signed")
+            self.assertEqual(document.job_status, "idle")
+            self.assertEqual(document.signed_xml_content, document.xml_content)
+            self.assertTrue(
+                ECFStatusEvent.objects.filter(document=document, source="xml_signing_batch", task_id="batch-1").exists()
+            )
+            self.assertTrue(ECFEventLog.objects.filter(electronic_document=document, event_type="signed").exists())
+
+    def test_audited_atomic_bulk_inserts_audit_rows_and_discards_them_on_rollback(self):
+        document = self._document(status="draft", fiscal_status="draft")
+        service = ECFStatusTransitionService()
+
+        with CaptureQueriesContext(connection) as queries:
+            with audited_atomic():
+                for job_status in ("queued", "running", "idle"):
+                    service.transition(document, job_status=job_status, source="audit_buffer")
+                    record_event_log(electronic_document=document, event_type=job_status, message="Buffer")
+
+        inserts = [query["sql"] for query in queries.captured_queries if query["sql"].startswith("INSERT")]
+        self.assertEqual(len(inserts), 2)
+        self.assertEqual(
+            list(ECFStatusEvent.objects.filter(document=document).order_by("id").values_list("new_job_status", flat=True)),
+            ["queued", "running", "idle"],
+        )
+        self.assertEqual(ECFEventLog.objects.filter(electronic_document=document, message="Buffer").count(), 3)
+
+        with self.assertRaises(RuntimeError):
+            with audited_atomic():
+                service.transition(document, job_status="queued", source="audit_buffer_rollback")
+                raise RuntimeError("rollback")
+
+        document.refresh_from_db()
+        self.assertEqual(document.job_status, "idle")
+        self.assertFalse(ECFStatusEvent.objects.filter(document=document, source="audit_buffer_rollback").exists())
+
+    def test_xml_artifacts_are_stored_once_by_digest_and_loaded_lazily(self):
+        signed_xml = "<ECF><Firmado>" + "x" * 5000 + "</Firmado></ECF>"
+        document = self._document(
+            status="signed",
+            fiscal_status="signed",
+            xml_content="<ECF />",
+            signed_xml_content=signed_xml,
+        )
+        document.dgii_request_xml = signed_xml
+        document.save(update_fields=["dgii_request_xml", "updated_at"])
+
+        digest = hashlib.sha256(signed_xml.encode("utf-8")).hexdigest()
+        stored = ElectronicFiscalDocument.objects.filter(pk=document.pk).values_list("signed_xml_content", "dgii_request_xml").get()
+        self.assertEqual([ref.sha256 for ref in stored], [digest, digest])
+        self.assertEqual(ECFArtifact.objects.count(), 2)
+        self.assertLess(len(ECFArtifact.objects.get(pk=digest).content), 200)
+
+        with self.assertNumQueries(1):
+            loaded = ElectronicFiscalDocument.objects.get(pk=document.pk)
+            self.assertEqual(loaded.artifact_sha256("signed_xml_content"), digest)
+        with self.assertNumQueries(1):
+            self.assertEqual(loaded.signed_xml_content, signed_xml)
+            self.assertEqual(loaded.signed_xml_content, signed_xml)
+
+        ElectronicFiscalDocument.objects.filter(pk=document.pk).update(status="queued", track_id=None)
+        queued = ElectronicFiscalDocument.objects.get(pk=document.pk)
+        serializer = ElectronicFiscalDocumentSerializer()
+        with self.assertNumQueries(0):
+            self.assertEqual(serializer.get_fiscal_status(queued), "signed")
+            self.assertTrue(serializer.get_signed_xml_available(queued))
+
+        user = get_user_model().objects.create_superuser(username="artifact-stream", password="pass")
+        CompanyMembership.objects.create(user=user, company=document.company, role="owner")
+        request = APIRequestFactory().get(f"/ecf-documents/{document.id}/audit-artifact/signed-xml/")
+        request.session = {"active_company_id": document.company_id}
+        force_authenticate(request, user=user)
+        response = ElectronicFiscalDocumentViewSet.as_view({"get": "audit_artifact"})(
+            request, pk=document.id, artifact="signed-xml"
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        self.assertEqual(b"".join(response.streaming_content).decode("utf-8"), signed_xml)
+        self.assertEqual(response["ETag"], f'"{digest}"')
+        self.assertIn("Accept-Encoding", response["Vary"])
+
+        def fetch(accept_encoding):
+            request = APIRequestFactory().get(
+                f"/ecf-documents/{document.id}/audit-artifact/signed-xml/", HTTP_ACCEPT_ENCODING=accept_encoding
+            )
+            request.session = {"active_company_id": document.company_id}
+            force_authenticate(request, user=user)
+            return ElectronicFiscalDocumentViewSet.as_view({"get": "audit_artifact"})(
+                request, pk=document.id, artifact="signed-xml"
+            )
+
+        gzipped = fetch("gzip, deflate;q=0.5")
+        self.assertEqual(gzipped["Content-Encoding"], "gzip")
+        self.assertEqual(gzip.decompress(gzipped.content).decode("utf-8"), signed_xml)
+        self.assertEqual(gzipped["ETag"], f'"{digest}-gzip"')
+        self.assertIn("Accept-Encoding", gzipped["Vary"])
+        for refused in ("gzip;q=0, identity", "br", "*;q=0"):
+            identity = fetch(refused)
+            self.assertTrue(identity.streaming, refused)
+            self.assertFalse(identity.has_header("Content-Encoding"))
+            self.assertEqual(identity["ETag"], f'"{digest}"')
+
+    def test_sign_batch_records_document_failures_without_aborting_batch(self):
+        first = self._document(status="xml_generated", fiscal_status="xml_generated", xml_content="<ECF />")
+        broken = self._sibling_document(first, xml_content="")
+
+        result = ECFSigningService(
+            certificate_loader=FakeCertificateLoader(),
+            signer=FakeXMLSigner(),
+            signature_validator=FakeValidator(),
+            xsd_validator=FakeValidator(),
+        ).sign_batch([first.pk, broken.pk], certificate_path="fake.p12", certificate_password="secret")
+
+        first.refresh_from_db()
+        broken.refresh_from_db()
+        self.assertEqual(result.signed, [first.pk])
+        self.assertIn(broken.pk, result.failed)
+        self.assertEqual(first.fiscal_status, "signed")
+        self.assertEqual(broken.fiscal_status, "xml_generated")
+        self.assertEqual(broken.job_status, "failed")
+        self.assertIn("XML generado", broken.last_error)
+        self.assertTrue(ECFStatusEvent.objects.filter(document=broken, source="xml_signing_batch_failed").exists())
+
+    def test_sign_batch_rejects_documents_from_several_issuers(self):
+        first = self._document(status="xml_generated", fiscal_status="xml_generated", xml_content="<ECF />")
+        other = self._document(status="xml_generated", fiscal_status="xml_generated", xml_content="<ECF />")
+
+        with self.assertRaises(ECFValidationError):
+            ECFSigningService(certificate_loader=FakeCertificateLoader()).sign_batch(
+                [first.pk, other.pk],
+                certificate_path="fake.p12",
+                certificate_password="secret",
+            )
+
+    @patch("facturacion.ecf.tasks.signing.resolve_certificate_credentials", return_value=("fake.p12", "secret"))
+    @patch("facturacion.ecf.tasks.signing.ECFSigningService")
+    def test_sign_xml_batch_task_groups_documents_by_issuer(self, service_class, resolve_credentials):
+        service_class.return_value = ECFSigningService(
+            certificate_loader=FakeCertificateLoader(),
+            signer=FakeXMLSigner(),
+            signature_validator=FakeValidator(),
+            xsd_validator=FakeValidator(),
+        )
+        first = self._document(status="xml_generated", fiscal_status="xml_generated", xml_content="<ECF />")
+        sibling = self._sibling_document(first, xml_content="<ECF />")
+        other = self._document(status="xml_generated", fiscal_status="xml_generated", xml_content="<ECF />")
+        for document in (first, other):
+            self._set_certificate_state(
+                document,
+                ECFIssuerConfig.CERTIFICATE_STATUS_ACTIVE,
+                ECFIssuerConfig.CERTIFICATE_RNC_MATCH_MATCHED,
+            )
+
+        result = sign_xml_batch_task.apply(args=[[first.pk, sibling.pk, other.pk]]).get()
+
+        self.assertEqual(sorted(result["signed"]), sorted([first.pk, sibling.pk, other.pk]))
+        self.assertEqual(resolve_credentials.call_count, 2)
+        self.assertEqual(
+            ElectronicFiscalDocument.objects.filter(pk__in=[first.pk, sibling.pk, other.pk], fiscal_status="signed").count(),
+            3,
+        )
+
+    @patch("facturacion.ecf.tasks.signing.resolve_certificate_credentials", return_value=("fake.p12", "secret"))
+    @patch("facturacion.ecf.tasks.signing.ECFSigningService")
+    def test_sign_xml_batch_task_retries_issuer_group_on_temporary_failure(self, service_class, resolve_credentials):
+        loader = Mock()
+        loader.load.side_effect = [ECFTemporaryError("Almacén de certificados no disponible."), FakeCertificate()]
+        service_class.return_value = ECFSigningService(
+            certificate_loader=loader,
+            signer=FakeXMLSigner(),
+            signature_validator=FakeValidator(),
+            xsd_validator=FakeValidator(),
+        )
+        document = self._document(status="xml_generated", fiscal_status="xml_generated", xml_content="<ECF />")
+        self._set_certificate_state(
+            document,
+            ECFIssuerConfig.CERTIFICATE_STATUS_ACTIVE,
+            ECFIssuerConfig.CERTIFICATE_RNC_MATCH_MATCHED,
+        )
+
+        result = sign_xml_batch_task.apply(args=[[document.pk]]).get()
+
+        document.refresh_from_db()
+        self.assertEqual(result["signed"], [document.pk])
+        self.assertEqual(loader.load.call_count, 2)
+        self.assertEqual(document.fiscal_status, "signed")
+        self.assertEqual(document.job_status, "idle")
+        self.assertTrue(ECFStatusEvent.objects.filter(document=document, source="task_sign_xml_batch_started").exists())
+        self.assertTrue(ECFStatusEvent.objects.filter(document=document, source="task_sign_xml_batch_retrying").exists())
+
+    @patch("facturacion.ecf.tasks.signing.resolve_certificate_credentials", side_effect=RuntimeError("credenciales ilegibles"))
+    def test_sign_xml_batch_task_fails_group_on_permanent_error(self, resolve_credentials):
+        document = self._document(status="xml_generated", fiscal_status="xml_generated", xml_content="<ECF />")
+        self._set_certificate_state(
+            document,
+            ECFIssuerConfig.CERTIFICATE_STATUS_ACTIVE,
+            ECFIssuerConfig.CERTIFICATE_RNC_MATCH_MATCHED,
+        )
+
+        result = sign_xml_batch_task.apply(args=[[document.pk]]).get()
+
+        document.refresh_from_db()
+        self.assertEqual(result["failed"], {str(document.pk): "credenciales ilegibles"})
+        self.assertEqual(document.fiscal_status, "xml_generated")
+        self.assertEqual(document.job_status, "failed")
+        self.assertEqual(document.last_error, "credenciales ilegibles")
+
+    @patch("facturacion.ecf.queues.ecf.sign_xml_batch.apply_async")
+    def test_enqueue_sign_batch_queues_only_documents_pending_signature(self, apply_async):
+        apply_async.return_value = SimpleNamespace(id="task-sign-batch")
+        pending = self._document(status="xml_generated", fiscal_status="xml_generated", xml_content="<ECF />")
+        draft = self._document(status="draft", fiscal_status="draft")
+
+        with CaptureQueriesContext(connection) as queries:
+            result = enqueue_sign_batch([pending.pk, draft.pk], validate_xsd=False)
+
+        self.assertFalse([query for query in queries.captured_queries if "facturacion_ecfartifact" in query["sql"]])
+        apply_async.assert_called_once_with(args=[[pending.pk]], kwargs={"user_id": None, "validate_xsd": False})
+        pending.refresh_from_db()
+        draft.refresh_from_db()
+        self.assertTrue(result["enqueued"])
+        self.assertEqual(pending.job_status, "queued")
+        self.assertEqual(pending.async_task_id, "task-sign-batch")
+        self.assertFalse(result["documents"][draft.pk]["enqueued"])
+        self.assertEqual(draft.job_status, "idle")
+
     @patch("facturacion.ecf.queues.ecf.generate_xml.apply_async")
     def test_enqueue_changes_only_job_status(self, apply_async):
         apply_async.return_value = SimpleNamespace(id="task-generate")
@@ -4009,6 +5332,30 @@ class ECFStatusRuntimeTransitionTests(TestCase):
         self.assertEqual(document.job_status, "idle")
         self.assertIsNone(document.last_error)
 
+    @override_settings(ECF_PIPELINE_MODE="fused")
+    @patch("facturacion.ecf.queues.ecf.sign_xml.si")
+    @patch("facturacion.ecf.queues.ecf.chain")
+    @patch("facturacion.ecf.queues.ecf.process_document.si")
+    def test_fused_submission_pipeline_enqueues_one_task_on_the_signing_queue(self, process_si, chain_mock, sign_si):
+        process_si.return_value.apply_async.return_value = SimpleNamespace(id="task-fused")
+        document = self._document(status="xml_generated", fiscal_status="xml_generated", xml_content="<ECF />")
+        self._set_certificate_state(
+            document,
+            ECFIssuerConfig.CERTIFICATE_STATUS_ACTIVE,
+            ECFIssuerConfig.CERTIFICATE_RNC_MATCH_MATCHED,
+        )
+
+        result = enqueue_submission_pipeline(document.id)
+
+        self.assertTrue(result["enqueued"])
+        process_si.assert_called_once()
+        chain_mock.assert_not_called()
+        sign_si.assert_not_called()
+        self.assertEqual(
+            settings.CELERY_TASK_ROUTES["facturacion.ecf.tasks.pipeline.process_document"]["queue"],
+            settings.CELERY_TASK_ROUTES["facturacion.ecf.tasks.signing.sign_xml"]["queue"],
+        )
+
     @patch("facturacion.ecf.queues.ecf.chain")
     def test_submission_pipeline_preflight_blocks_cross_company_sequence_before_enqueue(self, chain_mock):
         document = self._document(status="draft", fiscal_status="draft")
@@ -4259,6 +5606,41 @@ class ECFStatusRuntimeTransitionTests(TestCase):
             ).exists()
         )
 
+    @override_settings(ECF_DGII_MOCK_ENABLED=True, ECF_DGII_STATUS_POLLING="batch")
+    @patch("facturacion.ecf.tasks.pipeline.resolve_certificate_credentials", return_value=("fake.p12", "secret"))
+    @patch("facturacion.ecf.tasks.pipeline.ECFSigningService")
+    def test_process_document_runs_pipeline_stages_in_one_task(self, service_class, _resolver):
+        service_class.return_value = ECFSigningService(
+            certificate_loader=FakeCertificateLoader(),
+            signer=FakeXMLSigner(),
+            signature_validator=FakeValidator(),
+            xsd_validator=FakeValidator(),
+        )
+        document = self._document(status="xml_generated", fiscal_status="xml_generated", xml_content="<ECF />")
+        self._set_certificate_state(
+            document,
+            ECFIssuerConfig.CERTIFICATE_STATUS_ACTIVE,
+            ECFIssuerConfig.CERTIFICATE_RNC_MATCH_MATCHED,
+        )
+
+        result = process_document.apply(args=[document.id], kwargs={"validate_xsd": False}).get()
+        repeated = process_document.apply(args=[document.id], kwargs={"validate_xsd": False}).get()
+
+        document.refresh_from_db()
+        self.assertEqual(result["stages"], ["sign_xml", "submit_dgii"])
+        self.assertEqual(repeated["stages"], [])
+        self.assertEqual((document.fiscal_status, document.job_status), ("submitted", "idle"))
+        self.assertEqual(document.submission_attempts, 1)
+        self.assertEqual(
+            list(
+                ECFStatusEvent.objects
+                .filter(document=document, source__startswith="task_")
+                .order_by("id")
+                .values_list("source", flat=True)
+            ),
+            ["task_process_document_started", "task_process_document_succeeded"] * 2,
+        )
+
     @override_settings(DEBUG=False, ECF_DGII_MOCK_ENABLED=False, ECF_DGII_ENVIRONMENT="production")
     def test_sign_xml_task_policy_block_marks_job_failed_without_fiscal_change(self):
         document = self._document(status="xml_generated", fiscal_status="xml_generated", xml_content="<ECF />")
@@ -4432,6 +5814,28 @@ class ECFStatusRuntimeTransitionTests(TestCase):
             signed_xml_content=signed_xml_content,
         )
 
+    def _sibling_document(self, document, *, xml_content: str):
+        invoice = Invoice.objects.create(
+            company=document.company,
+            subtotal=Decimal("100.00"),
+            tax=Decimal("18.00"),
+            discount=Decimal("0.00"),
+            total=Decimal("118.00"),
+            status="paid",
+        )
+        return ElectronicFiscalDocument.objects.create(
+            company=document.company,
+            invoice=invoice,
+            issuer=document.issuer,
+            sequence=document.sequence,
+            ecf_type="32",
+            encf=f"E3200000{invoice.id:05d}",
+            status="xml_generated",
+            fiscal_status="xml_generated",
+            job_status="idle",
+            xml_content=xml_content,
+        )
+
     def _set_certificate_state(self, document, certificate_status: str, rnc_match_status: str):
         issuer = document.issuer
         issuer.certificate_status = certificate_status
@@ -4540,6 +5944,55 @@ class InvoiceE2EIntegrationTests(TestCase):
         self.assertEqual(result.sale.details.count(), 1)
         self.assertIsNotNone(result.electronic_document)
 
+    @override_settings(ECF_AUTO_ENQUEUE_ENABLED=False)
+    def test_daily_sales_rollup_follows_invoice_lifecycle(self):
+        self._assert_rollup_follows_invoice_lifecycle(company_rnc="501010105", issuer_rnc="101010105")
+
+    @patch("facturacion.services.sales_rollup.UPSERT_VENDORS", set())
+    def test_daily_sales_rollup_increment_fallback_follows_invoice_lifecycle(self):
+        self._assert_rollup_follows_invoice_lifecycle(company_rnc="501010106", issuer_rnc="101010106")
+
+    def _assert_rollup_follows_invoice_lifecycle(self, *, company_rnc, issuer_rnc):
+        company = Company.objects.create(name="Empresa Rollup", rnc=company_rnc)
+        product = self._product(stock=6, company=company)
+        issuer = self._issuer(company=company, rnc=issuer_rnc)
+        self._sequence(issuer)
+        service = InvoiceCreationService()
+
+        created = service.create_invoice(
+            client_id=None,
+            details=[{"product": product.id, "quantity": 3, "price": Decimal("100.00")}],
+            status="pending",
+            auto_ecf=False,
+            decrement_stock=False,
+            company=company,
+        )
+        collected = service.collect_and_issue_invoice(invoice_id=created.invoice.id)
+        ECFStatusTransitionService().transition(
+            collected.electronic_document,
+            fiscal_status="accepted",
+            source="test",
+            validate=False,
+        )
+
+        def rollup_rows():
+            return sorted(
+                DailySalesRollup.objects.filter(company=company)
+                .exclude(invoice_count=0, line_amount=0, quantity=0)
+                .values_list("day", "category_id", "status", "fiscal_status", "invoice_count", "total_amount", "line_amount", "quantity"),
+                key=str,
+            )
+
+        incremental = rollup_rows()
+        DailySalesRollupService().rebuild(company=company)
+
+        self.assertEqual(incremental, rollup_rows())
+        paid_row = DailySalesRollup.objects.get(company=company, category__isnull=True, status="paid", fiscal_status="accepted")
+        self.assertEqual(paid_row.invoice_count, 1)
+        self.assertEqual(paid_row.total_amount, collected.invoice.total)
+        category_row = DailySalesRollup.objects.get(company=company, category=product.category, status="paid")
+        self.assertEqual((category_row.quantity, category_row.line_amount), (3, Decimal("300.00")))
+
     def _product(self, stock=10, company=None):
         category = Category.objects.create(company=company, name=f"CAT-{stock}")
         return Product.objects.create(
@@ -5299,6 +6752,9 @@ class SaleLegacyAdapterTests(TestCase):
 class DashboardInvoiceReportingTests(TestCase):
     """Validate commercial dashboard metrics use Invoice as source of truth."""
 
+    def setUp(self):
+        cache.clear()
+
     def _company_for_user(self, user, name="Empresa Dashboard"):
         company = Company.objects.create(name=name, rnc=f"30{Company.objects.count():07d}")
         CompanyMembership.objects.create(user=user, company=company, role="admin")
@@ -5383,6 +6839,7 @@ class DashboardInvoiceReportingTests(TestCase):
             price=Decimal("111.00"),
         )
 
+        DailySalesRollupService().rebuild(company=company)
         request = APIRequestFactory().get("/dashboard/")
         request.session = {"active_company_id": company.id}
         force_authenticate(request, user=user)
@@ -5468,6 +6925,7 @@ class DashboardInvoiceReportingTests(TestCase):
             fiscal_status="accepted",
         )
 
+        DailySalesRollupService().rebuild(company=company)
         request = APIRequestFactory().get("/dashboard/")
         request.session = {"active_company_id": company.id}
         force_authenticate(request, user=user)
@@ -5485,6 +6943,70 @@ class DashboardInvoiceReportingTests(TestCase):
         self.assertEqual(response.data["topProducts"][0]["quantity"], 2)
         self.assertEqual([item["id"] for item in response.data["recentSales"]], [paid_invoice.id])
 
+    def test_inventory_health_uses_one_query_regardless_of_category_count(self):
+        company = Company.objects.create(name="Empresa Inventario", rnc="301010999")
+        for index, stocks in enumerate([(0, 2, 9), (7, 8), (4,)]):
+            category = Category.objects.create(company=company, name=f"Inventario {index}")
+            for stock in stocks:
+                Product.objects.create(
+                    company=company,
+                    name=f"Producto {index}-{stock}",
+                    description="Inventario",
+                    price=Decimal("10.00"),
+                    stock=stock,
+                    category=category,
+                )
+        Category.objects.create(company=company, name="Inventario vacio")
+
+        with self.assertNumQueries(1):
+            health = InventoryHealthService().category_health(company)
+
+        by_name = {category.name: category for category in health.categories}
+        self.assertEqual(len(by_name), 4)
+        self.assertEqual(
+            (by_name["Inventario 0"].in_stock, by_name["Inventario 0"].low_stock, by_name["Inventario 0"].out_of_stock),
+            (1, 2, 1),
+        )
+        self.assertEqual(by_name["Inventario 0"].total_stock, 11)
+        self.assertEqual(by_name["Inventario 1"].in_stock, 2)
+        self.assertEqual(by_name["Inventario vacio"].total_stock, 0)
+        self.assertEqual(health.low_stock_count, 3)
+
+    def test_dashboard_response_is_cached_per_company_until_invoice_changes(self):
+        user = get_user_model().objects.create_superuser(
+            username="dashboard-cache-admin",
+            email="dashboard-cache-admin@example.test",
+            password="test-pass",
+        )
+        company = self._company_for_user(user, name="Empresa Dashboard Cache")
+        _client, invoice, _product = self._build_invoice_fixture(company)
+        DailySalesRollupService().rebuild(company=company)
+
+        def fetch():
+            request = APIRequestFactory().get("/dashboard/", {"time_frame": "day", "_": "cache-buster"})
+            request.session = {"active_company_id": company.id}
+            force_authenticate(request, user=user)
+            return DashboardView.as_view()(request)
+
+        first = fetch()
+        with CaptureQueriesContext(connection) as cached_queries:
+            second = fetch()
+
+        self.assertEqual(second.data, first.data)
+        self.assertFalse(
+            [query["sql"] for query in cached_queries.captured_queries if "facturacion_dailysalesrollup" in query["sql"]]
+        )
+
+        with self.captureOnCommitCallbacks(execute=True):
+            invoice.status = "pending"
+            invoice.save(update_fields=["status"])
+            DailySalesRollupService().move_invoice(invoice, previous_status="paid")
+        refreshed = fetch()
+
+        self.assertEqual(first.data["salesSummary"]["sales_count"], 1)
+        self.assertEqual(refreshed.data["salesSummary"]["sales_count"], 0)
+        self.assertEqual(refreshed.data["salesSummary"]["accounts_receivable_count"], 1)
+
     def test_dashboard_accepts_financial_totals_permission(self):
         user = get_user_model().objects.create_user(username="financial-dashboard")
         company = self._company_for_user(user, name="Empresa Dashboard Financial")
@@ -5492,6 +7014,7 @@ class DashboardInvoiceReportingTests(TestCase):
         self._grant(user, Invoice, "view_financial_totals")
         self._build_invoice_fixture(company)
 
+        DailySalesRollupService().rebuild(company=company)
         request = APIRequestFactory().get("/dashboard/")
         request.session = {"active_company_id": company.id}
         force_authenticate(request, user=user)
@@ -5507,6 +7030,7 @@ class DashboardInvoiceReportingTests(TestCase):
         self._grant(user, Sale, "view_sale_totals")
         self._build_invoice_fixture(company)
 
+        DailySalesRollupService().rebuild(company=company)
         request = APIRequestFactory().get("/dashboard/")
         request.session = {"active_company_id": company.id}
         force_authenticate(request, user=user)
@@ -5675,14 +7199,15 @@ class E34FiscalValidationTests(TestCase):
             next_number=1,
         )
 
-        with patch("facturacion.services.credit_notes.enqueue_submission_pipeline") as enqueue:
-            with self.captureOnCommitCallbacks(execute=True):
-                result = CreditNoteService().create_credit_note(
-                    origin_invoice_id=invoice.id,
-                    details=[{"origin_detail": detail.id, "quantity": 1}],
-                    reason="Devolucion parcial por ajuste operativo",
-                    user=user,
-                )
+        with patch("facturacion.ecf.queues.outbox.enqueue_submission_pipeline", return_value={"task_id": "task-e34"}) as enqueue:
+            result = CreditNoteService().create_credit_note(
+                origin_invoice_id=invoice.id,
+                details=[{"origin_detail": detail.id, "quantity": 1}],
+                reason="Devolucion parcial por ajuste operativo",
+                user=user,
+            )
+            enqueue.assert_not_called()
+            ECFOutboxRelay().relay()
         xml_result = ECFXMLGenerationService().generate(result.electronic_document, user=user, validate_xsd=True)
 
         self.assertEqual(result.electronic_document.ecf_type, "34")
@@ -6225,6 +7750,124 @@ class ECFConcurrencyHardeningTests(TransactionTestCase):
         self.assertEqual(sorted(encfs)[0], "E320000000001")
         self.assertEqual(sorted(encfs)[-1], "E320000000020")
 
+    def _block_sequence(self, rnc="101010189", end_number=30):
+        company = Company.objects.first() or Company.objects.create(name="Empresa Bloques", rnc="701010189")
+        issuer = ECFIssuerConfig.objects.create(
+            company=company,
+            business_name="Empresa Bloques SRL",
+            rnc=rnc,
+            address="Calle Bloques",
+        )
+        sequence = ECFSequence.objects.create(
+            company=issuer.company,
+            issuer=issuer,
+            ecf_type="32",
+            start_number=1,
+            end_number=end_number,
+            next_number=1,
+        )
+        return issuer, sequence
+
+    def test_allocate_block_reserves_contiguous_range_capped_at_sequence_end(self):
+        issuer, sequence = self._block_sequence(end_number=12)
+
+        first = ECFSequence.allocate_block(issuer, "32", 10, owner="worker-a")
+        second = ECFSequence.allocate_block(issuer, "32", 10, owner="worker-b")
+
+        self.assertEqual((first.first_number, first.last_number), (1, 10))
+        self.assertEqual((second.first_number, second.last_number), (11, 12))
+        self.assertEqual(second.encfs(), ["E320000000011", "E320000000012"])
+        sequence.refresh_from_db()
+        self.assertEqual(sequence.next_number, 13)
+        with self.assertRaises(ValidationError):
+            ECFSequence.allocate_block(issuer, "32", 1)
+
+    @override_settings(ECF_SEQUENCE_BLOCK_SIZE=5)
+    def test_block_allocator_serves_block_locally_and_drops_it_on_rollback(self):
+        issuer, sequence = self._block_sequence()
+        sequence_allocator.clear()
+        self.addCleanup(sequence_allocator.clear)
+
+        encfs = []
+        for _ in range(3):
+            with transaction.atomic():
+                encf, _sequence = sequence_allocator.allocate(issuer, "32")
+                encfs.append(encf)
+
+        self.assertEqual(encfs, ["E320000000001", "E320000000002", "E320000000003"])
+        self.assertEqual(ECFSequenceReservation.objects.filter(sequence=sequence).count(), 1)
+
+        sequence_allocator.clear()
+        with self.assertRaises(RuntimeError):
+            with transaction.atomic():
+                sequence_allocator.allocate(issuer, "32")
+                raise RuntimeError("rollback")
+        encf, _sequence = sequence_allocator.allocate(issuer, "32")
+
+        self.assertEqual(encf, "E320000000006")
+        self.assertEqual(ECFSequenceReservation.objects.filter(sequence=sequence).count(), 2)
+
+    @override_settings(ECF_SEQUENCE_BLOCK_SIZE=5)
+    def test_block_allocator_stops_serving_deactivated_or_shrunk_sequence(self):
+        issuer, sequence = self._block_sequence()
+        sequence_allocator.clear()
+        self.addCleanup(sequence_allocator.clear)
+        with transaction.atomic():
+            sequence_allocator.allocate(issuer, "32")
+
+        ECFSequence.objects.filter(pk=sequence.pk).update(is_active=False)
+        with self.assertRaises(ValidationError):
+            sequence_allocator.allocate(issuer, "32")
+
+        replacement = ECFSequence.objects.create(
+            company=issuer.company,
+            issuer=issuer,
+            ecf_type="32",
+            start_number=100,
+            end_number=130,
+            next_number=100,
+        )
+        with transaction.atomic():
+            encf, served_by = sequence_allocator.allocate(issuer, "32")
+        self.assertEqual((encf, served_by.pk), ("E320000000100", replacement.pk))
+
+        ECFSequence.objects.filter(pk=replacement.pk).update(end_number=100)
+        with self.assertRaises(ValidationError):
+            sequence_allocator.allocate(issuer, "32")
+
+    def test_reconciliation_reports_unused_numbers_of_expired_reservations(self):
+        issuer, sequence = self._block_sequence()
+        reservation = ECFSequence.allocate_block(issuer, "32", 3, owner="worker-a", ttl_seconds=60)
+        invoice = Invoice.objects.create(
+            company=issuer.company,
+            subtotal=Decimal("100.00"),
+            tax=Decimal("18.00"),
+            discount=Decimal("0.00"),
+            total=Decimal("118.00"),
+            status="paid",
+        )
+        ElectronicFiscalDocument.objects.create(
+            company=issuer.company,
+            invoice=invoice,
+            issuer=issuer,
+            sequence=sequence,
+            ecf_type="32",
+            encf="E320000000002",
+        )
+        ECFSequenceReservation.objects.filter(pk=reservation.pk).update(
+            expires_at=datetime.now(timezone.utc) - timedelta(hours=1)
+        )
+
+        result = ECFSequenceReservationReconciliationService().reconcile_expired(grace_seconds=0)
+        again = ECFSequenceReservationReconciliationService().reconcile_expired(grace_seconds=0)
+
+        reservation.refresh_from_db()
+        self.assertEqual((result.reservations, result.unused_numbers), (1, 2))
+        self.assertEqual(again.reservations, 0)
+        self.assertEqual(reservation.status, ECFSequenceReservation.STATUS_RECONCILED)
+        self.assertEqual(reservation.used_count, 1)
+        self.assertEqual(reservation.unused_encfs, ["E320000000001", "E320000000003"])
+
     def test_concurrent_document_creation_for_same_invoice_is_idempotent(self):
         company = Company.objects.first() or Company.objects.create(name="Empresa Idempotente", rnc="701010198")
         category = Category.objects.create(company=company, name="IDEMPOTENCY")
@@ -6519,6 +8162,107 @@ class NumberSequenceHardeningTests(TransactionTestCase):
         )
         self.assertEqual(invoice.invoice_number, "FAC-00000500")
 
+    def test_update_returning_allocation_takes_one_number_per_statement(self):
+        company = Company.objects.create(name="Empresa Returning", rnc="719999005")
+        service = NumberingService()
+        service.update_returning_vendors = frozenset({connection.vendor})
+
+        numbers = [
+            service.allocate_unique(code="invoice", model_class=Invoice, field_name="invoice_number", company=company)
+            for _ in range(3)
+        ]
+        with CaptureQueriesContext(connection) as queries:
+            numbers.append(
+                service.allocate_unique(code="invoice", model_class=Invoice, field_name="invoice_number", company=company)
+            )
+
+        self.assertEqual(numbers, ["FAC-00000001", "FAC-00000002", "FAC-00000003", "FAC-00000004"])
+        self.assertEqual(NumberSequence.objects.get(company=company, code="invoice").next_number, 5)
+        statements = [
+            query["sql"]
+            for query in queries.captured_queries
+            if query["sql"].split(" ", 1)[0] in {"SELECT", "INSERT", "UPDATE", "DELETE"}
+        ]
+        self.assertEqual(len(statements), 1)
+        self.assertIn("RETURNING", statements[0])
+
+    def test_collision_probe_only_runs_inside_flagged_legacy_range(self):
+        company = Company.objects.create(name="Empresa Legacy", rnc="719999006")
+        Invoice.objects.create(
+            company=company,
+            invoice_number="FAC-00000003",
+            subtotal=Decimal("10.00"),
+            tax=Decimal("1.80"),
+            discount=Decimal("0.00"),
+            total=Decimal("11.80"),
+            status="paid",
+        )
+        service = NumberingService()
+        self.assertEqual(
+            service.mark_legacy_import(code="invoice", model_class=Invoice, field_name="invoice_number", company=company),
+            3,
+        )
+
+        def allocate():
+            return service.allocate_unique(code="invoice", model_class=Invoice, field_name="invoice_number", company=company)
+
+        numbers = [allocate(), allocate(), allocate()]
+        with CaptureQueriesContext(connection) as queries:
+            numbers.append(allocate())
+
+        self.assertEqual(numbers, ["FAC-00000001", "FAC-00000002", "FAC-00000004", "FAC-00000005"])
+        invoice_table = Invoice._meta.db_table
+        self.assertFalse(any(invoice_table + '"' in query["sql"] for query in queries.captured_queries))
+
+    def test_first_allocation_skips_rows_numbered_before_the_sequence_existed(self):
+        company = Company.objects.create(name="Empresa Sin Secuencia", rnc="719999007")
+        Invoice.objects.bulk_create(
+            [
+                Invoice(
+                    company=company,
+                    invoice_number=f"FAC-0000000{number}",
+                    subtotal=Decimal("10.00"),
+                    tax=Decimal("1.80"),
+                    discount=Decimal("0.00"),
+                    total=Decimal("11.80"),
+                    status="paid",
+                )
+                for number in (1, 2)
+            ]
+        )
+        self.assertFalse(NumberSequence.objects.filter(company=company, code="invoice").exists())
+
+        number = NumberingService().allocate_unique(
+            code="invoice", model_class=Invoice, field_name="invoice_number", company=company
+        )
+
+        self.assertEqual(number, "FAC-00000003")
+        self.assertEqual(NumberSequence.objects.get(company=company, code="invoice").legacy_max_number, 2)
+
+    def test_typed_internal_barcode_is_skipped_by_allocation(self):
+        company = Company.objects.create(name="Empresa Barcode Manual", rnc="709999002")
+        category = Category.objects.create(company=company, name="BARCODE-MANUAL")
+        Product.objects.create(
+            company=company,
+            name="Producto Manual",
+            description="Prueba",
+            price=Decimal("10.00"),
+            stock=1,
+            category=category,
+            barcode="PRD-00000001",
+        )
+
+        product = Product.objects.create(
+            company=company,
+            name="Producto Automatico",
+            description="Prueba",
+            price=Decimal("10.00"),
+            stock=1,
+            category=category,
+        )
+
+        self.assertEqual(product.barcode, "PRD-00000002")
+
     def _run_concurrently(self, callback, *, count: int, max_workers: int):
         with ThreadPoolExecutor(max_workers=max_workers) as pool:
             futures = [pool.submit(callback) for _ in range(count)]
@@ -26,6 +26,7 @@ from facturacion.api.views.inventory import (
     LowStockProductsView,
     ProductListCreateView,
     ProductHistoryListView,
+    ProductImportView,
     ProductRetrieveUpdateDeleteView,
 )
 from facturacion.api.views.inventory_utils import (
@@ -33,6 +34,7 @@ from facturacion.api.views.inventory_utils import (
     GenerateZPLLabelView,
     ListPrintersView,
     PrintLabelDirectView,
+    SearchByBarcodeBatchView,
     SearchByBarcodeView,
     generate_low_stock_pdf,
 )
@@ -92,6 +94,7 @@ urlpatterns = router.urls + [
     path('products/<int:pk>/', ProductRetrieveUpdateDeleteView.as_view(), name='product-detail'),
     path('products/<int:pk>/history/', ProductHistoryListView.as_view(), name='product-history'),
     path('products/low-stock/', LowStockProductsView.as_view(), name='low-stock-products'),
+    path('products/import/', ProductImportView.as_view(), name='product-import'),
     
     # ==========================================
     # CÓDIGOS DE BARRAS - NUEVAS RUTAS
@@ -100,6 +103,7 @@ urlpatterns = router.urls + [
     path('products/print-label/', GenerateZPLLabelView.as_view(), name='print-label'),
     path('products/print-direct/', PrintLabelDirectView.as_view(), name='print-direct'),
     path('products/search-barcode/', SearchByBarcodeView.as_view(), name='search-barcode'),
+    path('products/search-barcode/batch/', SearchByBarcodeBatchView.as_view(), name='search-barcode-batch'),
     path('products/list-printers/', ListPrintersView.as_view(), name='list-printers'), 
     
     # ==========================================
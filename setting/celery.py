@@ -17,4 +17,5 @@ app.conf.imports = (
     "facturacion.ecf.tasks.xml",
     "facturacion.ecf.tasks.signing",
     "facturacion.ecf.tasks.dgii",
+    "facturacion.ecf.tasks.pipeline",
 )
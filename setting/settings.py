@@ -127,13 +127,50 @@ DATABASES = {
 }
 
 
+# ==============================================================================
+# CACHE
+# ==============================================================================
+
+# Con varios procesos (gunicorn/celery) use Redis para que la invalidacion de
+# respuestas cacheadas y los tokens DGII se compartan entre procesos.
+CACHE_REDIS_URL = os.environ.get('CACHE_REDIS_URL')
+if CACHE_REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': CACHE_REDIS_URL,
+        }
+    }
+# Segundos que dashboard y monitor e-CF reutilizan una respuesta por empresa;
+# las escrituras la invalidan antes. 0 desactiva el cache.
+TENANT_RESPONSE_CACHE_TTL_SECONDS = int(os.environ.get('TENANT_RESPONSE_CACHE_TTL_SECONDS', '15'))
+# Segundos que se reutilizan las membresias de un usuario y la busqueda de su token al
+# resolver la empresa activa; guardar Company/CompanyMembership/User/Token las invalida. 0 desactiva.
+# Solo se activa por defecto con CACHE_REDIS_URL: con el cache local de cada proceso una
+# revocacion hecha en otro worker no invalidaria la copia de este.
+TENANT_CONTEXT_CACHE_TTL_SECONDS = int(
+    os.environ.get('TENANT_CONTEXT_CACHE_TTL_SECONDS', '300' if CACHE_REDIS_URL else '0')
+)
+# Segundos que se reutiliza el mapa codigo de barras -> producto del escaneo en caja;
+# guardar productos o mover stock lo invalida. 0 desactiva el cache.
+# Solo se activa por defecto con CACHE_REDIS_URL: con el cache local de cada proceso un
+# cambio de precio o stock hecho en otro worker no invalidaria la copia de este.
+BARCODE_MAP_CACHE_TTL_SECONDS = int(
+    os.environ.get('BARCODE_MAP_CACHE_TTL_SECONDS', '300' if CACHE_REDIS_URL else '0')
+)
+# Codigos de barras que cada proceso mantiene en memoria (LRU) antes de consultar Redis.
+BARCODE_MAP_LOCAL_MAX_ENTRIES = int(os.environ.get('BARCODE_MAP_LOCAL_MAX_ENTRIES', '20000'))
+# Filas del catalogo que la importacion masiva valida y escribe por transaccion.
+PRODUCT_IMPORT_CHUNK_SIZE = int(os.environ.get('PRODUCT_IMPORT_CHUNK_SIZE', '1000'))
+
+
 # ==============================================================================
 # DJANGO REST FRAMEWORK
 # ==============================================================================
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework.authentication.TokenAuthentication',
+        'facturacion.api.authentication.CachedTokenAuthentication',
     ],
     'DEFAULT_FILTER_BACKENDS': [
         'django_filters.rest_framework.DjangoFilterBackend',
@@ -231,13 +268,47 @@ CELERY_TASK_DEFAULT_QUEUE = 'ecf.default'
 CELERY_TASK_ROUTES = {
     'facturacion.ecf.tasks.xml.generate_xml': {'queue': 'ecf.xml'},
     'facturacion.ecf.tasks.signing.sign_xml': {'queue': 'ecf.signing'},
+    'facturacion.ecf.tasks.signing.sign_xml_batch': {'queue': 'ecf.signing'},
     'facturacion.ecf.tasks.dgii.submit_dgii': {'queue': 'ecf.dgii'},
     'facturacion.ecf.tasks.dgii.check_status': {'queue': 'ecf.status'},
     'facturacion.ecf.tasks.dgii.retry_submission': {'queue': 'ecf.retry'},
+    'facturacion.ecf.tasks.dgii.poll_submitted_batch': {'queue': 'ecf.status'},
+    # Generar+firmar+enviar en una task es CPU de firma: va con los workers de ecf.signing.
+    'facturacion.ecf.tasks.pipeline.process_document': {'queue': 'ecf.signing'},
 }
 ECF_TASK_MAX_RETRIES = int(os.environ.get('ECF_TASK_MAX_RETRIES', '5'))
 ECF_TASK_RETRY_BACKOFF_SECONDS = int(os.environ.get('ECF_TASK_RETRY_BACKOFF_SECONDS', '60'))
+# 'fused' ejecuta generar -> firmar -> enviar en una sola task (process_document);
+# 'chain' mantiene la cadena Celery de tres tasks.
+ECF_PIPELINE_MODE = os.environ.get('ECF_PIPELINE_MODE', 'fused')
 ECF_TASK_STATUS_CHECK_DELAY_SECONDS = int(os.environ.get('ECF_TASK_STATUS_CHECK_DELAY_SECONDS', '120'))
+# 'batch' consulta TrackIDs pendientes con la tarea periodica poll_submitted_batch y
+# requiere un proceso `celery beat` (servicio celery-beat en docker-compose.ecf.yml);
+# 'per_document' agenda un check_status diferido por cada envio y no necesita beat.
+ECF_DGII_STATUS_POLLING = os.environ.get('ECF_DGII_STATUS_POLLING', 'per_document')
+ECF_DGII_STATUS_POLL_INTERVAL_SECONDS = int(os.environ.get('ECF_DGII_STATUS_POLL_INTERVAL_SECONDS', '30'))
+ECF_DGII_STATUS_POLL_BATCH_SIZE = int(os.environ.get('ECF_DGII_STATUS_POLL_BATCH_SIZE', '200'))
+ECF_DGII_STATUS_POLL_WORKERS = int(os.environ.get('ECF_DGII_STATUS_POLL_WORKERS', '8'))
+ECF_DGII_STATUS_POLL_LEASE_SECONDS = int(os.environ.get('ECF_DGII_STATUS_POLL_LEASE_SECONDS', '600'))
+# Lotes maximos por ejecucion del despachador antes de ceder al siguiente tick de beat.
+ECF_DGII_STATUS_POLL_MAX_BATCHES = int(os.environ.get('ECF_DGII_STATUS_POLL_MAX_BATCHES', '10'))
+# Espera (segundos) antes de la consulta N+1 de estado DGII, segun consultas ya hechas;
+# pasado el final se repite el ultimo valor. Se puede ajustar por tipo e-CF.
+ECF_DGII_STATUS_CHECK_BACKOFF_SECONDS = [
+    int(seconds)
+    for seconds in os.environ.get('ECF_DGII_STATUS_CHECK_BACKOFF_SECONDS', '60,120,300,600,1800,3600').split(',')
+    if seconds.strip()
+]
+ECF_DGII_STATUS_CHECK_BACKOFF_BY_TYPE = {}
+# Consultas automaticas de estado por documento (modo per_document) antes de dejar de
+# reagendarlo; queda en 'submitted' para conciliacion u operadores. 0 = sin limite.
+ECF_DGII_STATUS_MAX_CHECKS = int(os.environ.get('ECF_DGII_STATUS_MAX_CHECKS', '48'))
+CELERY_BEAT_SCHEDULE = {}
+if ECF_DGII_STATUS_POLLING == 'batch':
+    CELERY_BEAT_SCHEDULE['ecf-poll-submitted-batch'] = {
+        'task': 'facturacion.ecf.tasks.dgii.poll_submitted_batch',
+        'schedule': ECF_DGII_STATUS_POLL_INTERVAL_SECONDS,
+    }
 
 
 # ==============================================================================
@@ -257,13 +328,29 @@ ECF_ALLOW_DEV_SELF_SIGNED_CERT = os.environ.get(
     'True' if DEBUG else 'False',
 ) == 'True'
 ECF_DEV_CERTIFICATE_PASSWORD = os.environ.get('ECF_DEV_CERTIFICATE_PASSWORD', 'dev-ecf-password')
+ECF_CERTIFICATE_CACHE_TTL_SECONDS = int(os.environ.get('ECF_CERTIFICATE_CACHE_TTL_SECONDS', '300'))
+ECF_CERTIFICATE_CACHE_MAX_ENTRIES = int(os.environ.get('ECF_CERTIFICATE_CACHE_MAX_ENTRIES', '32'))
+# 'inline' firma en el worker actual; 'process_pool' envia firma+verificacion a un
+# ProcessPoolExecutor (usar con workers de firma -P solo o threads).
+ECF_SIGNING_ENGINE = os.environ.get('ECF_SIGNING_ENGINE', 'inline')
+ECF_SIGNING_POOL_WORKERS = int(os.environ.get('ECF_SIGNING_POOL_WORKERS', '0')) or None
 ECF_DGII_ENVIRONMENT = os.environ.get('ECF_DGII_ENVIRONMENT', 'testing')
 ECF_DGII_MOCK_ENABLED = os.environ.get('ECF_DGII_MOCK_ENABLED', 'True' if DEBUG else 'False') == 'True'
 ECF_DGII_AUTH_TOKEN = os.environ.get('ECF_DGII_AUTH_TOKEN')
 ECF_DGII_TIMEOUT = int(os.environ.get('ECF_DGII_TIMEOUT', '30'))
+# Cache en disco (sqlite de Zeep) para WSDL/XSD DGII; 0 lo desactiva. Sin ruta usa ~/.cache/zeep.
+ECF_DGII_WSDL_CACHE_SECONDS = int(os.environ.get('ECF_DGII_WSDL_CACHE_SECONDS', '86400'))
+ECF_DGII_WSDL_CACHE_PATH = os.environ.get('ECF_DGII_WSDL_CACHE_PATH') or None
 ECF_DGII_RETRIES = int(os.environ.get('ECF_DGII_RETRIES', '3'))
 ECF_DGII_RETRY_BACKOFF = float(os.environ.get('ECF_DGII_RETRY_BACKOFF', '0.5'))
 ECF_DGII_VERIFY_TLS = os.environ.get('ECF_DGII_VERIFY_TLS', 'True') == 'True'
+# Token REST DGII: renovacion anticipada (segundos antes de expirar) y candado para que un solo
+# worker pida semilla por certificado/RNC mientras los demas esperan el resultado.
+ECF_DGII_REST_TOKEN_REFRESH_MARGIN_SECONDS = int(os.environ.get('ECF_DGII_REST_TOKEN_REFRESH_MARGIN_SECONDS', '300'))
+ECF_DGII_REST_TOKEN_LOCK_SECONDS = int(os.environ.get('ECF_DGII_REST_TOKEN_LOCK_SECONDS', '60'))
+ECF_DGII_REST_TOKEN_WAIT_SECONDS = int(os.environ.get('ECF_DGII_REST_TOKEN_WAIT_SECONDS', '60'))
+# Conexiones keep-alive maximas (y llamadas en vuelo) del cliente REST DGII asincrono por worker de I/O.
+ECF_DGII_REST_ASYNC_MAX_CONNECTIONS = int(os.environ.get('ECF_DGII_REST_ASYNC_MAX_CONNECTIONS', '100'))
 ECF_DGII_REST_BASE_URLS = {
     'testing': {
         'auth': os.environ.get('ECF_DGII_TEST_AUTH_BASE_URL'),
@@ -306,8 +393,22 @@ ECF_DGII_SOAP_OPERATIONS = {
     'status': os.environ.get('ECF_DGII_SOAP_STATUS_OPERATION', 'ConsultaResultado'),
     'trackids': os.environ.get('ECF_DGII_SOAP_TRACKIDS_OPERATION', 'ConsultaTrackIds'),
 }
+# Tamaño de bloque e-NCF reservado por proceso; 1 conserva la asignación unitaria.
+ECF_SEQUENCE_BLOCK_SIZE = int(os.environ.get('ECF_SEQUENCE_BLOCK_SIZE', '1'))
+ECF_SEQUENCE_BLOCK_TTL_SECONDS = int(os.environ.get('ECF_SEQUENCE_BLOCK_TTL_SECONDS', '900'))
 ECF_AUTO_CREATE_ENABLED = os.environ.get('ECF_AUTO_CREATE_ENABLED', 'True') == 'True'
 ECF_AUTO_ENQUEUE_ENABLED = os.environ.get('ECF_AUTO_ENQUEUE_ENABLED', 'True') == 'True'
+# 'outbox' escribe el encolado en ECFOutbox dentro de la transaccion de la venta y el relay
+# (manage.py relay_ecf_outbox) lo publica en el broker; 'on_commit' llama apply_async tras el commit.
+ECF_AUTO_ENQUEUE_MODE = os.environ.get('ECF_AUTO_ENQUEUE_MODE', 'outbox')
+ECF_OUTBOX_RELAY_BATCH_SIZE = int(os.environ.get('ECF_OUTBOX_RELAY_BATCH_SIZE', '100'))
+ECF_OUTBOX_RELAY_INTERVAL_SECONDS = float(os.environ.get('ECF_OUTBOX_RELAY_INTERVAL_SECONDS', '1'))
+ECF_OUTBOX_RETRY_BACKOFF_SECONDS = int(os.environ.get('ECF_OUTBOX_RETRY_BACKOFF_SECONDS', '5'))
+ECF_OUTBOX_MAX_ATTEMPTS = int(os.environ.get('ECF_OUTBOX_MAX_ATTEMPTS', '10'))
+# Meses completos de bitacoras (eventos e-CF y requests publicos DGII) que quedan en las
+# tablas calientes; manage.py archive_audit_logs mueve lo anterior a las tablas comprimidas.
+AUDIT_LOG_HOT_MONTHS = int(os.environ.get('AUDIT_LOG_HOT_MONTHS', '6'))
+AUDIT_LOG_ARCHIVE_BATCH_SIZE = int(os.environ.get('AUDIT_LOG_ARCHIVE_BATCH_SIZE', '1000'))
 ECF_DEFAULT_TYPE = os.environ.get('ECF_DEFAULT_TYPE', '32')
 ECF_AUTO_CREATE_INVOICE_STATUSES = tuple(
     value.strip()